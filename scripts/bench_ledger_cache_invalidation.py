@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: ledger cache selective invalidation latency.
+
+Compares the index-set invalidation in ``ledger_cache.invalidate_ledger_cache``
+(SMEMBERS + UNLINK on ``ledger:idx:{sub}:{name}``) with the previous
+SCAN/DEL loop over ``ledger:bal:v*:{sub}:{name}:*`` at several cache sizes.
+
+Runs against an in-process fakeredis server so no real Redis is touched.
+
+Usage:
+    python scripts/bench_ledger_cache_invalidation.py [--sizes 10000,100000,1000000]
+        [--keys-per-account 20] [--rounds 5] [--scan-max 10000]
+
+``--scan-max`` skips the SCAN baseline above that many keys; a full SCAN of a
+1M key fakeredis keyspace costs minutes per call (roughly 1s per 10k keys).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+from datetime import datetime, timedelta, timezone
+from timeit import default_timer as timer
+
+try:
+    import fakeredis
+except ImportError:  # pragma: no cover - dev dependency only
+    print("fakeredis is required: uv sync --group dev (or pip install fakeredis)")
+    sys.exit(1)
+
+from v4vapp_backend_v2.accounting import ledger_cache
+from v4vapp_backend_v2.accounting.ledger_account_classes import LiabilityAccount
+from v4vapp_backend_v2.config.setup import InternalConfig
+
+PAYLOAD = '{"name":"bench","sub":"bench","balances":{}}'
+FILL_BATCH = 5000
+
+
+def _account(i: int) -> LiabilityAccount:
+    return LiabilityAccount(name="VSC Liability", sub=f"bench-{i:07d}")
+
+
+async def fill(total_keys: int, keys_per_account: int) -> int:
+    """Write ``total_keys`` cache entries (with index sets) and return the account count."""
+    redis = InternalConfig.redis_async
+    await redis.flushall()
+    accounts = max(1, total_keys // keys_per_account)
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    written = 0
+    pipe = redis.pipeline(transaction=False)
+    for i in range(accounts):
+        account = _account(i)
+        for k in range(keys_per_account):
+            key = ledger_cache._make_cache_key(0, account, base + timedelta(minutes=k), None)
+            ledger_cache._queue_set(pipe, key, account, PAYLOAD, 3600)
+            written += 1
+            if written % FILL_BATCH == 0:
+                await pipe.execute()
+                pipe = redis.pipeline(transaction=False)
+    await pipe.execute()
+    return accounts
+
+
+async def scan_invalidate(name: str, sub: str) -> None:
+    """The previous SCAN/DEL implementation, kept here as the baseline."""
+    redis = InternalConfig.redis_async
+    cursor_val = 0
+    while True:
+        cursor_val, keys = await redis.scan(
+            cursor_val, match=f"ledger:bal:v*:{sub}:{name}:*", count=100
+        )
+        if keys:
+            await redis.delete(*keys)
+        if cursor_val == 0:
+            break
+
+
+async def time_rounds(func, accounts: int, rounds: int, offset: int) -> list[float]:
+    timings = []
+    for r in range(rounds):
+        # Step through different accounts so every round deletes live keys.
+        debit = _account((offset + 2 * r) % accounts)
+        credit = _account((offset + 2 * r + 1) % accounts)
+        start = timer()
+        await func(debit, credit)
+        timings.append((timer() - start) * 1000)
+    return timings
+
+
+async def index_pair(debit: LiabilityAccount, credit: LiabilityAccount) -> None:
+    await ledger_cache.invalidate_ledger_cache(debit.name, debit.sub, credit.name, credit.sub)
+
+
+async def scan_pair(debit: LiabilityAccount, credit: LiabilityAccount) -> None:
+    await scan_invalidate(debit.name, debit.sub)
+    await scan_invalidate(credit.name, credit.sub)
+
+
+def report(label: str, timings: list[float]) -> None:
+    print(
+        f"    {label:<6} median {statistics.median(timings):10.3f} ms"
+        f"   min {min(timings):10.3f} ms   max {max(timings):10.3f} ms"
+    )
+
+
+async def main(sizes: list[int], keys_per_account: int, rounds: int, scan_max: int) -> None:
+    InternalConfig.redis_async = fakeredis.FakeAsyncRedis(decode_responses=True)
+    for size in sizes:
+        start = timer()
+        accounts = await fill(size, keys_per_account)
+        print(
+            f"{size:>9,} keys / {accounts:,} accounts (filled in {timer() - start:.1f}s), "
+            f"{rounds} debit/credit invalidations:"
+        )
+        report("index", await time_rounds(index_pair, accounts, rounds, offset=0))
+        if size <= scan_max:
+            report("scan", await time_rounds(scan_pair, accounts, rounds, offset=2 * rounds))
+        else:
+            print(f"    scan   skipped (> --scan-max {scan_max:,})")
+    await InternalConfig.redis_async.flushall()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--keys-per-account", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--scan-max", type=int, default=10000)
+    args = parser.parse_args()
+    asyncio.run(
+        main(
+            [int(s) for s in args.sizes.split(",")],
+            args.keys_per_account,
+            args.rounds,
+            args.scan_max,
+        )
+    )
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Benchmark: LockStr contention, Redis polling locks vs the local-first lock manager.
+
+``N`` tasks in one process repeatedly take the same customer lock, do a little work,
+and release it, for N = 1, 10 and 100 concurrent customers' operations.  Compares
+
+* ``redis``   - a plain ``redis.asyncio.lock.Lock`` polling every 0.5 s, which is how
+                ``LockStr.acquire_lock`` worked before
+* ``manager`` - ``LockStr.acquire_lock`` / ``release_lock`` through ``LOCK_MANAGER``
+                (in-memory FIFO handoff, Redis SET NX with fencing, pub/sub wakeups)
+
+and reports lock operations per second, p50 / p99 acquire latency and Redis calls
+avoided by local handoffs.  Uses the Redis configured for the current environment.
+
+Usage:
+    python scripts/bench_lock_contention.py [--rounds 20] [--work-ms 1]
+        [--concurrency 1 10 100] [--skip-redis]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+from timeit import default_timer as timer
+from typing import Awaitable, Callable, List
+from uuid import uuid4
+
+from redis.asyncio.lock import Lock as RedisLock
+
+from v4vapp_backend_v2.config.setup import InternalConfig
+from v4vapp_backend_v2.process.lock_manager import LOCK_MANAGER
+from v4vapp_backend_v2.process.lock_str_class import LockStr
+
+OLD_POLLING_SLEEP = 0.5
+WORK = 0.001
+
+
+async def redis_cycle(name: str) -> Callable[[], Awaitable[float]]:
+    async def cycle() -> float:
+        lock = RedisLock(
+            InternalConfig.redis_async,
+            name=f"lock_str:{name}",
+            timeout=None,
+            sleep=OLD_POLLING_SLEEP,
+            blocking=True,
+            blocking_timeout=None,
+        )
+        t0 = timer()
+        await lock.acquire()
+        waited = timer() - t0
+        await asyncio.sleep(WORK)
+        await lock.release()
+        return waited
+
+    return cycle
+
+
+async def manager_cycle(name: str) -> Callable[[], Awaitable[float]]:
+    lock = LockStr(name)
+
+    async def cycle() -> float:
+        t0 = timer()
+        await lock.acquire_lock(blocking_timeout=None)
+        waited = timer() - t0
+        await asyncio.sleep(WORK)
+        await LockStr.release_lock(lock)
+        return waited
+
+    return cycle
+
+
+async def run(label: str, make_cycle, concurrency: int, rounds: int) -> None:
+    cycle = await make_cycle(f"bench_{uuid4().hex[:8]}")
+    latencies: List[float] = []
+
+    async def worker() -> None:
+        for _ in range(rounds):
+            latencies.append(await cycle())
+
+    stats_before = dict(LOCK_MANAGER.stats)
+    t0 = timer()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = timer() - t0
+    handoffs = LOCK_MANAGER.stats["local_handoffs"] - stats_before["local_handoffs"]
+    report(label, concurrency, latencies, elapsed, handoffs)
+
+
+def report(
+    label: str, concurrency: int, latencies: List[float], elapsed: float, handoffs: int
+) -> None:
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(
+        f"    {label:<8} {concurrency:4} tasks  {len(latencies) / elapsed:9.1f} ops/s"
+        f"   p50 {statistics.median(latencies) * 1000:9.2f} ms"
+        f"   p99 {p99 * 1000:9.2f} ms   local handoffs {handoffs:6}"
+    )
+
+
+async def main(rounds: int, concurrency: List[int], skip_redis: bool) -> None:
+    InternalConfig()
+    for n in concurrency:
+        print(f"{n} concurrent task(s) on one customer lock, {rounds} rounds each")
+        if not skip_redis:
+            await run("redis", redis_cycle, n, rounds)
+        await run("manager", manager_cycle, n, rounds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--work-ms", type=float, default=1.0)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument(
+        "--skip-redis", action="store_true", help="only run the lock manager (no Lua/EVAL)"
+    )
+    args = parser.parse_args()
+    WORK = args.work_ms / 1000
+    asyncio.run(main(args.rounds, args.concurrency, args.skip_redis))
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: cost of the ``all_ops_loop`` log call on the calling thread.
+
+Decodes the recorded ops in ``tests/data/hive_models`` and logs each one the way
+``combined_logging`` does (``op.log_str`` with the op's ``log_extra``) through
+
+* ``direct``      - ``2-stderr-json-file.json``: ``MyJSONFormatter`` writes the JSON file
+                    on the calling thread
+* ``queued``      - ``QueueHandler`` on a ``queue.Queue`` in front of the same file
+                    handler, extras built eagerly (the previous queued config)
+* ``structured``  - ``StructuredQueueHandler`` on a ``SimpleQueue`` with the extras
+                    passed as ``lazy_extra(..., defer=True)`` (``all_ops_loop`` now)
+* ``off-eager`` / ``off-lazy`` - the same call at DEBUG with DEBUG disabled, building
+                    ``log_extra`` at the call site vs ``lazy_extra``
+
+For each mode it reports the time per log call seen by the caller and, for the queued
+modes, how long the writer thread took to drain the queue afterwards.
+
+Usage:
+    python scripts/bench_log_pipeline.py [--rounds 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import logging.handlers
+import queue
+import tempfile
+from pathlib import Path
+from timeit import default_timer as timer
+from typing import Any, Callable, List
+
+from v4vapp_backend_v2.config.mylogger import (
+    MyJSONFormatter,
+    StructuredQueueHandler,
+    lazy_extra,
+)
+from v4vapp_backend_v2.hive_models.op_all import RawOp, op_any_or_base
+
+FILES = (
+    "tests/data/hive_models/all_ops_log.jsonl",
+    "tests/data/hive_models/real_ops_logs.jsonl",
+    "tests/data/hive_models/virtual_ops_log.jsonl",
+)
+FMT_KEYS = {
+    "level": "levelname",
+    "message": "message",
+    "timestamp": "timestamp",
+    "logger": "name",
+    "module": "module",
+    "function": "funcName",
+    "line": "lineno",
+    "thread_name": "threadName",
+}
+
+
+def load_ops() -> List[Any]:
+    ops = []
+    for file_name in FILES:
+        with open(file_name) as f:
+            for line in f:
+                try:
+                    hive_event = json.loads(line).get("hive_event")
+                except json.JSONDecodeError:
+                    continue
+                if not hive_event:
+                    continue
+                try:
+                    op = op_any_or_base(hive_event)
+                except Exception:
+                    continue
+                if not isinstance(op, RawOp):
+                    ops.append(op)
+    return ops
+
+
+def file_handler(folder: Path) -> logging.Handler:
+    handler = logging.handlers.RotatingFileHandler(
+        folder / "bench.jsonl", maxBytes=50_000_000, backupCount=1
+    )
+    handler.setFormatter(MyJSONFormatter(fmt_keys=FMT_KEYS))
+    return handler
+
+
+def eager_call(log: logging.Logger, op: Any) -> None:
+    log.info(
+        op.log_str,
+        extra={"notification": False, "notification_str": op.notification_str, **op.log_extra},
+    )
+
+
+def lazy_call(log: logging.Logger, op: Any) -> None:
+    log.info(
+        op.log_str,
+        extra={
+            "notification": False,
+            "notification_str": op.notification_str,
+            **lazy_extra(lambda: op.log_extra, defer=True),
+        },
+    )
+
+
+def eager_debug(log: logging.Logger, op: Any) -> None:
+    log.debug(op.log_str, extra={"notification": False, **op.log_extra})
+
+
+def lazy_debug(log: logging.Logger, op: Any) -> None:
+    log.debug(op.log_str, extra={"notification": False, **lazy_extra(lambda: op.log_extra)})
+
+
+def run_mode(
+    mode: str, ops: List[Any], folder: Path, call: Callable[[logging.Logger, Any], None]
+) -> tuple[float, float]:
+    log = logging.getLogger(f"bench.{mode}")
+    log.propagate = False
+    log.setLevel(logging.INFO)
+    handler = file_handler(folder)
+    listener = None
+    if mode == "direct" or mode.startswith("off"):
+        log.addHandler(handler)
+    else:
+        if mode == "queued":
+            front: logging.Handler = logging.handlers.QueueHandler(queue.Queue())
+        else:
+            front = StructuredQueueHandler(queue.SimpleQueue())
+        listener = logging.handlers.QueueListener(front.queue, handler)  # type: ignore[attr-defined]
+        listener.start()
+        log.addHandler(front)
+
+    t0 = timer()
+    for op in ops:
+        call(log, op)
+    caller = timer() - t0
+    t0 = timer()
+    if listener is not None:
+        listener.stop()
+    drain = timer() - t0
+    for h in list(log.handlers):
+        log.removeHandler(h)
+    handler.close()
+    return caller, drain
+
+
+def main(rounds: int) -> None:
+    ops = load_ops()
+    print(f"{len(ops):,} ops x {rounds} rounds")
+    modes = {
+        "direct": eager_call,
+        "queued": eager_call,
+        "structured": lazy_call,
+        "off-eager": eager_debug,
+        "off-lazy": lazy_debug,
+    }
+    calls = len(ops) * rounds
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        results = {}
+        for mode, call in modes.items():
+            caller = drain = 0.0
+            for _ in range(rounds):
+                c, d = run_mode(mode, ops, folder, call)
+                caller += c
+                drain += d
+            results[mode] = (caller, drain)
+        base = results["direct"][0]
+        for mode, (caller, drain) in results.items():
+            print(
+                f"    {mode:<11} {caller / calls * 1e6:8.1f} us/call   x{base / caller:6.1f}"
+                f"   writer drain {drain:6.2f}s"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    main(args.rounds)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: Overwatch event dispatch, full scan vs the indexed flow registry.
+
+Builds ``--flows`` synthetic in-flight flows spread over the registered flow
+definitions (each holding only its trigger event) and feeds ``--events`` ledger and
+op events through
+
+* ``scan``     - what ``Overwatch._dispatch`` did before: every active flow is
+                 checked for duplicates and offered the event
+* ``indexed``  - ``Overwatch._dispatch`` now: only the flows with a stage of the
+                 event's signature are looked at
+
+Each mode starts from its own copy of the flows, so both apply the same matches.
+Redis is not used.
+
+Usage:
+    python scripts/bench_overwatch_dispatch.py [--flows 10000] [--events 300]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import random
+from timeit import default_timer as timer
+from typing import List
+
+import v4vapp_backend_v2.process.overwatch_flows as overwatch_flows
+from v4vapp_backend_v2.accounting.ledger_type_class import LedgerType
+from v4vapp_backend_v2.process.process_overwatch import (
+    FlowDefinition,
+    FlowEvent,
+    FlowInstance,
+    Overwatch,
+)
+
+DEFINITIONS: List[FlowDefinition] = [
+    value for value in vars(overwatch_flows).values() if isinstance(value, FlowDefinition)
+]
+OP_TYPES = ["transfer", "custom_json", "payment", "invoice", "fill_order", "limit_order_create"]
+
+
+def build_flows(count: int) -> List[FlowInstance]:
+    flows = []
+    for n in range(count):
+        definition = DEFINITIONS[n % len(DEFINITIONS)]
+        flow = FlowInstance(
+            flow_definition=definition,
+            trigger_group_id=f"trigger_{n}",
+            trigger_short_id=f"{n:06d}",
+            cust_id=f"cust{n % 500}",
+        )
+        flow.events.append(
+            FlowEvent(event_type="op", op_type=definition.trigger_op_type, group_id=f"trigger_{n}")
+        )
+        flows.append(flow)
+    return flows
+
+
+def build_events(count: int, seed: int = 1) -> List[FlowEvent]:
+    rng = random.Random(seed)
+    ledger_types = list(LedgerType)
+    events = []
+    for n in range(count):
+        if rng.random() < 0.8:
+            events.append(
+                FlowEvent(
+                    event_type="ledger", ledger_type=rng.choice(ledger_types), group_id=f"le_{n}"
+                )
+            )
+        else:
+            events.append(
+                FlowEvent(event_type="op", op_type=rng.choice(OP_TYPES), group_id=f"op_{n}")
+            )
+    return events
+
+
+async def scan_dispatch(flows: List[FlowInstance], event: FlowEvent) -> None:
+    for flow in [f for f in flows if f.status not in ("completed", "failed")]:
+        if Overwatch._is_duplicate(flow, event):
+            continue
+        flow.add_event(event)
+
+
+async def run(flows_count: int, events_count: int) -> None:
+    logging.disable(logging.CRITICAL)
+    Overwatch.reset()
+    Overwatch._redis = staticmethod(lambda: None)  # type: ignore[method-assign]
+    Overwatch._loaded_from_redis = True
+    Overwatch.COMPLETION_REPORT_DELAY = 3600
+    events = build_events(events_count)
+    print(f"{flows_count:,} flows over {len(DEFINITIONS)} definitions, {len(events):,} events")
+
+    flows = build_flows(flows_count)
+    t0 = timer()
+    for event in events:
+        await scan_dispatch(flows, event)
+    scan = timer() - t0
+
+    overwatch = Overwatch()
+    overwatch.flow_instances.extend(build_flows(flows_count))
+    t0 = timer()
+    for event in events:
+        await overwatch._dispatch(event)
+    indexed = timer() - t0
+    Overwatch.reset()
+
+    for label, elapsed in (("scan", scan), ("indexed", indexed)):
+        print(
+            f"    {label:<8} {elapsed:8.3f}s  {elapsed / len(events) * 1000:8.3f} ms/event"
+            f"   x{scan / elapsed:6.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--flows", type=int, default=10_000)
+    parser.add_argument("--events", type=int, default=300)
+    args = parser.parse_args()
+    asyncio.run(run(args.flows, args.events))
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: quote cache payloads, pickle vs the versioned quote codec.
+
+Uses the recorded provider responses in ``tests/data/crypto_prices`` and compares
+
+* ``pickle`` - what ``QuoteService.set_cache`` and ``AllQuotes.get_all_quotes`` stored
+               before: the whole ``QuoteResponse`` (raw response included) and the
+               pickled ``global_quote_pack`` dict
+* ``codec``  - ``encode_quote`` / ``encode_quote_pack`` (rates, fetch date, source)
+
+for payload size and encode / decode time, for one provider quote and for the global
+pack every quote reader starts with.
+
+Usage:
+    python scripts/bench_quote_codec.py [--rounds 20000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import pickle
+import statistics
+from datetime import datetime, timezone
+from timeit import default_timer as timer
+from typing import Any, Callable, Dict
+
+from v4vapp_backend_v2.helpers.crypto_prices import AllQuotes, QuoteResponse
+from v4vapp_backend_v2.helpers.quote_codec import (
+    decode_quote,
+    decode_quote_pack,
+    encode_quote,
+    encode_quote_pack,
+)
+
+SERVICES = ("CoinGecko", "Binance", "CoinMarketCap", "HiveInternalMarket")
+
+
+def load_quotes() -> Dict[str, QuoteResponse]:
+    quotes = {}
+    for name in SERVICES:
+        with open(f"tests/data/crypto_prices/{name}.json") as f:
+            quotes[name] = QuoteResponse.model_validate(json.load(f))
+    return quotes
+
+
+def pickle_pack_decode(all_quotes: AllQuotes, data: bytes) -> Dict[str, QuoteResponse]:
+    # The old check_global_cache path: unpickle, then re-validate every quote.
+    return all_quotes.unpack_quotes(pickle.loads(data))
+
+
+def time_it(func: Callable[[], Any], rounds: int) -> float:
+    timings = []
+    for _ in range(5):
+        t0 = timer()
+        for _ in range(rounds):
+            func()
+        timings.append((timer() - t0) / rounds)
+    return statistics.median(timings)
+
+
+def report(label: str, size: int, encode: float, decode: float) -> None:
+    print(
+        f"    {label:<7} {size:7,} bytes   encode {encode * 1e6:8.2f} µs"
+        f"   decode {decode * 1e6:8.2f} µs"
+    )
+
+
+def main(rounds: int) -> None:
+    quotes = load_quotes()
+    all_quotes = AllQuotes()
+    all_quotes.quotes = quotes
+    all_quotes.fetch_date = datetime.now(tz=timezone.utc)
+    all_quotes.source = ", ".join(SERVICES)
+
+    quote = quotes["CoinMarketCap"]
+    print(f"Single provider quote (CoinMarketCap, {rounds:,} rounds)")
+    old = pickle.dumps(quote)
+    new = encode_quote(quote)
+    report(
+        "pickle",
+        len(old),
+        time_it(lambda: pickle.dumps(quote), rounds),
+        time_it(lambda: pickle.loads(old), rounds),
+    )
+    report(
+        "codec",
+        len(new),
+        time_it(lambda: encode_quote(quote), rounds),
+        time_it(lambda: decode_quote(new), rounds),
+    )
+
+    print(f"Global quote pack ({len(quotes)} providers, {rounds:,} rounds)")
+    old = pickle.dumps(all_quotes.global_quote_pack())
+    new = encode_quote_pack(quotes, all_quotes.fetch_date, all_quotes.source)
+    report(
+        "pickle",
+        len(old),
+        time_it(lambda: pickle.dumps(all_quotes.global_quote_pack()), rounds),
+        time_it(lambda: pickle_pack_decode(all_quotes, old), rounds),
+    )
+    fetch_date, source = all_quotes.fetch_date, all_quotes.source
+    report(
+        "codec",
+        len(new),
+        time_it(lambda: encode_quote_pack(quotes, fetch_date, source), rounds),
+        time_it(lambda: decode_quote_pack(new), rounds),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=20_000)
+    args = parser.parse_args()
+    main(args.rounds)
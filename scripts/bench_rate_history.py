@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: nearest-rate lookup via the in-memory RateHistory vs the database.
+
+Seeds a scratch rates collection with a year of records (one every ``--interval``
+seconds, the rate store cadence), then times random historical lookups with
+
+* ``db``     - ``find_nearest_by_timestamp_server_side`` (1h window, then unbounded),
+               the query ``TrackedBaseModel.nearest_quote`` used to issue per op
+* ``memory`` - ``RateHistory.nearest`` after it has paged the year in
+
+With ``--mongo-uri`` the collection lives in a real MongoDB (with a timestamp index);
+otherwise mongomock is used, which scans instead of using the index, so its ``db``
+numbers are an upper bound.
+
+Usage:
+    python scripts/bench_rate_history.py [--days 365] [--interval 110]
+        [--lookups 20000] [--db-lookups 200] [--mongo-uri mongodb://localhost:27017]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+from datetime import datetime, timedelta, timezone
+from timeit import default_timer as timer
+
+from bson import Decimal128
+
+from v4vapp_backend_v2.config.setup import InternalConfig
+from v4vapp_backend_v2.database.db_tools import find_nearest_by_timestamp_server_side
+from v4vapp_backend_v2.helpers.rate_history import RateHistory
+
+COLLECTION = "rates_ts_bench"
+FILL_BATCH = 10_000
+
+
+def _db(mongo_uri: str | None):
+    if mongo_uri:
+        from pymongo import AsyncMongoClient
+
+        return AsyncMongoClient(mongo_uri, tz_aware=True)["v4vapp_bench"]
+    try:
+        from mongomock_motor import AsyncMongoMockClient
+    except ImportError:  # pragma: no cover - dev dependency only
+        print("mongomock-motor is required without --mongo-uri: pip install mongomock-motor")
+        sys.exit(1)
+    return AsyncMongoMockClient(tz_aware=True)["v4vapp_bench"]
+
+
+async def fill(db, start: datetime, days: int, interval: int) -> int:
+    collection = db[COLLECTION]
+    await collection.drop()
+    await collection.create_index("timestamp")
+    rng = random.Random(1)
+    count = int(days * 86400 / interval)
+    batch = []
+    for i in range(count):
+        hive_usd = 0.2 + rng.random() / 10
+        batch.append(
+            {
+                "timestamp": start + timedelta(seconds=i * interval + rng.randint(0, 20)),
+                "hive_usd": Decimal128(f"{hive_usd:.6f}"),
+                "hbd_usd": Decimal128("1.000"),
+                "btc_usd": Decimal128(f"{60000 + rng.random() * 1000:.2f}"),
+                "hive_hbd": Decimal128(f"{hive_usd:.6f}"),
+            }
+        )
+        if len(batch) == FILL_BATCH:
+            await collection.insert_many(batch)
+            batch = []
+    if batch:
+        await collection.insert_many(batch)
+    return count
+
+
+async def db_nearest(target: datetime):
+    collection = InternalConfig.db[COLLECTION]
+    doc = await find_nearest_by_timestamp_server_side(
+        collection, target, ts_field="timestamp", max_window=timedelta(hours=1)
+    )
+    if doc is None:
+        doc = await find_nearest_by_timestamp_server_side(
+            collection, target, ts_field="timestamp", max_window=None
+        )
+    return doc
+
+
+def report(label: str, timings: list[float]) -> None:
+    print(
+        f"    {label:<6} median {statistics.median(timings) * 1e6:12.2f} µs"
+        f"   p99 {sorted(timings)[int(len(timings) * 0.99) - 1] * 1e6:12.2f} µs"
+        f"   ({len(timings):,} lookups)"
+    )
+
+
+async def main(days: int, interval: int, lookups: int, db_lookups: int, mongo_uri: str | None):
+    db = _db(mongo_uri)
+    InternalConfig.db = db
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    t0 = timer()
+    count = await fill(db, start, days, interval)
+    print(f"{count:,} rate records over {days} days (filled in {timer() - t0:.1f}s)")
+
+    rng = random.Random(2)
+    span = timedelta(days=days).total_seconds()
+    targets = [start + timedelta(seconds=rng.random() * span) for _ in range(lookups)]
+
+    history = RateHistory(collection_name=COLLECTION, page=timedelta(days=days))
+    t0 = timer()
+    await history.nearest(targets[0])
+    print(f"    memory load of {len(history):,} records: {timer() - t0:.2f}s ({history.loads} reads)")
+
+    memory = []
+    for target in targets:
+        t0 = timer()
+        await history.nearest(target)
+        memory.append(timer() - t0)
+
+    database = []
+    for target in targets[:db_lookups]:
+        t0 = timer()
+        doc = await db_nearest(target)
+        database.append(timer() - t0)
+        quote = await history.nearest(target)
+        assert doc is not None and quote is not None
+        assert abs(quote.fetch_date - doc["timestamp"].replace(tzinfo=timezone.utc)) < timedelta(
+            seconds=1
+        ), "memory and database disagree"
+
+    report("db", database)
+    report("memory", memory)
+    print(f"    speed-up {statistics.median(database) / statistics.median(memory):,.0f}x")
+    await db[COLLECTION].drop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--interval", type=int, default=110)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    parser.add_argument("--db-lookups", type=int, default=200)
+    parser.add_argument("--mongo-uri", default=None)
+    args = parser.parse_args()
+    asyncio.run(main(args.days, args.interval, args.lookups, args.db_lookups, args.mongo_uri))
@@ -195,7 +195,7 @@ async def fixed_quote(
 async def binance() -> Dict[str, str | int | float]:
     try:
         adapter = get_exchange_adapter()
-        balances = adapter.get_balances(["BTC", "HIVE", "USDT"])
+        balances = await adapter.get_balances_async(["BTC", "HIVE", "USDT"])
         logger.debug(f"{ICON} Binance balances: {balances}")
     except ExchangeConnectionError:
         return {"error": "Bad connection"}
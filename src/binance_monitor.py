@@ -124,7 +124,7 @@ async def check_binance_balances():
         try:
             if shutdown_event.is_set():
                 raise asyncio.CancelledError("Docker Shutdown")
-            new_balances, hive_target, notification_str, log_str = generate_message(
+            new_balances, hive_target, notification_str, log_str = await generate_message(
                 saved_balances,
             )
             silent = True if new_balances.get("HIVE", 0) > hive_target else False
@@ -188,7 +188,7 @@ async def check_binance_balances():
                 start = timer()
 
 
-def generate_message(saved_balances: dict):
+async def generate_message(saved_balances: dict):
     """
     Generates a message summarizing the current and target balances of HIVE and SATS,
     along with any changes (delta) in balances since the last check.
@@ -209,7 +209,7 @@ def generate_message(saved_balances: dict):
     delta_message = ""
     delta_balances = {}
     adapter = get_exchange_adapter()
-    balances = adapter.get_balances(["BTC", "HIVE"])
+    balances = await adapter.get_balances_async(["BTC", "HIVE"])
     hive_balance = Decimal(balances.get("HIVE", 0))
     sats_balance = Decimal(balances.get("SATS", 0))
     if saved_balances and balances != saved_balances:
@@ -223,7 +223,7 @@ def generate_message(saved_balances: dict):
                 f"{hive_direction} {delta_balances.get('HIVE', 0):.3f} HIVE "
                 f"({sats_direction} {int(delta_balances.get('SATS', 0)):,} sats)"
             )
-    current_price_decimal = adapter.get_current_price("HIVE", "BTC")
+    current_price_decimal = await adapter.get_current_price_async("HIVE", "BTC")
     saved_balances = balances
 
     current_price_sats = current_price_decimal * Decimal("1e8")
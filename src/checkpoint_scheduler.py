@@ -0,0 +1,131 @@
+import asyncio
+import signal
+import sys
+from typing import Annotated
+
+import typer
+
+from v4vapp_backend_v2 import __version__
+from v4vapp_backend_v2.accounting.ledger_checkpoint_scheduler import (
+    checkpoint_scheduler_loop,
+    run_checkpoint_cycle_locked,
+)
+from v4vapp_backend_v2.config.setup import DEFAULT_CONFIG_FILENAME, InternalConfig, logger
+from v4vapp_backend_v2.database.db_pymongo import DBConn
+
+ICON = "🗓️"
+app = typer.Typer()
+# Define a global flag to track shutdown
+shutdown_event = asyncio.Event()
+
+
+def handle_shutdown_signal():
+    """
+    Signal handler to set the shutdown event.
+    """
+    logger.info(f"{ICON} Received shutdown signal. Setting shutdown event.")
+    shutdown_event.set()
+
+
+async def main_async_start(once: bool = False):
+    """
+    Main function to run the Checkpoint Scheduler app.
+    Args:
+        once (bool): Run a single detect/backfill/prune cycle and exit.
+
+    Returns:
+        None
+    """
+    CONFIG = InternalConfig().config
+    logger.info(
+        f"{ICON} Notification bot: {CONFIG.logging.default_notification_bot_name} "
+        f"🔗 Database connection: {CONFIG.dbs_config.default_connection} "
+        f"🔗 Database name: {CONFIG.dbs_config.default_name} "
+    )
+    db_conn = DBConn()
+    await db_conn.setup_database()
+
+    loop = asyncio.get_event_loop()
+    # Register signal handlers for SIGTERM and SIGINT
+    loop.add_signal_handler(signal.SIGTERM, handle_shutdown_signal)
+    loop.add_signal_handler(signal.SIGINT, handle_shutdown_signal)
+    try:
+        logger.info(f"{ICON} Checkpoint Scheduler started.")
+        if once:
+            await run_checkpoint_cycle_locked()
+        else:
+            await checkpoint_scheduler_loop(shutdown_event)
+    except (asyncio.CancelledError, KeyboardInterrupt):
+        InternalConfig.notification_lock = True
+        logger.info(f"{ICON} 👋 Received signal to stop. Exiting...")
+    except Exception as e:
+        logger.exception(e, extra={"error": e, "notification": False})
+        logger.error(f"{ICON} Irregular shutdown in Checkpoint Scheduler {e}", extra={"error": e})
+        raise e
+    finally:
+        logger.info(f"{ICON} Cleaning up resources...")
+        if hasattr(InternalConfig, "notification_loop"):
+            while InternalConfig.notification_lock:
+                logger.info("Waiting for notification loop to complete...")
+                await asyncio.sleep(0.5)  # Allow pending notifications to complete
+        current_task = asyncio.current_task()
+        tasks = [task for task in asyncio.all_tasks() if task is not current_task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        logger.info(f"{ICON} 👋 Goodbye! from Checkpoint Scheduler", extra={"notification": True})
+
+
+@app.command()
+def main(
+    config_filename: Annotated[
+        str,
+        typer.Option(
+            "-c",
+            "--config",
+            "--config-filename",
+            help="The name of the config file (in a folder called ./config)",
+            show_default=True,
+        ),
+    ] = DEFAULT_CONFIG_FILENAME,
+    once: Annotated[
+        bool,
+        typer.Option(
+            "--once",
+            help="Run a single checkpoint cycle and exit",
+            is_flag=True,
+        ),
+    ] = False,
+):
+    """
+    Ledger Checkpoint Scheduler.
+    Keeps daily/weekly/monthly ledger checkpoints for every active account,
+    backfilling gaps and pruning old fine-grained checkpoints.
+    Args:
+        config_filename (str): The name of the config file (in a folder called ./config).
+        once (bool): Run a single cycle and exit instead of running daily.
+
+    Returns:
+        None
+    """
+    _ = InternalConfig(config_filename=config_filename)
+    logger.info(
+        f"{ICON} ✅ Checkpoint Scheduler. Started. Version: {__version__} on {InternalConfig().local_machine_name}",
+        extra={"notification": True},
+    )
+
+    asyncio.run(main_async_start(once=once))
+
+
+if __name__ == "__main__":
+    try:
+        logger.name = "checkpoint_scheduler"
+        app()
+        print("👋 Goodbye!")
+    except KeyboardInterrupt:
+        print("👋 Goodbye!")
+        sys.exit(0)
+
+    except Exception as e:
+        logger.exception(e)
+        sys.exit(1)
@@ -4,6 +4,7 @@ import signal
 import sys
 from contextlib import suppress
 from datetime import datetime, timezone
+from functools import partial
 from typing import Annotated, Any, Dict, Mapping, Sequence
 
 import bson
@@ -20,6 +21,7 @@ from pymongo.errors import (
 from status.status_api import StatusAPI
 from v4vapp_backend_v2 import __version__
 from v4vapp_backend_v2.accounting.ledger_cache import invalidate_all_ledger_cache
+from v4vapp_backend_v2.accounting.ledger_checkpoint_scheduler import checkpoint_scheduler_loop
 from v4vapp_backend_v2.accounting.ledger_entry_class import LedgerEntry, LedgerEntryException
 from v4vapp_backend_v2.accounting.pipelines.simple_pipelines import (
     IGNORED_UPDATE_FIELDS,
@@ -39,6 +41,11 @@ from v4vapp_backend_v2.helpers.opening_balances import (
     reset_exchange_opening_balance,
     reset_lightning_opening_balance,
 )
+from v4vapp_backend_v2.process.keyed_worker_pool import (
+    DEFAULT_WORKERS,
+    CompletionWatermark,
+    KeyedWorkerPool,
+)
 from v4vapp_backend_v2.process.lock_str_class import CustIDLockException, LockStr
 from v4vapp_backend_v2.process.overwatch_flows import FLOW_DEFINITIONS
 from v4vapp_backend_v2.process.process_overwatch import Overwatch
@@ -72,7 +79,12 @@ async def health_check() -> Dict[str, Any]:
         f"{ICON} DB Monitor Health check passed",
         extra={"notification": False, "error_code_clear": "db_monitor_task_failure"},
     )
-    return {"status": "OK", "name": __name__, "version": __version__}
+    return {
+        "status": "OK",
+        "name": __name__,
+        "version": __version__,
+        "process_pool": process_pool_stats(),
+    }
 
 
 # Define a global flag to track shutdown
@@ -80,6 +92,55 @@ shutdown_event = asyncio.Event()
 
 _overwatch_enabled: bool = False
 
+# Change events are processed on a bounded pool of workers, sharded by customer.
+_process_workers: int = DEFAULT_WORKERS
+_process_pool: KeyedWorkerPool | None = None
+_process_pool_loop: asyncio.AbstractEventLoop | None = None
+# collection name -> events handed to the pool whose resume token is not yet stored
+_watermarks: Dict[str, CompletionWatermark] = {}
+
+
+def set_process_workers(workers: int) -> None:
+    """Set the size of the worker pool used by ``subscribe_stream``."""
+    global _process_workers, _process_pool
+    _process_workers = max(int(workers), 1)
+    _process_pool = None
+
+
+def process_pool() -> KeyedWorkerPool:
+    """
+    The worker pool for change events, created on first use in the running loop.
+
+    Events for the same customer are processed strictly in stream order; events for
+    different customers are processed in parallel on up to ``_process_workers`` workers.
+    """
+    global _process_pool, _process_pool_loop
+    loop = asyncio.get_running_loop()
+    if _process_pool is None or _process_pool_loop is not loop:
+        _process_pool = KeyedWorkerPool(name="db_monitor", workers=_process_workers)
+        _process_pool_loop = loop
+    return _process_pool
+
+
+def process_pool_stats() -> Dict[str, Any]:
+    """Queue depth, per-worker latency and resume backlog for the health check."""
+    stats = _process_pool.stats() if _process_pool is not None else {}
+    stats["resume_backlog"] = {name: len(wm) for name, wm in _watermarks.items()}
+    return stats
+
+
+def shard_key(change: Mapping[str, Any]) -> str:
+    """
+    The ordering key for a change event: the customer id when the document has one,
+    otherwise the document ``_id`` so unrelated documents never wait on each other.
+    """
+    full_document = change.get("fullDocument") or {}
+    cust_id = full_document.get("cust_id")
+    if cust_id:
+        return f"cust:{cust_id}"
+    document_key = change.get("documentKey") or {}
+    return f"doc:{full_document.get('_id') or document_key.get('_id') or ''}"
+
 
 def set_overwatch_enabled(enabled: bool) -> None:
     """Mark overwatch as enabled/disabled for this process.
@@ -376,6 +437,12 @@ async def subscribe_stream(
                 extra={"notification": False},
             )
 
+        pool = process_pool()
+        # Only store a resume token once the event and every earlier one has been processed,
+        # so a restart replays anything that was still queued or in flight.
+        watermark = CompletionWatermark(on_advance=resume.set_token)
+        _watermarks[collection_name] = watermark
+
         async with await collection.watch(**watch_kwargs) as stream:
             if error_code:
                 logger.info(
@@ -406,12 +473,16 @@ async def subscribe_stream(
                         f"{ICON}✳️ Change detected in {collection_name} {group_id}",
                         extra={"notification": False, "change": change},
                     )
+                    seq = watermark.add(change.get("_id", {}))
                     if ignore_changes(change, collection_name=collection_name):
-                        pass
+                        watermark.done(seq)
                     else:
                         # Process the change if it is not a lock/unlock
-                        asyncio.create_task(process_op(change=change, collection=collection_name))
-                    resume.set_token(change.get("_id", {}))
+                        await pool.submit(
+                            shard_key(change),
+                            partial(process_op, change=change, collection=collection_name),
+                            on_done=partial(watermark.done, seq),
+                        )
                     if shutdown_event.is_set():
                         logger.info(
                             f"{ICON} Shutdown requested; exiting {collection_name} stream loop."
@@ -549,7 +620,12 @@ def handle_shutdown_signal():
     shutdown_event.set()
 
 
-async def main_async_start(use_resume: bool = True, use_overwatch: bool = False):
+async def main_async_start(
+    use_resume: bool = True,
+    use_overwatch: bool = False,
+    use_checkpoints: bool = False,
+    workers: int = DEFAULT_WORKERS,
+):
     """
     Main function to run Database Monitor app.
     Args:
@@ -560,6 +636,7 @@ async def main_async_start(use_resume: bool = True, use_overwatch: bool = False)
     """
     # flip the global so helpers know whether they should ingest anything
     set_overwatch_enabled(use_overwatch)
+    set_process_workers(workers)
 
     # Ensure notification handler uses the running loop (non-blocking path)
     InternalConfig.notification_loop = asyncio.get_running_loop()
@@ -614,6 +691,12 @@ async def main_async_start(use_resume: bool = True, use_overwatch: bool = False)
             tasks.append(task)
         if overwatch_enabled():
             tasks.append(asyncio.create_task(subscribe_overwatch(), name="overwatch_report_loop"))
+        if use_checkpoints:
+            tasks.append(
+                asyncio.create_task(
+                    checkpoint_scheduler_loop(shutdown_event), name="checkpoint_scheduler"
+                )
+            )
 
         await shutdown_event.wait()
         for t in tasks:
@@ -682,6 +765,22 @@ def main(
             is_flag=True,  # Mark as a flag option
         ),
     ] = False,
+    use_checkpoints: Annotated[
+        bool,
+        typer.Option(
+            "--checkpoints/--no-checkpoints",
+            help="Whether to run the daily ledger checkpoint scheduler",
+            is_flag=True,
+        ),
+    ] = False,
+    workers: Annotated[
+        int,
+        typer.Option(
+            "--workers",
+            help="Number of concurrent workers processing change events (ordered per customer)",
+            show_default=True,
+        ),
+    ] = DEFAULT_WORKERS,
 ):
     """
     DB Monitor App.
@@ -692,6 +791,8 @@ def main(
         config_filename (str): The name of the config file (in a folder called ./config).
         resume (bool): Whether to resume the stream from the last known token.
         use_overwatch (bool): Whether to start the overwatch report loop.
+        use_checkpoints (bool): Whether to run the ledger checkpoint scheduler.
+        workers (int): Number of concurrent workers processing change events.
 
     Returns:
         None
@@ -706,7 +807,14 @@ def main(
         extra={"notification": False},
     )
 
-    asyncio.run(main_async_start(use_resume=use_resume, use_overwatch=use_overwatch))
+    asyncio.run(
+        main_async_start(
+            use_resume=use_resume,
+            use_overwatch=use_overwatch,
+            use_checkpoints=use_checkpoints,
+            workers=workers,
+        )
+    )
 
 
 if __name__ == "__main__":
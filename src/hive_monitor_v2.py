@@ -3,7 +3,7 @@ import os
 import signal
 import sys
 import threading
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 from random import uniform
 from time import sleep
@@ -20,25 +20,34 @@ from pymongo.results import UpdateResult
 from status.status_api import StatusAPI, StatusAPIException
 from v4vapp_backend_v2 import __version__
 from v4vapp_backend_v2.actions.tracked_models import TrackedBaseModel
+from v4vapp_backend_v2.config.mylogger import lazy_extra
 from v4vapp_backend_v2.config.setup import (
     DEFAULT_CONFIG_FILENAME,
     InternalConfig,
     StartupFailure,
     logger,
 )
+from v4vapp_backend_v2.database.bulk_op_writer import BulkOpWriter
 from v4vapp_backend_v2.database.db_pymongo import DBConn
 from v4vapp_backend_v2.helpers.general_purpose_funcs import (
     check_time_diff,
     format_time_delta,
     seconds_only,
 )
+from v4vapp_backend_v2.helpers.quote_service import QUOTE_SERVICE
 from v4vapp_backend_v2.hive.hive_extras import get_hive_client, send_transfer
 from v4vapp_backend_v2.hive.internal_market_trade import account_trade
+from v4vapp_backend_v2.hive.node_pool import NODE_POOL
 from v4vapp_backend_v2.hive.v4v_config import V4VConfig
 from v4vapp_backend_v2.hive_models.block_marker import BlockMarker
 from v4vapp_backend_v2.hive_models.op_account_update2 import AccountUpdate2
 from v4vapp_backend_v2.hive_models.op_account_witness_vote import AccountWitnessVote
-from v4vapp_backend_v2.hive_models.op_all import OpAny, is_op_all_transfer
+from v4vapp_backend_v2.hive_models.op_all import (
+    OpAny,
+    RawOp,
+    is_op_all_transfer,
+    tracked_op_filter,
+)
 from v4vapp_backend_v2.hive_models.op_base import OpBase
 from v4vapp_backend_v2.hive_models.op_base_counters import BlockCounter
 from v4vapp_backend_v2.hive_models.op_fill_order import FillOrder
@@ -49,6 +58,10 @@ from v4vapp_backend_v2.hive_models.op_producer_reward import ProducerReward
 from v4vapp_backend_v2.hive_models.op_transfer import Transfer
 from v4vapp_backend_v2.hive_models.op_update_proposal_votes import UpdateProposalVotes
 from v4vapp_backend_v2.hive_models.stream_ops import stream_ops_async
+from v4vapp_backend_v2.hive_models.stream_watched_ops import (
+    stream_watched_ops_async,
+    watched_filter_from_config,
+)
 from v4vapp_backend_v2.witness_monitor.witness_events import check_witness_heartbeat
 
 HIVE_DATABASE_CONNECTION = ""
@@ -102,10 +115,16 @@ class StatusObject:
     time_diff: timedelta = timedelta(0)
     time_diff_str: str = ""
     is_catching_up: bool = False
+    op_writer: Dict[str, Any] = field(default_factory=dict)
+    quote_service: Dict[str, Any] = field(default_factory=dict)
+    node_pool: Dict[str, Any] = field(default_factory=dict)
 
 
 STATUS_OBJ = StatusObject()
 
+# Write-behind buffer for ops and block markers; ``db_store_op`` uses it while it is running.
+OP_WRITER = BulkOpWriter()
+
 
 async def health_check() -> Dict[str, Any]:
     """
@@ -127,7 +146,7 @@ async def health_check() -> Dict[str, Any]:
     """
 
     exceptions = []
-    check_for_tasks = ["all_ops_loop", "store_rates"]
+    check_for_tasks = ["all_ops_loop", "store_rates", "op_writer", "quote_refresher"]
 
     if not startup_complete_event.is_set():
         logger.warning(f"{ICON} Startup not complete", extra={"notification": False})
@@ -141,6 +160,9 @@ async def health_check() -> Dict[str, Any]:
             )
 
     STATUS_OBJ.time_diff_str = format_time_delta(STATUS_OBJ.time_diff)
+    STATUS_OBJ.op_writer = {"buffered": OP_WRITER.buffered, **OP_WRITER.stats.as_dict()}
+    STATUS_OBJ.quote_service = QUOTE_SERVICE.status()
+    STATUS_OBJ.node_pool = NODE_POOL.status()
 
     if exceptions:
         logger.error(
@@ -176,14 +198,19 @@ async def db_store_op(
     retries on connection failures. The operation is upserted into the appropriate collection,
     and logging is performed for errors and reconnections.
 
-    Uses the OpAny Save method which is automatically an upsert.
+    Uses the OpAny Save method which is automatically an upsert. While the
+    ``OP_WRITER`` buffer is running the op is queued for the next bulk upsert instead
+    (this waits if the buffer is full, slowing the stream down when MongoDB is slow).
 
         op (OpAny): The Hive event operation to process and store.
 
         UpdateResult | None: The result of the database update operation if successful,
-            or None/empty list if an error occurs.
+            or None/empty list if an error occurs or the op was buffered.
     """
     try:
+        if OP_WRITER.running:
+            await OP_WRITER.add(op)
+            return None
         return await op.save(mongo_kwargs={"upsert": True})
 
     except DuplicateKeyError as e:
@@ -539,7 +566,10 @@ async def witness_check_startup() -> None:
 
 
 async def all_ops_loop(
-    watch_witnesses: List[str] = [], watch_users: List[str] = [], start_block: int = 0
+    watch_witnesses: List[str] = [],
+    watch_users: List[str] = [],
+    start_block: int = 0,
+    watched_only: bool = False,
 ) -> None:
     """
     Asynchronously loops through transactions and processes them.
@@ -552,6 +582,10 @@ async def all_ops_loop(
     Args:
         watch_witnesses (List[str]): A list of witness accounts to monitor for transactions.
         watch_users (List[str]): A list of user accounts to monitor for transactions.
+        watched_only (bool): Use ``stream_watched_ops_async``, which only validates the ops
+            affecting watched accounts (plus tracked custom_json and proposal votes) and
+            takes virtual ops from their account history. Ops that would only be logged
+            (e.g. votes for other witnesses) are not seen in this mode.
 
     Raises:
         KeyboardInterrupt: If the process is interrupted by a keyboard signal.
@@ -579,7 +613,12 @@ async def all_ops_loop(
     if start_block == 0:
         last_good_block = await get_last_good_block() + 1
     elif start_block == -1:
-        global_properties: Dict = hive_client.get_dynamic_global_properties()  # type: ignore
+        try:
+            global_properties: Dict = await NODE_POOL.call(
+                "condenser_api.get_dynamic_global_properties"
+            )
+        except Exception:
+            global_properties = hive_client.get_dynamic_global_properties()  # type: ignore
         last_good_block = global_properties.get("head_block_number", 97112440)
     else:
         last_good_block = start_block
@@ -589,9 +628,23 @@ async def all_ops_loop(
     start = timer()
     while True:
         try:
-            async for op in stream_ops_async(
-                opNames=OpBase.op_tracked, start=last_good_block, stop_now=False, hive=hive_client
-            ):
+            if watched_only:
+                op_stream = stream_watched_ops_async(
+                    watched=watched_filter_from_config(watch_users, watch_witnesses),
+                    start=last_good_block,
+                    opNames=OpBase.op_tracked,
+                    hive=hive_client,
+                )
+            else:
+                op_stream = stream_ops_async(
+                    opNames=OpBase.op_tracked,
+                    start=last_good_block,
+                    stop_now=False,
+                    hive=hive_client,
+                    parallel_catch_up_enabled=True,
+                    keep=tracked_op_filter(watch_users, OpBase.custom_json_ids_tracked),
+                )
+            async for op in op_stream:
                 time_delay = TIME_DELAY if not block_counter.is_catching_up else 0
                 notification = False
                 log_it = False
@@ -601,17 +654,21 @@ async def all_ops_loop(
                     raise asyncio.CancelledError("Shutdown requested")
                 new_block, marker = block_counter.inc(op.raw_op)
 
-                if watch_witnesses and isinstance(op, AccountWitnessVote):
+                if isinstance(op, RawOp):
+                    # Left unvalidated by tracked_op_filter: nothing to log or store.
+                    pass
+
+                elif watch_witnesses and isinstance(op, AccountWitnessVote):
                     op.get_voter_details()
                     log_it = True
                     if op.witness in watch_witnesses:
-                        asyncio.create_task(db_store_op(op))
+                        await db_store_op(op)
                         notification = True
                         db_store = True
 
                 elif is_op_all_transfer(op):
                     if op.is_watched:
-                        await TrackedBaseModel.update_quote(time_delay=time_delay)
+                        await TrackedBaseModel.update_quote()
                         await op.update_conv()
                         if not COMMAND_LINE_WATCH_ONLY:
                             # Now only balance the server account HBD level if this is a send back to a customer
@@ -639,7 +696,7 @@ async def all_ops_loop(
                 elif (
                     isinstance(op, LimitOrderCreate) or isinstance(op, FillOrder)
                 ) and op.is_watched:
-                    await TrackedBaseModel.update_quote(time_delay=time_delay)
+                    await TrackedBaseModel.update_quote()
                     await op.update_conv()
                     notification = (
                         False if isinstance(op, FillOrder) and not op.completed_order else True
@@ -722,7 +779,7 @@ async def all_ops_loop(
             )
             if getattr(hive_client, "rpc", None):
                 try:
-                    hive_client.rpc.next()
+                    NODE_POOL.switch(hive_client, failed=str(hive_client.rpc.url))
                 except Exception:
                     pass
             else:
@@ -756,15 +813,16 @@ async def combined_logging(
         notification = False
 
     if db_store:
-        asyncio.create_task(db_store_op(op))
+        await db_store_op(op)
 
     if log_it:
         message = f"{ICON} {op.log_str}"
+        # The op is finished with once logged, so its model dump can wait for the log writer.
         log_extras = {
             "notification": notification,
             "silent": True,
             "notification_str": f"{ICON} {op.notification_str}",
-            **op.log_extra,
+            **lazy_extra(lambda: op.log_extra, defer=True),
         }
         # Only send extra notifications if the bot is not in watch-only mode
         # so we don't double notify.
@@ -789,7 +847,7 @@ async def store_rates() -> None:
     try:
         while not shutdown_event.is_set():
             try:
-                await TrackedBaseModel.update_quote(time_delay=TIME_DELAY)
+                await TrackedBaseModel.update_quote()
                 quote = TrackedBaseModel.last_quote
                 logger.debug(
                     f"{ICON} Updating Quotes: {quote.hive_usd:.3f} hive/usd {quote.sats_hive:.0f} sats/hive fetch date {quote.fetch_date}",
@@ -822,7 +880,7 @@ async def store_rates() -> None:
 
 
 async def main_async_start(
-    watch_users: List[str], watch_witnesses: List[str], start_block: int
+    watch_users: List[str], watch_witnesses: List[str], start_block: int, watched_only: bool = False
 ) -> None:
     """
     Main function to run the Hive Watcher client.
@@ -830,6 +888,7 @@ async def main_async_start(
         watch_users (List[str]): The Hive user(s) to watch for transactions.
         watch_witnesses (List[str]): The Hive witness(es) to watch for transactions.
         start_block (int): The block number to start processing from.
+        watched_only (bool): Only ingest ops affecting the watched accounts.
 
     Returns:
         None
@@ -862,16 +921,20 @@ async def main_async_start(
         # asyncio.create_task(balance_server_hbd_level(), name="initial_balance_hbd_level")
         # Create tasks so we can cancel them on shutdown_event
         await witness_check_startup()
+        op_writer_task = asyncio.create_task(OP_WRITER.run(shutdown_event), name="op_writer")
         tasks = [
             asyncio.create_task(
                 all_ops_loop(
                     watch_witnesses=watch_witnesses,
                     watch_users=watch_users,
                     start_block=start_block,
+                    watched_only=watched_only,
                 ),
                 name="all_ops_loop",
             ),
             asyncio.create_task(store_rates(), name="store_rates"),
+            asyncio.create_task(QUOTE_SERVICE.run(shutdown_event), name="quote_refresher"),
+            asyncio.create_task(NODE_POOL.run(shutdown_event), name="node_pool"),
             asyncio.create_task(status_api.start(), name="status_api"),
         ]
         startup_complete_event.set()
@@ -885,6 +948,8 @@ async def main_async_start(
         for t in tasks:
             t.cancel()
         await asyncio.gather(*tasks, return_exceptions=True)
+        # The writer exits on shutdown_event after flushing whatever the ops loop buffered
+        await asyncio.gather(op_writer_task, return_exceptions=True)
     except (asyncio.CancelledError, KeyboardInterrupt) as e:
         logger.info(f"{ICON} 👋 Received signal to stop. Exiting...")
         raise e
@@ -973,6 +1038,16 @@ def main(
             show_default=True,
         ),
     ] = 0,
+    watched_only: Annotated[
+        bool,
+        typer.Option(
+            "--watched-only",
+            help="""Only ingest ops affecting the watched users, witnesses and server accounts
+            (plus tracked custom_json and proposal votes), taking virtual ops from account
+            history instead of fetching them for every block.""",
+            show_default=True,
+        ),
+    ] = False,
 ):
     """
     Watch the Hive blockchain for transactions.
@@ -1013,7 +1088,11 @@ def main(
     if not watch_witnesses:
         watch_witnesses = CONFIG.hive_config.watch_witnesses
     COMMAND_LINE_WATCH_ONLY = watch_only
-    asyncio.run(main_async_start(watch_users, watch_witnesses, start_block=start_block))
+    asyncio.run(
+        main_async_start(
+            watch_users, watch_witnesses, start_block=start_block, watched_only=watched_only
+        )
+    )
 
 
 if __name__ == "__main__":
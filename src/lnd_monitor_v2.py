@@ -11,8 +11,6 @@ import typer
 from colorama import Fore, Style
 from google.protobuf.json_format import MessageToDict
 from grpc.aio import AioRpcError  # type: ignore
-from pymongo import UpdateOne
-from pymongo.errors import BulkWriteError
 
 import v4vapp_backend_v2.lnd_grpc.lightning_pb2 as lnrpc
 import v4vapp_backend_v2.lnd_grpc.router_pb2 as routerrpc
@@ -38,15 +36,16 @@ from v4vapp_backend_v2.helpers.pub_key_alias import (
     decode_payment_request_and_attach,
     update_payment_route_with_alias,
 )
+from v4vapp_backend_v2.lnd_grpc.lnd_backfill import InvoiceBackfill, PaymentBackfill
 from v4vapp_backend_v2.lnd_grpc.lnd_client import LNDClient
 from v4vapp_backend_v2.lnd_grpc.lnd_errors import LNDConnectionError, LNDSubscriptionError
 from v4vapp_backend_v2.lnd_grpc.lnd_functions import (
     get_channel_name,
     get_node_alias_from_pay_request,
 )
-from v4vapp_backend_v2.models.invoice_models import Invoice, ListInvoiceResponse
+from v4vapp_backend_v2.models.invoice_models import Invoice
 from v4vapp_backend_v2.models.lnd_balance_models import NodeBalances
-from v4vapp_backend_v2.models.payment_models import ListPaymentsResponse, Payment
+from v4vapp_backend_v2.models.payment_models import Payment
 from v4vapp_backend_v2.models.tracked_forward_models import TrackedForwardEvent
 
 ICON = "⚡"
@@ -920,12 +919,10 @@ async def fill_channel_names(
 
 async def read_all_invoices(lnd_client: LNDClient) -> None:
     """
-    Reads all invoices from the LND client and inserts them into a MongoDB collection.
+    Stores every invoice on the node that is not yet in the invoices collection.
 
-    This function continuously fetches invoices from the LND client in batches
-    and inserts them into a MongoDB collection.
-    It stops fetching when the number of invoices in a batch is less than the maximum
-    number of invoices per batch.
+    Pages are fetched concurrently from the last checkpoint up to the node's newest
+    invoice and bulk-upserted by ``add_index``; see ``lnd_backfill``.
 
     Args:
         lnd_client (LNDClient): The LND client used to fetch invoices.
@@ -934,95 +931,22 @@ async def read_all_invoices(lnd_client: LNDClient) -> None:
         None
     """
     try:
-        index_offset = 0
-        num_max_invoices = 1000
-        total_invoices = 0
         logger.info(f"{lnd_client.icon} Reading all invoices...")
-        while True:
-            if shutdown_event.is_set():
-                return
-            request = lnrpc.ListInvoiceRequest(
-                pending_only=False,
-                index_offset=index_offset,
-                num_max_invoices=num_max_invoices,
-                reversed=True,
-            )
-            invoices_raw: lnrpc.ListInvoiceResponse = await lnd_client.call(
-                lnd_client.lightning_stub.ListInvoices,
-                request,
-            )
-            list_invoices = ListInvoiceResponse(invoices_raw)
-            index_offset = list_invoices.first_index_offset
-            bulk_updates = []
-            for invoice in list_invoices.invoices:
-                insert_one = invoice.model_dump(
-                    exclude_none=True, exclude_unset=True, exclude={"conv"}
-                )
-                query = {"r_hash": invoice.r_hash}
-                read_invoice = await Invoice.collection().find_one(
-                    filter=query,
-                )
-                if read_invoice:
-                    continue
-                    # this match is only necessary if running for the first time or filling an empty database
-                    try:
-                        db_invoice = Invoice(**read_invoice)
-                        if db_invoice == invoice:
-                            continue
-                    except Exception as e:
-                        logger.warning(e, extra={"notification": False, "invoice": read_invoice})
-                        pass
-                bulk_updates.append(
-                    {
-                        "filter": query,
-                        "update": {"$set": insert_one},
-                        "upsert": True,
-                    }
-                )
-            try:
-                if bulk_updates:
-                    result = await Invoice.collection().bulk_write(
-                        requests=[
-                            UpdateOne(update["filter"], update["update"], upsert=update["upsert"])
-                            for update in bulk_updates
-                        ],
-                    )
-                    modified = result.modified_count
-                    inserted = result.inserted_count
-                else:
-                    modified = 0
-                    inserted = 0
-                logger.info(
-                    f"{lnd_client.icon} {DATABASE_ICON} "
-                    f"Invoices {index_offset}... "
-                    f"modified: {modified} inserted: {inserted}"
-                )
-                total_invoices += len(list_invoices.invoices)
-            except BulkWriteError as e:
-                logger.debug(e.details)
-                pass
-            except Exception as e:
-                logger.exception(str(e), extra={"error": e})
-                break
-            if len(list_invoices.invoices) < num_max_invoices:
-                logger.info(
-                    f"{lnd_client.icon} {DATABASE_ICON} "
-                    f"Finished reading {total_invoices} invoices..."
-                )
-                break
+        await InvoiceBackfill(lnd_client, shutdown_event=shutdown_event).run()
     except (KeyboardInterrupt, asyncio.CancelledError) as e:
         logger.info(f"Keyboard interrupt or Cancelled: {__name__} {e}")
         raise e
+    except Exception as e:
+        logger.exception(e, extra={"error": e})
 
 
 async def read_all_payments(lnd_client: LNDClient) -> None:
     """
-    Reads all payments from the LND client and inserts them into a MongoDB collection.
+    Stores every payment on the node that is not yet in the payments collection.
 
-    This function continuously fetches payments from the LND client in batches and
-    inserts them into a MongoDB collection.
-    It stops fetching when the number of payments in a batch is less than the
-    maximum number of payments per batch.
+    New payments, and stored ones without a route, get their route aliases and decoded
+    pay request attached before being bulk-upserted by ``payment_index``; see
+    ``lnd_backfill``.
 
     Args:
         lnd_client (LNDClient): The LND client used to fetch payments.
@@ -1031,100 +955,13 @@ async def read_all_payments(lnd_client: LNDClient) -> None:
         None
     """
     try:
-        index_offset = 0
-        num_max_payments = 1000
-        total_payments = 0
         logger.info(f"{lnd_client.icon} Reading all payments...")
-        while True:
-            if shutdown_event.is_set():
-                return
-            request = lnrpc.ListPaymentsRequest(
-                include_incomplete=True,
-                index_offset=index_offset,
-                max_payments=num_max_payments,
-                reversed=True,
-            )
-            payments_raw: lnrpc.ListPaymentsResponse = await lnd_client.call(
-                lnd_client.lightning_stub.ListPayments,
-                request,
-            )
-            list_payments = ListPaymentsResponse(payments_raw)
-            index_offset = payments_raw.first_index_offset
-            bulk_updates = []
-            for payment in list_payments.payments:
-                query = {"payment_hash": payment.payment_hash}
-                read_payment = await Payment.collection().find_one(
-                    filter=query,
-                )
-                # The invoice_description "Not set" is used in pub_key_alias.py if there is no description.
-                # look for existing data so we can skip further processing
-                route_str = read_payment.get("route_str", None) if read_payment else None
-                invoice_description = (
-                    read_payment.get("invoice_description", None) if read_payment else None
-                )
-                status = read_payment.get("status", None) if read_payment else None
-                # if we already have a meaningful route or description, nothing to do
-                if (read_payment and route_str and invoice_description):
-                    continue
-                if read_payment and route_str and (not invoice_description or invoice_description == "Not set"):
-                    continue
-                logger.info(
-                    f"Updating payment {payment.payment_index} {route_str} {invoice_description} {payment.payment_hash} {status}"
-                )
-                await update_payment_route_with_alias(
-                    lnd_client=lnd_client,
-                    payment=payment,
-                    fill_cache=True,
-                    col_pub_keys="pub_keys",
-                )
-                await decode_payment_request_and_attach(lnd_client=lnd_client, payment=payment)
-
-                insert_one = payment.model_dump(
-                    exclude_none=True, exclude_unset=True, exclude={"conv", "conv_fee"}
-                )
-                bulk_updates.append(
-                    {
-                        "filter": query,
-                        "update": {"$set": insert_one},
-                        "upsert": True,
-                    }
-                )
-            try:
-                if bulk_updates:
-                    result = await Payment.collection().bulk_write(
-                        requests=[
-                            UpdateOne(update["filter"], update["update"], upsert=update["upsert"])
-                            for update in bulk_updates
-                        ],
-                    )
-                    modified = result.modified_count
-                    inserted = result.inserted_count
-                else:
-                    modified = 0
-                    inserted = 0
-                logger.info(
-                    f"{lnd_client.icon} {DATABASE_ICON} "
-                    f"Payments {index_offset}... "
-                    f"modified: {modified} inserted: {inserted}"
-                )
-                total_payments += len(list_payments.payments)
-            except BulkWriteError as e:
-                logger.debug(e.details)
-                pass
-            except Exception as e:
-                logger.exception(str(e), extra={"error": e})
-            if len(list_payments.payments) < num_max_payments:
-                logger.info(
-                    f"{lnd_client.icon} {DATABASE_ICON} "
-                    f"Finished reading {total_payments} payments..."
-                )
-                break
+        await PaymentBackfill(lnd_client, shutdown_event=shutdown_event).run()
     except (KeyboardInterrupt, asyncio.CancelledError) as e:
         logger.info(f"Keyboard interrupt or Cancelled: {__name__} {e}")
         raise e
     except Exception as e:
         logger.exception(e, extra={"error": e})
-        return
 
 
 async def get_most_recent_invoice() -> Invoice | None:
@@ -9,6 +9,8 @@ from colorama import Fore, Style
 from fastapi import FastAPI, HTTPException
 from single_source import get_version
 
+from v4vapp_backend_v2.accounting.ledger_l1_cache import ledger_l1_stats
+
 # Import your logger and config paths from setup.py
 from v4vapp_backend_v2.config.setup import (
     InternalConfig,
@@ -54,6 +56,7 @@ class StatusAPI:
     - Runs on a specified port.
     - Exposes a /status endpoint that calls a provided async health check function.
     - Returns "OK" (200) on success or an error (500) on failure.
+    - Includes the in-process ledger L1 cache hit/miss/eviction counters.
     - Integrates with asyncio shutdown events for graceful stopping.
 
     Start up with the `start` method, which runs until the provided shutdown event is set.
@@ -112,7 +115,7 @@ class StatusAPI:
                             f"Status API health check passed {process_name} {'no error' if not error_codes_dict else 'with errors'}",
                             extra={"notification": False, "check_answer": check_answer},
                         )
-                return {"status": "OK", **check_answer}
+                return {"status": "OK", **check_answer, "ledger_l1_cache": ledger_l1_stats()}
             except Exception as e:
                 # Use your imported logger for consistent logging
                 logger.error(
@@ -1,5 +1,5 @@
 from datetime import datetime, timedelta, timezone
-from typing import Any, List, Mapping, Sequence, Set
+from typing import Any, Dict, List, Mapping, Sequence, Set
 
 from v4vapp_backend_v2.accounting.ledger_account_classes import LedgerAccount
 
@@ -56,6 +56,7 @@ def list_all_accounts_pipeline() -> Sequence[Mapping[str, Any]]:
 
 def list_all_active_accounts_pipeline(
     min_transactions: int = 2,
+    include_first_timestamp: bool = False,
 ) -> Sequence[Mapping[str, Any]]:
     """
     Returns a MongoDB aggregation pipeline that lists all accounts across both debit and
@@ -70,12 +71,21 @@ def list_all_active_accounts_pipeline(
     Args:
         min_transactions: Minimum number of ledger entries required for an account to be
             included in the results. Defaults to 2.
+        include_first_timestamp: If True, also return `first_timestamp`, the timestamp of
+            the account's earliest ledger entry (used by the checkpoint scheduler).
 
     Returns:
         Sequence[Mapping[str, Any]]: A MongoDB aggregation pipeline that returns
             documents with `account_type`, `name`, `sub`, and `contra` fields, sorted
             by `account_type`, `name`, `sub`.
     """
+    first_keep: Dict[str, Any] = {}
+    first_group: Dict[str, Any] = {}
+    first_project: Dict[str, Any] = {}
+    if include_first_timestamp:
+        first_keep = {"timestamp": 1}
+        first_group = {"first_timestamp": {"$min": "$timestamp"}}
+        first_project = {"first_timestamp": 1}
     pipeline: Sequence[Mapping[str, Any]] = [
         {
             "$project": {
@@ -92,7 +102,8 @@ def list_all_active_accounts_pipeline(
                         "sub": "$credit.sub",
                         "contra": "$credit.contra",
                     },
-                ]
+                ],
+                **first_keep,
             }
         },
         {"$unwind": "$accounts"},
@@ -105,6 +116,7 @@ def list_all_active_accounts_pipeline(
                     "contra": "$accounts.contra",
                 },
                 "transaction_count": {"$sum": 1},
+                **first_group,
             }
         },
         {"$match": {"transaction_count": {"$gte": min_transactions}}},
@@ -115,6 +127,7 @@ def list_all_active_accounts_pipeline(
                 "name": "$_id.name",
                 "sub": "$_id.sub",
                 "contra": "$_id.contra",
+                **first_project,
             }
         },
         {"$sort": {"account_type": 1, "name": 1, "sub": 1}},
@@ -157,6 +170,8 @@ def all_account_balances_pipeline(
     filter: Mapping[str, Any] | None = None,
     cust_ids: Set[str] | None = None,
     hide_reversed: bool = True,
+    accounts: Sequence[LedgerAccount] | None = None,
+    account_from_dates: Sequence[datetime | None] | None = None,
 ) -> Sequence[Mapping[str, Any]]:
     """
     Generates a MongoDB aggregation pipeline to retrieve the balances of all accounts in the ledger.
@@ -168,7 +183,7 @@ def all_account_balances_pipeline(
       checkpoint system to run incremental queries from a known checkpoint state.
       ``from_date`` takes precedence over ``age``.
     - The resulting documents include running totals for amounts and conversions in various currencies, grouped by account and unit.
-    The order of precedence for filtering is: `account` > `account_name` > `sub`. If none are provided, the pipeline will include all accounts.
+    The order of precedence for filtering is: `account` > `accounts` > `account_name` > `sub`. If none are provided, the pipeline will include all accounts.
 
     Args:
         account (LedgerAccount, optional): An instance of LedgerAccount to filter the transactions. If provided, the pipeline will match transactions for this specific account.
@@ -180,6 +195,8 @@ def all_account_balances_pipeline(
         filter (Mapping[str, Any], optional): Additional MongoDB filter to apply to the transactions.
         cust_ids (Set[str] | None, optional): A set of customer IDs to restrict the transactions to. If provided, only transactions with `cust_id` in this set will be included.
         hide_reversed (bool, optional): If True, excludes transactions that have been reversed (i.e., those with a `reversed` field). Defaults to True.
+        accounts (Sequence[LedgerAccount], optional): Several accounts to fetch in one pass. Each account still produces its own result documents (grouped by account and contra flag).
+        account_from_dates (Sequence[datetime | None], optional): Parallel to `accounts`; a per-account exclusive lower bound on the timestamp (the checkpoint `period_end`), or None for the full history.
 
     Returns:
         Sequence[Mapping[str, Any]]: A MongoDB aggregation pipeline that:
@@ -208,6 +225,28 @@ def all_account_balances_pipeline(
             "credit.sub": account.sub,
             "credit.account_type": account.account_type,
         }
+    elif accounts:
+        from_dates = list(account_from_dates or [None] * len(accounts))
+        debit_clauses: List[dict[str, Any]] = []
+        credit_clauses: List[dict[str, Any]] = []
+        for acc, acc_from_date in zip(accounts, from_dates):
+            debit_clause: dict[str, Any] = {
+                "debit.name": acc.name,
+                "debit.sub": acc.sub,
+                "debit.account_type": acc.account_type,
+            }
+            credit_clause: dict[str, Any] = {
+                "credit.name": acc.name,
+                "credit.sub": acc.sub,
+                "credit.account_type": acc.account_type,
+            }
+            if acc_from_date is not None:
+                debit_clause["timestamp"] = {"$gt": acc_from_date}
+                credit_clause["timestamp"] = {"$gt": acc_from_date}
+            debit_clauses.append(debit_clause)
+            credit_clauses.append(credit_clause)
+        debit_match_query = {"$or": debit_clauses}
+        credit_match_query = {"$or": credit_clauses}
     elif account_name:
         debit_match_query = {"debit.name": account_name}
         credit_match_query = {"credit.name": account_name}
@@ -256,6 +295,9 @@ def all_account_balances_pipeline(
     match["timestamp"] = date_range_query
     if filter:
         match.update(filter)
+    if accounts and not account:
+        # Only documents touching one of the requested accounts reach the $facet
+        match["$or"] = debit_match_query["$or"] + credit_match_query["$or"]
 
     if cust_ids is not None:
         match["all_cust_ids"] = {
@@ -1,7 +1,8 @@
+import asyncio
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 from timeit import default_timer as timer
-from typing import Any, List, Mapping, Set, Tuple
+from typing import Any, Dict, List, Mapping, Sequence, Set, Tuple
 
 from v4vapp_backend_v2.accounting.account_balance_pipelines import (
     account_notifications_pipeline,
@@ -19,6 +20,7 @@ from v4vapp_backend_v2.accounting.accounting_classes import (
     LedgerAccountDetails,
     LedgerConvSummary,
 )
+from v4vapp_backend_v2.accounting.conversion_limit_counters import counter_limit_checks
 from v4vapp_backend_v2.accounting.in_progress_results_class import (
     InProgressResults,
     all_held_msats,
@@ -28,9 +30,12 @@ from v4vapp_backend_v2.accounting.ledger_cache import (
     HISTORICAL_TTL_SECONDS,
     LIVE_TTL_SECONDS,
     get_cached_balance,
+    get_cached_balances,
     set_cached_balance,
+    set_cached_balances,
 )
 from v4vapp_backend_v2.accounting.ledger_entry_class import LedgerEntry
+from v4vapp_backend_v2.accounting.ledger_running_balances import running_account_balance
 from v4vapp_backend_v2.accounting.ledger_type_class import LedgerType
 from v4vapp_backend_v2.accounting.limit_check_classes import LimitCheckResult
 from v4vapp_backend_v2.accounting.pipelines.simple_pipelines import limit_check_pipeline
@@ -338,108 +343,30 @@ async def all_account_balances_summary(
     return account_balances
 
 
-# @async_time_decorator
-async def one_account_balance(
-    account: LedgerAccount | str,
-    as_of_date: datetime | None = None,
-    age: timedelta | None = None,
-    in_progress: InProgressResults | None = None,
-    use_cache: bool = True,
-    use_checkpoints: bool = True,
+def _account_details_from_groups(
+    account: LedgerAccount,
+    groups: List[LedgerAccountDetails],
+    checkpoint: Any = None,
 ) -> LedgerAccountDetails:
     """
-    Retrieve the balance details for a single ledger account as of a specified date.
-    If use_cache is False, the cache will be ignored but the result will be written to the cache.
+    Build the ``LedgerAccountDetails`` for one account from the pipeline result groups.
 
-    Args:
-        account (LedgerAccount | str): The ledger account object or its string identifier.
-        as_of_date (datetime | None, optional): The date for which to retrieve the account balance. Defaults to current UTC time if not provided.
-        age (timedelta | None, optional): Optional age filter for the balance calculation.
-        in_progress (InProgressResults | None, optional): Pre-computed in-progress results. If None, fetched fresh.
-        use_cache (bool): If True, try Redis cache before hitting the database. Defaults to True.
-        use_checkpoints (bool): If True and ``as_of_date`` is provided, try to start from a
-            pre-calculated checkpoint and only aggregate the incremental delta.  Defaults to True.
-    Returns:
-        LedgerAccountDetails: The details of the account balance as of the specified date.
-    Raises:
-        None explicitly, but logs a warning if no results are found for the given account.
-    Notes:
-        - If `account` is provided as a string, it is converted to a LiabilityAccount.
-        - If no balance data is found, returns a default LedgerAccountDetails instance.
-        - Results are cached in Redis.  Most cache invalidations happen
-          via ``invalidate_ledger_cache(debit_name, debit_sub, credit_name,
-          credit_sub)``, which deletes only the relevant account(s).  A full
-          flush can be forced by calling ``invalidate_all_ledger_cache()``.
+    The aggregation returns one group per contra flag; these are merged, running totals
+    are recomputed and, when a ``LedgerCheckpoint`` was used as the starting point, its
+    balances are carried forward into the running totals.  Shared by
+    ``one_account_balance`` and ``many_account_balances``.
     """
-    _t0 = timer()
-    if isinstance(account, str):
-        account = LiabilityAccount(
-            name="VSC Liability",
-            sub=account,
-        )
-
-    # --- Cache lookup ---
-    if use_cache:
-        cached_result = await get_cached_balance(
-            account, as_of_date, age, use_checkpoints=use_checkpoints
-        )
-        if cached_result is not None:
-            # Always refresh in_progress_msats (changes independently of ledger)
-            if in_progress is None:
-                all_held_result = await all_held_msats()
-                in_progress = InProgressResults(results=all_held_result)
-            cached_result.in_progress_msats = in_progress.get_net_held(account.sub)
-            return cached_result
-
-    # --- Checkpoint lookup (only for explicit historical queries without an age window) ---
-    checkpoint = None
-    from_date: datetime | None = None
-    if use_checkpoints and as_of_date is not None and age is None:
-        from v4vapp_backend_v2.accounting.ledger_checkpoints import get_latest_checkpoint_before
-
-        try:
-            checkpoint = await get_latest_checkpoint_before(account, as_of_date)
-            if checkpoint is not None:
-                from_date = checkpoint.period_end
-                logger.info(
-                    f"📌 Using checkpoint for {account.name}:{account.sub} "
-                    f"@ {checkpoint.period_end.date()} → delta from {from_date.date()} to {as_of_date.date()}",
-                    extra={"notification": False},
-                )
-            else:
-                from_date = None
-        except Exception as e:
-            logger.info(
-                f"Checkpoint lookup failed for {account.name}:{account.sub}: {e}",
-                extra={"notification": False},
-            )
-            checkpoint = None
-            from_date = None
-
-    pipeline = all_account_balances_pipeline(
-        account=account,
-        as_of_date=as_of_date,
-        age=age,
-        from_date=from_date,
-    )
-    _t1 = timer()
-    cursor = await LedgerEntry.collection().aggregate(pipeline=pipeline)
-    results = await cursor.to_list()
-    clean_results = convert_datetime_fields(results)
-    _t2 = timer()
-    account_balance = AccountBalances.model_validate(clean_results)
-    _t3 = timer()
     # If there are multiple entries (e.g., contra and non-contra groups), merge them so both show up
-    if account_balance.root and len(account_balance.root) > 0:
-        if len(account_balance.root) == 1:
+    if groups:
+        if len(groups) == 1:
             merged_balances = {
                 unit: [line.model_copy() for line in lines]
-                for unit, lines in account_balance.root[0].balances.items()
+                for unit, lines in groups[0].balances.items()
             }
         else:
             # Merge balances from multiple groups (preserve per-row contra flag and order)
             merged_balances = {}
-            for group in account_balance.root:
+            for group in groups:
                 for unit, lines in group.balances.items():
                     merged_balances.setdefault(unit, [])
                     # copy to avoid mutating original objects
@@ -571,7 +498,6 @@ async def one_account_balance(
             sub=account.sub,
             contra=account.contra,
         )
-    _t4 = timer()
     # Find the most recent transaction date
     if ledger_details.balances:
         max_timestamp = None
@@ -585,8 +511,146 @@ async def one_account_balance(
                 max_timestamp = checkpoint.last_transaction_date
         ledger_details.last_transaction_date = max_timestamp
 
+    return ledger_details
+
+
+def _use_checkpoints(
+    use_checkpoints: bool,
+    live_checkpoints: bool,
+    as_of_date: datetime | None,
+    age: timedelta | None,
+) -> bool:
+    """Whether a balance query starts from a checkpoint; also part of its cache key."""
+    return use_checkpoints and age is None and (as_of_date is not None or live_checkpoints)
+
+
+# @async_time_decorator
+async def one_account_balance(
+    account: LedgerAccount | str,
+    as_of_date: datetime | None = None,
+    age: timedelta | None = None,
+    in_progress: InProgressResults | None = None,
+    use_cache: bool = True,
+    use_checkpoints: bool = True,
+    use_running_balance: bool = False,
+    live_checkpoints: bool = False,
+) -> LedgerAccountDetails:
+    """
+    Retrieve the balance details for a single ledger account as of a specified date.
+    If use_cache is False, the cache will be ignored but the result will be written to the cache.
+
+    Args:
+        account (LedgerAccount | str): The ledger account object or its string identifier.
+        as_of_date (datetime | None, optional): The date for which to retrieve the account balance. Defaults to current UTC time if not provided.
+        age (timedelta | None, optional): Optional age filter for the balance calculation.
+        in_progress (InProgressResults | None, optional): Pre-computed in-progress results. If None, fetched fresh.
+        use_cache (bool): If True, try Redis cache before hitting the database. Defaults to True.
+        use_checkpoints (bool): If True and ``as_of_date`` is provided, try to start from a
+            pre-calculated checkpoint and only aggregate the incremental delta.  Defaults to True.
+        live_checkpoints (bool): If True (with ``use_checkpoints``), a live query with no
+            ``age`` also starts from the latest checkpoint.  The history before it is then a
+            single carried-forward line, so only use it when the totals are all that is
+            needed.  Defaults to False.
+        use_running_balance (bool): If True and this is a live query (no ``as_of_date`` and
+            no ``age``), read the totals from the ``ledger_running_balances`` collection with a
+            single document fetch.  The result has one summary line per currency instead of
+            the full transaction history.  Falls back to the pipeline if no document exists.
+            Defaults to False.
+    Returns:
+        LedgerAccountDetails: The details of the account balance as of the specified date.
+    Raises:
+        None explicitly, but logs a warning if no results are found for the given account.
+    Notes:
+        - If `account` is provided as a string, it is converted to a LiabilityAccount.
+        - If no balance data is found, returns a default LedgerAccountDetails instance.
+        - Results are cached in Redis.  Most cache invalidations happen
+          via ``invalidate_ledger_cache(debit_name, debit_sub, credit_name,
+          credit_sub)``, which deletes only the relevant account(s).  A full
+          flush can be forced by calling ``invalidate_all_ledger_cache()``.
+    """
+    _t0 = timer()
+    if isinstance(account, str):
+        account = LiabilityAccount(
+            name="VSC Liability",
+            sub=account,
+        )
+
+    # --- Running balance lookup (live totals only) ---
+    if use_running_balance and as_of_date is None and age is None:
+        try:
+            running_result = await running_account_balance(account)
+        except Exception as e:
+            logger.info(
+                f"Running balance lookup failed for {account.name}:{account.sub}: {e}",
+                extra={"notification": False},
+            )
+            running_result = None
+        if running_result is not None:
+            if in_progress is None:
+                all_held_result = await all_held_msats(use_cache=True)
+                in_progress = InProgressResults(results=all_held_result)
+            running_result.in_progress_msats = in_progress.get_net_held(account.sub)
+            return running_result
+
+    checkpointed = _use_checkpoints(use_checkpoints, live_checkpoints, as_of_date, age)
+
+    # --- Cache lookup ---
+    if use_cache:
+        cached_result = await get_cached_balance(
+            account, as_of_date, age, use_checkpoints=checkpointed
+        )
+        if cached_result is not None:
+            # Always refresh in_progress_msats (changes independently of ledger)
+            if in_progress is None:
+                all_held_result = await all_held_msats(use_cache=True)
+                in_progress = InProgressResults(results=all_held_result)
+            cached_result.in_progress_msats = in_progress.get_net_held(account.sub)
+            return cached_result
+
+    # --- Checkpoint lookup (no age window; live queries only when asked for) ---
+    checkpoint = None
+    from_date: datetime | None = None
+    if checkpointed:
+        from v4vapp_backend_v2.accounting.ledger_checkpoints import get_latest_checkpoint_before
+
+        checkpoint_as_of = as_of_date or datetime.now(tz=timezone.utc)
+        try:
+            checkpoint = await get_latest_checkpoint_before(account, checkpoint_as_of)
+            if checkpoint is not None:
+                from_date = checkpoint.period_end
+                logger.info(
+                    f"📌 Using checkpoint for {account.name}:{account.sub} "
+                    f"@ {checkpoint.period_end.date()} → delta from {from_date.date()} "
+                    f"to {'now' if as_of_date is None else as_of_date.date()}",
+                    extra={"notification": False},
+                )
+            else:
+                from_date = None
+        except Exception as e:
+            logger.info(
+                f"Checkpoint lookup failed for {account.name}:{account.sub}: {e}",
+                extra={"notification": False},
+            )
+            checkpoint = None
+            from_date = None
+
+    pipeline = all_account_balances_pipeline(
+        account=account,
+        as_of_date=as_of_date,
+        age=age,
+        from_date=from_date,
+    )
+    _t1 = timer()
+    cursor = await LedgerEntry.collection().aggregate(pipeline=pipeline)
+    results = await cursor.to_list()
+    clean_results = convert_datetime_fields(results)
+    _t2 = timer()
+    account_balance = AccountBalances.model_validate(clean_results)
+    _t3 = timer()
+    ledger_details = _account_details_from_groups(account, account_balance.root, checkpoint)
+
     if in_progress is None:
-        all_held_result = await all_held_msats()
+        all_held_result = await all_held_msats(use_cache=True)
         in_progress = InProgressResults(results=all_held_result)
     ledger_details.in_progress_msats = in_progress.get_net_held(account.sub)
     _t5 = timer()
@@ -596,7 +660,7 @@ async def one_account_balance(
         ttl = LIVE_TTL_SECONDS if as_of_date is None else HISTORICAL_TTL_SECONDS
         # pass the original intent (None for live) so key doesn't drift
         await set_cached_balance(
-            account, as_of_date, age, ledger_details, ttl=ttl, use_checkpoints=use_checkpoints
+            account, as_of_date, age, ledger_details, ttl=ttl, use_checkpoints=checkpointed
         )
     except Exception as e:
         logger.warning(f"Failed to set cache for {account.name}:{account.sub}: {e}")
@@ -604,6 +668,133 @@ async def one_account_balance(
     return ledger_details
 
 
+async def many_account_balances(
+    accounts: Sequence[LedgerAccount | str],
+    as_of_date: datetime | None = None,
+    age: timedelta | None = None,
+    in_progress: InProgressResults | None = None,
+    use_cache: bool = True,
+    use_checkpoints: bool = True,
+    live_checkpoints: bool = False,
+) -> List[LedgerAccountDetails]:
+    """
+    Batched version of ``one_account_balance`` for several accounts at once.
+
+    Cache hits are resolved with a single Redis ``MGET``, the latest checkpoints of
+    the misses are found with one query, every miss is computed by one
+    ``all_account_balances_pipeline`` aggregation and held msats are fetched once.
+    Results are returned in the same order as ``accounts`` and are identical to
+    calling ``one_account_balance`` for each account (they share the same cache keys).
+
+    Args:
+        accounts (Sequence[LedgerAccount | str]): Ledger accounts, or customer ids which are
+            treated as ``VSC Liability`` subs (as in ``one_account_balance``).
+        as_of_date (datetime | None, optional): The date for the balances. ``None`` is a live query.
+        age (timedelta | None, optional): Optional age filter for the balance calculation.
+        in_progress (InProgressResults | None, optional): Pre-computed in-progress results.
+            If None, fetched once for all accounts.
+        use_cache (bool): If True, try the Redis cache first. Results are always written back.
+        use_checkpoints (bool): If True and ``as_of_date`` is provided (without ``age``), start
+            each account from its latest checkpoint.  Defaults to True.
+        live_checkpoints (bool): If True, live queries start from the latest checkpoint too
+            (see ``one_account_balance``).  Defaults to False.
+
+    Returns:
+        List[LedgerAccountDetails]: One entry per requested account, in input order.
+    """
+    _t0 = timer()
+    ledger_accounts: List[LedgerAccount] = [
+        LiabilityAccount(name="VSC Liability", sub=acc) if isinstance(acc, str) else acc
+        for acc in accounts
+    ]
+    if not ledger_accounts:
+        return []
+
+    checkpointed = _use_checkpoints(use_checkpoints, live_checkpoints, as_of_date, age)
+    results: List[LedgerAccountDetails | None] = [None] * len(ledger_accounts)
+    if use_cache:
+        results = await get_cached_balances(
+            ledger_accounts, as_of_date, age, use_checkpoints=checkpointed
+        )
+    _t1 = timer()
+
+    misses: dict[tuple, LedgerAccount] = {}
+    for acc, result in zip(ledger_accounts, results):
+        if result is None:
+            misses.setdefault((str(acc.account_type), acc.name, acc.sub), acc)
+
+    computed: dict[tuple, LedgerAccountDetails] = {}
+    if misses:
+        miss_accounts = list(misses.values())
+        checkpoints: List[Any] = [None] * len(miss_accounts)
+        if checkpointed:
+            from v4vapp_backend_v2.accounting.ledger_checkpoints import (
+                get_latest_checkpoints_before,
+            )
+
+            try:
+                checkpoints = await get_latest_checkpoints_before(
+                    miss_accounts, as_of_date or datetime.now(tz=timezone.utc)
+                )
+            except Exception as e:
+                logger.info(
+                    f"Checkpoint lookup failed for {len(miss_accounts)} accounts: {e}",
+                    extra={"notification": False},
+                )
+                checkpoints = [None] * len(miss_accounts)
+
+        pipeline = all_account_balances_pipeline(
+            accounts=miss_accounts,
+            account_from_dates=[cp.period_end if cp else None for cp in checkpoints],
+            as_of_date=as_of_date,
+            age=age,
+        )
+        cursor = await LedgerEntry.collection().aggregate(pipeline=pipeline)
+        raw_results = await cursor.to_list()
+        account_balances = AccountBalances.model_validate(convert_datetime_fields(raw_results))
+
+        groups: dict[tuple, List[LedgerAccountDetails]] = {}
+        for group in account_balances.root:
+            key = (str(group.account_type), group.name, group.sub)
+            groups.setdefault(key, []).append(group)
+
+        for (key, acc), checkpoint in zip(misses.items(), checkpoints):
+            computed[key] = _account_details_from_groups(acc, groups.get(key, []), checkpoint)
+    _t2 = timer()
+
+    if in_progress is None:
+        all_held_result = await all_held_msats(use_cache=True)
+        in_progress = InProgressResults(results=all_held_result)
+
+    answer: List[LedgerAccountDetails] = []
+    for acc, result in zip(ledger_accounts, results):
+        if result is None:
+            result = computed[(str(acc.account_type), acc.name, acc.sub)]
+        result.in_progress_msats = in_progress.get_net_held(acc.sub)
+        answer.append(result)
+    _t3 = timer()
+
+    if computed:
+        ttl = LIVE_TTL_SECONDS if as_of_date is None else HISTORICAL_TTL_SECONDS
+        await set_cached_balances(
+            [(misses[key], details) for key, details in computed.items()],
+            as_of_date,
+            age,
+            ttl=ttl,
+            use_checkpoints=checkpointed,
+        )
+
+    logger.info(
+        f"cache={(_t1 - _t0):.3f}s, "
+        f"aggregate={(_t2 - _t1):.3f}s, "
+        f"held_msats={(_t3 - _t2):.3f}s, "
+        f"total={(timer() - _t0):.3f}s "
+        f"many_account_balances timing "
+        f"({len(ledger_accounts)} accounts, {len(misses)} misses)"
+    )
+    return answer
+
+
 def _add_notes() -> str:
     # Clarify that unit sections are separate views and are not additive
     return (
@@ -1507,8 +1698,36 @@ async def ledger_pipeline_result(
     return ans
 
 
+def _set_limit_expiry(
+    limit_check: LimitCheckResult, expiry_info: Tuple[datetime, Decimal] | None
+) -> None:
+    """Fill in the next-expiry fields of a limit check that is over its limit."""
+    if limit_check.limit_ok or not expiry_info:
+        return
+    limit_check.expiry, limit_check.sats_freed = expiry_info
+    expires_in = limit_check.expiry - datetime.now(tz=timezone.utc)
+    limit_check.next_limit_expiry = f"Next limit expires in: {format_time_delta(expires_in)}, freeing {limit_check.sats_freed:,.0f} sats"
+
+
+async def _counter_limit_checks(
+    cust_ids: Sequence[CustIDType],
+) -> Dict[str, Tuple[LimitCheckResult, Tuple[datetime, Decimal] | None]] | None:
+    """Read limit checks from ``conversion_limit_counters``; ``None`` means use the pipeline."""
+    try:
+        return await counter_limit_checks(cust_ids)
+    except Exception as e:
+        logger.info(
+            f"Conversion limit counter lookup failed: {e}",
+            extra={"notification": False},
+        )
+        return None
+
+
 async def check_hive_conversion_limits(
-    cust_id: CustIDType, extra_spend_msats: Decimal = Decimal(0), line_items: bool = False
+    cust_id: CustIDType,
+    extra_spend_msats: Decimal = Decimal(0),
+    line_items: bool = False,
+    use_counters: bool = True,
 ) -> LimitCheckResult:
     """
     Checks if a Hive account's recent Lightning conversions are within configured rate limits.
@@ -1516,6 +1735,9 @@ async def check_hive_conversion_limits(
         cust_id (str): The Hive account name to check conversion limits for.
         extra_spend_sats (int, optional): Additional satoshis to consider in the limit check. Defaults to 0.
         line_items (bool, optional): Whether to include line item details in the conversion summary. Defaults to False.
+        use_counters (bool, optional): Read the hourly ``conversion_limit_counters`` buckets
+            (one small indexed query) instead of aggregating the ledger.  Falls back to
+            ``limit_check_pipeline`` when the counters have not been built.  Defaults to True.
     Returns:
         List[LightningLimitSummary]: A list of LightningLimitSummary objects, each representing the conversion summary and limit status for a configured time window.
     Raises:
@@ -1524,6 +1746,13 @@ async def check_hive_conversion_limits(
         - If Lightning rate limits are not configured, a warning is logged and an empty list is returned.
         - The function checks conversions for each configured limit window and determines if the account is within limits.
     """
+    if use_counters:
+        counter_checks = await _counter_limit_checks([cust_id])
+        if counter_checks is not None:
+            limit_check, expiry_info = counter_checks[cust_id]
+            _set_limit_expiry(limit_check, expiry_info)
+            return limit_check
+
     extra_spend_sats = extra_spend_msats // Decimal(1000)  # Convert msats to sats
 
     pipeline = limit_check_pipeline(
@@ -1534,16 +1763,40 @@ async def check_hive_conversion_limits(
     results = convert_decimal128_to_decimal(results)
     limit_check = LimitCheckResult.model_validate(results[0]) if results else LimitCheckResult()
     if not limit_check.limit_ok:
-        expiry_info = await get_next_limit_expiry(cust_id)
-        if expiry_info:
-            limit_check.expiry, limit_check.sats_freed = expiry_info
-            expires_in = limit_check.expiry - datetime.now(tz=timezone.utc)
-            limit_check.next_limit_expiry = f"Next limit expires in: {format_time_delta(expires_in)}, freeing {limit_check.sats_freed:,.0f} sats"
+        _set_limit_expiry(limit_check, await get_next_limit_expiry(cust_id, use_counters=False))
 
     return limit_check
 
 
-async def get_next_limit_expiry(cust_id: CustIDType) -> Tuple[datetime, Decimal] | None:
+async def check_hive_conversion_limits_many(
+    cust_ids: Sequence[CustIDType],
+) -> Dict[str, LimitCheckResult]:
+    """
+    ``check_hive_conversion_limits`` for many customers at once.
+
+    With the counters available every customer is answered from a single query;
+    otherwise each customer is checked with the pipeline concurrently.
+
+    Returns:
+        Dict[str, LimitCheckResult]: Results keyed by customer ID.
+    """
+    counter_checks = await _counter_limit_checks(cust_ids)
+    if counter_checks is not None:
+        answer: Dict[str, LimitCheckResult] = {}
+        for cust_id, (limit_check, expiry_info) in counter_checks.items():
+            _set_limit_expiry(limit_check, expiry_info)
+            answer[cust_id] = limit_check
+        return answer
+
+    results = await asyncio.gather(
+        *(check_hive_conversion_limits(cust_id, use_counters=False) for cust_id in cust_ids)
+    )
+    return dict(zip(cust_ids, results))
+
+
+async def get_next_limit_expiry(
+    cust_id: CustIDType, use_counters: bool = True
+) -> Tuple[datetime, Decimal] | None:
     """
     Determines when the next rate limit will expire for a given customer and the amount that will be freed.
     This looks at the first (shortest) rate limit period and finds the oldest transaction
@@ -1552,6 +1805,8 @@ async def get_next_limit_expiry(cust_id: CustIDType) -> Tuple[datetime, Decimal]
 
     Args:
         cust_id (str): The customer ID to check the limit expiry for.
+        use_counters (bool): Answer from ``conversion_limit_counters`` when available
+            instead of pushing every document of the window through the pipeline.
 
     Returns:
         Tuple[datetime, int] | None: A tuple of (expiry_datetime, sats_freed), or None if no limits or no transactions.
@@ -1560,6 +1815,11 @@ async def get_next_limit_expiry(cust_id: CustIDType) -> Tuple[datetime, Decimal]
     if not lightning_rate_limits:
         return None
 
+    if use_counters:
+        counter_checks = await _counter_limit_checks([cust_id])
+        if counter_checks is not None:
+            return counter_checks[cust_id][1]
+
     first_limit = min(lightning_rate_limits, key=lambda x: x.hours)
 
     pipeline = limit_check_pipeline(cust_id=cust_id, details=True)
@@ -1600,6 +1860,7 @@ async def keepsats_balance(
     as_of_date: datetime | None = None,
     line_items: bool = False,
     notifications: bool = False,
+    use_running_balance: bool = False,
 ) -> Tuple[Decimal, LedgerAccountDetails]:
     """
     Retrieves the balance of Keepsats for a specific customer as of a given date.
@@ -1612,6 +1873,9 @@ async def keepsats_balance(
         cust_id (str): The customer ID for which to retrieve the Keepsats balance.
         as_of_date (datetime, optional): The date up to which to calculate the balance. Defaults to the current UTC time.
         notifications (bool): If True, include non-financial notification entries in the returned line items.
+        use_running_balance (bool): If True, a live query reads the totals from the running
+            balances (see ``one_account_balance``).  Use it for balance checks that only need
+            the net figures; the returned details then have no transaction history.
 
     Returns:
         Tuple:
@@ -1629,6 +1893,7 @@ async def keepsats_balance(
         as_of_date=as_of_date,
         age=None,
         use_checkpoints=False,
+        use_running_balance=use_running_balance,
     )
 
     if notifications:
@@ -0,0 +1,577 @@
+"""
+Sliding-window Lightning conversion limit counters stored in MongoDB.
+
+``check_hive_conversion_limits`` used to run ``limit_check_pipeline`` (a ``$facet``
+over every ``h_conv_k``/``k_conv_h`` ledger entry of the customer) on each
+conversion, and once more with ``details=True`` to find the next expiry whenever a
+limit was exceeded.  Instead every ``LedgerEntry.save()`` of a conversion entry adds
+it to an hourly bucket for its customer:
+
+Collection: ``conversion_limit_counters``
+
+    {
+        "cust_id": "alice",
+        "hour": ISODate("2026-10-16T13:00:00Z"),     # start of the bucket
+        "totals": {"hive": Decimal128, "hbd": ..., "usd": ..., "sats": ..., "msats": ...},
+        "count": 2,
+        "entries": [
+            {"group_id": "...", "timestamp": ISODate("..."), "hive": Decimal128, ...},
+            ...
+        ],
+        "expires_at": ISODate("..."),                # TTL: hour + longest window + 1h
+        "updated_at": ISODate("..."),
+    }
+
+A limit check reads at most ``max_rate_limit_hours + 1`` small documents for the
+customer with one indexed ``find``.  Buckets that lie wholly inside a window add their
+``totals``; only the bucket straddling the start of each window is summed entry by
+entry, so the answer equals the pipeline's (``credit_conv`` sums, reversed entries
+included, exactly as ``limit_check_pipeline`` counts them).  The next expiry is the
+oldest entry inside the shortest window.
+
+One extra document (``_id: "meta"``) records when the collection was last rebuilt and
+for which window.  Until it exists, or when the configured limits grow beyond that
+window (older buckets have already expired), readers get ``None`` and fall back to
+the pipeline.
+
+``reconcile_conversion_limit_counters`` recomputes the buckets from the ledger and
+repairs any that differ; it runs with every checkpoint scheduler cycle and rebuilds
+the collection when it is missing.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from timeit import default_timer as timer
+from typing import Any, Dict, Iterable, List, Mapping, Tuple
+
+from bson import Decimal128
+from pymongo import ASCENDING, DeleteOne, IndexModel, ReplaceOne, UpdateOne
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.errors import BulkWriteError
+
+from v4vapp_backend_v2.accounting.limit_check_classes import LimitCheckResult, PeriodResult
+from v4vapp_backend_v2.config.setup import InternalConfig, logger
+from v4vapp_backend_v2.database.db_tools import convert_decimal128_to_decimal
+from v4vapp_backend_v2.hive.v4v_config import V4VConfig, V4VConfigRateLimits
+
+ICON = "⏳"
+
+CONV_FIELDS = ("hive", "hbd", "usd", "sats", "msats")
+CONVERSION_LEDGER_TYPES = ("h_conv_k", "k_conv_h")
+BUCKET = timedelta(hours=1)
+META_ID = "meta"
+
+# Duplicate key: the entry is already counted in an existing bucket.
+_DUPLICATE_KEY = 11000
+
+
+def _utc(dt: datetime) -> datetime:
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt
+
+
+def bucket_hour(timestamp: datetime) -> datetime:
+    """Start of the hourly bucket holding *timestamp*."""
+    return _utc(timestamp).replace(minute=0, second=0, microsecond=0)
+
+
+def collection_name() -> str:
+    return "conversion_limit_counters"
+
+
+def collection() -> AsyncCollection:
+    return InternalConfig.db[collection_name()]
+
+
+async def ensure_indexes() -> None:
+    """Create the unique bucket index and the TTL index if they do not exist."""
+    await collection().create_indexes(
+        [
+            IndexModel(
+                [("cust_id", ASCENDING), ("hour", ASCENDING)],
+                unique=True,
+                partialFilterExpression={"cust_id": {"$exists": True}},
+                name="conversion_bucket_unique",
+            ),
+            IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0, name="bucket_ttl"),
+        ]
+    )
+
+
+def _window_hours() -> int:
+    return V4VConfig().data.max_rate_limit_hours
+
+
+def _expires_at(hour: datetime, window_hours: int) -> datetime:
+    return hour + timedelta(hours=window_hours) + BUCKET
+
+
+# ---------------------------------------------------------------------------
+# Incremental updates
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class CounterEntry:
+    """What one conversion ledger entry contributes to its customer's bucket."""
+
+    cust_id: str
+    group_id: str
+    timestamp: datetime
+    conv: Dict[str, Decimal] = field(default_factory=dict)
+
+    @property
+    def hour(self) -> datetime:
+        return bucket_hour(self.timestamp)
+
+    @classmethod
+    def from_ledger(cls, entry: Any) -> "CounterEntry | None":
+        """Build from a ``LedgerEntry``; ``None`` unless it is a customer conversion."""
+        if entry is None or str(entry.ledger_type) not in CONVERSION_LEDGER_TYPES:
+            return None
+        if not entry.cust_id or not entry.group_id:
+            return None
+        return cls(
+            cust_id=entry.cust_id,
+            group_id=entry.group_id,
+            timestamp=_utc(entry.timestamp),
+            conv={f: Decimal(str(getattr(entry.credit_conv, f, 0) or 0)) for f in CONV_FIELDS},
+        )
+
+    @classmethod
+    def from_doc(cls, doc: Mapping[str, Any]) -> "CounterEntry | None":
+        """Build from a raw ledger document (decimals already converted)."""
+        if not doc.get("cust_id") or not doc.get("group_id"):
+            return None
+        credit_conv = doc.get("credit_conv") or {}
+        return cls(
+            cust_id=doc["cust_id"],
+            group_id=doc["group_id"],
+            timestamp=_utc(doc["timestamp"]),
+            conv={f: Decimal(str(credit_conv.get(f, 0) or 0)) for f in CONV_FIELDS},
+        )
+
+    def entry_doc(self) -> Dict[str, Any]:
+        return {
+            "group_id": self.group_id,
+            "timestamp": self.timestamp,
+            **{f: Decimal128(str(self.conv[f])) for f in CONV_FIELDS},
+        }
+
+    def inc(self, sign: int) -> Dict[str, Any]:
+        inc: Dict[str, Any] = {
+            f"totals.{f}": Decimal128(str(self.conv[f] * sign)) for f in CONV_FIELDS
+        }
+        inc["count"] = sign
+        return inc
+
+
+def _build_updates(before: Any, after: Any) -> List[UpdateOne]:
+    """
+    Build the operations that move the counters from ledger entry *before* to *after*.
+
+    The removal only matches a bucket that still lists the entry and the addition
+    only one that does not, so replaying an update never counts an entry twice.
+    """
+    old = CounterEntry.from_ledger(before)
+    new = CounterEntry.from_ledger(after)
+    now = datetime.now(tz=timezone.utc)
+    updates: List[UpdateOne] = []
+    if old is not None:
+        updates.append(
+            UpdateOne(
+                {"cust_id": old.cust_id, "hour": old.hour, "entries.group_id": old.group_id},
+                {
+                    "$pull": {"entries": {"group_id": old.group_id}},
+                    "$inc": old.inc(-1),
+                    "$set": {"updated_at": now},
+                },
+            )
+        )
+    if new is not None:
+        updates.append(
+            UpdateOne(
+                {
+                    "cust_id": new.cust_id,
+                    "hour": new.hour,
+                    "entries.group_id": {"$ne": new.group_id},
+                },
+                {
+                    "$push": {"entries": new.entry_doc()},
+                    "$inc": new.inc(1),
+                    "$set": {"updated_at": now},
+                    "$max": {"expires_at": _expires_at(new.hour, _window_hours())},
+                },
+                upsert=True,
+            )
+        )
+    return updates
+
+
+async def update_conversion_limit_counters(before: Any = None, after: Any = None) -> None:
+    """
+    Apply the change from ledger entry *before* to ledger entry *after*.
+
+    Either side may be ``None``.  Entries that are not ``h_conv_k``/``k_conv_h``
+    are ignored, so this is a no-op for almost every save.
+    """
+    updates = _build_updates(before, after)
+    if not updates:
+        return
+    try:
+        await collection().bulk_write(updates, ordered=True)
+    except BulkWriteError as e:
+        # The upsert of an entry that is already counted collides with its bucket.
+        if any(err.get("code") != _DUPLICATE_KEY for err in e.details.get("writeErrors", [])):
+            raise
+
+
+# ---------------------------------------------------------------------------
+# Window arithmetic (pure)
+# ---------------------------------------------------------------------------
+
+
+def _window_entries(buckets: Iterable[Mapping[str, Any]], start: datetime):
+    """Yield the bucket entries with a timestamp at or after *start*."""
+    for bucket in buckets:
+        for entry in bucket.get("entries", []):
+            if _utc(entry["timestamp"]) >= start:
+                yield entry
+
+
+def period_results(
+    buckets: List[Mapping[str, Any]],
+    lightning_rate_limits: List[V4VConfigRateLimits],
+    now: datetime,
+) -> Dict[str, PeriodResult]:
+    """
+    Sum one customer's *buckets* (decimals already converted) for every limit window
+    ending at *now*, keyed by ``str(hours)`` like ``limit_check_pipeline``.
+    """
+    answer: Dict[str, PeriodResult] = {}
+    for limit in lightning_rate_limits:
+        start = now - timedelta(hours=limit.hours)
+        totals = {f: Decimal(0) for f in CONV_FIELDS}
+        for bucket in buckets:
+            hour = _utc(bucket["hour"])
+            if hour >= start:
+                for f in CONV_FIELDS:
+                    totals[f] += Decimal(str(bucket.get("totals", {}).get(f, 0)))
+            elif hour + BUCKET > start:
+                for entry in _window_entries([bucket], start):
+                    for f in CONV_FIELDS:
+                        totals[f] += Decimal(str(entry.get(f, 0)))
+        answer[str(limit.hours)] = PeriodResult(
+            **totals, limit_hours=limit.hours, limit_sats=int(limit.sats)
+        )
+    return answer
+
+
+def next_expiry(
+    buckets: List[Mapping[str, Any]],
+    lightning_rate_limits: List[V4VConfigRateLimits],
+    now: datetime,
+) -> Tuple[datetime, Decimal] | None:
+    """
+    When the oldest conversion inside the shortest window drops out of it, and the
+    sats that frees; the same answer as ``get_next_limit_expiry`` from the pipeline.
+    """
+    if not lightning_rate_limits:
+        return None
+    first_limit = min(lightning_rate_limits, key=lambda x: x.hours)
+    start = now - timedelta(hours=first_limit.hours)
+    candidates = [b for b in buckets if _utc(b["hour"]) + BUCKET > start]
+    candidates.sort(key=lambda b: _utc(b["hour"]))
+    for bucket in candidates:
+        entries = list(_window_entries([bucket], start))
+        if entries:
+            oldest = min(entries, key=lambda e: _utc(e["timestamp"]))
+            sats_freed = Decimal(str(oldest.get("msats", 0))) // Decimal(1000)
+            return _utc(oldest["timestamp"]) + timedelta(hours=first_limit.hours), sats_freed
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Reads
+# ---------------------------------------------------------------------------
+
+
+def _counters_ready(meta: Mapping[str, Any] | None) -> bool:
+    return meta is not None and meta.get("window_hours", 0) >= _window_hours()
+
+
+async def get_customer_buckets(
+    cust_ids: Iterable[str], now: datetime | None = None
+) -> Dict[str, List[Dict[str, Any]]] | None:
+    """
+    Return the buckets inside the longest limit window for each of *cust_ids*, read
+    together with the meta document in one query.
+
+    Returns ``None`` when the counters have not been built for the configured window,
+    in which case callers should fall back to ``limit_check_pipeline``.
+    """
+    if now is None:
+        now = datetime.now(tz=timezone.utc)
+    cust_ids = list(cust_ids)
+    start = bucket_hour(now - timedelta(hours=_window_hours()))
+    query = {
+        "$or": [
+            {"_id": META_ID},
+            {"cust_id": {"$in": cust_ids}, "hour": {"$gte": start}},
+        ]
+    }
+    meta: Dict[str, Any] | None = None
+    answer: Dict[str, List[Dict[str, Any]]] = {cust_id: [] for cust_id in cust_ids}
+    async for doc in collection().find(query, projection={"updated_at": 0}):
+        if doc["_id"] == META_ID:
+            meta = doc
+            continue
+        answer.setdefault(doc["cust_id"], []).append(convert_decimal128_to_decimal(doc))
+    if not _counters_ready(meta):
+        return None
+    return answer
+
+
+async def counter_limit_checks(
+    cust_ids: Iterable[str], now: datetime | None = None
+) -> Dict[str, Tuple[LimitCheckResult, Tuple[datetime, Decimal] | None]] | None:
+    """
+    Limit check results and next expiry for each of *cust_ids* from the counters,
+    or ``None`` if the counters are not available.
+    """
+    if now is None:
+        now = datetime.now(tz=timezone.utc)
+    buckets = await get_customer_buckets(cust_ids, now=now)
+    if buckets is None:
+        return None
+    V4VConfig().data.check_and_sort_rate_limits()
+    limits = V4VConfig().data.lightning_rate_limits
+    return {
+        cust_id: (
+            LimitCheckResult(cust_id=cust_id, periods=period_results(cust_buckets, limits, now)),
+            next_expiry(cust_buckets, limits, now),
+        )
+        for cust_id, cust_buckets in buckets.items()
+    }
+
+
+# ---------------------------------------------------------------------------
+# Rebuild and reconciliation
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class ReconcileResult:
+    """Counts from one reconciliation against the ledger."""
+
+    buckets: int = 0
+    repaired: int = 0
+    removed: int = 0
+    skipped: int = 0
+    rebuilt: bool = False
+    elapsed: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "buckets": self.buckets,
+            "repaired": self.repaired,
+            "removed": self.removed,
+            "skipped": self.skipped,
+            "rebuilt": self.rebuilt,
+            "elapsed": round(self.elapsed, 3),
+        }
+
+
+def build_buckets(
+    entries: Iterable[CounterEntry], window_hours: int
+) -> Dict[Tuple[str, datetime], Dict[str, Any]]:
+    """Group *entries* into bucket documents keyed by ``(cust_id, hour)``."""
+    documents: Dict[Tuple[str, datetime], Dict[str, Any]] = {}
+    for entry in entries:
+        doc = documents.setdefault(
+            (entry.cust_id, entry.hour),
+            {
+                "cust_id": entry.cust_id,
+                "hour": entry.hour,
+                "totals": {f: Decimal(0) for f in CONV_FIELDS},
+                "count": 0,
+                "entries": [],
+                "expires_at": _expires_at(entry.hour, window_hours),
+            },
+        )
+        for f in CONV_FIELDS:
+            doc["totals"][f] += entry.conv[f]
+        doc["count"] += 1
+        doc["entries"].append(entry.entry_doc())
+    return documents
+
+
+async def _ledger_buckets(
+    start: datetime, window_hours: int
+) -> Dict[Tuple[str, datetime], Dict[str, Any]]:
+    """Bucket documents computed from the ledger for every conversion since *start*."""
+    from v4vapp_backend_v2.accounting.ledger_entry_class import LedgerEntry
+
+    cursor = LedgerEntry.collection().find(
+        {"ledger_type": {"$in": list(CONVERSION_LEDGER_TYPES)}, "timestamp": {"$gte": start}},
+        projection={"_id": 0, "group_id": 1, "cust_id": 1, "timestamp": 1, "credit_conv": 1},
+    )
+    entries = []
+    async for raw in cursor:
+        entry = CounterEntry.from_doc(convert_decimal128_to_decimal(raw))
+        if entry is not None:
+            entries.append(entry)
+    return build_buckets(entries, window_hours)
+
+
+def _stored_form(doc: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    doc["entries"].sort(key=lambda e: e["timestamp"])
+    return {
+        **doc,
+        "totals": {f: Decimal128(str(v)) for f, v in doc["totals"].items()},
+        "updated_at": now,
+    }
+
+
+def _same_bucket(stored: Mapping[str, Any], expected: Mapping[str, Any]) -> bool:
+    stored_ids = sorted(e["group_id"] for e in stored.get("entries", []))
+    expected_ids = sorted(e["group_id"] for e in expected["entries"])
+    if stored.get("count") != expected["count"] or stored_ids != expected_ids:
+        return False
+    totals = stored.get("totals", {})
+    return all(Decimal(str(totals.get(f, 0))) == expected["totals"][f] for f in CONV_FIELDS)
+
+
+def _reconcile_operations(
+    expected: Mapping[Tuple[str, datetime], Dict[str, Any]],
+    stored: Mapping[Tuple[str, datetime], Dict[str, Any]],
+    scan_start: datetime,
+    now: datetime,
+    result: ReconcileResult,
+) -> List[ReplaceOne | DeleteOne]:
+    """
+    The writes that bring *stored* in line with *expected*, counted into *result*.
+
+    Each write is conditional on the bucket being unchanged since it was read: a
+    bucket that did not exist must still not exist (the unique index rejects the
+    upsert otherwise) and an existing one must keep its ``updated_at``.
+    """
+    operations: List[ReplaceOne | DeleteOne] = []
+    for key in expected.keys() | stored.keys():
+        current = stored.get(key)
+        updated_at = current.get("updated_at") if current else None
+        if updated_at is not None and _utc(updated_at) >= scan_start:
+            result.skipped += 1
+            continue
+        doc = expected.get(key)
+        if doc is None and current is not None:
+            # Buckets emptied by ledger edits are harmless; only count ones still holding entries.
+            if current.get("entries"):
+                result.removed += 1
+            operations.append(DeleteOne({"_id": current["_id"], "updated_at": updated_at}))
+        elif doc is not None and (current is None or not _same_bucket(current, doc)):
+            result.repaired += 1
+            operations.append(
+                ReplaceOne(
+                    {"cust_id": key[0], "hour": key[1], "updated_at": updated_at},
+                    _stored_form(doc, now),
+                    upsert=current is None,
+                )
+            )
+    return operations
+
+
+async def rebuild_conversion_limit_counters(now: datetime | None = None) -> int:
+    """
+    Recompute every bucket inside the longest limit window from the ledger and
+    replace the collection.
+
+    Returns:
+        The number of bucket documents written.
+    """
+    start_timer = timer()
+    if now is None:
+        now = datetime.now(tz=timezone.utc)
+    window_hours = _window_hours()
+    documents = await _ledger_buckets(
+        bucket_hour(now - timedelta(hours=window_hours)), window_hours
+    )
+
+    await collection().delete_many({})
+    await ensure_indexes()
+    if documents:
+        await collection().insert_many([_stored_form(d, now) for d in documents.values()])
+    await collection().replace_one(
+        {"_id": META_ID},
+        {"window_hours": window_hours, "rebuilt_at": now, "reconciled_at": now},
+        upsert=True,
+    )
+    logger.info(
+        f"{ICON} Rebuilt {len(documents)} conversion limit buckets "
+        f"(took {timer() - start_timer:.2f}s)",
+        extra={"notification": False},
+    )
+    return len(documents)
+
+
+async def reconcile_conversion_limit_counters(
+    now: datetime | None = None, repair: bool = True
+) -> ReconcileResult:
+    """
+    Compare every bucket inside the longest limit window with the ledger.
+
+    Buckets whose entries or totals differ are replaced with the ledger's version and
+    buckets with no conversions left are removed (when *repair* is set).  If the
+    counters were never built, or were built for a shorter window than the current
+    limits need, the whole collection is rebuilt instead.
+
+    The ledger is read before the buckets, so a conversion saved in between is in its
+    bucket but not in the ledger snapshot.  Buckets written since the scan started are
+    therefore left alone (counted as ``skipped``), and every replace or delete only
+    applies if the bucket's ``updated_at`` is still the one that was compared; the
+    next cycle checks anything skipped.
+    """
+    start_timer = timer()
+    if now is None:
+        now = datetime.now(tz=timezone.utc)
+    result = ReconcileResult()
+    meta = await collection().find_one({"_id": META_ID})
+    if not _counters_ready(meta):
+        result.buckets = await rebuild_conversion_limit_counters(now=now)
+        result.rebuilt = True
+        result.elapsed = timer() - start_timer
+        return result
+
+    window_hours = _window_hours()
+    start = bucket_hour(now - timedelta(hours=window_hours))
+    scan_start = datetime.now(tz=timezone.utc)
+    expected = await _ledger_buckets(start, window_hours)
+    stored: Dict[Tuple[str, datetime], Dict[str, Any]] = {}
+    async for doc in collection().find({"cust_id": {"$exists": True}, "hour": {"$gte": start}}):
+        stored[(doc["cust_id"], _utc(doc["hour"]))] = convert_decimal128_to_decimal(doc)
+    result.buckets = len(expected)
+    operations = _reconcile_operations(expected, stored, scan_start, now, result)
+
+    if repair:
+        if operations:
+            try:
+                await collection().bulk_write(operations, ordered=False)
+            except BulkWriteError as e:
+                # A live save created the bucket after it was read; leave it for next time.
+                if any(
+                    err.get("code") != _DUPLICATE_KEY for err in e.details.get("writeErrors", [])
+                ):
+                    raise
+        await collection().update_one({"_id": META_ID}, {"$set": {"reconciled_at": now}})
+
+    result.elapsed = timer() - start_timer
+    log = logger.warning if result.repaired or result.removed else logger.info
+    log(
+        f"{ICON} Conversion limit counters: {result.buckets} buckets, "
+        f"{result.repaired} repaired, {result.removed} removed "
+        f"(took {result.elapsed:.2f}s)",
+        extra={"notification": False, "reconcile": result.as_dict()},
+    )
+    return result
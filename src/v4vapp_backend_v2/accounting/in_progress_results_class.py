@@ -4,6 +4,7 @@ from typing import Any, List, Mapping
 
 from v4vapp_backend_v2.accounting.account_balance_pipelines import all_held_msats_balance_pipeline
 from v4vapp_backend_v2.accounting.ledger_entry_class import LedgerEntry
+from v4vapp_backend_v2.accounting.ledger_l1_cache import ledger_l1_cache
 from v4vapp_backend_v2.config.decorators import async_time_decorator
 from v4vapp_backend_v2.process.lock_str_class import CustIDType
 
@@ -92,7 +93,7 @@ class InProgressResults:
 
 
 # @async_time_decorator
-async def all_held_msats() -> List[Mapping[str, Any]]:
+async def all_held_msats(use_cache: bool = False) -> List[Mapping[str, Any]]:
     """
     Execute the aggregation pipeline that computes "held" balances in millisatoshis (msats)
     from ledger entries and return the resulting documents.
@@ -102,6 +103,11 @@ async def all_held_msats() -> List[Mapping[str, Any]]:
     - Runs the pipeline against the LedgerEntry collection.
     - Collects and returns all resulting documents as a list of mappings.
 
+    Args:
+        use_cache (bool): If True, return the result held by the in-process ledger L1
+            cache when it is live.  The held totals are derived from the ledger, so the
+            entry is dropped on every ledger cache invalidation.  Defaults to False.
+
     Returns:
         List[Mapping[str, Any]]: A list of aggregation result documents. Each mapping
         corresponds to a document emitted by the pipeline (typically containing
@@ -112,7 +118,15 @@ async def all_held_msats() -> List[Mapping[str, Any]]:
         - This function is asynchronous and must be awaited.
         - Database errors raised by the underlying driver will propagate to the caller.
     """
+    l1_active = use_cache and ledger_l1_cache.ensure_listener()
+    epoch = ledger_l1_cache.epoch
+    if l1_active:
+        cached = ledger_l1_cache.get_held()
+        if cached is not None:
+            return cached
     in_progress_pipeline = all_held_msats_balance_pipeline()
     cursor = await LedgerEntry.collection().aggregate(in_progress_pipeline)
     results = await cursor.to_list(length=None)
+    if l1_active:
+        ledger_l1_cache.put_held(results, epoch)
     return results
@@ -16,9 +16,19 @@ Operations fall into two categories:
 * **Full invalidation** – increment the generation counter and ignore every
   existing key. This path is O(1) and is used as a fallback or when the
   entire cache needs flushing.
-* **Selective invalidation** – delete only keys whose embedded account
-  information matches a supplied debit/credit pair. This uses a lightweight
-  SCAN/DEL loop and keeps unrelated entries alive.
+* **Selective invalidation** – delete only keys belonging to a supplied
+  debit/credit pair and keep unrelated entries alive.  Every write also adds
+  its key to a per-account index set:
+
+      ledger:idx:{sub}:{name}
+
+  so invalidation is an ``SMEMBERS`` + ``UNLINK`` of the keys for those two
+  accounts rather than a SCAN over the whole ``ledger:bal:`` namespace.  The
+  index set carries a TTL at least as long as the longest-lived key it lists.
+
+An in-process L1 (``ledger_l1_cache``) sits in front of Redis and holds the
+already-validated objects under the same keys.  Both invalidation paths
+publish on ``INVALIDATION_CHANNEL`` so every process drops its L1 copies.
 
 All operations are fault-tolerant: if Redis is unavailable the functions
 return ``None`` / silently skip, and the caller falls back to the database.
@@ -26,12 +36,12 @@ return ``None`` / silently skip, and the caller falls back to the database.
 
 from __future__ import annotations
 
-import asyncio
 from datetime import datetime, timedelta
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, List, Sequence, Tuple
 
 from colorama import Fore
 
+from v4vapp_backend_v2.accounting.ledger_l1_cache import INVALIDATION_CHANNEL, ledger_l1_cache
 from v4vapp_backend_v2.config.setup import InternalConfig, logger
 
 if TYPE_CHECKING:
@@ -52,11 +62,25 @@ LIVE_TTL_SECONDS = 1200
 HISTORICAL_TTL_SECONDS = 1200
 
 
+# Number of keys sent per UNLINK command during selective invalidation.
+UNLINK_CHUNK_SIZE = 1000
+
+
 # ---------------------------------------------------------------------------
 # Key construction
 # ---------------------------------------------------------------------------
 
 
+def _make_index_key(name: str, sub: str) -> str:
+    """Return the Redis set that indexes every cached key for ``name``/``sub``.
+
+    Invalidation works on the name/sub pair (every account type and contra
+    flag), so the index is keyed the same way.  It is deliberately outside the
+    ``ledger:bal:`` namespace and independent of the generation number.
+    """
+    return f"ledger:idx:{sub}:{name}"
+
+
 def _make_cache_key(
     generation: int,
     account: LedgerAccount,
@@ -119,6 +143,11 @@ async def invalidate_all_ledger_cache() -> int:
     """
     try:
         new_gen: int = await InternalConfig.redis_async.incr(GENERATION_KEY)
+        ledger_l1_cache.clear()
+        ledger_l1_cache.generation = new_gen
+        await InternalConfig.redis_async.publish(
+            INVALIDATION_CHANNEL, ledger_l1_cache.generation_message(new_gen)
+        )
         logger.info(
             f"🗑️  Ledger cache invalidated — generation now {new_gen}",
             extra={"notification": False},
@@ -139,50 +168,44 @@ async def invalidate_ledger_cache(
 
     When a ledger entry is created or updated we only expect two accounts to be
     affected.  Instead of bumping the global generation (which would trash the
-    entire cache), this function scans Redis for keys whose embedded name/sub
-    matches the supplied pairs and deletes them.  Only a handful of keys are
-    touched, and unrelated cache entries remain usable.
+    entire cache), this function reads the per-account index sets and deletes
+    exactly the keys they list.  Reading and dropping the index sets happens in
+    one MULTI/EXEC so a concurrent ``set_cached_balance`` starts a fresh set
+    rather than being lost; the listed keys are then UNLINKed and the
+    invalidation published to every process's L1 in one pipeline.
 
     The return value is the current generation number (unchanged).  On error we
     fall back to ``invalidate_all_ledger_cache()`` to guarantee no stale data is
     returned.
     """
-    # build glob patterns for the two account pairs
-    # These patterns MUST match the _make_cache_key format,
-    # especially the position of name/sub and the generation wildcard.
-    debit_key = f"ledger:bal:v*:{debit_sub}:{debit_name}:*"
-    patterns = [debit_key]
-    if credit_name and credit_sub:
-        credit_key = f"ledger:bal:v*:{credit_sub}:{credit_name}:*"
-        patterns.append(credit_key)
-    else:
-        credit_key = None
+    pairs = [(debit_name, debit_sub)]
+    if credit_name and credit_sub and (credit_name, credit_sub) not in pairs:
+        pairs.append((credit_name, credit_sub))
+    index_keys = [_make_index_key(name, sub) for name, sub in pairs]
 
     try:
-        # Use SCAN to locate and delete matching keys.  In a typical
-        # deployment only a few cache entries will match the account pair, so
-        # this loop completes quickly.  It avoids the O(n) cost of SCAN/DEL over
-        # the whole ledger: namespace that we would incur with a naive
-        # invalidation.
-        tasks = []
-        for pattern in patterns:
-            cursor_val = 0
-            while True:
-                cursor_val, keys = await InternalConfig.redis_async.scan(
-                    cursor_val, match=pattern, count=100
-                )
-                if keys:
-                    tasks.append(InternalConfig.redis_async.delete(*keys))
-                    logger.debug(
-                        f"🗑️  Deleted {len(keys)} cache keys matching pattern: {pattern}",
-                        extra={"notification": False},
-                    )
-                if cursor_val == 0:
-                    break
-        if tasks:
-            await asyncio.gather(*tasks)
+        async with InternalConfig.redis_async.pipeline(transaction=True) as pipe:
+            for index_key in index_keys:
+                pipe.smembers(index_key)
+            pipe.unlink(*index_keys)
+            results = await pipe.execute()
+
+        keys: set[str] = set()
+        for members in results[: len(index_keys)]:
+            keys.update(members or ())
+
+        # Publish only after the keys are gone so no process refills its L1 from
+        # a Redis entry that is about to be deleted.
+        key_list = list(keys)
+        async with InternalConfig.redis_async.pipeline(transaction=False) as pipe:
+            for i in range(0, len(key_list), UNLINK_CHUNK_SIZE):
+                pipe.unlink(*key_list[i : i + UNLINK_CHUNK_SIZE])
+            pipe.publish(INVALIDATION_CHANNEL, ledger_l1_cache.accounts_message(pairs))
+            await pipe.execute()
+        ledger_l1_cache.invalidate_accounts(pairs)
         logger.debug(
-            f"🗑️  Ledger cache invalidated for accounts {debit_name}:{debit_sub} and {credit_name}:{credit_sub}",
+            f"🗑️  Ledger cache invalidated {len(keys)} keys for accounts "
+            f"{debit_name}:{debit_sub} and {credit_name}:{credit_sub}",
             extra={"notification": False},
         )
         return await get_cache_generation()  # Return current generation after invalidation
@@ -194,6 +217,19 @@ async def invalidate_ledger_cache(
         return await invalidate_all_ledger_cache()  # Fallback to full invalidation on error
 
 
+def _queue_set(pipe, key: str, account: LedgerAccount, data: str, ttl: int) -> None:
+    """Queue the SETEX and index-set maintenance for one cache entry on ``pipe``.
+
+    ``EXPIRE NX`` gives a brand new index set its TTL and ``EXPIRE GT`` only
+    ever extends it, so the index always outlives the keys it lists.
+    """
+    index_key = _make_index_key(account.name, account.sub)
+    pipe.setex(key, ttl, data)
+    pipe.sadd(index_key, key)
+    pipe.expire(index_key, ttl, nx=True)
+    pipe.expire(index_key, ttl, gt=True)
+
+
 # ---------------------------------------------------------------------------
 # Get / Set
 # ---------------------------------------------------------------------------
@@ -214,12 +250,25 @@ async def get_cached_balance(
     from v4vapp_backend_v2.accounting.account_balances import LedgerAccountDetails
 
     try:
+        l1_active = ledger_l1_cache.ensure_listener()
+        epoch = ledger_l1_cache.epoch
+        if l1_active and ledger_l1_cache.generation is not None:
+            key = _make_cache_key(
+                ledger_l1_cache.generation, account, as_of_date, age, use_checkpoints
+            )
+            l1_result = ledger_l1_cache.get(key)
+            if l1_result is not None:
+                return l1_result
         gen = await get_cache_generation()
+        if l1_active:
+            epoch = ledger_l1_cache.sync_generation(gen)
         key = _make_cache_key(gen, account, as_of_date, age, use_checkpoints)
         data: str | None = await InternalConfig.redis_async.get(key)
         if data is not None:
             result = LedgerAccountDetails.model_validate_json(data)
             logger.info(f"{Fore.GREEN}HIT: {key}{Fore.RESET}")
+            if l1_active:
+                ledger_l1_cache.put(key, (account.name, account.sub), result, epoch)
             return result
     except Exception as e:
         logger.info(f"{Fore.RED}miss/error: {e}{Fore.RESET}")
@@ -245,7 +294,95 @@ async def set_cached_balance(
         gen = await get_cache_generation()
         key = _make_cache_key(gen, account, as_of_date, age, use_checkpoints)
         data = result.model_dump_json()
-        await InternalConfig.redis_async.setex(key, ttl, data)
+        async with InternalConfig.redis_async.pipeline(transaction=False) as pipe:
+            _queue_set(pipe, key, account, data, ttl)
+            await pipe.execute()
+        if ledger_l1_cache.active and gen == ledger_l1_cache.generation:
+            ledger_l1_cache.put(key, (account.name, account.sub), result)
         logger.info(f"SET: {key} (ttl={ttl}s)")
     except Exception as e:
         logger.warning(f"Failed to set ledger cache: {e}")
+
+
+async def get_cached_balances(
+    accounts: Sequence[LedgerAccount],
+    as_of_date: datetime | None,
+    age: timedelta | None,
+    use_checkpoints: bool = True,
+) -> List[LedgerAccountDetails | None]:
+    """Batched ``get_cached_balance``: one ``MGET`` for every account.
+
+    Returns a list in the same order as ``accounts`` holding the cached
+    ``LedgerAccountDetails`` or ``None`` for each miss.  L1 hits are taken first
+    and only the remainder goes to Redis.  On a Redis error every
+    entry is a miss.
+    """
+    from v4vapp_backend_v2.accounting.account_balances import LedgerAccountDetails
+
+    answer: List[LedgerAccountDetails | None] = [None] * len(accounts)
+    if not accounts:
+        return answer
+    try:
+        l1_active = ledger_l1_cache.ensure_listener()
+        epoch = ledger_l1_cache.epoch
+        pending = list(range(len(accounts)))
+        if l1_active and ledger_l1_cache.generation is not None:
+            gen = ledger_l1_cache.generation
+            for i in pending:
+                answer[i] = ledger_l1_cache.get(
+                    _make_cache_key(gen, accounts[i], as_of_date, age, use_checkpoints)
+                )
+            pending = [i for i in pending if answer[i] is None]
+            if not pending:
+                return answer
+        gen = await get_cache_generation()
+        if l1_active:
+            epoch = ledger_l1_cache.sync_generation(gen)
+        keys = [_make_cache_key(gen, acc, as_of_date, age, use_checkpoints) for acc in accounts]
+        values: List[str | None] = await InternalConfig.redis_async.mget(
+            [keys[i] for i in pending]
+        )
+        hits = 0
+        for i, data in zip(pending, values):
+            if data is None:
+                continue
+            try:
+                answer[i] = LedgerAccountDetails.model_validate_json(data)
+                hits += 1
+                if l1_active:
+                    ledger_l1_cache.put(
+                        keys[i], (accounts[i].name, accounts[i].sub), answer[i], epoch
+                    )
+            except Exception as e:
+                logger.info(f"{Fore.RED}miss/error: {keys[i]} {e}{Fore.RESET}")
+        logger.info(f"{Fore.GREEN}MGET: {hits}/{len(pending)} hits{Fore.RESET}")
+    except Exception as e:
+        logger.info(f"{Fore.RED}miss/error: {e}{Fore.RESET}")
+    return answer
+
+
+async def set_cached_balances(
+    items: Sequence[Tuple[LedgerAccount, LedgerAccountDetails]],
+    as_of_date: datetime | None,
+    age: timedelta | None,
+    ttl: int = DEFAULT_TTL_SECONDS,
+    use_checkpoints: bool = True,
+) -> None:
+    """Batched ``set_cached_balance``: every ``SETEX`` and index update goes out in one pipeline."""
+    if not items:
+        return
+    try:
+        gen = await get_cache_generation()
+        async with InternalConfig.redis_async.pipeline(transaction=False) as pipe:
+            keys = []
+            for account, result in items:
+                key = _make_cache_key(gen, account, as_of_date, age, use_checkpoints)
+                _queue_set(pipe, key, account, result.model_dump_json(), ttl)
+                keys.append(key)
+            await pipe.execute()
+        if ledger_l1_cache.active and gen == ledger_l1_cache.generation:
+            for key, (account, result) in zip(keys, items):
+                ledger_l1_cache.put(key, (account.name, account.sub), result)
+        logger.info(f"SET: {len(items)} balances (ttl={ttl}s)")
+    except Exception as e:
+        logger.warning(f"Failed to set ledger cache: {e}")
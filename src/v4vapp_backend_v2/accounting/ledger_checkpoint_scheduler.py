@@ -0,0 +1,319 @@
+"""
+Background scheduler that keeps ``ledger_checkpoints`` complete.
+
+Each cycle:
+
+1. Lists every active account together with the timestamp of its first entry.
+2. Detects missing checkpoints for each granularity inside its retention window
+   (monthly: the whole history, weekly: ``WEEKLY_RETENTION``, daily:
+   ``DAILY_RETENTION``) and backfills them oldest-first.  Coarse periods are
+   filled before fine ones and each checkpoint is computed from the latest
+   earlier checkpoint, so a backfill only ever aggregates one period of entries.
+3. Prunes daily and weekly checkpoints that have aged out of their window; the
+   coarser checkpoints filled in step 2 take their place.
+4. Reconciles the ``conversion_limit_counters`` with the ledger (see
+   ``reconcile_conversion_limit_counters``), building them on the first run.
+5. Verifies the ``ledger_running_balances`` against the pipeline once they have
+   been rebuilt, marking them stale on drift (see ``verify_running_balances``).
+
+Only one process runs a cycle at a time (Redis ``SET NX`` lock).  The loop can
+run inside ``db_monitor.py`` (``--checkpoints``) or on its own via
+``src/checkpoint_scheduler.py``.
+
+Reversals and backdated entries already delete the affected checkpoints (see
+``invalidate_checkpoints_for_accounts_by_date``); the next cycle sees those as
+gaps and rebuilds them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from timeit import default_timer as timer
+from typing import Any, Dict, List, Set, Tuple
+
+from redis.exceptions import WatchError
+
+from v4vapp_backend_v2.accounting.account_balance_pipelines import (
+    list_all_active_accounts_pipeline,
+)
+from v4vapp_backend_v2.accounting.conversion_limit_counters import (
+    reconcile_conversion_limit_counters,
+)
+from v4vapp_backend_v2.accounting.ledger_account_classes import LedgerAccount
+from v4vapp_backend_v2.accounting.ledger_checkpoints import LedgerCheckpoint, create_checkpoint
+from v4vapp_backend_v2.accounting.ledger_entry_class import LedgerEntry
+from v4vapp_backend_v2.accounting.ledger_running_balances import (
+    running_balances_ready,
+    verify_running_balances,
+)
+from v4vapp_backend_v2.config.setup import InternalConfig, logger
+from v4vapp_backend_v2.helpers.period_end_type import PeriodType, completed_period_ends_since
+
+ICON = "🗓️"
+
+# How long fine-grained checkpoints are kept before being pruned.  Monthly
+# checkpoints are kept for the whole history.
+DAILY_RETENTION = timedelta(days=45)
+WEEKLY_RETENTION = timedelta(weeks=26)
+
+RETENTION: Dict[PeriodType, timedelta | None] = {
+    PeriodType.MONTHLY: None,
+    PeriodType.WEEKLY: WEEKLY_RETENTION,
+    PeriodType.DAILY: DAILY_RETENTION,
+}
+
+# Coarse to fine: finer backfills start from the coarser checkpoints.
+SCHEDULE_ORDER = (PeriodType.MONTHLY, PeriodType.WEEKLY, PeriodType.DAILY)
+
+# Run shortly after midnight UTC so yesterday's daily period is complete.
+RUN_OFFSET = timedelta(minutes=5)
+
+# Accounts processed concurrently; each account's periods run in order.
+MAX_CONCURRENT_ACCOUNTS = 4
+
+LOCK_KEY = "ledger:checkpoint_scheduler:lock"
+LOCK_TTL_SECONDS = 3600
+
+
+@dataclass
+class CheckpointCycleResult:
+    """Counts from one scheduler cycle."""
+
+    accounts: int = 0
+    created: Dict[str, int] = field(default_factory=dict)
+    failed: int = 0
+    pruned: Dict[str, int] = field(default_factory=dict)
+    limit_counters: Dict[str, Any] = field(default_factory=dict)
+    running_balance_mismatches: int | None = None
+    elapsed: float = 0.0
+
+
+def _utc(dt: datetime) -> datetime:
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt
+
+
+def _bson_precision(dt: datetime) -> datetime:
+    """Truncate to milliseconds, the precision MongoDB stores ``period_end`` at."""
+    return _utc(dt).replace(microsecond=dt.microsecond // 1000 * 1000)
+
+
+async def active_accounts_with_first_timestamp() -> List[Tuple[LedgerAccount, datetime]]:
+    """Return every active account with the timestamp of its earliest ledger entry.
+
+    Checkpoints are keyed by ``(name, sub, account_type)`` so contra variants of the
+    same account are merged, keeping the earliest timestamp.
+    """
+    pipeline = list_all_active_accounts_pipeline(include_first_timestamp=True)
+    cursor = await LedgerEntry.collection().aggregate(pipeline=pipeline)
+    found: Dict[Tuple[str, str, str], Tuple[LedgerAccount, datetime]] = {}
+    async for doc in cursor:
+        first = doc.get("first_timestamp")
+        if first is None:
+            continue
+        first = _utc(first)
+        account = LedgerAccount.model_validate(doc)
+        key = (account.name, account.sub, str(account.account_type))
+        if key not in found or first < found[key][1]:
+            found[key] = (account, first)
+    return list(found.values())
+
+
+async def existing_period_ends(account: LedgerAccount, period_type: PeriodType) -> Set[datetime]:
+    """Return the ``period_end`` of every stored checkpoint for one account and granularity."""
+    ends = await LedgerCheckpoint.collection().distinct(
+        "period_end",
+        {
+            "account_name": account.name,
+            "account_sub": account.sub,
+            "account_type": str(account.account_type),
+            "period_type": str(period_type),
+        },
+    )
+    return {_bson_precision(end) for end in ends}
+
+
+def expected_period_ends(
+    period_type: PeriodType, first_timestamp: datetime, now: datetime
+) -> List[datetime]:
+    """Completed period ends that should have a checkpoint, inside the retention window."""
+    since = first_timestamp
+    retention = RETENTION[period_type]
+    if retention is not None:
+        since = max(since, now - retention)
+    return completed_period_ends_since(period_type, since, now)
+
+
+async def find_checkpoint_gaps(
+    account: LedgerAccount, period_type: PeriodType, first_timestamp: datetime, now: datetime
+) -> List[datetime]:
+    """Return the missing period ends for *account*, oldest first."""
+    expected = expected_period_ends(period_type, first_timestamp, now)
+    if not expected:
+        return []
+    existing = await existing_period_ends(account, period_type)
+    return [
+        period_end for period_end in expected if _bson_precision(period_end) not in existing
+    ]
+
+
+async def backfill_account(
+    account: LedgerAccount, first_timestamp: datetime, now: datetime
+) -> Tuple[Dict[str, int], int]:
+    """Fill every checkpoint gap for one account.  Returns (created per period type, failures)."""
+    created: Dict[str, int] = {}
+    failed = 0
+    for period_type in SCHEDULE_ORDER:
+        gaps = await find_checkpoint_gaps(account, period_type, first_timestamp, now)
+        for period_end in gaps:
+            try:
+                _, new_checkpoint = await create_checkpoint(
+                    account, period_type, period_end, use_checkpoints=True
+                )
+                if new_checkpoint:
+                    created[str(period_type)] = created.get(str(period_type), 0) + 1
+            except Exception as e:
+                failed += 1
+                logger.warning(
+                    f"{ICON} Could not create {period_type} checkpoint for "
+                    f"{account.name}:{account.sub} at {period_end}: {e}",
+                    extra={"notification": False},
+                )
+                # Later periods would chain from a missing checkpoint; retry next cycle.
+                break
+    return created, failed
+
+
+async def prune_checkpoints(now: datetime) -> Dict[str, int]:
+    """Delete daily/weekly checkpoints older than their retention window."""
+    pruned: Dict[str, int] = {}
+    for period_type, retention in RETENTION.items():
+        if retention is None:
+            continue
+        result = await LedgerCheckpoint.collection().delete_many(
+            {"period_type": str(period_type), "period_end": {"$lt": now - retention}}
+        )
+        if result.deleted_count:
+            pruned[str(period_type)] = result.deleted_count
+    return pruned
+
+
+async def run_checkpoint_cycle(now: datetime | None = None) -> CheckpointCycleResult:
+    """Run one detect/backfill/prune cycle over every active account."""
+    start = timer()
+    if now is None:
+        now = datetime.now(tz=timezone.utc)
+    result = CheckpointCycleResult()
+    await LedgerCheckpoint.ensure_indexes()
+
+    accounts = await active_accounts_with_first_timestamp()
+    result.accounts = len(accounts)
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_ACCOUNTS)
+
+    async def _one(account: LedgerAccount, first_timestamp: datetime) -> None:
+        async with semaphore:
+            created, failed = await backfill_account(account, first_timestamp, now)
+        for period_type, count in created.items():
+            result.created[period_type] = result.created.get(period_type, 0) + count
+        result.failed += failed
+
+    async with asyncio.TaskGroup() as tg:
+        for account, first_timestamp in accounts:
+            tg.create_task(_one(account, first_timestamp))
+
+    result.pruned = await prune_checkpoints(now)
+    try:
+        # Limit windows are always measured back from the real time, not *now*.
+        result.limit_counters = (await reconcile_conversion_limit_counters()).as_dict()
+    except Exception as e:
+        logger.warning(
+            f"{ICON} Conversion limit counter reconciliation failed: {e}",
+            extra={"notification": False},
+        )
+    try:
+        if await running_balances_ready():
+            mismatches = await verify_running_balances(mark_stale=True)
+            result.running_balance_mismatches = len(mismatches)
+    except Exception as e:
+        logger.warning(
+            f"{ICON} Running balance verification failed: {e}",
+            extra={"notification": False},
+        )
+    result.elapsed = timer() - start
+    logger.info(
+        f"{ICON} Checkpoint cycle: {result.accounts} accounts, created {result.created}, "
+        f"pruned {result.pruned}, failed {result.failed} (took {result.elapsed:.2f}s)",
+        extra={"notification": False},
+    )
+    return result
+
+
+def seconds_until_next_run(now: datetime | None = None) -> float:
+    """Seconds until ``RUN_OFFSET`` past the next UTC midnight."""
+    if now is None:
+        now = datetime.now(tz=timezone.utc)
+    next_run = now.replace(hour=0, minute=0, second=0, microsecond=0) + RUN_OFFSET
+    if next_run <= now:
+        next_run += timedelta(days=1)
+    return (next_run - now).total_seconds()
+
+
+async def run_checkpoint_cycle_locked() -> CheckpointCycleResult | None:
+    """Run a cycle if no other process holds the scheduler lock; ``None`` if skipped."""
+    token = f"{InternalConfig().local_machine_name}:{uuid.uuid4().hex[:12]}"
+    acquired = await InternalConfig.redis_async.set(LOCK_KEY, token, nx=True, ex=LOCK_TTL_SECONDS)
+    if not acquired:
+        logger.info(
+            f"{ICON} Checkpoint cycle already running elsewhere; skipping",
+            extra={"notification": False},
+        )
+        return None
+    try:
+        return await run_checkpoint_cycle()
+    finally:
+        await _release_lock(token)
+
+
+async def _release_lock(token: str) -> None:
+    """Delete the scheduler lock only while it still holds *token*.
+
+    A cycle that outlasts ``LOCK_TTL_SECONDS`` may find the lock taken by
+    another process, which must keep it.
+    """
+    try:
+        async with InternalConfig.redis_async.pipeline(transaction=True) as pipe:
+            await pipe.watch(LOCK_KEY)
+            if await pipe.get(LOCK_KEY) != token:
+                await pipe.unwatch()
+                logger.warning(
+                    f"{ICON} Checkpoint scheduler lock expired or was taken over before release",
+                    extra={"notification": False},
+                )
+                return
+            pipe.multi()
+            pipe.delete(LOCK_KEY)
+            await pipe.execute()
+    except WatchError:
+        logger.warning(
+            f"{ICON} Checkpoint scheduler lock changed during release",
+            extra={"notification": False},
+        )
+
+
+async def checkpoint_scheduler_loop(shutdown_event: asyncio.Event) -> None:
+    """Run a cycle now and then daily just after midnight UTC until *shutdown_event* is set."""
+    logger.info(f"{ICON} Checkpoint scheduler started", extra={"notification": False})
+    while not shutdown_event.is_set():
+        try:
+            await run_checkpoint_cycle_locked()
+        except Exception as e:
+            logger.exception(
+                f"{ICON} Checkpoint cycle failed: {e}", extra={"notification": True}
+            )
+        try:
+            await asyncio.wait_for(shutdown_event.wait(), timeout=seconds_until_next_run())
+        except asyncio.TimeoutError:
+            pass
+    logger.info(f"{ICON} Checkpoint scheduler stopped", extra={"notification": False})
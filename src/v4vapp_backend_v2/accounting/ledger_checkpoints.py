@@ -361,6 +361,63 @@ async def get_latest_checkpoint_before(
         return None
 
 
+async def get_latest_checkpoints_before(
+    accounts: List[LedgerAccount],
+    as_of_date: datetime,
+) -> List[LedgerCheckpoint | None]:
+    """Batched ``get_latest_checkpoint_before`` using a single aggregation.
+
+    Returns a list parallel to *accounts* holding the most-recent checkpoint
+    with ``period_end ≤ as_of_date`` for each account, or ``None`` where no
+    checkpoint exists.
+    """
+    if not accounts:
+        return []
+    pipeline: List[Dict[str, Any]] = [
+        {
+            "$match": {
+                "$or": [
+                    {
+                        "account_name": account.name,
+                        "account_sub": account.sub,
+                        "account_type": str(account.account_type),
+                    }
+                    for account in accounts
+                ],
+                "period_end": {"$lte": as_of_date},
+            }
+        },
+        {"$sort": {"period_end": -1}},
+        {
+            "$group": {
+                "_id": {
+                    "account_name": "$account_name",
+                    "account_sub": "$account_sub",
+                    "account_type": "$account_type",
+                },
+                "doc": {"$first": "$$ROOT"},
+            }
+        },
+    ]
+    cursor = await LedgerCheckpoint.collection().aggregate(pipeline)
+    latest: Dict[Tuple[str, str, str], LedgerCheckpoint] = {}
+    for row in await cursor.to_list():
+        try:
+            checkpoint = LedgerCheckpoint._from_mongo_doc(row["doc"])
+        except Exception as e:
+            logger.warning(
+                f"⚠️  Failed to deserialise checkpoint document: {e}",
+                extra={"notification": False},
+            )
+            continue
+        key = (checkpoint.account_name, checkpoint.account_sub, checkpoint.account_type)
+        latest[key] = checkpoint
+    return [
+        latest.get((account.name, account.sub, str(account.account_type)))
+        for account in accounts
+    ]
+
+
 async def get_checkpoint_by_id(
     account: LedgerAccount,
     period_type: PeriodType,
@@ -435,6 +492,7 @@ async def create_checkpoint(
     period_end: datetime,
     use_cache: bool = True,
     force: bool = False,
+    use_checkpoints: bool = False,
 ) -> Tuple[LedgerCheckpoint, bool]:
     """
     Compute and persist a checkpoint for *account* at *period_end*.
@@ -449,9 +507,14 @@ async def create_checkpoint(
         This is the redis temp cache.
 
     The balance is computed by calling ``one_account_balance`` with
-    ``as_of_date=period_end`` and cache/checkpoint lookup disabled so that
+    ``as_of_date=period_end`` and checkpoint lookup disabled so that
     the result is authoritative.
 
+    if *use_checkpoints* is True the balance instead starts from the latest earlier
+        checkpoint and only aggregates the delta.  The checkpoint scheduler uses this
+        when filling consecutive gaps oldest-first, so each new checkpoint chains from
+        the one created just before it.
+
     Returns:
     - The checkpoint instance (newly created or existing)
     - A boolean flag indicating whether a new checkpoint was created (True) or an existing one was returned (False)
@@ -475,7 +538,7 @@ async def create_checkpoint(
         account=account,
         as_of_date=period_end,
         use_cache=use_cache,
-        use_checkpoints=False,
+        use_checkpoints=use_checkpoints,
     )
 
     balances_net: Dict[str, Decimal] = {}
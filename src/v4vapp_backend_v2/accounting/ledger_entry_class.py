@@ -12,6 +12,7 @@ from pydantic import (
     field_validator,
     model_validator,
 )
+from pymongo import ReturnDocument
 from pymongo.asynchronous.collection import AsyncCollection
 from pymongo.errors import DuplicateKeyError
 from pymongo.results import InsertOneResult, UpdateResult
@@ -720,6 +721,54 @@ class LedgerEntry(BaseModel):
                 extra={"notification": True, **self.log_extra},
             )
 
+    async def _update_running_balances(
+        self,
+        previous_doc: Mapping[str, Any] | None = None,
+        stored_doc: Mapping[str, Any] | None = None,
+    ) -> None:
+        """
+        Applies this ledger entry to the ``ledger_running_balances`` collection and,
+        for Lightning conversions, to the ``conversion_limit_counters``.
+
+        For an insert the entry is simply added.  For an upsert (reversal or ledger
+        editor change) the version the write replaced (*previous_doc*) is backed out
+        and the version it stored (*stored_doc*) is added, so reversed entries drop
+        out and edited accounts, units or amounts move to the right place.  Both come
+        from the write itself, so concurrent edits of one entry each apply their own
+        change exactly once.
+
+        Side effects:
+            - Updates the running balance documents for the affected accounts.
+            - Updates the customer's hourly conversion limit bucket.
+            - Logs any errors; ``rebuild_running_balances`` and
+              ``reconcile_conversion_limit_counters`` repair a missed update.
+        """
+        from v4vapp_backend_v2.accounting.conversion_limit_counters import (
+            update_conversion_limit_counters,
+        )
+        from v4vapp_backend_v2.accounting.ledger_running_balances import (
+            update_running_balances,
+        )
+
+        before: LedgerEntry | None = None
+        after: LedgerEntry | None = None
+        try:
+            before = LedgerEntry.model_validate(previous_doc) if previous_doc else None
+            after = LedgerEntry.model_validate(stored_doc) if stored_doc else self
+            await update_running_balances(before=before, after=after)
+        except Exception as e:
+            logger.error(
+                f"Error updating ledger running balances: {e}",
+                extra={"notification": True, **self.log_extra},
+            )
+        try:
+            await update_conversion_limit_counters(before=before, after=after)
+        except Exception as e:
+            logger.error(
+                f"Error updating conversion limit counters: {e}",
+                extra={"notification": True, **self.log_extra},
+            )
+
     async def save(
         self, ignore_duplicates: bool = False, upsert: bool = False, reverse: bool = False
     ) -> InsertOneResult | UpdateResult | None:
@@ -740,6 +789,7 @@ class LedgerEntry(BaseModel):
             InsertOneResult: The result of the insert operation.
         Side effects:
             - Inserts the LedgerEntry into the database.
+            - Updates the running balances of the debit and credit accounts.
             - Logs the operation details.
 
         """
@@ -756,13 +806,25 @@ class LedgerEntry(BaseModel):
             document = convert_decimals_for_mongodb(document)
 
             ans: InsertOneResult | UpdateResult | None = None
+            previous_doc: Mapping[str, Any] | None = None
+            stored_doc: Mapping[str, Any] | None = None
             if not upsert:
                 ans = await InternalConfig.db["ledger"].insert_one(document=document)
             else:
-                ans = await InternalConfig.db["ledger"].update_one(
+                # Take the replaced version in the same write so the running balances
+                # back out exactly what this update overwrote; $set leaves the other
+                # stored fields in place.
+                previous_doc = await InternalConfig.db["ledger"].find_one_and_update(
                     filter=self.group_id_query,
                     update={"$set": document},
                     upsert=True,
+                    return_document=ReturnDocument.BEFORE,
+                )
+                stored_doc = {**(previous_doc or {}), **document}
+                updated = int(previous_doc is not None)
+                ans = UpdateResult(
+                    {"n": updated, "nModified": updated, "updatedExisting": bool(updated)},
+                    acknowledged=True,
                 )
                 logger.info(
                     f"Ledger Entry upserted: {self.short_id} {self.group_id}",
@@ -778,6 +840,7 @@ class LedgerEntry(BaseModel):
             # before the write creates a race: another coroutine can repopulate
             # the cache from DB (missing the new entry) before insert_one completes.
             await self._invalidate_cache()
+            await self._update_running_balances(previous_doc=previous_doc, stored_doc=stored_doc)
             from v4vapp_backend_v2.accounting.ledger_checkpoints import (
                 invalidate_checkpoints_for_accounts_by_date,
             )
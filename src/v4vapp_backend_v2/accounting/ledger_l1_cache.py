@@ -0,0 +1,286 @@
+"""
+In-process (L1) cache in front of the Redis ledger balance cache.
+
+Holds already-validated ``LedgerAccountDetails`` objects keyed by the same
+string as the Redis cache (``ledger_cache._make_cache_key``) so a repeated
+lookup costs neither a Redis round-trip nor a Pydantic parse of the JSON
+blob.  It also keeps the latest ``all_held_msats()`` result, which is derived
+from the ledger and so changes exactly when the balances do.
+
+Consistency across processes relies on Redis pub/sub:
+``invalidate_ledger_cache`` / ``invalidate_all_ledger_cache`` publish on
+``INVALIDATION_CHANNEL`` and every process runs a listener task that drops the
+matching entries.  The L1 only serves hits while that listener is subscribed
+on the current ``InternalConfig.redis_async`` client; otherwise every lookup
+falls through to Redis.  Entries also expire after ``L1_MAX_AGE_SECONDS`` to
+bound the damage of a missed message (e.g. during a reconnect).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from collections import OrderedDict
+from dataclasses import dataclass
+from timeit import default_timer as timer
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Sequence, Set, Tuple
+
+from v4vapp_backend_v2.config.setup import InternalConfig, logger
+
+if TYPE_CHECKING:
+    from v4vapp_backend_v2.accounting.accounting_classes import LedgerAccountDetails
+
+
+ICON = "🧊"
+
+# Redis pub/sub channel carrying ledger cache invalidations.
+INVALIDATION_CHANNEL = "ledger:cache:invalidate"
+
+# Maximum number of balances held per process.
+L1_MAX_ENTRIES = 2048
+
+# Upper bound on the age of any L1 entry, in seconds.
+L1_MAX_AGE_SECONDS = 30.0
+
+AccountPair = Tuple[str, str]
+
+
+@dataclass
+class _L1Entry:
+    value: Any
+    account: AccountPair
+    stored_at: float
+
+
+class LedgerL1Cache:
+    """
+    Bounded LRU of ``LedgerAccountDetails`` plus the held-msats aggregate.
+
+    Attributes:
+        max_entries (int): LRU capacity; the least recently used entry is evicted beyond it.
+        max_age (float): Seconds after which an entry is treated as a miss.
+        generation (int | None): The Redis cache generation seen by the listener, or None
+            until the listener has subscribed.
+        hits, misses, evictions, invalidations (int): Counters reported by ``stats()``.
+    """
+
+    def __init__(self, max_entries: int = L1_MAX_ENTRIES, max_age: float = L1_MAX_AGE_SECONDS):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.generation: int | None = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        # Incremented on every invalidation; a value read from Redis is only stored
+        # if no invalidation happened while it was being fetched.
+        self.epoch = 0
+        self._entries: OrderedDict[str, _L1Entry] = OrderedDict()
+        self._by_account: Dict[AccountPair, Set[str]] = {}
+        self._held: Tuple[List[Mapping[str, Any]], float] | None = None
+        self._listener: asyncio.Task | None = None
+        self._client: Any = None
+        self._subscribed = False
+
+    # ------------------------------------------------------------------
+    # Listener lifecycle
+    # ------------------------------------------------------------------
+
+    @property
+    def active(self) -> bool:
+        """True while the pub/sub listener is subscribed on the current Redis client."""
+        return (
+            self._subscribed
+            and self._listener is not None
+            and not self._listener.done()
+            and self._client is InternalConfig.redis_async
+        )
+
+    def ensure_listener(self) -> bool:
+        """Start the pub/sub listener if it isn't running.  Returns ``self.active``."""
+        if self.active:
+            return True
+        if self._listener is not None and not self._listener.done():
+            if self._client is InternalConfig.redis_async:
+                return False  # still subscribing
+            self._listener.cancel()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        self._subscribed = False
+        self._client = InternalConfig.redis_async
+        self._listener = loop.create_task(self._listen(self._client), name="ledger_l1_listener")
+        return False
+
+    async def _listen(self, client: Any) -> None:
+        from v4vapp_backend_v2.accounting.ledger_cache import GENERATION_KEY
+
+        pubsub = client.pubsub()
+        try:
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+            val = await client.get(GENERATION_KEY)
+            self.clear()
+            self.generation = int(val) if val else 0
+            self._subscribed = True
+            logger.info(
+                f"{ICON} Ledger L1 cache listening on {INVALIDATION_CHANNEL}",
+                extra={"notification": False},
+            )
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                self.apply_message(message.get("data"))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(
+                f"{ICON} Ledger L1 cache listener stopped: {e}", extra={"notification": False}
+            )
+        finally:
+            self._subscribed = False
+            self.clear()
+            try:
+                await pubsub.aclose()
+            except Exception:
+                pass
+
+    # ------------------------------------------------------------------
+    # Invalidation
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def accounts_message(accounts: Sequence[AccountPair]) -> str:
+        return json.dumps({"accounts": [list(pair) for pair in accounts]})
+
+    @staticmethod
+    def generation_message(generation: int) -> str:
+        return json.dumps({"generation": generation})
+
+    def apply_message(self, data: str | bytes | None) -> None:
+        """Apply an invalidation message published by ``ledger_cache``."""
+        try:
+            payload = json.loads(data or "")
+        except (TypeError, ValueError):
+            self.clear()
+            return
+        if "generation" in payload:
+            self.clear()
+            self.generation = int(payload["generation"])
+        else:
+            self.invalidate_accounts([tuple(pair) for pair in payload.get("accounts", [])])
+
+    def invalidate_accounts(self, accounts: Sequence[AccountPair]) -> None:
+        """Drop every entry for the given (name, sub) pairs and the held-msats result."""
+        self.epoch += 1
+        self.invalidations += 1
+        self._held = None
+        for pair in accounts:
+            for key in self._by_account.pop(pair, ()):
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self.epoch += 1
+        self.invalidations += 1
+        self._entries.clear()
+        self._by_account.clear()
+        self._held = None
+
+    def sync_generation(self, generation: int) -> int:
+        """Adopt the generation read from Redis on a miss and return the current epoch.
+
+        Normally the listener keeps ``generation`` current; this catches a generation
+        key that was reset or bumped without a message (e.g. deleted by hand).
+        """
+        if generation != self.generation:
+            self.clear()
+            self.generation = generation
+        return self.epoch
+
+    # ------------------------------------------------------------------
+    # Balances
+    # ------------------------------------------------------------------
+
+    def get(self, key: str) -> LedgerAccountDetails | None:
+        """Return a copy of the cached details for ``key`` or ``None`` (counted as a miss)."""
+        entry = self._entries.get(key)
+        if entry is None or timer() - entry.stored_at > self.max_age:
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        # Callers modify the details in place (in_progress_msats, notification lines
+        # merged into combined_balance), so hand out a deep copy.
+        return entry.value.model_copy(deep=True)
+
+    def put(
+        self, key: str, account: AccountPair, value: LedgerAccountDetails, epoch: int | None = None
+    ) -> None:
+        """Store ``value``; skipped if ``epoch`` is given and an invalidation has happened since."""
+        if epoch is not None and epoch != self.epoch:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = _L1Entry(
+            value=value.model_copy(deep=True), account=account, stored_at=timer()
+        )
+        self._by_account.setdefault(account, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            old_key, old_entry = self._entries.popitem(last=False)
+            self._discard_index(old_key, old_entry.account)
+            self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._discard_index(key, entry.account)
+
+    def _discard_index(self, key: str, account: AccountPair) -> None:
+        keys = self._by_account.get(account)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_account[account]
+
+    # ------------------------------------------------------------------
+    # Held msats
+    # ------------------------------------------------------------------
+
+    def get_held(self) -> List[Mapping[str, Any]] | None:
+        if self._held is None or timer() - self._held[1] > self.max_age:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._held[0]
+
+    def put_held(self, results: List[Mapping[str, Any]], epoch: int) -> None:
+        if epoch == self.epoch:
+            self._held = (results, timer())
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "active": self.active,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+# Process-wide instance used by ledger_cache.
+ledger_l1_cache = LedgerL1Cache()
+
+
+def ledger_l1_stats() -> Dict[str, Any]:
+    """Hit/miss/eviction counters for the process-wide ledger L1 cache."""
+    return ledger_l1_cache.stats()
@@ -0,0 +1,490 @@
+"""
+Incrementally maintained running balances stored in MongoDB.
+
+Every ``LedgerEntry.save()`` applies the entry's signed debit/credit amounts to
+one document per account with atomic ``$inc`` updates, so a live balance read
+is a single indexed ``find_one`` instead of the full ``all_account_balances_pipeline``
+aggregation.
+
+Collection: ``ledger_running_balances``
+
+Each document covers one account (contra variants are merged, exactly as
+``one_account_balance`` merges them):
+    {
+        "account_type": "Liability",
+        "name": "VSC Liability",
+        "sub": "alice",
+        "balances": {
+            "hive": {
+                "amount": Decimal128("1.234"),
+                "conv": {"hive": ..., "hbd": ..., "usd": ..., "sats": ..., "msats": ...},
+                "count": 12,
+                "last_transaction_date": ISODate("..."),
+            },
+            ...
+        },
+        "last_transaction_date": ISODate("..."),
+        "updated_at": ISODate("..."),
+    }
+
+Reversals and ledger-editor edits both go through ``save(upsert=True)``; the
+stored document is read before and after the write and only the difference in
+contribution is applied, so a reversed entry drops out of the running balance
+and an edited entry moves between accounts/units correctly.
+
+The collection can be rebuilt from scratch (``rebuild_running_balances``) and
+checked against the aggregation pipeline (``verify_running_balances``), either
+from ``src/running_balances.py`` or by the daily checkpoint scheduler cycle.
+
+Documents upserted before the first rebuild only hold the entries saved since
+the code was deployed, so reads are gated on a status document that the
+rebuild writes (``running_balances_ready``).  A verification that finds drift
+clears it again and readers fall back to the pipeline until the next rebuild.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from decimal import Decimal
+from timeit import default_timer as timer
+from typing import Any, Dict, List, Mapping, Tuple
+
+from bson import Decimal128
+from pydantic import BaseModel, Field
+from pymongo import ASCENDING, IndexModel, UpdateOne
+from pymongo.asynchronous.collection import AsyncCollection
+
+from v4vapp_backend_v2.accounting.ledger_account_classes import LedgerAccount
+from v4vapp_backend_v2.config.setup import InternalConfig, logger
+from v4vapp_backend_v2.database.db_tools import convert_decimal128_to_decimal
+
+ICON = "🧮"
+
+CONV_FIELDS = ("hive", "hbd", "usd", "sats", "msats")
+
+# Status document kept in the same collection; no ledger account has this type.
+STATUS_FILTER: Dict[str, str] = {"account_type": "_status", "name": "running_balances", "sub": ""}
+# How long a process trusts its last read of the status document.
+STATUS_CHECK_SECONDS = 60.0
+_status_cache: Tuple[float, bool] | None = None
+
+
+class RunningUnitBalance(BaseModel):
+    """Running totals for one currency of one account."""
+
+    amount: Decimal = Decimal(0)
+    conv: Dict[str, Decimal] = Field(default_factory=lambda: {f: Decimal(0) for f in CONV_FIELDS})
+    count: int = 0
+    last_transaction_date: datetime | None = None
+
+
+class LedgerRunningBalance(BaseModel):
+    """Materialised running balance for one ledger account."""
+
+    account_type: str = Field(..., description="AccountType enum value")
+    name: str = Field(..., description="Name of the ledger account")
+    sub: str = Field("", description="Sub-account identifier")
+    balances: Dict[str, RunningUnitBalance] = Field(
+        default_factory=dict, description="Running totals keyed by currency value"
+    )
+    last_transaction_date: datetime | None = None
+    updated_at: datetime | None = None
+
+    # ------------------------------------------------------------------
+    # Database helpers
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def collection_name(cls) -> str:
+        return "ledger_running_balances"
+
+    @classmethod
+    def collection(cls) -> AsyncCollection:
+        return InternalConfig.db[cls.collection_name()]
+
+    @classmethod
+    async def ensure_indexes(cls) -> None:
+        """Create the unique account index if it does not exist."""
+        index = IndexModel(
+            [
+                ("account_type", ASCENDING),
+                ("name", ASCENDING),
+                ("sub", ASCENDING),
+            ],
+            unique=True,
+            name="running_balance_unique",
+        )
+        await cls.collection().create_indexes([index])
+
+    @classmethod
+    def _from_mongo_doc(cls, doc: Mapping[str, Any]) -> "LedgerRunningBalance":
+        clean = convert_decimal128_to_decimal(dict(doc))
+        clean.pop("_id", None)
+        return cls.model_validate(clean)
+
+    def to_ledger_account_details(self, contra: bool = False):
+        """
+        Build a ``LedgerAccountDetails`` with one summary line per currency.
+
+        Like ``all_account_balances_summary`` the result carries final totals only
+        (``balances_net``, ``hive``/``hbd``/``msats``, ``conv_total`` ...), not
+        per-transaction history.
+        """
+        from v4vapp_backend_v2.accounting.accounting_classes import (
+            AccountBalanceLine,
+            LedgerAccountDetails,
+        )
+        from v4vapp_backend_v2.accounting.converted_summary_class import ConvertedSummary
+        from v4vapp_backend_v2.helpers.crypto_conversion import CryptoConv
+        from v4vapp_backend_v2.helpers.currency_class import Currency
+
+        balances: Dict[Currency, List[AccountBalanceLine]] = {}
+        for unit_str, unit_balance in self.balances.items():
+            if unit_balance.count == 0 and unit_balance.amount == Decimal(0):
+                continue
+            try:
+                currency = Currency(unit_str)
+            except ValueError:
+                continue
+            conv_summary = ConvertedSummary(
+                **{f: unit_balance.conv.get(f, Decimal(0)) for f in CONV_FIELDS}
+            )
+            balances[currency] = [
+                AccountBalanceLine(
+                    ledger_type="summary",
+                    timestamp=unit_balance.last_transaction_date or datetime.now(tz=timezone.utc),
+                    amount_signed=unit_balance.amount,
+                    amount_running_total=unit_balance.amount,
+                    unit=unit_str,
+                    conv_signed=CryptoConv(
+                        **{f: unit_balance.conv.get(f, Decimal(0)) for f in CONV_FIELDS}
+                    ),
+                    conv_running_total=conv_summary,
+                    account_type=self.account_type,
+                    name=self.name,
+                    sub=self.sub,
+                    contra=contra,
+                )
+            ]
+        details = LedgerAccountDetails(
+            name=self.name,
+            account_type=self.account_type,
+            sub=self.sub,
+            contra=contra,
+            balances=balances,
+        )
+        details.last_transaction_date = self.last_transaction_date
+        return details
+
+
+# ---------------------------------------------------------------------------
+# Incremental updates
+# ---------------------------------------------------------------------------
+
+
+def _account_filter(account: LedgerAccount) -> Dict[str, Any]:
+    return {
+        "account_type": str(account.account_type),
+        "name": account.name,
+        "sub": account.sub,
+    }
+
+
+def _entry_contributions(entry: Any, sign: int = 1) -> List[Tuple[LedgerAccount, str, Any]]:
+    """
+    Return ``(account, unit, update)`` triples describing what *entry* adds to
+    the running balances, multiplied by *sign* (``-1`` removes it).
+
+    Reversed entries and incomplete entries contribute nothing, matching the
+    ``hide_reversed`` filter of the balance pipelines.
+    """
+    if entry is None or entry.reversed or not entry.debit or not entry.credit:
+        return []
+    conv = entry.conv_signed_p
+    sides = [
+        (entry.debit, entry.debit_unit, entry.debit_amount_signed, conv["debit"]),
+        (entry.credit, entry.credit_unit, entry.credit_amount_signed, conv["credit"]),
+    ]
+    answer = []
+    for account, unit, amount, side_conv in sides:
+        unit_str = unit.value if hasattr(unit, "value") else str(unit)
+        inc: Dict[str, Any] = {
+            f"balances.{unit_str}.amount": Decimal128(str(Decimal(amount) * sign)),
+            f"balances.{unit_str}.count": sign,
+        }
+        for field in CONV_FIELDS:
+            value = Decimal(getattr(side_conv, field, 0) or 0) * sign
+            inc[f"balances.{unit_str}.conv.{field}"] = Decimal128(str(value))
+        answer.append((account, unit_str, {"inc": inc, "timestamp": entry.timestamp}))
+    return answer
+
+
+def _build_updates(before: Any, after: Any) -> List[UpdateOne]:
+    """Build the ``UpdateOne`` operations moving the running balances from *before* to *after*."""
+    now = datetime.now(tz=timezone.utc)
+    updates: List[UpdateOne] = []
+    for sign, entry in ((-1, before), (1, after)):
+        for account, unit_str, change in _entry_contributions(entry, sign):
+            update: Dict[str, Any] = {
+                "$inc": change["inc"],
+                "$set": {"updated_at": now},
+            }
+            if sign > 0 and change["timestamp"] is not None:
+                update["$max"] = {
+                    f"balances.{unit_str}.last_transaction_date": change["timestamp"],
+                    "last_transaction_date": change["timestamp"],
+                }
+            updates.append(UpdateOne(_account_filter(account), update, upsert=True))
+    return updates
+
+
+async def update_running_balances(before: Any = None, after: Any = None) -> None:
+    """
+    Apply the change from ledger entry *before* to ledger entry *after*.
+
+    Either side may be ``None``: a fresh insert passes only *after*, a deletion
+    passes only *before*.  All ``$inc`` operations go to MongoDB in one
+    ``bulk_write`` so concurrent writers never lose updates.
+    """
+    updates = _build_updates(before, after)
+    if not updates:
+        return
+    await LedgerRunningBalance.collection().bulk_write(updates, ordered=False)
+
+
+# ---------------------------------------------------------------------------
+# Status
+# ---------------------------------------------------------------------------
+
+
+async def running_balances_ready() -> bool:
+    """
+    Return True when the running balances have been rebuilt (or verified) and can
+    be read in place of the pipeline.  The answer is cached for
+    ``STATUS_CHECK_SECONDS`` so live reads do not pay for a second query.
+    """
+    global _status_cache
+    if _status_cache is not None and timer() - _status_cache[0] < STATUS_CHECK_SECONDS:
+        return _status_cache[1]
+    doc = await LedgerRunningBalance.collection().find_one(filter=STATUS_FILTER)
+    ready = bool(doc and doc.get("ready"))
+    _status_cache = (timer(), ready)
+    return ready
+
+
+async def set_running_balances_ready(ready: bool, reason: str = "") -> None:
+    """Mark the running balances as usable (after a rebuild) or stale (after drift)."""
+    global _status_cache
+    await LedgerRunningBalance.collection().update_one(
+        STATUS_FILTER,
+        {"$set": {"ready": ready, "reason": reason, "updated_at": datetime.now(tz=timezone.utc)}},
+        upsert=True,
+    )
+    _status_cache = (timer(), ready)
+
+
+# ---------------------------------------------------------------------------
+# Reads
+# ---------------------------------------------------------------------------
+
+
+async def get_running_balance(account: LedgerAccount) -> LedgerRunningBalance | None:
+    """Return the running balance document for *account* or ``None`` if missing."""
+    doc = await LedgerRunningBalance.collection().find_one(filter=_account_filter(account))
+    if doc is None:
+        return None
+    try:
+        return LedgerRunningBalance._from_mongo_doc(doc)
+    except Exception as e:
+        logger.warning(
+            f"⚠️  Failed to deserialise running balance document: {e}",
+            extra={"notification": False},
+        )
+        return None
+
+
+async def running_account_balance(account: LedgerAccount):
+    """
+    Return a summary ``LedgerAccountDetails`` for *account* from the running
+    balance collection, or ``None`` when the collection is not ready or no
+    document exists, in which case callers should fall back to the pipeline.
+    """
+    if not await running_balances_ready():
+        return None
+    running = await get_running_balance(account)
+    if running is None:
+        return None
+    return running.to_ledger_account_details(contra=account.contra)
+
+
+# ---------------------------------------------------------------------------
+# Rebuild and verification
+# ---------------------------------------------------------------------------
+
+
+async def rebuild_running_balances() -> int:
+    """
+    Recompute every running balance document from the ledger.
+
+    Uses ``all_account_balances_summary_pipeline`` (one ``$group`` pass, no
+    running totals) and replaces the whole collection.  Ledger writes that land
+    while the rebuild is in progress may be counted twice or not at all, so run
+    this while the monitors are paused or follow it with
+    ``verify_running_balances``.
+
+    Returns:
+        The number of account documents written.
+    """
+    from v4vapp_backend_v2.accounting.account_balance_pipelines import (
+        all_account_balances_summary_pipeline,
+    )
+    from v4vapp_backend_v2.accounting.ledger_entry_class import LedgerEntry
+
+    start = timer()
+    cursor = await LedgerEntry.collection().aggregate(
+        pipeline=all_account_balances_summary_pipeline()
+    )
+    results = convert_decimal128_to_decimal(await cursor.to_list())
+
+    # Merge contra variants into one document per (account_type, name, sub)
+    documents: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+    for row in results:
+        key = (str(row["account_type"]), row["name"], row.get("sub", ""))
+        doc = documents.setdefault(
+            key,
+            {
+                "account_type": key[0],
+                "name": key[1],
+                "sub": key[2],
+                "balances": {},
+                "last_transaction_date": None,
+            },
+        )
+        unit = str(row["unit"])
+        unit_doc = doc["balances"].setdefault(
+            unit,
+            {
+                "amount": Decimal(0),
+                "conv": {f: Decimal(0) for f in CONV_FIELDS},
+                "count": 0,
+                "last_transaction_date": None,
+            },
+        )
+        unit_doc["amount"] += Decimal(str(row.get("total_amount", 0)))
+        for field in CONV_FIELDS:
+            unit_doc["conv"][field] += Decimal(str(row.get(f"total_conv_{field}", 0)))
+        unit_doc["count"] += row.get("count", 0)
+        ts = row.get("max_timestamp")
+        if ts and (
+            unit_doc["last_transaction_date"] is None or ts > unit_doc["last_transaction_date"]
+        ):
+            unit_doc["last_transaction_date"] = ts
+        if ts and (doc["last_transaction_date"] is None or ts > doc["last_transaction_date"]):
+            doc["last_transaction_date"] = ts
+
+    now = datetime.now(tz=timezone.utc)
+    collection = LedgerRunningBalance.collection()
+    await collection.delete_many({})
+    await LedgerRunningBalance.ensure_indexes()
+    if documents:
+        to_insert = []
+        for doc in documents.values():
+            for unit_doc in doc["balances"].values():
+                unit_doc["amount"] = Decimal128(str(unit_doc["amount"]))
+                unit_doc["conv"] = {k: Decimal128(str(v)) for k, v in unit_doc["conv"].items()}
+            doc["updated_at"] = now
+            to_insert.append(doc)
+        await collection.insert_many(to_insert)
+    await set_running_balances_ready(True, reason="rebuilt")
+
+    logger.info(
+        f"{ICON} Rebuilt {len(documents)} running balances (took {timer() - start:.2f}s)",
+        extra={"notification": False},
+    )
+    return len(documents)
+
+
+async def verify_running_balances(
+    accounts: List[LedgerAccount] | None = None,
+    mark_stale: bool = False,
+) -> Dict[str, Dict[str, Tuple[Decimal, Decimal]]]:
+    """
+    Compare the running balances against ``one_account_balance`` (the full
+    aggregation pipeline, cache and checkpoints disabled).
+
+    An entry saved between the two reads shows up as a difference, so accounts
+    that differ are compared a second time before being reported.
+
+    Args:
+        accounts: Accounts to check.  Defaults to every active account.
+        mark_stale: If True and differences remain, mark the running balances as
+            not ready so live reads fall back to the pipeline until the next
+            ``rebuild_running_balances``.
+
+    Returns:
+        A mapping of ``"name:sub"`` → ``{unit: (running, pipeline)}`` for every
+        unit whose values differ by more than the unit tolerance.  Empty when
+        everything matches.
+    """
+    from v4vapp_backend_v2.accounting.account_balances import (
+        UNIT_TOLERANCE,
+        list_all_active_accounts,
+        one_account_balance,
+    )
+    from v4vapp_backend_v2.accounting.in_progress_results_class import InProgressResults
+
+    start = timer()
+    if accounts is None:
+        accounts = await list_all_active_accounts()
+
+    in_progress = InProgressResults(results=[])
+
+    async def _differences(account: LedgerAccount) -> Dict[str, Tuple[Decimal, Decimal]]:
+        running = await get_running_balance(account)
+        pipeline = await one_account_balance(
+            account, in_progress=in_progress, use_cache=False, use_checkpoints=False
+        )
+        running_net = {unit: b.amount for unit, b in running.balances.items()} if running else {}
+        pipeline_net = {str(unit): value for unit, value in pipeline.balances_net.items()}
+        differences: Dict[str, Tuple[Decimal, Decimal]] = {}
+        for unit in set(running_net) | set(pipeline_net):
+            r_val = running_net.get(unit, Decimal(0))
+            p_val = pipeline_net.get(unit, Decimal(0))
+            tolerance = Decimal(str(UNIT_TOLERANCE.get(unit.upper(), 0)))
+            if abs(r_val - p_val) > tolerance:
+                differences[unit] = (r_val, p_val)
+        return differences
+
+    mismatches: Dict[str, Dict[str, Tuple[Decimal, Decimal]]] = {}
+    for account in accounts:
+        differences = await _differences(account)
+        if differences:
+            differences = await _differences(account)
+        if differences:
+            mismatches[f"{account.name}:{account.sub}"] = differences
+
+    if mismatches:
+        logger.warning(
+            f"{ICON} Running balance mismatches for {len(mismatches)} of {len(accounts)} accounts "
+            f"(took {timer() - start:.2f}s)",
+            extra={
+                "notification": False,
+                "mismatches": {k: str(v) for k, v in mismatches.items()},
+            },
+        )
+        if mark_stale:
+            await set_running_balances_ready(
+                False, reason=f"{len(mismatches)} accounts differ from the ledger"
+            )
+            logger.warning(
+                f"{ICON} Running balances marked stale; live reads use the pipeline until "
+                f"src/running_balances.py rebuild is run",
+                extra={"notification": True},
+            )
+    else:
+        logger.info(
+            f"{ICON} Running balances match the ledger for {len(accounts)} accounts "
+            f"(took {timer() - start:.2f}s)",
+            extra={"notification": False},
+        )
+    return mismatches
@@ -9,7 +9,10 @@ from typing import Any, Callable, Coroutine, List, Tuple
 from nectar.amount import Amount
 from pydantic import BaseModel
 
-from v4vapp_backend_v2.accounting.account_balances import one_account_balance
+from v4vapp_backend_v2.accounting.account_balances import (
+    many_account_balances,
+    one_account_balance,
+)
 from v4vapp_backend_v2.accounting.balance_sheet import check_balance_sheet_mongodb
 from v4vapp_backend_v2.accounting.in_progress_results_class import (
     InProgressResults,
@@ -167,20 +170,11 @@ async def _set_cached_sanity_check_results(results: "SanityCheckResults") -> Non
 # MARK: Individual sanity check tests
 
 
-async def _safe_one_account_balance(account_name: str, in_progress: InProgressResults):
+async def _safe_create_checkpoint(account: LiabilityAccount) -> None:
     try:
-        # age = timedelta(days=1)
-        account = LiabilityAccount(
-            name="VSC Liability",
-            sub=account_name,
-        )
         await latest_period_create_checkpoint(account=account, period_type=PeriodType.DAILY)
-        return await one_account_balance(
-            account=account, as_of_date=datetime.now(timezone.utc), in_progress=in_progress
-        )
     except Exception as e:
         logger.error(e, extra={"notification": False})
-        return e
 
 
 @async_time_decorator
@@ -189,8 +183,8 @@ async def server_account_balances(in_progress: InProgressResults) -> SanityCheck
 
     This coroutine reads the server identifier from InternalConfig().server_id and
     checks the balances of two accounts: the hard-coded "keepsats" account and the
-    server account (if configured). For each account it calls await one_account_balance(account)
-    and treats a balance as non-zero if abs(balance.msats) > Decimal(2_000) (i.e., greater
+    server account (if configured). All accounts are fetched with one many_account_balances(...)
+    call and it treats a balance as non-zero if abs(balance.msats) > Decimal(2_000) (i.e., greater
     than 2,000 msats, or 2 sats).
 
     Returns:
@@ -204,7 +198,8 @@ async def server_account_balances(in_progress: InProgressResults) -> SanityCheck
           the hive server account is not configured.
 
     Exceptions:
-        Exceptions from InternalConfig() or one_account_balance(...) may propagate.
+        Exceptions from InternalConfig() may propagate; a failed balance lookup is reported
+        in the result details.
     """
     server_id = InternalConfig().server_id
     if server_id is None:
@@ -218,19 +213,27 @@ async def server_account_balances(in_progress: InProgressResults) -> SanityCheck
 
     results: List[str] = []
 
-    tasks: dict[str, asyncio.Task] = {}
+    ledger_accounts = [
+        LiabilityAccount(name="VSC Liability", sub=account) for account in accounts_to_check
+    ]
     async with asyncio.TaskGroup() as tg:
-        for account in accounts_to_check:
-            tasks[account] = tg.create_task(
-                _safe_one_account_balance(account_name=account, in_progress=in_progress)
-            )
+        for ledger_account in ledger_accounts:
+            tg.create_task(_safe_create_checkpoint(ledger_account))
+
+    try:
+        # Only the totals are checked, so the live query can start from the checkpoints.
+        balances = await many_account_balances(
+            ledger_accounts, in_progress=in_progress, live_checkpoints=True
+        )
+    except Exception as e:
+        logger.error(e, extra={"notification": False})
+        return SanityCheckResult(
+            name="server_account_balances",
+            is_valid=False,
+            details=f"Accounts {', '.join(accounts_to_check)} check failed: {e}",
+        )
 
-    for account, task in tasks.items():
-        res = task.result()
-        if isinstance(res, Exception):
-            results.append(f"Account '{account}' check failed: {res}")
-            continue
-        balance = res
+    for account, balance in zip(accounts_to_check, balances):
         if abs(balance.msats) > Decimal(2_000):  # 2,000 msats = 2 sats tolerance
             results.append(
                 f"Account '{account}' has non zero balance: {balance.msats / 1000:,.3f} sats"
@@ -295,7 +298,6 @@ async def server_account_hive_balances(in_progress: InProgressResults) -> Sanity
                 raise
 
         try:
-            as_of_date = datetime.now(tz=timezone.utc)
             async with asyncio.TaskGroup() as tg:
                 tasks["deposits_checkpoint"] = tg.create_task(
                     latest_period_create_checkpoint(
@@ -312,15 +314,15 @@ async def server_account_hive_balances(in_progress: InProgressResults) -> Sanity
                 tasks["deposits_details"] = tg.create_task(
                     one_account_balance(
                         account=customer_deposits_account,
-                        as_of_date=as_of_date,
                         in_progress=in_progress,
+                        live_checkpoints=True,
                     )
                 )
                 tasks["traded_deposits_details"] = tg.create_task(
                     one_account_balance(
                         account=traded_deposits_account,
-                        as_of_date=as_of_date,
                         in_progress=in_progress,
+                        live_checkpoints=True,
                     )
                 )
                 tasks["balances"] = tg.create_task(_fetch_balances())
@@ -1,7 +1,7 @@
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional
 
-from v4vapp_backend_v2.accounting.account_balances import list_all_accounts, one_account_balance
+from v4vapp_backend_v2.accounting.account_balances import list_all_accounts, many_account_balances
 from v4vapp_backend_v2.accounting.accounting_classes import AccountBalanceLine
 from v4vapp_backend_v2.accounting.ledger_account_classes import AssetAccount
 from v4vapp_backend_v2.accounting.ledger_type_class import LedgerType
@@ -42,13 +42,11 @@ async def generate_trading_pnl_report(
         "total_trading_pnl_usd": 0.0,
     }
 
-    for sub in subs:
-        # Ensure we pass a LedgerAccount (AssetAccount) to one_account_balance —
-        # calling code sometimes passes a plain sub string.
-        account_obj = AssetAccount(name="Exchange Holdings", sub=sub or "")
+    # Fetch account balance details for every sub in one batched call
+    account_objs = [AssetAccount(name="Exchange Holdings", sub=sub or "") for sub in subs]
+    all_accts = await many_account_balances(account_objs, as_of_date=as_of_date, age=age)
 
-        # Fetch account balance details for this sub
-        acct = await one_account_balance(account=account_obj, as_of_date=as_of_date, age=age)
+    for sub, acct in zip(subs, all_accts):
 
         hive_lines: List[AccountBalanceLine] = acct.balances.get("hive", [])
         # Filter exchange conversion trades
@@ -10,15 +10,16 @@ from pymongo.asynchronous.collection import AsyncCollection
 from pymongo.errors import ServerSelectionTimeoutError
 from pymongo.results import UpdateResult
 
-from v4vapp_backend_v2.config.setup import DB_RATES_COLLECTION, InternalConfig, logger
+from v4vapp_backend_v2.config.setup import InternalConfig, logger
 from v4vapp_backend_v2.database.db_retry import mongo_call
-from v4vapp_backend_v2.database.db_tools import find_nearest_by_timestamp_server_side
 from v4vapp_backend_v2.helpers.crypto_conversion import CryptoConv
-from v4vapp_backend_v2.helpers.crypto_prices import AllQuotes, HiveRatesDB, QuoteResponse
+from v4vapp_backend_v2.helpers.crypto_prices import QuoteResponse
 from v4vapp_backend_v2.helpers.general_purpose_funcs import (
     convert_decimals_for_mongodb,
     snake_case,
 )
+from v4vapp_backend_v2.helpers.quote_service import QUOTE_SERVICE
+from v4vapp_backend_v2.helpers.rate_history import RATE_HISTORY
 from v4vapp_backend_v2.hive_models.amount_pyd import AmountPyd
 
 ICON = "🔄"
@@ -322,6 +323,31 @@ class TrackedBaseModel(BaseModel):
         """
         if mongo_kwargs is None:
             mongo_kwargs = {"upsert": True}
+        update = self.mongo_update(exclude_unset=exclude_unset, exclude_none=exclude_none, **kwargs)
+        # Delegate retries and logging to the wrapper
+        return await mongo_call(
+            lambda: InternalConfig.db[self.collection_name].update_one(
+                filter=self.group_id_query, update=update, **mongo_kwargs
+            ),
+            error_code=f"db_save_error_{self.collection_name}",
+            context=f"{self.collection_name}:{self.group_id_p}",
+        )
+
+    def mongo_update(
+        self, exclude_unset: bool = False, exclude_none: bool = True, **kwargs: Any
+    ) -> dict[str, Any]:
+        """
+        The ``$set`` update document used by ``save`` (and by bulk writers) to upsert
+        this record against ``group_id_query``.
+
+        Args:
+            exclude_unset (bool, optional): Exclude fields that were not explicitly set.
+            exclude_none (bool, optional): Exclude fields with value None.
+            **kwargs (Any): Additional keyword arguments passed to the model serialization.
+
+        Returns:
+            dict[str, Any]: A MongoDB update document.
+        """
         update = self.model_dump(
             exclude_unset=exclude_unset,
             exclude_none=exclude_none,
@@ -332,19 +358,7 @@ class TrackedBaseModel(BaseModel):
             update.pop("replies", None)  # Remove empty replies list if it exists
 
         # Convert Decimal objects to floats for MongoDB compatibility
-        update = convert_decimals_for_mongodb(update)
-
-        update = {
-            "$set": update,
-        }
-        # Delegate retries and logging to the wrapper
-        return await mongo_call(
-            lambda: InternalConfig.db[self.collection_name].update_one(
-                filter=self.group_id_query, update=update, **mongo_kwargs
-            ),
-            error_code=f"db_save_error_{self.collection_name}",
-            context=f"{self.collection_name}:{self.group_id_p}",
-        )
+        return {"$set": convert_decimals_for_mongodb(update)}
 
     def tracked_type(self) -> str:
         """
@@ -402,35 +416,27 @@ class TrackedBaseModel(BaseModel):
         quote: QuoteResponse | None = None,
         use_cache: bool = True,
         store_db: bool = True,
-        time_delay: int = 0,
     ) -> QuoteResponse:
         """
         Asynchronously updates the last quote for the class.
 
         If a quote is provided, it sets the last quote to the provided quote.
-        If no quote is provided, it fetches all quotes and sets the last quote
-        to the fetched quote.
+        If no quote is provided, the last quote comes from ``QUOTE_SERVICE``: concurrent
+        callers share one fetch and a stale quote is served while it refreshes.
 
         Args:
             quote (QuoteResponse | None): The quote to update.
                 If None, fetches all quotes.
             use_cache (bool): Whether to use cached quotes when fetching.
             store_db (bool): Whether to store the fetched quotes in the database.
-            time_delay (int): Optional delay in seconds before fetching quotes to allow
-                for a prior quote to complete and be in the cache.
 
         Returns:
             None
         """
-        if time_delay:
-            logger.debug(f"Delaying quote update by {time_delay} seconds")
-            await asyncio.sleep(time_delay)
         if quote:
             cls.last_quote = quote
         else:
-            all_quotes = AllQuotes()
-            await all_quotes.get_all_quotes(use_cache=use_cache, store_db=store_db)
-            cls.last_quote = all_quotes.quote
+            cls.last_quote = await QUOTE_SERVICE.get(use_cache=use_cache, store_db=store_db)
         return cls.last_quote
 
     async def update_conv(self, quote: QuoteResponse | None = None) -> None:
@@ -485,41 +491,19 @@ class TrackedBaseModel(BaseModel):
             )
 
         try:
-            # Find the nearest quote using index-backed queries (prefer 1 hour window)
-            collection = InternalConfig.db[DB_RATES_COLLECTION]
-            # Try a 1-hour window first to avoid long searches; fallback to an unbounded search if none found
-            one_hour = timedelta(hours=1)
-            nearest_doc = await find_nearest_by_timestamp_server_side(
-                collection, timestamp, ts_field="timestamp", max_window=one_hour
-            )
-            if nearest_doc is None:
-                # fallback to unbounded search
-                nearest_doc = await find_nearest_by_timestamp_server_side(
-                    collection, timestamp, ts_field="timestamp", max_window=None
-                )
-
-            if not nearest_doc:
+            # Binary search over the in-memory rate history; pages in from the
+            # rates collection only when the span around `timestamp` is not loaded yet.
+            quote_response = await RATE_HISTORY.nearest(timestamp)
+            if quote_response is None:
                 logger.warning(
                     f"No quotes found for timestamp {timestamp}",
                     extra={"notification": False},
                 )
                 return cls.last_quote
 
-            quote = HiveRatesDB.model_validate(nearest_doc)
-            quote_response = QuoteResponse(
-                hive_usd=quote.hive_usd,
-                hbd_usd=quote.hbd_usd,
-                btc_usd=quote.btc_usd,
-                hive_hbd=quote.hive_hbd,
-                raw_response={},
-                source="HiveRatesDB",
-                fetch_date=quote.timestamp,
-                error="",
-                error_details={},
-            )
-            logger.info(
-                f"Found nearest quote delta from {timestamp}: {quote.timestamp - timestamp}",
-                extra={"notification": False, "quote": quote.model_dump()},
+            logger.debug(
+                f"Found nearest quote delta from {timestamp}: {quote_response.fetch_date - timestamp}",
+                extra={"notification": False, "quote": quote_response.model_dump()},
             )
             return quote_response
 
@@ -6,7 +6,7 @@ Each endpoint returns data for a specific dashboard section, allowing the
 browser to fetch them in parallel and render as they arrive.
 """
 
-from asyncio import TaskGroup
+from asyncio import TaskGroup, gather
 from datetime import datetime, timezone
 from decimal import ROUND_HALF_UP, Decimal
 from typing import Optional
@@ -14,7 +14,7 @@ from typing import Optional
 from fastapi import APIRouter
 from fastapi.responses import JSONResponse
 
-from v4vapp_backend_v2.accounting.account_balances import one_account_balance
+from v4vapp_backend_v2.accounting.account_balances import many_account_balances
 from v4vapp_backend_v2.accounting.ledger_account_classes import AssetAccount
 from v4vapp_backend_v2.accounting.ledger_checkpoints import (
     PeriodType,
@@ -102,26 +102,33 @@ async def dashboard_lnd_info() -> JSONResponse:
         return nb_obj
 
     @async_time_decorator
-    async def _safe_ledger(asset: AssetAccount):
+    async def _safe_ledger(assets: list[AssetAccount]) -> list:
         try:
-            await latest_period_create_checkpoint(account=asset, period_type=PeriodType.DAILY)
-            return await one_account_balance(account=asset, as_of_date=datetime.now(timezone.utc))
+            await gather(
+                *(
+                    latest_period_create_checkpoint(account=asset, period_type=PeriodType.DAILY)
+                    for asset in assets
+                ),
+                return_exceptions=True,
+            )
+            return await many_account_balances(assets, as_of_date=datetime.now(timezone.utc))
         except Exception as e:
             logger.warning(f"Ledger lookup failed: {e}", extra={"notification": False})
-            return None
+            return [None] * len(assets)
 
     async with TaskGroup() as tg:
         fetch_task = tg.create_task(_safe_fetch(nb))
-        ext_task = tg.create_task(
-            _safe_ledger(AssetAccount(name="External Lightning Payments", sub=node_name))
-        )
-        treasury_task = tg.create_task(
-            _safe_ledger(AssetAccount(name="Treasury Lightning", sub=node_name))
+        ledger_task = tg.create_task(
+            _safe_ledger(
+                [
+                    AssetAccount(name="External Lightning Payments", sub=node_name),
+                    AssetAccount(name="Treasury Lightning", sub=node_name),
+                ]
+            )
         )
 
     await fetch_task
-    ext_details = ext_task.result()
-    treasury_details = treasury_task.result()
+    ext_details, treasury_details = ledger_task.result()
 
     info = {
         "node": node_name,
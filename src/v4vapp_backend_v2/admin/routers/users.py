@@ -4,11 +4,10 @@ Users Router
 Handles routes for displaying VSC Liability user accounts.
 """
 
-import asyncio
 from datetime import datetime, timezone
 from decimal import Decimal
 from timeit import default_timer as timer
-from typing import Any, List, Optional, cast
+from typing import Any, List, Optional
 
 from fastapi import APIRouter, Request
 from fastapi.responses import HTMLResponse
@@ -16,10 +15,9 @@ from fastapi.templating import Jinja2Templates
 
 from v4vapp_backend_v2.accounting.account_balances import (
     all_account_balances_summary,
-    check_hive_conversion_limits,
+    check_hive_conversion_limits_many,
     list_active_account_subs,
 )
-from v4vapp_backend_v2.accounting.limit_check_classes import LimitCheckResult
 from v4vapp_backend_v2.accounting.sanity_checks import SanityCheckResults
 from v4vapp_backend_v2.admin.navigation import NavigationManager
 from v4vapp_backend_v2.config.setup import logger
@@ -97,22 +95,23 @@ async def users_data_api(active_only: bool = True) -> dict[str, Any]:
     # Get balances for each account
     users_data: List[dict[str, Any]] = []
 
-    # Prepare concurrent tasks for limit checks
-    limit_check_tasks = [
-        check_hive_conversion_limits(cust_id=account.sub) for account in vsc_liability_balances
-    ]
-
-    # Run all limit checks concurrently
-    limit_check_results = await asyncio.gather(*limit_check_tasks, return_exceptions=True)
+    # Limit checks for every account from the conversion limit counters in one query
+    try:
+        limit_check_results = await check_hive_conversion_limits_many(
+            [account.sub for account in vsc_liability_balances]
+        )
+    except Exception as e:
+        logger.exception(
+            f"Exception checking conversion limits: {e}", extra={"notification": False}
+        )
+        limit_check_results = {}
 
-    for i, account in enumerate(vsc_liability_balances):
+    for account in vsc_liability_balances:
         try:
             balance_sats = account.sats  # Convert msats to sats
-            # Get the limit check result (handle exceptions)
-            limit_result = limit_check_results[i]
-            if isinstance(limit_result, Exception):
-                raise limit_result
-            check_limits = cast(LimitCheckResult, limit_result)
+            check_limits = limit_check_results.get(account.sub)
+            if check_limits is None:
+                raise ValueError("Conversion limits unavailable")
 
             balance_usd = account.conv_total.usd
             balance_usd_fmt = f"{balance_usd:,.2f}"
@@ -2,11 +2,14 @@ import asyncio
 import datetime as dt
 import json
 import logging
+import logging.handlers
+import math
 from datetime import datetime, timedelta
 from decimal import Decimal, InvalidOperation
-from typing import OrderedDict, override
+from typing import Any, Callable, Dict, OrderedDict, override
 
 from colorama import Fore, Style
+from pydantic import BaseModel
 
 from v4vapp_backend_v2.config.error_code_class import ErrorCode
 from v4vapp_backend_v2.config.notification_protocol import BotNotification, NotificationProtocol
@@ -133,13 +136,9 @@ class MyJSONFormatter(logging.Formatter):
                  parent class's format method if an error occurs.
         """
 
-        # Use module-level json_default helper so it's testable and robust
-        def json_default(o):
-            return _json_default(o)
-
         try:
             message = self._prepare_log_dict(record)
-            ans_str = json.dumps(message, default=json_default)
+            ans_str = _LOG_JSON_ENCODER.encode(message)
             if hasattr(record, "error_code"):
                 error_code = record.error_code  # type: ignore[attr-defined]
                 error_state = InternalConfig().error_codes.get(error_code, None)
@@ -176,13 +175,12 @@ class MyJSONFormatter(logging.Formatter):
         Returns:
             OrderedDict: A dictionary with the prepared log data, ordered with 'human_time' after 'level'.
         """
-        human_readable_str = human_readable_datetime_str(
-            dt.datetime.fromtimestamp(record.created, tz=dt.timezone.utc)
-        )
+        resolve_lazy_extras(record, include_deferred=True)
+        created = dt.datetime.fromtimestamp(record.created, tz=dt.timezone.utc)
         always_fields = {
             "message": record.getMessage(),
-            "human_time": human_readable_str,
-            "timestamp": dt.datetime.fromtimestamp(record.created, tz=dt.timezone.utc).isoformat(),
+            "human_time": human_readable_datetime_str(created),
+            "timestamp": created.isoformat(),
         }
         if record.exc_info is not None:
             always_fields["exc_info"] = self.formatException(record.exc_info)
@@ -503,53 +501,185 @@ IGNORE_REPORT_FIELDS = LOG_RECORD_BUILTIN_ATTRS | {
 }
 
 
+# MARK: Structured log encoding
+
+LogEncoder = Callable[[Any], Any]
+
+_LOG_ENCODERS: Dict[type, LogEncoder] = {}
+_resolved_encoders: Dict[type, LogEncoder] = {}
+
+
+def register_log_encoder(cls: type, encoder: LogEncoder) -> None:
+    """
+    Register how values of *cls* (and its subclasses) are written to the JSON log.
+
+    *encoder* returns something ``json`` can write, or another value with an encoder.
+    With ``StructuredQueueHandler`` it runs on the log writer thread.
+
+    ``dict`` and ``list`` subclasses (nectar's ``Amount`` and ``Asset`` among them)
+    are written directly by ``json`` and never reach an encoder.
+    """
+    _LOG_ENCODERS[cls] = encoder
+    _resolved_encoders.clear()
+
+
+def _encoder_for(cls: type) -> LogEncoder:
+    try:
+        return _resolved_encoders[cls]
+    except KeyError:
+        pass
+    encoder = next((_LOG_ENCODERS[base] for base in cls.__mro__ if base in _LOG_ENCODERS), str)
+    _resolved_encoders[cls] = encoder
+    return encoder
+
+
+def _encode_decimal(o: Decimal) -> float | str:
+    """Rounded float, or a string for NaN, infinity and values too large for a float."""
+    if not o.is_finite():
+        return str(o)
+    try:
+        f = float(o)
+    except (InvalidOperation, OverflowError):
+        return str(o)
+    if not math.isfinite(f):
+        return str(o)
+    return round(f, 11)
+
+
+def _encode_model(o: BaseModel) -> Any:
+    try:
+        return o.model_dump(by_alias=True)
+    except Exception:
+        return str(o)
+
+
 def _json_default(o):
     """JSON default handler for structured logs.
 
-    Handles Decimal, bson.Decimal128, and fallbacks safely without raising
-    decimal.InvalidOperation or OverflowError for pathological inputs.
+    Looks up the encoder registered for the value's type (or nearest base class),
+    caching the answer per type, and falls back to ``str(o)``.
 
-    Strategy:
-      - If value is bson.Decimal128, convert to Decimal using .to_decimal()
-      - If value is Decimal:
-          - If NaN or infinite -> return str(o)
-          - Try safe float conversion and round to 11 places
-          - On conversion error -> fallback to string
-      - Otherwise -> fallback to str(o)
+    Pre-registered:
+      - Decimal: rounded float; NaN, infinite and float-overflowing values as strings
+      - bson.Decimal128: as Decimal
+      - datetime, date, time: ISO 8601
+      - Pydantic models: ``model_dump(by_alias=True)``, encoded recursively
+      - set, frozenset: list
+      - LazyExtra: its resolved value
     """
+    return _encoder_for(type(o))(o)
 
-    # Lazy import so module doesn't require pymongo/bson unless used
-    try:
-        from bson.decimal128 import Decimal128  # type: ignore
-    except Exception:  # pragma: no cover - environment may not have bson
-        Decimal128 = None
 
-    # Support bson.Decimal128 (convert to Decimal then handle)
-    if Decimal128 is not None and isinstance(o, Decimal128):
+register_log_encoder(Decimal, _encode_decimal)
+register_log_encoder(dt.datetime, dt.datetime.isoformat)
+register_log_encoder(dt.date, dt.date.isoformat)
+register_log_encoder(dt.time, dt.time.isoformat)
+register_log_encoder(BaseModel, _encode_model)
+register_log_encoder(set, list)
+register_log_encoder(frozenset, list)
+
+try:
+    from bson.decimal128 import Decimal128
+except Exception:  # pragma: no cover - environment may not have bson
+    pass
+else:
+
+    def _encode_decimal128(o: Decimal128) -> float | str:
         try:
-            o = o.to_decimal()
+            return _encode_decimal(o.to_decimal())
         except Exception:
             return str(o)
 
-    if isinstance(o, Decimal):
-        try:
-            # Preserve special values as strings so json doesn't try to use NaN
-            if o.is_nan() or o.is_infinite():
-                return str(o)
-            # Try converting to float; catch errors and detect overflow to inf
-            f = float(o)
-            import math
-
-            # If conversion produced an infinite float (too large), return string
-            if not math.isfinite(f):
-                return str(o)
-        except (InvalidOperation, OverflowError):
-            return str(o)
-        # Safe to return rounded float
-        return round(f, 11)
+    register_log_encoder(Decimal128, _encode_decimal128)
+
+# One shared encoder: ``json.dumps(..., default=...)`` builds a new one per call.
+_LOG_JSON_ENCODER = json.JSONEncoder(default=_json_default)
+
 
-    # Final fallback
-    return str(o)
+# MARK: Lazy extras
+
+LAZY_EXTRA_KEY = "lazy_extra"
+
+
+class LazyExtra:
+    """
+    A log ``extra`` value computed only if the record is actually written::
+
+        logger.debug("Ledger entry", extra={"ledger_entry": LazyExtra(entry.model_dump)})
+
+    Nothing is computed when the level is disabled.  Normally the value is computed on
+    the calling thread just before ``StructuredQueueHandler`` queues the record, so it
+    shows the object as it was when logged.  With ``defer=True`` it is left to the log
+    writer thread; only use that for objects the caller no longer changes.
+
+    Under the ``LAZY_EXTRA_KEY`` key (see ``lazy_extra``) the result must be a mapping
+    and its items become the record's extras.
+    """
+
+    __slots__ = ("_func", "_args", "_kwargs", "defer", "_value", "_resolved")
+
+    def __init__(self, func: Callable[..., Any], *args: Any, defer: bool = False, **kwargs: Any):
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs
+        self.defer = defer
+        self._value: Any = None
+        self._resolved = False
+
+    def resolve(self) -> Any:
+        if not self._resolved:
+            self._value = self._func(*self._args, **self._kwargs)
+            self._resolved = True
+        return self._value
+
+    def __repr__(self) -> str:
+        return repr(self.resolve())
+
+
+register_log_encoder(LazyExtra, LazyExtra.resolve)
+
+
+def lazy_extra(
+    func: Callable[..., Any], *args: Any, defer: bool = False, **kwargs: Any
+) -> Dict[str, LazyExtra]:
+    """
+    Extras computed only if the record is written, keeping the keys *func* returns::
+
+        logger.info(op.log_str, extra={"notification": False, **lazy_extra(lambda: op.log_extra)})
+    """
+    return {LAZY_EXTRA_KEY: LazyExtra(func, *args, defer=defer, **kwargs)}
+
+
+def resolve_lazy_extras(record: logging.LogRecord, include_deferred: bool = False) -> None:
+    """Replace the ``LazyExtra`` values on *record* with their results."""
+    attrs = record.__dict__
+    for key, value in list(attrs.items()):
+        if not isinstance(value, LazyExtra) or (value.defer and not include_deferred):
+            continue
+        if key != LAZY_EXTRA_KEY:
+            attrs[key] = value.resolve()
+            continue
+        del attrs[key]
+        for extra_key, extra_value in (value.resolve() or {}).items():
+            if extra_key not in LOG_RECORD_BUILTIN_ATTRS:
+                attrs.setdefault(extra_key, extra_value)
+
+
+class StructuredQueueHandler(logging.handlers.QueueHandler):
+    """
+    ``QueueHandler`` for the structured log pipeline.
+
+    The calling thread creates the record, renders the message text and resolves the
+    non-deferred ``LazyExtra`` values; everything else, including the JSON encoding of
+    the extras by ``MyJSONFormatter``, runs on the ``QueueListener`` writer thread.
+    Pair it with an unbounded ``queue.SimpleQueue`` so a log call never waits on I/O
+    (see ``5-queued-stderr-json-file.json``).
+    """
+
+    @override
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        resolve_lazy_extras(record)
+        return super().prepare(record)
 
 
 class AddJsonDataIndicatorFilter(logging.Filter):
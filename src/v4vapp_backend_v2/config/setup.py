@@ -1056,6 +1056,7 @@ class InternalConfig:
     redis: ClassVar[Redis] = Redis()
     redis_decoded: ClassVar[Redis] = Redis(decode_responses=True)
     redis_async: ClassVar[AsyncRedis] = AsyncRedis()
+    redis_async_raw: ClassVar[AsyncRedis] = AsyncRedis()
     # When False, NotificationProtocol will skip sending messages. Set to False on
     # critical startup failures (e.g., Redis unavailable) to avoid cascading errors.
     notifications_enabled: ClassVar[bool] = True
@@ -1183,6 +1184,13 @@ class InternalConfig:
                 decode_responses=True,
                 **self.config.redis.kwargs,
             )
+            InternalConfig.redis_async_raw = AsyncRedis(
+                host=self.config.redis.host,
+                port=self.config.redis.port,
+                db=self.config.redis.db,
+                decode_responses=False,
+                **self.config.redis.kwargs,
+            )
             # Optional: Test connections during startup
             InternalConfig.redis.ping()
             InternalConfig.redis_decoded.ping()
@@ -1442,6 +1450,12 @@ class InternalConfig:
                 ):
                     loop.create_task(InternalConfig.redis_async.close())
                     logger.info(f"{ICON} Closed async Redis client.")
+                if (
+                    hasattr(InternalConfig, "redis_async_raw")
+                    and InternalConfig.redis_async_raw is not None
+                ):
+                    loop.create_task(InternalConfig.redis_async_raw.close())
+                    logger.info(f"{ICON} Closed raw async Redis client.")
         except RuntimeError:
             # If there is no running loop, we can safely close the db client
             pass
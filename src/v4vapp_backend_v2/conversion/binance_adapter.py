@@ -16,6 +16,7 @@ from decimal import ROUND_DOWN, Decimal
 from typing import ClassVar
 
 from v4vapp_backend_v2.config.setup import logger
+from v4vapp_backend_v2.conversion.exchange_gateway import EXCHANGE_GATEWAY
 from v4vapp_backend_v2.conversion.exchange_protocol import (
     SATS_PER_BTC,
     BaseExchangeAdapter,
@@ -113,22 +114,39 @@ class BinanceAdapter(BaseExchangeAdapter):
         symbol = self.build_symbol(base_asset, quote_asset)
         try:
             min_qty, min_notional = get_min_order_quantity(symbol, testnet=self.testnet)
-
-            # Try to get step_size from symbol info
-            step_size = Decimal("0")
             symbol_info = get_symbol_info(symbol, testnet=self.testnet)
-            for f in symbol_info.get("filters", []):
-                if f["filterType"] == "LOT_SIZE":
-                    step_size = Decimal(f.get("stepSize", "0"))
-                    break
-
-            return ExchangeMinimums(
-                min_qty=min_qty,
-                min_notional=min_notional,
-                step_size=step_size,
+        except BinanceErrorBadConnection as e:
+            raise ExchangeConnectionError(f"Failed to get Binance minimums: {e}")
+        return self._minimums(min_qty, min_notional, symbol_info)
+
+    async def get_min_order_requirements_async(
+        self, base_asset: str, quote_asset: str
+    ) -> ExchangeMinimums:
+        """``get_min_order_requirements`` from the gateway's cached symbol filters."""
+        symbol = self.build_symbol(base_asset, quote_asset)
+        try:
+            min_qty, min_notional = await EXCHANGE_GATEWAY.get_min_order_quantity(
+                symbol, testnet=self.testnet
             )
+            symbol_info = await EXCHANGE_GATEWAY.get_symbol_info(symbol, testnet=self.testnet)
         except BinanceErrorBadConnection as e:
             raise ExchangeConnectionError(f"Failed to get Binance minimums: {e}")
+        return self._minimums(min_qty, min_notional, symbol_info)
+
+    @staticmethod
+    def _minimums(min_qty: Decimal, min_notional: Decimal, symbol_info: dict) -> ExchangeMinimums:
+        # Try to get step_size from symbol info
+        step_size = Decimal("0")
+        for f in symbol_info.get("filters", []):
+            if f["filterType"] == "LOT_SIZE":
+                step_size = Decimal(f.get("stepSize", "0"))
+                break
+
+        return ExchangeMinimums(
+            min_qty=min_qty,
+            min_notional=min_notional,
+            step_size=step_size,
+        )
 
     def get_balance(self, asset: str) -> Decimal:
         """
@@ -164,6 +182,14 @@ class BinanceAdapter(BaseExchangeAdapter):
         except BinanceErrorBadConnection as e:
             raise ExchangeConnectionError(f"Failed to get Binance balances: {e}")
 
+    async def get_balances_async(self, assets: list[str]) -> dict[str, Decimal]:
+        """``get_balances`` through the gateway (answered from the balance cache when fresh)."""
+        try:
+            raw = await EXCHANGE_GATEWAY.get_balances(assets, testnet=self.testnet)
+            return {k: Decimal(str(v)) for k, v in raw.items()}
+        except BinanceErrorBadConnection as e:
+            raise ExchangeConnectionError(f"Failed to get Binance balances: {e}")
+
     def get_current_price(self, base_asset: str, quote_asset: str) -> Decimal:
         """
         Get current market price from Binance.
@@ -184,6 +210,14 @@ class BinanceAdapter(BaseExchangeAdapter):
         except BinanceErrorBadConnection as e:
             raise ExchangeConnectionError(f"Failed to get Binance price: {e}")
 
+    async def get_current_price_async(self, base_asset: str, quote_asset: str) -> Decimal:
+        """``get_current_price`` through the gateway."""
+        symbol = self.build_symbol(base_asset, quote_asset)
+        try:
+            return await EXCHANGE_GATEWAY.get_mid_price(symbol, testnet=self.testnet)
+        except BinanceErrorBadConnection as e:
+            raise ExchangeConnectionError(f"Failed to get Binance price: {e}")
+
     def _convert_fee_to_msats(
         self,
         fee: Decimal,
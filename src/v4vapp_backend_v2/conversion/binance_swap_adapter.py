@@ -21,11 +21,13 @@ from pydantic import BaseModel, ConfigDict
 from requests.exceptions import RequestException
 
 from v4vapp_backend_v2.config.setup import logger
+from v4vapp_backend_v2.conversion.exchange_gateway import EXCHANGE_GATEWAY
 from v4vapp_backend_v2.conversion.exchange_protocol import (
     BaseExchangeAdapter, ExchangeBelowMinimumError, ExchangeConnectionError,
     ExchangeError, ExchangeMinimums, ExchangeOrderResult)
 from v4vapp_backend_v2.helpers.binance_extras import (
-    BinanceErrorBadConnection, get_balances, get_client, get_mid_price)
+    BINANCE_CACHE, SYMBOL_INFO_TTL, BinanceErrorBadConnection, get_balances, get_client,
+    get_mid_price, invalidate_balances)
 from v4vapp_backend_v2.helpers.crypto_prices import QuoteResponse
 
 
@@ -234,7 +236,8 @@ class BinanceSwapAdapter(BaseExchangeAdapter):
         """
         Get minimum order requirements from the Convert API.
 
-        Uses list_all_convert_pairs to get min/max amounts for a pair.
+        Uses list_all_convert_pairs to get min/max amounts for a pair; the pair lists
+        are cached like spot symbol filters (``SYMBOL_INFO_TTL``).
 
         Args:
             base_asset: The base asset (e.g., 'HIVE')
@@ -244,8 +247,7 @@ class BinanceSwapAdapter(BaseExchangeAdapter):
             ExchangeMinimums with min_qty and min_notional from the Convert API
         """
         try:
-            client = self._get_client()
-            pairs = client.list_all_convert_pairs(fromAsset=base_asset, toAsset=quote_asset)
+            pairs = self._convert_pairs(base_asset, quote_asset)
 
             # Find the matching pair
             for pair in pairs:
@@ -262,9 +264,7 @@ class BinanceSwapAdapter(BaseExchangeAdapter):
                     )
 
             # Also check the reverse direction (toAsset -> fromAsset)
-            pairs_reverse = client.list_all_convert_pairs(
-                fromAsset=quote_asset, toAsset=base_asset
-            )
+            pairs_reverse = self._convert_pairs(quote_asset, base_asset)
             for pair in pairs_reverse:
                 if pair.get("fromAsset") == quote_asset and pair.get("toAsset") == base_asset:
                     min_qty = Decimal(str(pair.get("toAssetMinAmount", "0")))
@@ -293,6 +293,15 @@ class BinanceSwapAdapter(BaseExchangeAdapter):
         except RequestException as e:
             raise ExchangeConnectionError(f"Failed to get Convert pair info: {e}")
 
+    def _convert_pairs(self, from_asset: str, to_asset: str) -> list:
+        return BINANCE_CACHE.get_or_set(
+            ("convert_pairs", from_asset, to_asset),
+            SYMBOL_INFO_TTL,
+            lambda: self._get_client().list_all_convert_pairs(
+                fromAsset=from_asset, toAsset=to_asset
+            ),
+        )
+
     def get_balance(self, asset: str) -> Decimal:
         """
         Get available balance from Binance.
@@ -327,6 +336,14 @@ class BinanceSwapAdapter(BaseExchangeAdapter):
         except BinanceErrorBadConnection as e:
             raise ExchangeConnectionError(f"Failed to get Binance balances: {e}")
 
+    async def get_balances_async(self, assets: list[str]) -> dict[str, Decimal]:
+        """``get_balances`` through the gateway (answered from the balance cache when fresh)."""
+        try:
+            raw = await EXCHANGE_GATEWAY.get_balances(assets, testnet=False)
+            return {k: Decimal(str(v)) for k, v in raw.items()}
+        except BinanceErrorBadConnection as e:
+            raise ExchangeConnectionError(f"Failed to get Binance balances: {e}")
+
     def get_current_price(self, base_asset: str, quote_asset: str) -> Decimal:
         """
         Get current market price from Binance.
@@ -347,6 +364,14 @@ class BinanceSwapAdapter(BaseExchangeAdapter):
         except BinanceErrorBadConnection as e:
             raise ExchangeConnectionError(f"Failed to get Binance price: {e}")
 
+    async def get_current_price_async(self, base_asset: str, quote_asset: str) -> Decimal:
+        """``get_current_price`` through the gateway."""
+        symbol = self.build_symbol(base_asset, quote_asset)
+        try:
+            return await EXCHANGE_GATEWAY.get_mid_price(symbol, testnet=False)
+        except BinanceErrorBadConnection as e:
+            raise ExchangeConnectionError(f"Failed to get Binance price: {e}")
+
     def send_quote_request(
         self,
         from_asset: str,
@@ -664,7 +689,10 @@ class BinanceSwapAdapter(BaseExchangeAdapter):
             )
 
         # Step 2: Accept the quote
-        accept_result = self.accept_quote(quote.quote_id)
+        try:
+            accept_result = self.accept_quote(quote.quote_id)
+        finally:
+            invalidate_balances()
 
         # Step 3: Wait for order completion (poll status)
         order_status = self._wait_for_order_completion(accept_result.order_id)
@@ -0,0 +1,132 @@
+"""
+Async access to the (synchronous) exchange adapters and Binance helpers.
+
+The Binance SDK and the adapters built on it make blocking HTTP calls.  Called from
+coroutines they stall the event loop for hundreds of milliseconds per request, so
+everything async goes through ``EXCHANGE_GATEWAY`` instead:
+
+- blocking calls run in one bounded thread pool (``EXCHANGE_WORKERS`` threads), so a
+  burst of rebalance decisions cannot start an unbounded number of threads;
+- concurrent identical reads (same callable, same arguments) share one call;
+- reads already in ``binance_extras.BINANCE_CACHE`` (symbol filters for hours,
+  balances for a few seconds) are answered on the loop without a thread hop.
+
+Trades go through ``run`` and are never coalesced.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from decimal import Decimal
+from typing import Any, Callable, Dict, Hashable
+
+from v4vapp_backend_v2.helpers import binance_extras
+from v4vapp_backend_v2.helpers.binance_extras import BINANCE_CACHE
+
+EXCHANGE_WORKERS = 4
+
+
+@dataclass
+class ExchangeGatewayStats:
+    calls: int = 0
+    coalesced: int = 0
+    cache_hits: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+class ExchangeGateway:
+    """
+    Run blocking exchange calls off the event loop, sharing identical in-flight reads.
+
+    Args:
+        max_workers (int): Size of the thread pool for blocking SDK calls.
+    """
+
+    def __init__(self, max_workers: int = EXCHANGE_WORKERS) -> None:
+        self.max_workers = max_workers
+        self._executor: ThreadPoolExecutor | None = None
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self.stats = ExchangeGatewayStats()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="exchange"
+            )
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run ``func(*args, **kwargs)`` in the gateway's thread pool."""
+        self.stats.calls += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, functools.partial(func, *args, **kwargs)
+        )
+
+    async def read(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Like ``run`` for calls without side effects: callers asking for the same
+        ``func`` with the same arguments while one is in flight await that one.
+        """
+        self._check_loop()
+        key = (func, args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return await self.run(func, *args, **kwargs)
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats.coalesced += 1
+            return await asyncio.shield(future)
+        future = asyncio.ensure_future(self.run(func, *args, **kwargs))
+        self._inflight[key] = future
+        future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(future)
+
+    def _check_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._inflight = {}
+            self._loop = loop
+
+    # MARK: Binance reads
+
+    async def get_balances(self, symbols: list, testnet: bool = False) -> Dict[str, Decimal]:
+        if ("balances", testnet) in BINANCE_CACHE:
+            self.stats.cache_hits += 1
+            return binance_extras.get_balances(symbols, testnet)
+        return await self.read(binance_extras.get_balances, tuple(symbols), testnet)
+
+    async def get_symbol_info(self, symbol: str, testnet: bool = False) -> dict:
+        if ("symbol_info", symbol, testnet) in BINANCE_CACHE:
+            self.stats.cache_hits += 1
+            return binance_extras.get_symbol_info(symbol, testnet)
+        return await self.read(binance_extras.get_symbol_info, symbol, testnet)
+
+    async def get_min_order_quantity(
+        self, symbol: str, testnet: bool = False
+    ) -> tuple[Decimal, Decimal]:
+        await self.get_symbol_info(symbol, testnet)
+        return binance_extras.get_min_order_quantity(symbol, testnet)
+
+    async def get_current_price(self, symbol: str, testnet: bool = False) -> dict:
+        return await self.read(binance_extras.get_current_price, symbol, testnet)
+
+    async def get_mid_price(self, symbol: str, testnet: bool = False) -> Decimal:
+        return await self.read(binance_extras.get_mid_price, symbol, testnet)
+
+    def status(self) -> Dict[str, Any]:
+        return {"in_flight": len(self._inflight), **self.stats.as_dict()}
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+EXCHANGE_GATEWAY = ExchangeGateway()
@@ -4,6 +4,10 @@ Abstract protocol for exchange operations.
 This module defines the interface that any exchange adapter must implement,
 allowing the rebalancing system to work with multiple exchanges (Binance, etc.)
 without coupling to a specific implementation.
+
+The adapter methods are synchronous (the exchange SDKs make blocking HTTP calls).
+Coroutines use the ``*_async`` counterparts on ``BaseExchangeAdapter``, which run
+through ``EXCHANGE_GATEWAY`` instead of blocking the event loop.
 """
 
 from abc import ABC, abstractmethod
@@ -12,6 +16,7 @@ from typing import Any, Dict, Optional, Protocol, runtime_checkable
 
 from pydantic import BaseModel, ConfigDict
 
+from v4vapp_backend_v2.conversion.exchange_gateway import EXCHANGE_GATEWAY
 from v4vapp_backend_v2.helpers.crypto_prices import QuoteResponse
 
 # Conversion constant: 1 BTC = 100,000,000 satoshis
@@ -373,18 +378,90 @@ class BaseExchangeAdapter(ABC):
         try:
             minimums = self.get_min_order_requirements(base_asset, quote_asset)
             price = self.get_current_price(base_asset, quote_asset)
-            notional = quantity * price
+            return self._check_minimums(quantity, price, minimums)
+        except Exception as e:
+            return False, f"Error checking order: {e}"
+
+    @staticmethod
+    def _check_minimums(
+        quantity: Decimal, price: Decimal, minimums: ExchangeMinimums
+    ) -> tuple[bool, str]:
+        notional = quantity * price
+
+        if quantity < minimums.min_qty:
+            return False, f"Quantity {quantity} below minimum {minimums.min_qty}"
+
+        if notional < minimums.min_notional:
+            return (
+                False,
+                f"Notional {notional} below minimum {minimums.min_notional}",
+            )
+
+        return True, "OK"
 
-            if quantity < minimums.min_qty:
-                return False, f"Quantity {quantity} below minimum {minimums.min_qty}"
+    # MARK: Async access
 
-            if notional < minimums.min_notional:
-                return (
-                    False,
-                    f"Notional {notional} below minimum {minimums.min_notional}",
-                )
+    async def get_min_order_requirements_async(
+        self, base_asset: str, quote_asset: str
+    ) -> ExchangeMinimums:
+        """``get_min_order_requirements`` run through ``EXCHANGE_GATEWAY``."""
+        return await EXCHANGE_GATEWAY.read(
+            self.get_min_order_requirements, base_asset, quote_asset
+        )
+
+    async def get_balance_async(self, asset: str) -> Decimal:
+        """``get_balance`` using ``get_balances_async``."""
+        balances = await self.get_balances_async([asset])
+        return balances.get(asset, Decimal(0))
+
+    async def get_balances_async(self, assets: list[str]) -> Dict[str, Decimal]:
+        """``get_balances`` run through ``EXCHANGE_GATEWAY``."""
+        return await EXCHANGE_GATEWAY.run(self.get_balances, assets)
+
+    async def get_current_price_async(self, base_asset: str, quote_asset: str) -> Decimal:
+        """``get_current_price`` run through ``EXCHANGE_GATEWAY``."""
+        return await EXCHANGE_GATEWAY.read(self.get_current_price, base_asset, quote_asset)
 
-            return True, "OK"
+    async def market_sell_async(
+        self,
+        base_asset: str,
+        quote_asset: str,
+        quantity: Decimal,
+        client_order_id: str | None = None,
+    ) -> ExchangeOrderResult:
+        """``market_sell`` run through ``EXCHANGE_GATEWAY`` (never coalesced)."""
+        return await EXCHANGE_GATEWAY.run(
+            self.market_sell,
+            base_asset=base_asset,
+            quote_asset=quote_asset,
+            quantity=quantity,
+            client_order_id=client_order_id,
+        )
+
+    async def market_buy_async(
+        self,
+        base_asset: str,
+        quote_asset: str,
+        quantity: Decimal,
+        client_order_id: str | None = None,
+    ) -> ExchangeOrderResult:
+        """``market_buy`` run through ``EXCHANGE_GATEWAY`` (never coalesced)."""
+        return await EXCHANGE_GATEWAY.run(
+            self.market_buy,
+            base_asset=base_asset,
+            quote_asset=quote_asset,
+            quantity=quantity,
+            client_order_id=client_order_id,
+        )
+
+    async def can_execute_order_async(
+        self, base_asset: str, quote_asset: str, quantity: Decimal
+    ) -> tuple[bool, str]:
+        """``can_execute_order`` for coroutines; the exchange reads go through the gateway."""
+        try:
+            minimums = await self.get_min_order_requirements_async(base_asset, quote_asset)
+            price = await self.get_current_price_async(base_asset, quote_asset)
+            return self._check_minimums(quantity, price, minimums)
         except Exception as e:
             return False, f"Error checking order: {e}"
 
@@ -546,7 +546,9 @@ async def add_pending_rebalance(
 
         # Update thresholds from exchange
         try:
-            minimums = exchange_adapter.get_min_order_requirements(base_asset, quote_asset)
+            minimums = await exchange_adapter.get_min_order_requirements_async(
+                base_asset, quote_asset
+            )
             pending.min_qty_threshold = minimums.min_qty
             pending.min_notional_threshold = minimums.min_notional
         except ExchangeConnectionError as e:
@@ -554,7 +556,7 @@ async def add_pending_rebalance(
 
         # Estimate quote value for the new quantity
         try:
-            price = exchange_adapter.get_current_price(base_asset, quote_asset)
+            price = await exchange_adapter.get_current_price_async(base_asset, quote_asset)
             quote_value = qty * price
         except ExchangeConnectionError:
             # Use a rough estimate if we can't get current price
@@ -644,14 +646,14 @@ async def execute_rebalance_trade(
     client_order_id = pending.transaction_ids[-1] if pending.transaction_ids else None
 
     if pending.direction == RebalanceDirection.SELL_BASE_FOR_QUOTE:
-        exchange_result = exchange_adapter.market_sell(
+        exchange_result = await exchange_adapter.market_sell_async(
             base_asset=pending.base_asset,
             quote_asset=pending.quote_asset,
             quantity=pending.pending_qty,
             client_order_id=client_order_id,
         )
     else:
-        exchange_result = exchange_adapter.market_buy(
+        exchange_result = await exchange_adapter.market_buy_async(
             base_asset=pending.base_asset,
             quote_asset=pending.quote_asset,
             quantity=pending.pending_qty,
@@ -777,7 +779,7 @@ async def get_net_position(
 
     # Get exchange minimums
     try:
-        minimums = exchange_adapter.get_min_order_requirements(base_asset, quote_asset)
+        minimums = await exchange_adapter.get_min_order_requirements_async(base_asset, quote_asset)
         min_qty = minimums.min_qty
         min_notional = minimums.min_notional
     except ExchangeConnectionError:
@@ -795,7 +797,7 @@ async def get_net_position(
         net_direction = RebalanceDirection.SELL_BASE_FOR_QUOTE
         # Estimate notional for the net quantity
         try:
-            price = exchange_adapter.get_current_price(base_asset, quote_asset)
+            price = await exchange_adapter.get_current_price_async(base_asset, quote_asset)
             net_notional = net_qty * price
         except ExchangeConnectionError:
             net_notional = sell_pending.pending_quote_value - buy_pending.pending_quote_value
@@ -806,7 +808,7 @@ async def get_net_position(
         net_direction = RebalanceDirection.BUY_BASE_WITH_QUOTE
         net_qty_abs = abs(net_qty)
         try:
-            price = exchange_adapter.get_current_price(base_asset, quote_asset)
+            price = await exchange_adapter.get_current_price_async(base_asset, quote_asset)
             net_notional = net_qty_abs * price
         except ExchangeConnectionError:
             net_notional = buy_pending.pending_quote_value - sell_pending.pending_quote_value
@@ -909,13 +911,13 @@ async def execute_net_rebalance(
         abs_net_qty = net_position.abs_net_qty
 
         if net_direction == RebalanceDirection.SELL_BASE_FOR_QUOTE:
-            order_result = exchange_adapter.market_sell(
+            order_result = await exchange_adapter.market_sell_async(
                 base_asset=base_asset,
                 quote_asset=quote_asset,
                 quantity=abs_net_qty,
             )
         else:
-            order_result = exchange_adapter.market_buy(
+            order_result = await exchange_adapter.market_buy_async(
                 base_asset=base_asset,
                 quote_asset=quote_asset,
                 quantity=abs_net_qty,
@@ -0,0 +1,194 @@
+"""
+Write-behind buffer that batches ``TrackedBaseModel`` upserts into ``bulk_write`` calls.
+
+Records are queued with ``add`` and written by ``run`` whenever ``max_batch`` records are
+waiting or ``flush_interval`` seconds have passed.  Each record becomes an idempotent
+``UpdateOne(group_id_query, {"$set": ...}, upsert=True)``, exactly what ``save`` would
+have sent, so replaying a block range after a restart rewrites the same documents.
+
+Two writes for the same record inside one batch are merged (later fields win), which is
+what applying them one after the other would have produced.  ``add`` waits while
+``max_buffered`` records are queued, so a slow MongoDB slows the producer down instead
+of growing memory without bound.
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Protocol, Tuple
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from v4vapp_backend_v2.config.setup import InternalConfig, logger
+from v4vapp_backend_v2.database.db_pymongo import DATABASE_ICON
+from v4vapp_backend_v2.database.db_retry import mongo_call
+
+DEFAULT_MAX_BATCH = 500
+DEFAULT_MAX_BUFFERED = 5_000
+DEFAULT_FLUSH_INTERVAL = 0.5
+
+
+class BulkWritable(Protocol):
+    @property
+    def collection_name(self) -> str: ...
+
+    @property
+    def group_id_query(self) -> Dict[str, Any]: ...
+
+    def mongo_update(self) -> Dict[str, Any]: ...
+
+
+@dataclass
+class BulkWriteStats:
+    added: int = 0
+    merged: int = 0
+    written: int = 0
+    batches: int = 0
+    errors: int = 0
+    last_batch_seconds: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "added": self.added,
+            "merged": self.merged,
+            "written": self.written,
+            "batches": self.batches,
+            "errors": self.errors,
+            "last_batch_seconds": round(self.last_batch_seconds, 4),
+        }
+
+
+@dataclass
+class BulkOpWriter:
+    """
+    Batch upserts of tracked records into per-collection ``bulk_write`` calls.
+
+    Attributes:
+        max_batch (int): Flush as soon as this many records are waiting.
+        flush_interval (float): Flush at least this often (seconds) while records wait.
+        max_buffered (int): ``add`` blocks while this many records are waiting.
+    """
+
+    max_batch: int = DEFAULT_MAX_BATCH
+    flush_interval: float = DEFAULT_FLUSH_INTERVAL
+    max_buffered: int = DEFAULT_MAX_BUFFERED
+    stats: BulkWriteStats = field(default_factory=BulkWriteStats)
+
+    def __post_init__(self) -> None:
+        # (collection, frozen group_id_query) -> [filter, update]
+        self._buffer: Dict[Tuple[str, Tuple], List[Dict[str, Any]]] = {}
+        self._wake = asyncio.Event()
+        self._space = asyncio.Event()
+        self._space.set()
+        self._flush_lock = asyncio.Lock()
+        self._running = False
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    @property
+    def buffered(self) -> int:
+        return len(self._buffer)
+
+    async def add(self, record: BulkWritable) -> None:
+        """Queue ``record`` for upsert, waiting while the buffer is full."""
+        query = record.group_id_query
+        key = (record.collection_name, _freeze(query))
+        update = record.mongo_update()
+        # A record already waiting in the buffer is merged and never has to wait.
+        while key not in self._buffer and len(self._buffer) >= self.max_buffered:
+            self._space.clear()
+            self._wake.set()
+            await self._space.wait()
+        existing = self._buffer.get(key)
+        if existing is None:
+            self._buffer[key] = [query, update]
+        else:
+            existing[1]["$set"].update(update["$set"])
+            self.stats.merged += 1
+        self.stats.added += 1
+        if len(self._buffer) >= self.max_batch:
+            self._wake.set()
+
+    async def flush(self) -> int:
+        """Write everything buffered so far; returns the number of records written."""
+        async with self._flush_lock:
+            if not self._buffer:
+                return 0
+            batch, self._buffer = self._buffer, {}
+            self._space.set()
+            by_collection: Dict[str, List[UpdateOne]] = {}
+            for (collection_name, _), (query, update) in batch.items():
+                by_collection.setdefault(collection_name, []).append(
+                    UpdateOne(query, update, upsert=True)
+                )
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            written = 0
+            for collection_name, requests in by_collection.items():
+                written += await self._write(collection_name, requests)
+            self.stats.batches += 1
+            self.stats.written += written
+            self.stats.last_batch_seconds = loop.time() - started
+            return written
+
+    async def _write(self, collection_name: str, requests: List[UpdateOne]) -> int:
+        try:
+            # Unordered: one bad document must not stop the rest of the batch.
+            await mongo_call(
+                lambda: InternalConfig.db[collection_name].bulk_write(requests, ordered=False),
+                error_code=f"db_save_error_{collection_name}",
+                context=f"{collection_name}:bulk_write {len(requests)}",
+            )
+            return len(requests)
+        except BulkWriteError as e:
+            write_errors = e.details.get("writeErrors", [])
+            self.stats.errors += len(write_errors)
+            logger.warning(
+                f"{DATABASE_ICON} {collection_name} bulk write: "
+                f"{len(write_errors)} of {len(requests)} failed",
+                extra={"notification": False, "error": e, "write_errors": write_errors[:5]},
+            )
+            return len(requests) - len(write_errors)
+        except Exception as e:
+            self.stats.errors += len(requests)
+            logger.error(
+                f"{DATABASE_ICON} {collection_name} bulk write of {len(requests)} failed: {e}",
+                extra={"notification": False, "error": e},
+            )
+            return 0
+
+    async def run(self, shutdown_event: asyncio.Event) -> None:
+        """Flush on size or time until ``shutdown_event`` is set, then flush what is left."""
+        self._running = True
+        shutdown_wait = asyncio.ensure_future(shutdown_event.wait())
+        try:
+            while not shutdown_event.is_set():
+                wake_wait = asyncio.ensure_future(self._wake.wait())
+                await asyncio.wait(
+                    {wake_wait, shutdown_wait},
+                    timeout=self.flush_interval,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                wake_wait.cancel()
+                self._wake.clear()
+                await self.flush()
+        finally:
+            shutdown_wait.cancel()
+            self._running = False
+            if self._buffer:
+                logger.info(
+                    f"{DATABASE_ICON} Flushing {len(self._buffer)} buffered records before exit"
+                )
+                # Shield the final flush from the cancellation that may have ended the loop.
+                await asyncio.shield(self.flush())
+
+
+def _freeze(value: Any) -> Any:
+    """Hashable form of a Mongo query so it can key the buffer."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
@@ -1,6 +1,24 @@
+"""
+In-memory grouping of LND HTLC events, invoices and payments for the monitor.
+
+Events are indexed as they arrive so the lookups made for every HTLC notification are
+dictionary hits rather than scans of everything received so far:
+
+- HTLC events by htlc id (both incoming and outgoing) and by channel id;
+- invoices by payment hash, preimage and the htlc index of their HTLCs;
+- payments by payment hash, preimage and HTLC attempt id.
+
+Groups that are never removed explicitly (failed forwards, unpaid invoices) are dropped
+once untouched for ``EVENTS_TTL`` seconds, groups found complete after
+``COMPLETED_TTL``, and the oldest groups go first when more than ``MAX_EVENTS`` events
+are held.
+"""
+
+import time
+from collections import OrderedDict
 from datetime import datetime, timezone
 from decimal import Decimal
-from typing import List, Tuple, Union
+from typing import Dict, Hashable, List, Tuple, Union
 
 from google.protobuf.json_format import MessageToDict
 
@@ -8,6 +26,10 @@ import v4vapp_backend_v2.lnd_grpc.lightning_pb2 as lnrpc
 import v4vapp_backend_v2.lnd_grpc.router_pb2 as routerrpc
 from v4vapp_backend_v2.helpers.general_purpose_funcs import get_in_flight_time
 
+EVENTS_TTL = 3600.0
+COMPLETED_TTL = 60.0
+MAX_EVENTS = 50_000
+
 
 def event_type_name(event_type: routerrpc.HtlcEvent.EventType) -> str:
     return routerrpc.HtlcEvent.EventType.Name(event_type)
@@ -17,6 +39,17 @@ def payment_event_status_name(event_status: lnrpc.Payment.PaymentStatus) -> str:
     return lnrpc.Payment.PaymentStatus.Name(event_status)
 
 
+def htlc_event_ids(event: routerrpc.HtlcEvent) -> List[int]:
+    """The htlc ids an event is found under: its incoming and outgoing ids."""
+    if event.incoming_htlc_id == event.outgoing_htlc_id:
+        return [event.incoming_htlc_id]
+    return [event.incoming_htlc_id, event.outgoing_htlc_id]
+
+
+def _preimage_hex(pre_image: bytes | str) -> str:
+    return pre_image.hex() if isinstance(pre_image, bytes) else pre_image
+
+
 class LndChannelName:
     channel_id: int
     name: str
@@ -65,20 +98,71 @@ EventItem = Union[routerrpc.HtlcEvent, lnrpc.Invoice, lnrpc.Payment, LndChannelN
 
 
 class LndEventsGroup:
-    htlc_events: List[routerrpc.HtlcEvent] = []
-    lnrpc_invoices: List[lnrpc.Invoice] = []
-    lnrpc_payments: List[lnrpc.Payment] = []
-    channel_names: dict[int, LndChannelName] = {}
+    """
+    HTLC events, invoices and payments received from LND, grouped and indexed.
+
+    Args:
+        htlc_events, invoices, payments: Events to start with.
+        ttl (float): Seconds after which a group nobody has touched is dropped.
+        completed_ttl (float): Seconds after which a group found complete is dropped,
+            should nothing remove it before.
+        max_events (int): Events held before the oldest groups are dropped.
+    """
+
+    channel_names: dict[int, LndChannelName]
 
     def __init__(
         self,
-        htlc_events: List[routerrpc.HtlcEvent] = [],
-        invoices: List[lnrpc.Invoice] = [],
-        payments: List[lnrpc.Payment] = [],
+        htlc_events: List[routerrpc.HtlcEvent] | None = None,
+        invoices: List[lnrpc.Invoice] | None = None,
+        payments: List[lnrpc.Payment] | None = None,
+        ttl: float = EVENTS_TTL,
+        completed_ttl: float = COMPLETED_TTL,
+        max_events: int = MAX_EVENTS,
     ) -> None:
-        self.htlc_events = htlc_events
-        self.lnrpc_invoices = invoices
-        self.lnrpc_payments = payments
+        self.ttl = ttl
+        self.completed_ttl = completed_ttl
+        self.max_events = max_events
+        self.channel_names = {}
+        self.evicted = 0
+        self._invoice_count = 0
+        self._payment_count = 0
+        # arrival number -> event
+        self._htlc_events: Dict[int, routerrpc.HtlcEvent] = {}
+        self._htlc_seq = 0
+        # htlc id -> {arrival number: event} carrying it as incoming or outgoing id
+        self._htlcs: Dict[int, Dict[int, routerrpc.HtlcEvent]] = {}
+        # channel id -> htlc ids seen on it (a dict used as an ordered set)
+        self._htlcs_by_channel: Dict[int, Dict[int, None]] = {}
+        # payment hash -> invoice updates
+        self._invoices: Dict[bytes, List[lnrpc.Invoice]] = {}
+        self._invoice_hash_by_preimage: Dict[bytes, bytes] = {}
+        self._invoice_by_htlc_index: Dict[int, lnrpc.Invoice] = {}
+        # payment hash -> payment updates
+        self._payments: Dict[str, List[lnrpc.Payment]] = {}
+        self._payment_by_preimage: Dict[str, lnrpc.Payment] = {}
+        self._payment_by_attempt: Dict[int, lnrpc.Payment] = {}
+        # (kind, key) of each group, least recently touched first
+        self._touched: OrderedDict[Tuple[str, Hashable], float] = OrderedDict()
+        self._completed: OrderedDict[Tuple[str, Hashable], float] = OrderedDict()
+        for item in [*(htlc_events or []), *(invoices or []), *(payments or [])]:
+            self.append(item)
+
+    @property
+    def htlc_events(self) -> List[routerrpc.HtlcEvent]:
+        return list(self._htlc_events.values())
+
+    @property
+    def lnrpc_invoices(self) -> List[lnrpc.Invoice]:
+        return [invoice for group in self._invoices.values() for invoice in group]
+
+    @property
+    def lnrpc_payments(self) -> List[lnrpc.Payment]:
+        return [payment for group in self._payments.values() for payment in group]
+
+    @property
+    def event_count(self) -> int:
+        return len(self._htlc_events) + self._invoice_count + self._payment_count
 
     # MARK: Universal Methods
 
@@ -113,51 +197,72 @@ class LndEventsGroup:
         self.clear_channel_names()
 
     def complete_group(self, event: EventItem) -> bool:
+        """
+        Whether the group ``event`` belongs to is complete.  A complete group is dropped
+        after ``completed_ttl`` seconds if ``remove_group`` has not removed it by then.
+        """
         event_type = event.__class__.__name__
         match event_type:
             case "HtlcEvent":
-                return self.htlc_complete_group(event)
+                complete = self.htlc_complete_group(event)
             case "Invoice":
-                invoice_group = self.get_invoice_list_by_pre_image(event.r_preimage)
-                if self.is_invoice_expired(event):
-                    return True
-                return True if len(invoice_group) == 2 else False
+                invoice_group = self._invoices.get(event.r_hash, [])
+                complete = self.is_invoice_expired(event) or len(invoice_group) == 2
             case "Payment":
-                return True
+                complete = True
             case "ChannelName":
                 # Channel Group is never complete and we'll never delete channels
                 return False
             case _:
                 return False
+        if complete:
+            self._completed.setdefault(self._group_key(event), time.monotonic())
+        return complete
 
     def remove_group(self, event: EventItem) -> None:
         event_type = event.__class__.__name__
         match event_type:
             case "HtlcEvent":
-                htlc_id = event.incoming_htlc_id or event.outgoing_htlc_id
-                self.htlc_events = [
-                    event
-                    for event in self.htlc_events
-                    if event.incoming_htlc_id != htlc_id and event.outgoing_htlc_id != htlc_id
-                ]
+                self._remove_htlc_group(event.incoming_htlc_id or event.outgoing_htlc_id)
             case "Invoice":
-                invoice_group = self.get_invoice_list_by_pre_image(event.r_preimage)
-                for invoice in invoice_group:
-                    self.lnrpc_invoices.remove(invoice)
+                self._remove_invoice_group(event.r_hash)
                 self.clear_expired_invoices()
             case "Payment":
-                self.lnrpc_payments.remove(event)
+                self._remove_payment(event)
             case _:
                 pass
 
     def list_groups(self) -> List[List[EventItem]]:
         return []
 
+    def evict(self, now: float | None = None) -> int:
+        """
+        Drop groups completed more than ``completed_ttl`` seconds ago, groups untouched
+        for ``ttl`` seconds and, while over ``max_events``, the least recently touched.
+
+        Returns:
+            int: The number of events dropped.
+        """
+        now = time.monotonic() if now is None else now
+        dropped = 0
+        while self._completed:
+            key, completed_at = next(iter(self._completed.items()))
+            if now - completed_at < self.completed_ttl:
+                break
+            dropped += self._drop_group(key)
+        while self._touched:
+            key, touched_at = next(iter(self._touched.items()))
+            if now - touched_at < self.ttl and self.event_count <= self.max_events:
+                break
+            dropped += self._drop_group(key)
+        self.evicted += dropped
+        return dropped
+
     def report_event_counts(self) -> dict:
         return {
-            "htlc_events": len(self.htlc_events),
-            "invoices": len(self.lnrpc_invoices),
-            "payments": len(self.lnrpc_payments),
+            "htlc_events": len(self._htlc_events),
+            "invoices": self._invoice_count,
+            "payments": self._payment_count,
             "channel_names": len(self.channel_names),
         }
 
@@ -251,31 +356,45 @@ class LndEventsGroup:
     # MARK: HTLC Event Methods
     def add_htlc_event(self, htlc_event: routerrpc.HtlcEvent) -> int:
         htlc_id = htlc_event.incoming_htlc_id or htlc_event.outgoing_htlc_id
-        self.htlc_events.append(htlc_event)
+        self._htlc_seq += 1
+        self._htlc_events[self._htlc_seq] = htlc_event
+        for event_id in htlc_event_ids(htlc_event):
+            self._htlcs.setdefault(event_id, {})[self._htlc_seq] = htlc_event
+        for channel_id in (htlc_event.incoming_channel_id, htlc_event.outgoing_channel_id):
+            if channel_id:
+                channel_htlcs = self._htlcs_by_channel.setdefault(channel_id, {})
+                for event_id in htlc_event_ids(htlc_event):
+                    channel_htlcs[event_id] = None
+        self._touch(("htlc", htlc_id))
         return htlc_id
 
     def by_htlc_id(self, htlc_id: int) -> List[routerrpc.HtlcEvent]:
-        return [
-            event
-            for event in self.htlc_events
-            if event.incoming_htlc_id == htlc_id or event.outgoing_htlc_id == htlc_id
-        ]
+        return list(self._htlcs.get(htlc_id, {}).values())
+
+    def by_channel_id(self, channel_id: int) -> List[routerrpc.HtlcEvent]:
+        """HTLC events in or out of a channel, grouped by htlc id."""
+        events: Dict[int, routerrpc.HtlcEvent] = {}
+        for htlc_id in self._htlcs_by_channel.get(channel_id, {}):
+            for seq, event in self._htlcs.get(htlc_id, {}).items():
+                if channel_id in (event.incoming_channel_id, event.outgoing_channel_id):
+                    events[seq] = event
+        return [events[seq] for seq in sorted(events)]
 
     def get_htlc_event_pre_image(self, htlc_id: int) -> str:
-        for event in self.htlc_events:
-            if event.incoming_htlc_id == htlc_id or event.outgoing_htlc_id == htlc_id:
-                preimage = (
-                    event.settle_event.preimage.hex()
-                    if event.settle_event.preimage != b""
-                    else None
-                )
-                if preimage:
-                    return preimage
+        for event in self._htlcs.get(htlc_id, {}).values():
+            preimage = (
+                event.settle_event.preimage.hex() if event.settle_event.preimage != b"" else None
+            )
+            if preimage:
+                return preimage
         return ""
 
     def list_htlc_ids(self) -> List[int]:
         return list(
-            {event.incoming_htlc_id or event.outgoing_htlc_id for event in self.htlc_events}
+            dict.fromkeys(
+                event.incoming_htlc_id or event.outgoing_htlc_id
+                for event in self._htlc_events.values()
+            )
         )
 
     def list_groups_htlc(self) -> List[List[routerrpc.HtlcEvent]]:
@@ -290,13 +409,7 @@ class LndEventsGroup:
             List[List[routerrpc.HtlcEvent]]: A list of lists, where each inner list contains
             HTLC events that share the same HTLC ID.
         """
-        grouped_events = {}
-        for event in self.htlc_events:
-            htlc_id = event.incoming_htlc_id or event.outgoing_htlc_id
-            if htlc_id not in grouped_events:
-                grouped_events[htlc_id] = []
-                grouped_events[htlc_id].append(event)
-        return list(grouped_events.values())
+        return [self.by_htlc_id(htlc_id) for htlc_id in self.list_htlc_ids()]
 
     def htlc_complete_group(self, event: routerrpc.HtlcEvent) -> bool:
         """
@@ -355,7 +468,34 @@ class LndEventsGroup:
         return False
 
     def clear_htlc_events(self) -> None:
-        self.htlc_events.clear()
+        self._htlc_events.clear()
+        self._htlcs.clear()
+        self._htlcs_by_channel.clear()
+        self._forget_kind("htlc")
+
+    def _remove_htlc_group(self, htlc_id: int) -> int:
+        """Remove every event carrying ``htlc_id``; returns how many were removed."""
+        events = self._htlcs.pop(htlc_id, {})
+        for seq, event in events.items():
+            del self._htlc_events[seq]
+            for event_id in htlc_event_ids(event):
+                others = self._htlcs.get(event_id)
+                if others is None:
+                    continue
+                others.pop(seq, None)
+                if not others:
+                    del self._htlcs[event_id]
+            for channel_id in (event.incoming_channel_id, event.outgoing_channel_id):
+                channel_htlcs = self._htlcs_by_channel.get(channel_id)
+                if channel_htlcs is None:
+                    continue
+                for event_id in htlc_event_ids(event):
+                    if event_id not in self._htlcs:
+                        channel_htlcs.pop(event_id, None)
+                if not channel_htlcs:
+                    del self._htlcs_by_channel[channel_id]
+        self._forget(("htlc", htlc_id))
+        return len(events)
 
     def message_forward_event(self, htlc_id: int) -> Tuple[str, dict]:
         """
@@ -435,10 +575,7 @@ class LndEventsGroup:
         return ForwardAmtFee(forward_amount=0, fee=0)
 
     def get_payment_by_pre_image(self, pre_image: str) -> lnrpc.Payment:
-        for payment in self.lnrpc_payments:
-            if payment.payment_preimage == pre_image:
-                return payment
-        return None
+        return self._payment_by_preimage.get(pre_image)
 
     def message_send_event(self, htlc_id: int, dest_alias: str = None) -> Tuple[str, dict]:
         """
@@ -528,32 +665,34 @@ class LndEventsGroup:
     # MARK: Invoice Methods
     def add_invoice(self, invoice: lnrpc.Invoice) -> int:
         add_index = invoice.add_index or 0
-        self.lnrpc_invoices.append(invoice)
+        self._invoices.setdefault(invoice.r_hash, []).append(invoice)
+        self._invoice_count += 1
+        self._index_invoice(invoice)
+        self._touch(("invoice", invoice.r_hash))
         return add_index
 
     def clear_invoices(self) -> None:
-        self.lnrpc_invoices.clear()
+        self._invoices.clear()
+        self._invoice_hash_by_preimage.clear()
+        self._invoice_by_htlc_index.clear()
+        self._invoice_count = 0
+        self._forget_kind("invoice")
 
     def clear_expired_invoices(self) -> None:
-        self.lnrpc_invoices = [
-            invoice for invoice in self.lnrpc_invoices if not self.is_invoice_expired(invoice)
-        ]
+        for r_hash, invoice_group in list(self._invoices.items()):
+            if self.is_invoice_expired(invoice_group[0]):
+                self._remove_invoice_group(r_hash)
 
     def lookup_invoice_by_htlc_id(self, htlc_id: int) -> lnrpc.Invoice:
-        for invoice in self.lnrpc_invoices:
-            if invoice and invoice.htlcs:
-                for htlc_data in invoice.htlcs:
-                    if int(htlc_data.htlc_index) == int(htlc_id):
-                        return invoice
-        return None
-
-    def get_invoice_list_by_pre_image(self, pre_image: str) -> List[lnrpc.Invoice]:
-        answer = []
-        for invoice in self.lnrpc_invoices:
-            if invoice.r_preimage == pre_image:
-                answer.append(invoice)
-            return answer
-        return []
+        return self._invoice_by_htlc_index.get(int(htlc_id))
+
+    def get_invoice_list_by_pre_image(self, pre_image: bytes) -> List[lnrpc.Invoice]:
+        r_hash = self._invoice_hash_by_preimage.get(pre_image)
+        return [
+            invoice
+            for invoice in self._invoices.get(r_hash, [])
+            if invoice.r_preimage == pre_image
+        ]
 
     def is_invoice_expired(self, invoice: lnrpc.Invoice) -> bool:
         """
@@ -571,45 +710,137 @@ class LndEventsGroup:
         expired = datetime.now(tz=timezone.utc) > expiry_date
         return expired
 
+    def _index_invoice(self, invoice: lnrpc.Invoice) -> None:
+        if invoice.r_preimage:
+            self._invoice_hash_by_preimage.setdefault(invoice.r_preimage, invoice.r_hash)
+        for htlc_data in invoice.htlcs:
+            self._invoice_by_htlc_index.setdefault(int(htlc_data.htlc_index), invoice)
+
+    def _remove_invoice_group(self, r_hash: bytes) -> int:
+        invoice_group = self._invoices.pop(r_hash, [])
+        self._invoice_count -= len(invoice_group)
+        for invoice in invoice_group:
+            if self._invoice_hash_by_preimage.get(invoice.r_preimage) == r_hash:
+                del self._invoice_hash_by_preimage[invoice.r_preimage]
+            for htlc_data in invoice.htlcs:
+                if self._invoice_by_htlc_index.get(int(htlc_data.htlc_index)) is invoice:
+                    del self._invoice_by_htlc_index[int(htlc_data.htlc_index)]
+        self._forget(("invoice", r_hash))
+        return len(invoice_group)
+
     # MARK: Payment Methods
     def add_payment(self, payment: lnrpc.Payment) -> int:
         payment_index = payment.payment_index or 0
-        self.lnrpc_payments.append(payment)
+        self._payments.setdefault(payment.payment_hash, []).append(payment)
+        self._payment_count += 1
+        self._index_payment(payment)
+        self._touch(("payment", payment.payment_hash))
         return payment_index
 
     def clear_payments(self) -> None:
-        self.lnrpc_payments.clear()
+        self._payments.clear()
+        self._payment_by_preimage.clear()
+        self._payment_by_attempt.clear()
+        self._payment_count = 0
+        self._forget_kind("payment")
 
     def search_payment(self, htlc_id: int) -> lnrpc.Payment:
         """
-        Search for a payment in the payments list by HTLC ID.
+        Search for a payment by the attempt id of one of its HTLCs.
 
         Args:
-            htlc_id (int): The HTLC ID to search for.
+            htlc_id (int): The HTLC attempt ID to search for.
 
         Returns:
             lnrpc.Payment: The payment object if found, None otherwise.
         """
-        for payment in self.lnrpc_payments:
-            if payment.htlc_id == htlc_id:
-                return payment
-        return None
+        return self._payment_by_attempt.get(htlc_id)
 
-    def search_payment_preimage(self, pre_image: str) -> lnrpc.Payment:
+    def search_payment_preimage(self, pre_image: bytes | str) -> lnrpc.Payment:
         """
         Search for a payment in the payments list by preimage.
 
         Args:
-            pre_image (str): The preimage to search for.
+            pre_image (bytes | str): The preimage to search for, raw or hex.
 
         Returns:
             lnrpc.Payment: The payment object if found, None otherwise.
         """
-        for payment in self.lnrpc_payments:
-            for htlc in payment.htlcs:
-                if htlc.preimage == pre_image:
-                    return payment
-        return None
+        return self._payment_by_preimage.get(_preimage_hex(pre_image))
+
+    def _index_payment(self, payment: lnrpc.Payment) -> None:
+        for pre_image in (payment.payment_preimage, *(h.preimage.hex() for h in payment.htlcs)):
+            # In flight payments carry an all zero preimage.
+            if pre_image.strip("0"):
+                self._payment_by_preimage.setdefault(pre_image, payment)
+        for htlc in payment.htlcs:
+            self._payment_by_attempt.setdefault(htlc.attempt_id, payment)
+
+    def _unindex_payment(self, payment: lnrpc.Payment) -> None:
+        for pre_image in (payment.payment_preimage, *(h.preimage.hex() for h in payment.htlcs)):
+            if self._payment_by_preimage.get(pre_image) is payment:
+                del self._payment_by_preimage[pre_image]
+        for htlc in payment.htlcs:
+            if self._payment_by_attempt.get(htlc.attempt_id) is payment:
+                del self._payment_by_attempt[htlc.attempt_id]
+
+    def _remove_payment(self, payment: lnrpc.Payment) -> None:
+        """Remove one payment update, leaving other updates of the same payment."""
+        payment_group = self._payments.get(payment.payment_hash, [])
+        if payment not in payment_group:
+            return
+        stored = payment_group.pop(payment_group.index(payment))
+        self._payment_count -= 1
+        self._unindex_payment(stored)
+        if not payment_group:
+            del self._payments[payment.payment_hash]
+            self._forget(("payment", payment.payment_hash))
+        for other in payment_group:
+            self._index_payment(other)
+
+    def _remove_payment_group(self, payment_hash: str) -> int:
+        payment_group = self._payments.pop(payment_hash, [])
+        self._payment_count -= len(payment_group)
+        for payment in payment_group:
+            self._unindex_payment(payment)
+        self._forget(("payment", payment_hash))
+        return len(payment_group)
+
+    # MARK: Eviction
+
+    def _group_key(self, event: EventItem) -> Tuple[str, Hashable]:
+        if isinstance(event, routerrpc.HtlcEvent):
+            return ("htlc", event.incoming_htlc_id or event.outgoing_htlc_id)
+        if isinstance(event, lnrpc.Invoice):
+            return ("invoice", event.r_hash)
+        return ("payment", event.payment_hash)
+
+    def _touch(self, key: Tuple[str, Hashable]) -> None:
+        now = time.monotonic()
+        self._touched[key] = now
+        self._touched.move_to_end(key)
+        self.evict(now)
+
+    def _forget(self, key: Tuple[str, Hashable]) -> None:
+        self._touched.pop(key, None)
+        self._completed.pop(key, None)
+
+    def _forget_kind(self, kind: str) -> None:
+        for groups in (self._touched, self._completed):
+            for key in [key for key in groups if key[0] == kind]:
+                del groups[key]
+
+    def _drop_group(self, key: Tuple[str, Hashable]) -> int:
+        kind, group_id = key
+        self._forget(key)
+        match kind:
+            case "htlc":
+                return self._remove_htlc_group(group_id)
+            case "invoice":
+                return self._remove_invoice_group(group_id)
+            case "payment":
+                return self._remove_payment_group(group_id)
+        return 0
 
     # MARK: Channel Name Methods
 
@@ -630,11 +861,11 @@ class LndEventsGroup:
     def __contains__(self, item: EventItem) -> bool:
         match type(item):
             case routerrpc.HtlcEvent:
-                return item in self.htlc_events
+                return item in self._htlcs.get(item.incoming_htlc_id, {}).values()
             case lnrpc.Invoice:
-                return item in self.lnrpc_invoices
+                return item in self._invoices.get(item.r_hash, [])
             case lnrpc.Payment:
-                return item in self.lnrpc_payments
+                return item in self._payments.get(item.payment_hash, [])
             case _:
                 if isinstance(item, LndChannelName):
                     return item.channel_id in self.channel_names
@@ -1,6 +1,8 @@
 import re
+import threading
+import time
 from decimal import Decimal
-from typing import Dict
+from typing import Any, Callable, Dict, Hashable, Tuple
 
 import backoff
 from binance.error import ClientError  # type: ignore
@@ -14,6 +16,79 @@ from v4vapp_backend_v2.config.setup import InternalConfig, logger
 # Only alphanumeric characters, hyphens, and underscores are allowed
 BINANCE_ORDER_ID_PATTERN = re.compile(r"^[a-zA-Z0-9\-_]{1,36}$")
 
+# Symbol filters (lot size, notional) change a few times a year; balances change with
+# every trade and deposit, so they are only shared between calls a few seconds apart.
+SYMBOL_INFO_TTL = 6 * 3600
+BALANCES_TTL = 5.0
+
+
+class TTLCache:
+    """
+    Small thread-safe cache of values with per-entry expiry.
+
+    The Binance helpers are synchronous and run both on the event loop thread and in
+    the exchange gateway's worker threads, so every access holds a lock.
+    """
+
+    _MISSING = object()
+
+    def __init__(self) -> None:
+        self._data: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            if entry[0] <= time.monotonic():
+                del self._data[key]
+                return default
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+
+    def get_or_set(self, key: Hashable, ttl: float, func: Callable[[], Any]) -> Any:
+        value = self.get(key, self._MISSING)
+        if value is self._MISSING:
+            value = func()
+            self.set(key, value, ttl)
+        return value
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, self._MISSING) is not self._MISSING
+
+    def invalidate(self, kind: str) -> None:
+        """Drop every entry whose key is a tuple starting with ``kind``."""
+        with self._lock:
+            for key in [k for k in self._data if isinstance(k, tuple) and k[:1] == (kind,)]:
+                del self._data[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+BINANCE_CACHE = TTLCache()
+
+# One Spot client (and so one requests session) per set of credentials.
+_CLIENTS: Dict[Tuple[str, str, str | None], Client] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def clear_binance_cache() -> None:
+    """Forget cached clients, symbol info and balances (config changes and tests)."""
+    BINANCE_CACHE.clear()
+    with _CLIENTS_LOCK:
+        _CLIENTS.clear()
+
+
+def invalidate_balances() -> None:
+    """Called after anything that moves funds so the next balance read is fresh."""
+    BINANCE_CACHE.invalidate("balances")
+
 
 def sanitize_client_order_id(order_id: str | None, max_length: int = 36) -> str | None:
     """
@@ -70,6 +145,9 @@ def get_client(testnet: bool = False) -> Client:
     Uses the exchange_config section from the configuration to get API credentials.
     The testnet parameter determines which network config (testnet/mainnet) to use,
     but if exchange_mode is set to testnet in config, testnet will be used regardless.
+
+    Clients are reused for the same credentials so calls share one HTTP session
+    (connection pool) instead of opening a new TLS connection each time.
     """
     binance_config = InternalConfig().binance_config
 
@@ -80,17 +158,18 @@ def get_client(testnet: bool = False) -> Client:
         if use_testnet:
             network_config = binance_config.testnet
             base_url = network_config.base_url or "https://testnet.binance.vision"
-            client = Client(
-                api_key=network_config.resolved_api_key,
-                api_secret=network_config.resolved_api_secret,
-                base_url=base_url,
-            )
         else:
             network_config = binance_config.mainnet
-            client = Client(
-                api_key=network_config.resolved_api_key,
-                api_secret=network_config.resolved_api_secret,
-            )
+            base_url = None
+        key = (network_config.resolved_api_key, network_config.resolved_api_secret, base_url)
+        with _CLIENTS_LOCK:
+            client = _CLIENTS.get(key)
+            if client is None:
+                if base_url:
+                    client = Client(api_key=key[0], api_secret=key[1], base_url=base_url)
+                else:
+                    client = Client(api_key=key[0], api_secret=key[1])
+                _CLIENTS[key] = client
         return client
     except Exception as e:
         logger.error(e)
@@ -110,23 +189,19 @@ def get_balances(symbols: list, testnet: bool = False) -> Dict[str, Decimal | in
     This will work always on testnet. If the IP address is not whitelisted on Binance
     then it will fail and raise BinanceErrorBadConnection
 
+    The account's free balances are cached for ``BALANCES_TTL`` seconds, so several
+    reads during one rebalance decision cost a single ``account`` call.
+
     Returns:
         dict: Balances as Decimal values for each symbol
     """
     try:
-        client = get_client(testnet)
-        account = client.account()
-        symbols_set = set(symbols)  # Convert to set for O(1) lookups
+        free = BINANCE_CACHE.get_or_set(
+            ("balances", testnet), BALANCES_TTL, lambda: _account_balances(testnet)
+        )
         balances: dict[str, Decimal | int] = {
-            symbol: Decimal("0") for symbol in symbols
-        }  # Initialize all balances to 0
-        found_count = 0
-        for balance in account["balances"]:
-            if balance["asset"] in symbols_set:
-                balances[balance["asset"]] = Decimal(balance["free"])
-                found_count += 1
-                if found_count == len(symbols_set):
-                    break  # Early exit once all symbols found
+            symbol: free.get(symbol, Decimal("0")) for symbol in symbols
+        }  # Missing assets are 0
         if "BTC" in balances and balances["BTC"] > Decimal("0"):
             balances["SATS"] = Decimal(balances["BTC"] * Decimal("100000000"))
         return balances
@@ -144,6 +219,11 @@ def get_balances(symbols: list, testnet: bool = False) -> Dict[str, Decimal | in
         raise BinanceErrorBadConnection(str(error))
 
 
+def _account_balances(testnet: bool) -> Dict[str, Decimal]:
+    account = get_client(testnet).account()
+    return {balance["asset"]: Decimal(balance["free"]) for balance in account["balances"]}
+
+
 def get_current_price(symbol: str, testnet: bool = False) -> dict:
     """
     Retrieve the current price details for a given trading symbol from Binance.
@@ -270,6 +350,8 @@ def get_symbol_info(symbol: str, testnet: bool = False) -> dict:
     """
     Get exchange info for a specific symbol including minimum order requirements.
 
+    Cached for ``SYMBOL_INFO_TTL`` seconds: the filters rarely change.
+
     Args:
         symbol: The trading pair symbol (e.g., 'HIVEBTC')
         testnet: Whether to use the Binance testnet
@@ -277,6 +359,12 @@ def get_symbol_info(symbol: str, testnet: bool = False) -> dict:
     Returns:
         dict: Symbol info including filters for LOT_SIZE and MIN_NOTIONAL
     """
+    return BINANCE_CACHE.get_or_set(
+        ("symbol_info", symbol, testnet), SYMBOL_INFO_TTL, lambda: _symbol_info(symbol, testnet)
+    )
+
+
+def _symbol_info(symbol: str, testnet: bool) -> dict:
     client = get_client(testnet)
     try:
         exchange_info = client.exchange_info(symbol=symbol)
@@ -398,7 +486,11 @@ def market_order(
         sanitized_order_id = sanitize_client_order_id(client_order_id)
         if sanitized_order_id:
             order_params["newClientOrderId"] = sanitized_order_id
-        response = client.new_order(**order_params)
+        try:
+            response = client.new_order(**order_params)
+        finally:
+            # Even a failed request may have filled; never trust cached balances after it.
+            invalidate_balances()
 
         logger.info(
             f"Market {side.lower()} order executed: {quantity} {symbol}",
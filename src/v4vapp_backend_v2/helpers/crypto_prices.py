@@ -1,5 +1,4 @@
 import asyncio
-import pickle
 from abc import ABC, abstractmethod
 from datetime import datetime, timedelta, timezone
 from decimal import ROUND_HALF_UP, Decimal
@@ -50,6 +49,12 @@ CACHE_TIMES = {
     "Global": 60,
 }
 
+# Redis key for the packed AllQuotes result shared by every process
+GLOBAL_QUOTE_CACHE_KEY = "cryptoprices:all_quote_class_quote"
+# Also cache each provider's raw response (under "<service>:get_quote:raw"); only
+# useful when debugging a provider, every normal reader needs just the rates.
+CACHE_RAW_RESPONSES = False
+
 # Collection name for storing rates in the database
 
 DB_RATES_MIN_INTERVAL: int = 60 * 2 - 10  # 2 minutes 50 seconds
@@ -616,16 +621,29 @@ class AllQuotes(BaseModel):
         AllQuotes.fetch_date_class = self.fetch_date
         self.quote = self.get_one_quote()
         self.redis_hit = False
-        redis_client = InternalConfig.redis
-        cache_data_pickle = pickle.dumps(self.global_quote_pack())
-        cache_times = (
-            TESTING_CACHE_TIMES if InternalConfig().config.development.enabled else CACHE_TIMES
-        )
-        redis_client.setex(
-            "cryptoprices:cryptoprices:all_quote_class_quote",
-            time=cache_times["Global"],
-            value=cache_data_pickle,
-        )
+        if all(quote.error for quote in self.quotes.values()):
+            # Nothing usable came back; don't serve the failure from cache for the
+            # next ``Global`` seconds, let the next call try the services again.
+            logger.warning(
+                f"{ICON} Every quote service failed, not caching the global quote",
+                extra={"notification": False},
+            )
+        else:
+            from v4vapp_backend_v2.helpers.quote_codec import encode_quote_pack
+
+            cache_data = encode_quote_pack(self.quotes, self.fetch_date, self.source)
+            cache_times = (
+                TESTING_CACHE_TIMES if InternalConfig().config.development.enabled else CACHE_TIMES
+            )
+            try:
+                await InternalConfig.redis_async_raw.setex(
+                    GLOBAL_QUOTE_CACHE_KEY, time=cache_times["Global"], value=cache_data
+                )
+            except Exception as e:
+                logger.warning(
+                    f"{ICON} Failed to set global quote cache: {e}",
+                    extra={"notification": False},
+                )
         if store_db:
             await self.db_store_quote()
 
@@ -682,17 +700,21 @@ class AllQuotes(BaseModel):
         Returns:
             bool: True if the global cache is valid, False otherwise.
         """
-        redis_client = InternalConfig.redis
-        cache_data_pickle = redis_client.get("all_quote_class_quote")
-        if cache_data_pickle:
-            cache_data = pickle.loads(cache_data_pickle)
-            # Handle fetch_date conversion
-            if "fetch_date" in cache_data:
-                # Normalize whatever form was stored in cache (str or datetime)
-                self.fetch_date = _parse_iso_datetime(cache_data.get("fetch_date"))
-            self.quotes = self.unpack_quotes(cache_data)
+        from v4vapp_backend_v2.helpers.quote_codec import decode_quote_pack
+
+        try:
+            cache_data = await InternalConfig.redis_async_raw.get(GLOBAL_QUOTE_CACHE_KEY)
+        except Exception as e:
+            logger.warning(
+                f"{ICON} Failed to read global quote cache: {e}", extra={"notification": False}
+            )
+            cache_data = None
+        unpacked = decode_quote_pack(cache_data)
+        if unpacked is not None:
+            self.quotes, fetch_date, self.source = unpacked
+            if fetch_date is not None:
+                self.fetch_date = fetch_date
             self.get_one_quote()
-            self.source = cache_data["source"]
             self.redis_hit = True
             return True
         self.redis_hit = False
@@ -808,6 +830,10 @@ class AllQuotes(BaseModel):
                 name=f"rates_insert:{self.fetch_date.isoformat()}",
             )
             task.add_done_callback(_log_rates_insert_done)
+            # Local import: rate_history depends on this module
+            from v4vapp_backend_v2.helpers.rate_history import RATE_HISTORY
+
+            RATE_HISTORY.add(record)
             return record
         except Exception as e:
             logger.warning(
@@ -958,16 +984,41 @@ class QuoteService(ABC):
     async def get_quote(self, use_cache: bool = True) -> QuoteResponse:
         pass
 
-    async def check_cache(self, use_cache: bool = True) -> QuoteResponse | None:
+    async def check_cache(
+        self, use_cache: bool = True, with_raw: bool = False
+    ) -> QuoteResponse | None:
+        """
+        The cached quote for this service, or None.
+
+        ``raw_response`` is empty unless ``with_raw`` is set and the raw response was
+        cached alongside (see ``CACHE_RAW_RESPONSES``).
+        """
+        from v4vapp_backend_v2.helpers.quote_codec import decode_quote, decode_raw
+
         if use_cache:
             key = f"{self.__class__.__name__}:get_quote"
-            redis_client = InternalConfig.redis
-            cached_quote = redis_client.get(key)
-            if cached_quote:
-                return pickle.loads(cached_quote)
+            try:
+                if with_raw:
+                    cached_quote, cached_raw = await InternalConfig.redis_async_raw.mget(
+                        key, f"{key}:raw"
+                    )
+                else:
+                    cached_quote = await InternalConfig.redis_async_raw.get(key)
+                    cached_raw = None
+            except Exception as e:
+                logger.warning(
+                    f"{ICON} Failed to read cache for {key}: {e}", extra={"notification": False}
+                )
+                return None
+            quote = decode_quote(cached_quote)
+            if quote is not None and cached_raw:
+                quote.raw_response = decode_raw(cached_raw)
+            return quote
         return None
 
     async def set_cache(self, quote: QuoteResponse) -> None:
+        from v4vapp_backend_v2.helpers.quote_codec import encode_quote, encode_raw
+
         try:
             key = f"{self.__class__.__name__}:get_quote"
             if InternalConfig().config.development.enabled:
@@ -975,8 +1026,15 @@ class QuoteService(ABC):
             else:
                 cache_times = CACHE_TIMES
             expiry = cache_times[self.__class__.__name__]
-            redis_client = InternalConfig.redis
-            redis_client.setex(key, time=expiry, value=pickle.dumps(quote))
+            if CACHE_RAW_RESPONSES and quote.raw_response:
+                async with InternalConfig.redis_async_raw.pipeline(transaction=False) as pipe:
+                    pipe.setex(key, expiry, encode_quote(quote))
+                    pipe.setex(f"{key}:raw", expiry, encode_raw(quote.raw_response))
+                    await pipe.execute()
+            else:
+                await InternalConfig.redis_async_raw.setex(
+                    key, time=expiry, value=encode_quote(quote)
+                )
         except Exception as e:
             logger.warning(
                 f"{ICON} Failed to set cache for {key}: {e}",
@@ -175,9 +175,10 @@ async def reset_exchange_opening_balance(
 
     exchange_sub = binance_adaptor.exchange_name
 
-    btc_balance = binance_adaptor.get_balance("BTC")
+    balances = await binance_adaptor.get_balances_async(["BTC", "HIVE"])
+    btc_balance = balances.get("BTC", Decimal(0))
     sats_balance = btc_balance * Decimal(1e8)  # Convert BTC to satoshis
-    hive_balance = binance_adaptor.get_balance("HIVE")
+    hive_balance = balances.get("HIVE", Decimal(0))
 
     if sats_balance == 0 and hive_balance == 0:
         logger.warning(
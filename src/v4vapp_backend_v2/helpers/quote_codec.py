@@ -0,0 +1,147 @@
+"""
+Compact, versioned Redis encoding for ``QuoteResponse`` and the ``AllQuotes`` global pack.
+
+The quote caches used to hold pickled ``QuoteResponse`` objects, ``raw_response``
+included, so every cache read unpickled a provider's whole JSON payload to get four
+numbers.  Here a quote is a JSON array of just what readers use::
+
+    [version, hive_usd, hbd_usd, btc_usd, hive_hbd, fetch_us, source, error, error_details]
+
+Rates are decimal strings and ``fetch_us`` is integer epoch microseconds, so both
+round-trip exactly.  ``error_details`` is only present on error quotes.  The global pack is
+``[version, fetch_us, source, {service: quote_fields}]`` with the same fields minus the
+version.  Raw provider responses are encoded separately with ``encode_raw`` and only
+cached when asked for.
+
+Decoders return None for anything they do not recognise (an older pickle, another
+version, garbage) so a format change is just a cache miss.
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Tuple
+
+from v4vapp_backend_v2.helpers.crypto_prices import QuoteResponse
+
+QUOTE_CODEC_VERSION = 1
+
+_SEPARATORS = (",", ":")
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _to_us(timestamp: datetime) -> int:
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return (timestamp - _EPOCH) // timedelta(microseconds=1)
+
+
+def _from_us(fetch_us: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=fetch_us)
+
+
+def _fields(quote: QuoteResponse) -> List[Any]:
+    fields: List[Any] = [
+        str(quote.hive_usd),
+        str(quote.hbd_usd),
+        str(quote.btc_usd),
+        str(quote.hive_hbd),
+        _to_us(quote.fetch_date),
+        quote.source,
+        quote.error,
+    ]
+    if quote.error_details:
+        fields.append(quote.error_details)
+    return fields
+
+
+def _quote(fields: List[Any]) -> QuoteResponse:
+    hive_usd, hbd_usd, btc_usd, hive_hbd, fetch_us, source, error = fields[:7]
+    # Values come from our own encoder, so skip QuoteResponse's validating __init__.
+    return QuoteResponse.model_construct(
+        hive_usd=Decimal(hive_usd),
+        hbd_usd=Decimal(hbd_usd),
+        btc_usd=Decimal(btc_usd),
+        hive_hbd=Decimal(hive_hbd),
+        raw_response={},
+        source=source,
+        fetch_date=_from_us(fetch_us),
+        error=error,
+        error_details=fields[7] if len(fields) > 7 else {},
+    )
+
+
+def _loads(data: bytes | str | None) -> Any:
+    if not data:
+        return None
+    try:
+        value = json.loads(data)
+    except (UnicodeDecodeError, ValueError):
+        return None
+    if not isinstance(value, list) or not value or value[0] != QUOTE_CODEC_VERSION:
+        return None
+    return value
+
+
+def encode_quote(quote: QuoteResponse) -> bytes:
+    """Encode the rates, fetch date, source and error of ``quote`` (not ``raw_response``)."""
+    return json.dumps(
+        [QUOTE_CODEC_VERSION, *_fields(quote)], separators=_SEPARATORS, default=str
+    ).encode()
+
+
+def decode_quote(data: bytes | str | None) -> QuoteResponse | None:
+    """Decode ``encode_quote`` output; None if ``data`` is missing or not this version."""
+    value = _loads(data)
+    if value is None:
+        return None
+    try:
+        return _quote(value[1:])
+    except (TypeError, ValueError, ArithmeticError):
+        return None
+
+
+def encode_quote_pack(
+    quotes: Dict[str, QuoteResponse], fetch_date: datetime | None, source: str
+) -> bytes:
+    """Encode the ``AllQuotes`` global pack; quotes with an error are left out."""
+    return json.dumps(
+        [
+            QUOTE_CODEC_VERSION,
+            _to_us(fetch_date) if fetch_date else None,
+            source,
+            {name: _fields(quote) for name, quote in quotes.items() if not quote.error},
+        ],
+        separators=_SEPARATORS,
+        default=str,
+    ).encode()
+
+
+def decode_quote_pack(
+    data: bytes | str | None,
+) -> Tuple[Dict[str, QuoteResponse], datetime | None, str] | None:
+    """Decode ``encode_quote_pack`` output to ``(quotes, fetch_date, source)``, or None."""
+    value = _loads(data)
+    if value is None or len(value) != 4:
+        return None
+    _, fetch_us, source, packed = value
+    try:
+        quotes = {name: _quote(fields) for name, fields in packed.items()}
+        fetch_date = _from_us(fetch_us) if fetch_us is not None else None
+    except (AttributeError, TypeError, ValueError, ArithmeticError):
+        return None
+    return quotes, fetch_date, source
+
+
+def encode_raw(raw_response: Dict[str, Any] | List[Dict[str, Any]]) -> bytes:
+    """Encode a provider's raw response for its optional, separate cache entry."""
+    return json.dumps(raw_response, separators=_SEPARATORS, default=str).encode()
+
+
+def decode_raw(data: bytes | str | None) -> Dict[str, Any] | List[Dict[str, Any]]:
+    if not data:
+        return {}
+    try:
+        return json.loads(data)
+    except (UnicodeDecodeError, ValueError):
+        return {}
@@ -0,0 +1,189 @@
+"""
+Single-flight, stale-while-revalidate quote refresh shared by every caller in a process.
+
+``TrackedBaseModel.update_quote`` used to build a new ``AllQuotes`` and run
+``get_all_quotes`` on every call, so a burst of watched ops meant a burst of identical
+provider round trips (and ``TIME_DELAY`` sleeps to let the first one land in Redis).
+
+``QuoteRefreshService`` keeps the last good quote in memory:
+
+- younger than ``fresh_for``: returned immediately
+- younger than ``stale_for``: returned immediately and one background refresh started
+- older, missing, or ``use_cache=False``: the caller waits for a refresh
+
+Concurrent refreshes with the same arguments share one in-flight ``get_all_quotes``.
+A refresh that only produces an error quote never replaces a good quote.  ``run`` keeps
+a fresh quote ready ahead of expiry so ops do not wait on CoinGecko/CoinMarketCap.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Tuple
+
+from v4vapp_backend_v2.config.setup import logger
+from v4vapp_backend_v2.helpers.crypto_prices import CACHE_TIMES, AllQuotes, QuoteResponse
+
+ICON = "💱"
+
+FRESH_FOR = timedelta(seconds=CACHE_TIMES["Global"])
+STALE_FOR = timedelta(minutes=10)
+REFRESH_EVERY = FRESH_FOR * 0.75
+
+
+@dataclass
+class QuoteServiceStats:
+    fresh_hits: int = 0
+    stale_hits: int = 0
+    fetches: int = 0
+    coalesced: int = 0
+    errors: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(self.__dict__)
+
+
+class QuoteRefreshService:
+    """
+    Share one quote refresh between concurrent callers and serve stale quotes while
+    a refresh runs.
+
+    Args:
+        fresh_for (timedelta): Age below which the held quote is returned as is.
+        stale_for (timedelta): Age below which the held quote is returned while refreshing.
+        refresh_every (timedelta): Interval of the background refresher (``run``).
+    """
+
+    def __init__(
+        self,
+        fresh_for: timedelta = FRESH_FOR,
+        stale_for: timedelta = STALE_FOR,
+        refresh_every: timedelta = REFRESH_EVERY,
+    ) -> None:
+        self.fresh_for = fresh_for
+        self.stale_for = stale_for
+        self.refresh_every = refresh_every
+        self.quote: QuoteResponse | None = None
+        self.stats = QuoteServiceStats()
+        self._inflight: Dict[Tuple[bool, bool], asyncio.Task] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def clear(self) -> None:
+        """Forget the held quote and counters; in-flight refreshes still complete."""
+        self.quote = None
+        self.stats = QuoteServiceStats()
+        self._inflight = {}
+
+    def age(self, quote: QuoteResponse | None = None) -> timedelta:
+        quote = quote or self.quote
+        if quote is None:
+            return timedelta.max
+        fetch_date = quote.fetch_date
+        if fetch_date.tzinfo is None:
+            fetch_date = fetch_date.replace(tzinfo=timezone.utc)
+        return datetime.now(tz=timezone.utc) - fetch_date
+
+    async def get(self, use_cache: bool = True, store_db: bool = True) -> QuoteResponse:
+        """
+        The current quote, refreshing it first only when there is nothing usable.
+
+        Args:
+            use_cache (bool): False forces a provider fetch and waits for it.
+            store_db (bool): Whether a refresh started by this call stores the rates.
+        """
+        self._check_loop()
+        quote = self.quote
+        if use_cache and quote is not None:
+            age = self.age(quote)
+            if age < self.fresh_for:
+                self.stats.fresh_hits += 1
+                return quote
+            if age < self.stale_for:
+                self.stats.stale_hits += 1
+                self._start_refresh(use_cache=True, store_db=store_db)
+                return quote
+        return await self.refresh(use_cache=use_cache, store_db=store_db)
+
+    async def refresh(self, use_cache: bool = True, store_db: bool = True) -> QuoteResponse:
+        """Wait for a refresh, joining one already in flight with the same arguments."""
+        self._check_loop()
+        task = self._start_refresh(use_cache=use_cache, store_db=store_db)
+        # Shielded: a cancelled caller must not cancel the fetch other callers share.
+        return await asyncio.shield(task)
+
+    def _start_refresh(self, use_cache: bool, store_db: bool) -> asyncio.Task:
+        key = (use_cache, store_db)
+        task = self._inflight.get(key)
+        if task is not None and not task.done():
+            self.stats.coalesced += 1
+            return task
+        task = asyncio.create_task(self._fetch(use_cache, store_db), name="quote_refresh")
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._done(key, t))
+        return task
+
+    def _done(self, key: Tuple[bool, bool], task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is not None:
+            # Retrieved here so a background refresh nobody awaited does not warn.
+            logger.debug(f"{ICON} Quote refresh failed: {task.exception()}")
+
+    async def _fetch(self, use_cache: bool, store_db: bool) -> QuoteResponse:
+        self.stats.fetches += 1
+        all_quotes = AllQuotes()
+        try:
+            await all_quotes.get_all_quotes(use_cache=use_cache, store_db=store_db)
+        except Exception as e:
+            self.stats.errors += 1
+            logger.warning(
+                f"{ICON} Quote refresh failed: {e}", extra={"notification": False, "error": e}
+            )
+            if self.quote is not None:
+                return self.quote
+            raise
+        quote = all_quotes.quote
+        if quote.error and self.quote is not None and not self.quote.error:
+            self.stats.errors += 1
+            logger.warning(
+                f"{ICON} Quote refresh returned an error, keeping quote from "
+                f"{self.quote.fetch_date}: {quote.error}",
+                extra={"notification": False},
+            )
+            return self.quote
+        self.quote = quote
+        return quote
+
+    def _check_loop(self) -> None:
+        """In-flight tasks belong to one event loop; forget them if the loop changed."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._inflight = {}
+            self._loop = loop
+
+    async def run(self, shutdown_event: asyncio.Event) -> None:
+        """Refresh every ``refresh_every`` until ``shutdown_event`` is set."""
+        interval = self.refresh_every.total_seconds()
+        while not shutdown_event.is_set():
+            try:
+                await self.refresh(use_cache=True, store_db=True)
+            except Exception as e:
+                logger.warning(
+                    f"{ICON} Background quote refresh failed: {e}",
+                    extra={"notification": False, "error": e},
+                )
+            try:
+                await asyncio.wait_for(shutdown_event.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                continue
+
+    def status(self) -> Dict[str, Any]:
+        age = self.age()
+        return {
+            "age": None if self.quote is None else round(age.total_seconds(), 1),
+            "in_flight": len(self._inflight),
+            **self.stats.as_dict(),
+        }
+
+
+QUOTE_SERVICE = QuoteRefreshService()
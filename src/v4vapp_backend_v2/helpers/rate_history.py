@@ -0,0 +1,245 @@
+"""
+In-memory, timestamp-indexed history of the ``rates_ts`` collection.
+
+``TrackedBaseModel.nearest_quote`` is called for every historical op when old
+transactions are reprocessed or the ledger is rebuilt.  Instead of two aggregation
+queries per lookup, ``RateHistory`` keeps the rates it has seen in parallel sorted
+arrays (epoch seconds plus one float column per rate) and answers with a binary search.
+
+Only a contiguous span ``[covered_from, covered_to]`` of the collection is held in
+memory.  A lookup whose nearest candidate could lie outside that span pages in another
+``page`` of records on the side it needs, so history older than the first lookup is
+loaded lazily and in order.  Records written by this process (``AllQuotes.db_store_quote``)
+are added directly so the newest rates do not need a reload.
+
+Nearest means the same as ``find_nearest_by_timestamp_server_side``: the smallest
+absolute time difference, preferring the earlier record on a tie.
+"""
+
+import asyncio
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Mapping
+
+from v4vapp_backend_v2.config.setup import DB_RATES_COLLECTION, InternalConfig, logger
+from v4vapp_backend_v2.database.db_tools import find_nearest_by_timestamp_server_side
+from v4vapp_backend_v2.helpers.crypto_prices import HiveRatesDB, QuoteResponse
+
+ICON = "📈"
+
+RATE_COLUMNS = ("hive_usd", "hbd_usd", "btc_usd", "hive_hbd")
+DEFAULT_PAGE = timedelta(days=7)
+
+
+def _epoch(timestamp: datetime) -> float:
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.timestamp()
+
+
+def _to_float(value: Any) -> float:
+    # Decimal128 from the database, Decimal from HiveRatesDB, float from test fakes
+    return float(str(value)) if not isinstance(value, (int, float)) else float(value)
+
+
+class RateHistory:
+    """
+    Sorted, lazily paged copy of the rates collection for nearest-timestamp lookups.
+
+    Args:
+        collection_name (str): The rates collection to read.
+        page (timedelta): How much history each database read adds on either side.
+    """
+
+    def __init__(
+        self, collection_name: str = DB_RATES_COLLECTION, page: timedelta = DEFAULT_PAGE
+    ) -> None:
+        self.collection_name = collection_name
+        self.page = page
+        self._lock = asyncio.Lock()
+        self._db: Any = None
+        self.clear()
+
+    def clear(self) -> None:
+        self._ts = array("d")
+        self._cols: Dict[str, array] = {name: array("d") for name in RATE_COLUMNS}
+        self.covered_from: float | None = None
+        self.covered_to: float | None = None
+        self.loads = 0
+        self.fallbacks = 0
+
+    def __len__(self) -> int:
+        return len(self._ts)
+
+    @property
+    def collection(self):
+        db = InternalConfig.db
+        if db is not self._db:
+            # A different database (reconnect, tests) invalidates everything loaded.
+            self.clear()
+            self._db = db
+        return db[self.collection_name]
+
+    # MARK: Lookup
+
+    async def nearest(self, timestamp: datetime) -> QuoteResponse | None:
+        """
+        The stored rate nearest to ``timestamp``, or None if the collection is empty.
+        """
+        ts = _epoch(timestamp)
+        _ = self.collection  # drop the loaded span if the database changed
+        index = self._nearest_index(ts)
+        if not self._is_exact(index, ts):
+            async with self._lock:
+                now = datetime.now(tz=timezone.utc).timestamp()
+                page = self.page.total_seconds()
+                end = min(ts + page, now)
+                await self._extend(ts - page, end)
+            index = self._nearest_index(ts)
+            # Once loaded up to "now" there is nothing later to find.
+            if not self._is_exact(index, ts, later_complete=end == now):
+                # Nothing within a page either side: ask the database directly.
+                self.fallbacks += 1
+                return await self._nearest_from_db(timestamp)
+        if index is None:
+            return None
+        return self._quote(index)
+
+    def _nearest_index(self, ts: float) -> int | None:
+        if not self._ts:
+            return None
+        i = bisect_left(self._ts, ts)
+        if i == 0:
+            return 0
+        if i == len(self._ts):
+            return i - 1
+        # Prefer the earlier record on an exact tie
+        return i - 1 if ts - self._ts[i - 1] <= self._ts[i] - ts else i
+
+    def _is_exact(self, index: int | None, ts: float, later_complete: bool = False) -> bool:
+        """True if no record outside the loaded span could be nearer than ``index``."""
+        if index is None or self.covered_from is None or self.covered_to is None:
+            return False
+        delta = abs(self._ts[index] - ts)
+        if self.covered_from > ts - delta:
+            return False
+        return later_complete or ts + delta <= self.covered_to
+
+    def _quote(self, index: int) -> QuoteResponse:
+        return QuoteResponse(
+            **{name: Decimal(repr(self._cols[name][index])) for name in RATE_COLUMNS},
+            raw_response={},
+            source="HiveRatesDB",
+            fetch_date=datetime.fromtimestamp(self._ts[index], tz=timezone.utc),
+            error="",
+            error_details={},
+        )
+
+    async def _nearest_from_db(self, timestamp: datetime) -> QuoteResponse | None:
+        doc = await find_nearest_by_timestamp_server_side(
+            self.collection, timestamp, ts_field="timestamp", max_window=None
+        )
+        if not doc:
+            return None
+        timestamp = doc["timestamp"]
+        return QuoteResponse(
+            **{name: Decimal(str(doc[name])) for name in RATE_COLUMNS},
+            raw_response={},
+            source="HiveRatesDB",
+            fetch_date=timestamp if timestamp.tzinfo else timestamp.replace(tzinfo=timezone.utc),
+            error="",
+            error_details={},
+        )
+
+    # MARK: Loading
+
+    async def _extend(self, start: float, end: float) -> None:
+        """Load records so the covered span includes ``[start, end]``."""
+        if self.covered_from is None or self.covered_to is None:
+            rows = await self._load({"$gte": _dt(start), "$lte": _dt(end)})
+            self._merge(rows)
+            self.covered_from, self.covered_to = start, end
+            return
+        if start < self.covered_from:
+            rows = await self._load({"$gte": _dt(start), "$lt": _dt(self.covered_from)})
+            self._merge(rows)
+            self.covered_from = start
+        if end > self.covered_to:
+            rows = await self._load({"$gt": _dt(self.covered_to), "$lte": _dt(end)})
+            self._merge(rows)
+            self.covered_to = end
+
+    async def _load(self, ts_range: Mapping[str, datetime]) -> List[tuple]:
+        self.loads += 1
+        projection = {"_id": 0, "timestamp": 1, **{name: 1 for name in RATE_COLUMNS}}
+        cursor = self.collection.find({"timestamp": dict(ts_range)}, projection).sort(
+            "timestamp", 1
+        )
+        rows = []
+        for doc in await cursor.to_list(length=None):
+            try:
+                rows.append(
+                    (
+                        _epoch(doc["timestamp"]),
+                        *(_to_float(doc[name]) for name in RATE_COLUMNS),
+                    )
+                )
+            except (KeyError, TypeError, ValueError) as e:
+                logger.debug(f"{ICON} Skipping malformed rate record: {e}")
+        logger.debug(
+            f"{ICON} Loaded {len(rows)} rate records {ts_range}", extra={"notification": False}
+        )
+        return rows
+
+    def _merge(self, rows: List[tuple]) -> None:
+        """Merge sorted ``rows`` into the arrays; records already held are skipped."""
+        if not rows:
+            return
+        if not self._ts or rows[0][0] > self._ts[-1]:
+            self._append(rows)
+            return
+        if rows[-1][0] < self._ts[0]:
+            merged = rows + self._rows()
+        else:
+            existing = set(self._ts)
+            merged = sorted(self._rows() + [r for r in rows if r[0] not in existing])
+        self._ts = array("d")
+        self._cols = {name: array("d") for name in RATE_COLUMNS}
+        self._append(merged)
+
+    def _append(self, rows: List[tuple]) -> None:
+        for row in rows:
+            self._ts.append(row[0])
+            for name, value in zip(RATE_COLUMNS, row[1:]):
+                self._cols[name].append(value)
+
+    def _rows(self) -> List[tuple]:
+        return [
+            (ts, *(self._cols[name][i] for name in RATE_COLUMNS)) for i, ts in enumerate(self._ts)
+        ]
+
+    # MARK: Live updates
+
+    def add(self, record: HiveRatesDB) -> None:
+        """
+        Record a rate this process has just stored.
+
+        The covered span is not widened: other processes may have written rates since
+        the last load, so the next lookup past ``covered_to`` still reads the gap.
+        """
+        ts = _epoch(record.timestamp)
+        i = bisect_left(self._ts, ts)
+        if i < len(self._ts) and self._ts[i] == ts:
+            return
+        self._ts.insert(i, ts)
+        for name in RATE_COLUMNS:
+            self._cols[name].insert(i, _to_float(getattr(record, name)))
+
+
+def _dt(ts: float) -> datetime:
+    return datetime.fromtimestamp(ts, tz=timezone.utc)
+
+
+RATE_HISTORY = RateHistory()
@@ -30,6 +30,8 @@ from v4vapp_backend_v2.helpers.bad_actors_list import (
     get_bad_hive_accounts,
 )
 from v4vapp_backend_v2.helpers.general_purpose_funcs import convert_decimals_to_float_or_int
+from v4vapp_backend_v2.hive.memo_decoder import MEMO_DECODER
+from v4vapp_backend_v2.hive.node_pool import NODE_POOL
 from v4vapp_backend_v2.hive_models.account_name_type import AccNameType
 from v4vapp_backend_v2.hive_models.pending_transaction_class import (
     PendingCustomJson,
@@ -182,7 +184,9 @@ class HiveDevelopmentAccountError(HiveTransferError):
 def get_hive_client(stream_only: bool = False, nobroadcast: bool = False, *args, **kwargs) -> Hive:
     """
     Creates and returns a Hive client instance, selecting a working node from a list of available nodes.
-    If no node is provided in kwargs, retrieves a list of good nodes from Redis cache or regenerates it if necessary.
+    If no node is provided in kwargs, uses the ``NODE_POOL`` ranking (fastest healthy node first)
+    once the pool has probed its nodes; until then retrieves a list of good nodes from Redis cache
+    or regenerates it if necessary, in random order.
     Optionally includes stream-only nodes if `stream_only` is True.
     Attempts to instantiate a Hive client with each node in the list until successful, or raises an error if all nodes fail.
 
@@ -197,6 +201,10 @@ def get_hive_client(stream_only: bool = False, nobroadcast: bool = False, *args,
     Raises:
         ValueError: If no working node can be found after trying all available nodes.
     """
+    if "node" not in kwargs and NODE_POOL.probed:
+        kwargs["node"] = NODE_POOL.ranked_nodes()
+        if stream_only:
+            kwargs["node"] += BLOCK_STREAM_ONLY
     if "node" not in kwargs:
         # shuffle good nodes
         good_nodes: List[str] = []
@@ -693,10 +701,15 @@ def decode_memo(
     """
     Decode an encrypted memo.
 
+    Decryption goes through ``MEMO_DECODER``, which caches shared secrets and decrypted
+    memos, so a memo already seen (or prefetched during catch-up) is not decrypted again.
+
     Args:
         memo (str): The encrypted memo to decode.
         memo_keys (List[str]): A list of memo keys.
         hive_inst (Hive): A Hive instance.
+        trx_id (str): Transaction to read the memo from when ``memo`` is not given.
+        op_in_trx (int): Position of the transfer in that transaction.
 
     Returns:
         str: The decrypted memo.
@@ -704,6 +717,10 @@ def decode_memo(
     if not memo and not trx_id:
         return ""
 
+    d_memo = MEMO_DECODER.cached(memo=memo, trx_id=trx_id, op_in_trx=op_in_trx)
+    if d_memo is not None:
+        return d_memo[1:]
+
     if not memo_keys and not hive_inst:
         raise ValueError("No memo keys or Hive instance provided.")
 
@@ -723,8 +740,7 @@ def decode_memo(
         return memo
 
     try:
-        m = Memo(from_account=None, to_account=None, blockchain_instance=hive_inst)
-        d_memo = m.decrypt(memo)
+        d_memo = MEMO_DECODER.decrypt(memo, hive_inst, trx_id=trx_id, op_in_trx=op_in_trx)
         if d_memo == memo:
             return memo
         if d_memo:
@@ -757,6 +773,7 @@ async def send_custom_json(
     nobroadcast: bool = False,
     active: bool = True,
     resend_attempt: int = 0,
+    batched: bool = False,
 ) -> Dict[str, str]:
     """
     Asynchronously sends a custom JSON operation to the Hive blockchain.
@@ -777,6 +794,9 @@ async def send_custom_json(
             Defaults to False.
         active (bool, optional): If True, the operation will require active authority.
             If False, it will require posting authority. Defaults to True.
+        batched (bool, optional): If True, hand the saved pending custom_json to
+            ``HIVE_SEND_QUEUE`` so it can share a transaction with other ops sent in the
+            same moment. The reply's ``operations`` holds only this op. Defaults to False.
 
     Returns:
         Dict[str, str]: The transaction response from the Hive blockchain.
@@ -811,6 +831,10 @@ async def send_custom_json(
         hive_client = get_hive_client(keys=keys)
     if hive_client.nobroadcast and hive_client.nobroadcast != nobroadcast:
         raise ValueError("nobroadcast is not set to the same value as hive_client")
+    if batched and pending is not None:
+        from v4vapp_backend_v2.hive.hive_send_queue import HIVE_SEND_QUEUE
+
+        return await HIVE_SEND_QUEUE.submit(pending, hive_client)
     try:
         if active:
             kwargs = {"required_auths": [send_account]}
@@ -886,6 +910,33 @@ async def perform_transfer_checks(
     return True
 
 
+def encrypt_transfer_memo(from_account: str, to_account: str, memo: str, hive_client: Hive) -> str:
+    """
+    Encrypt a private (``#``-prefixed) memo the way ``Account.transfer`` does.
+
+    Ops built directly for a ``TransactionBuilder`` skip ``Account.transfer``, so they
+    must encrypt private memos themselves. Other memos are returned unchanged.
+
+    Args:
+        from_account (str): The sending account; its memo key must be in the wallet.
+        to_account (str): The receiving account, whose public memo key is used.
+        memo (str): The memo as stored on the pending transfer.
+        hive_client (Hive): The client holding the sender's keys.
+
+    Returns:
+        str: The memo to put in the transfer op.
+    """
+    if not memo or memo[0] != "#":
+        return memo
+    memo_obj = Memo(
+        from_account=Account(from_account, blockchain_instance=hive_client),
+        to_account=to_account,
+        blockchain_instance=hive_client,
+    )
+    encrypted_memo = memo_obj.encrypt(memo[1:])
+    return encrypted_memo["message"] if encrypted_memo else ""
+
+
 async def send_transfer_bulk(
     transfer_list: List[PendingTransaction] = [],
     custom_json_list: List[PendingCustomJson] = [],
@@ -904,6 +955,8 @@ async def send_transfer_bulk(
         nobroadcast (bool, optional): If True, transactions will not be broadcasted to the network. Defaults to False.
         is_private (bool, optional): If True, indicates the operation should be private. Defaults to False.
 
+    Transfer memos starting with ``#`` are encrypted (see ``encrypt_transfer_memo``).
+
     Returns:
         Dict[str, str]: The result of the broadcasted transaction, or an empty dictionary if not broadcasted.
 
@@ -929,7 +982,12 @@ async def send_transfer_bulk(
                 "from": transfer.from_account,
                 "to": transfer.to_account,
                 "amount": transfer.amount,
-                "memo": transfer.memo,
+                "memo": encrypt_transfer_memo(
+                    str(transfer.from_account),
+                    str(transfer.to_account),
+                    transfer.memo,
+                    hive_client,
+                ),
             }
             tx.appendOps(NectarTransfer(transfer_nectar))
             tx.appendSigner(transfer.from_account, "active")
@@ -1034,6 +1092,7 @@ async def send_transfer(
     nobroadcast: bool = False,
     is_private: bool = False,
     store_pending: PendingTransaction | None = None,
+    batched: bool = False,
 ) -> Dict[str, str]:
     """
     Sends a transfer of Hive tokens from one account to another, with support for retries,
@@ -1055,6 +1114,10 @@ async def send_transfer(
         store_pending (PendingTransaction, optional): An existing PendingTransaction instance to update.
             If not provided, a new PendingTransaction will be created and saved before sending.
             Defaults to None.
+        batched (bool, optional): If True, the checked and saved pending transfer is sent
+            through ``HIVE_SEND_QUEUE`` and may share a multi-op transaction with other
+            transfers from the same account. Failures surface as the same exceptions.
+            Defaults to False.
 
     Returns:
         Dict[str, str]: The transaction result dictionary, including transaction ID and
@@ -1104,6 +1167,10 @@ async def send_transfer(
             is_private=is_private,
             unique_key=f"{from_account}_{to_account}_{amount}_{memo}",
         ).save()
+    if batched:
+        from v4vapp_backend_v2.hive.hive_send_queue import HIVE_SEND_QUEUE
+
+        return await HIVE_SEND_QUEUE.submit(store_pending, hive_client)
     while retries < 3:
         try:
             trx = account.transfer(
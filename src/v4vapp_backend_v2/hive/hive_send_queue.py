@@ -0,0 +1,322 @@
+"""
+Coalesce outgoing Hive transfers and custom_jsons into multi-op transactions.
+
+``send_transfer`` and ``send_custom_json`` broadcast one transaction per item, so a busy
+minute of customer payouts costs one node round trip, one signature and one
+transaction's worth of RC for every reply.  ``HiveSendQueue`` holds submitted
+``PendingTransaction``/``PendingCustomJson`` items for ``SEND_WINDOW`` seconds, groups
+them by Hive client, signing account and ``nobroadcast``, and broadcasts each group with
+``send_transfer_bulk`` in transactions of at most ``MAX_OPS_PER_TRX`` ops.  Transfers get
+the same ``perform_transfer_checks`` as ``send_transfer`` before they are batched, and
+``send_transfer_bulk`` encrypts ``#`` memos as ``Account.transfer`` would.
+
+Every caller gets back a reply shaped like a single-op broadcast: the shared trx with
+``operations`` narrowed to its own op and ``op_in_trx`` giving the op's position, so
+``get_hive_amount_from_trx_reply`` and the ledger/reply bookkeeping are unchanged.
+
+One bad op (insufficient funds, a bad account) fails the whole transaction, so a failed
+multi-op broadcast is retried item by item through the single-op senders.  Each caller
+then sees exactly the exception it would have seen without batching.  Items that are
+alone in their group, and posting-authority custom_jsons, always go the single-op way.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence, Tuple
+
+from nectar.hive import Hive
+
+from v4vapp_backend_v2.config.setup import logger
+from v4vapp_backend_v2.hive_models.account_name_type import AccName
+from v4vapp_backend_v2.hive_models.pending_transaction_class import (
+    PendingCustomJson,
+    PendingTransaction,
+)
+
+ICON = "📦"
+
+SEND_WINDOW = 0.25  # seconds
+MAX_OPS_PER_TRX = 20
+
+PendingSend = PendingTransaction | PendingCustomJson
+
+
+@dataclass
+class HiveSendQueueStats:
+    submitted: int = 0
+    transactions: int = 0
+    batched_ops: int = 0
+    single_sends: int = 0
+    batch_failures: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(self.__dict__)
+
+
+@dataclass
+class _QueuedSend:
+    pending: PendingSend
+    hive_client: Hive
+    future: asyncio.Future
+
+    def resolve(self, result: Dict[str, Any]) -> None:
+        if not self.future.done():  # the submitter may have been cancelled
+            self.future.set_result(result)
+
+    def fail(self, ex: BaseException) -> None:
+        if not self.future.done():
+            self.future.set_exception(ex)
+
+    @property
+    def signer(self) -> str:
+        if isinstance(self.pending, PendingTransaction):
+            return str(self.pending.from_account)
+        return str(self.pending.send_account)
+
+    @property
+    def batchable(self) -> bool:
+        return isinstance(self.pending, PendingTransaction) or self.pending.active
+
+    @property
+    def group_key(self) -> Tuple[int, str, bool]:
+        return (id(self.hive_client), self.signer, self.pending.nobroadcast)
+
+
+def item_reply(trx: Dict[str, Any], index: int) -> Dict[str, Any]:
+    """
+    The part of a multi-op broadcast result that belongs to the op at ``index``.
+
+    Args:
+        trx (Dict[str, Any]): The broadcast result of the whole transaction.
+        index (int): Position of the op in the transaction.
+
+    Returns:
+        Dict[str, Any]: ``trx`` with ``operations`` reduced to that op, plus ``op_in_trx``.
+    """
+    reply = dict(trx)
+    operations = trx.get("operations") or []
+    if index < len(operations):
+        reply["operations"] = [operations[index]]
+    reply["op_in_trx"] = index
+    return reply
+
+
+class HiveSendQueue:
+    """
+    Batch outgoing Hive ops submitted within a short window into multi-op transactions.
+
+    Args:
+        window (float): Seconds to wait for more items after the first one is queued.
+        max_ops (int): Most ops put in one transaction; a full batch is sent at once.
+    """
+
+    def __init__(self, window: float = SEND_WINDOW, max_ops: int = MAX_OPS_PER_TRX) -> None:
+        self.window = window
+        self.max_ops = max_ops
+        self.stats = HiveSendQueueStats()
+        self._queue: List[_QueuedSend] = []
+        self._flush_task: asyncio.Task | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    async def submit(self, pending: PendingSend, hive_client: Hive) -> Dict[str, Any]:
+        """
+        Queue one saved pending item and wait for its broadcast.
+
+        The pending record is deleted once its op is on chain, as the single-op senders do.
+
+        Args:
+            pending (PendingTransaction | PendingCustomJson): The item to send; must
+                already be saved so it can be resent if this process dies.
+            hive_client (Hive): The client to sign and broadcast with.
+
+        Returns:
+            Dict[str, Any]: This item's part of the broadcast result (see ``item_reply``).
+
+        Raises:
+            The exceptions of ``send_transfer``/``send_custom_json`` for this item.
+        """
+        loop = asyncio.get_running_loop()
+        self._check_loop(loop)
+        item = _QueuedSend(pending=pending, hive_client=hive_client, future=loop.create_future())
+        self._queue.append(item)
+        self.stats.submitted += 1
+        if len(self._queue) >= self.max_ops:
+            self._start(self.flush())
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = self._start(self._flush_after(self.window))
+        return await item.future
+
+    async def send_many(
+        self, pendings: Sequence[PendingSend], hive_client: Hive
+    ) -> List[Dict[str, Any] | BaseException]:
+        """
+        Submit several items together; results (or exceptions) come back in order.
+        """
+        return await asyncio.gather(
+            *(self.submit(pending, hive_client) for pending in pendings),
+            return_exceptions=True,
+        )
+
+    async def flush(self) -> None:
+        """Send everything queued so far without waiting for the window to close."""
+        items, self._queue = self._queue, []
+        if not items:
+            return
+        groups: Dict[Tuple[int, str, bool], List[_QueuedSend]] = {}
+        singles: List[_QueuedSend] = []
+        for item in items:
+            if item.batchable:
+                groups.setdefault(item.group_key, []).append(item)
+            else:
+                singles.append(item)
+        try:
+            for group in groups.values():
+                for start in range(0, len(group), self.max_ops):
+                    await self._send_batch(group[start : start + self.max_ops])
+            for item in singles:
+                await self._send_single(item)
+        finally:
+            for item in items:
+                if not item.future.done():
+                    item.future.cancel()
+
+    def status(self) -> Dict[str, Any]:
+        return {"queued": len(self._queue), **self.stats.as_dict()}
+
+    def _start(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _flush_after(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        await self.flush()
+
+    def _check_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        if loop is not self._loop:
+            self._queue = []
+            self._flush_task = None
+            self._tasks = set()
+            self._loop = loop
+
+    async def _send_batch(self, items: List[_QueuedSend]) -> None:
+        if len(items) == 1:
+            await self._send_single(items[0])
+            return
+        from v4vapp_backend_v2.hive.hive_extras import (
+            HiveSomeOtherRPCException,
+            send_transfer_bulk,
+        )
+
+        items = await self._check_transfers(items)
+        if len(items) <= 1:
+            for item in items:
+                await self._send_single(item)
+            return
+
+        # send_transfer_bulk puts every transfer ahead of every custom_json.
+        items = sorted(items, key=lambda item: isinstance(item.pending, PendingCustomJson))
+        transfers = [
+            item.pending for item in items if isinstance(item.pending, PendingTransaction)
+        ]
+        custom_jsons = [
+            item.pending for item in items if isinstance(item.pending, PendingCustomJson)
+        ]
+        try:
+            trx = await send_transfer_bulk(
+                transfer_list=transfers,
+                custom_json_list=custom_jsons,
+                hive_client=items[0].hive_client,
+            )
+        except HiveSomeOtherRPCException as ex:
+            self.stats.batch_failures += 1
+            logger.warning(
+                f"{ICON} Batch of {len(items)} ops from {items[0].signer} failed, "
+                f"sending one by one: {ex}",
+                extra={"notification": False},
+            )
+            for item in items:
+                await self._send_single(item)
+            return
+
+        self.stats.transactions += 1
+        self.stats.batched_ops += len(items)
+        check_nobroadcast = " NO BROADCAST " if items[0].pending.nobroadcast else ""
+        logger.info(
+            f"{ICON} Batch sent{check_nobroadcast}: {len(transfers)} transfers and "
+            f"{len(custom_jsons)} custom_jsons from {items[0].signer} {trx.get('trx_id', '')}",
+            extra={"notification": False},
+        )
+        for index, item in enumerate(items):
+            try:
+                await item.pending.delete()
+            except Exception as ex:
+                logger.warning(f"{ICON} Could not delete pending {item.pending}: {ex}")
+            item.resolve(item_reply(trx, index))
+
+    async def _check_transfers(self, items: List[_QueuedSend]) -> List[_QueuedSend]:
+        """
+        Run ``perform_transfer_checks`` on each transfer, as ``send_transfer`` does.
+
+        Transfers to an account on the exchanges list are redirected to ``v4vapp.sus``;
+        any other failure (``HiveDevelopmentAccountError`` among them) fails that item
+        and leaves it out of the batch.
+        """
+        from v4vapp_backend_v2.hive.hive_extras import (
+            HiveAccountNameOnExchangesList,
+            perform_transfer_checks,
+        )
+
+        checked: List[_QueuedSend] = []
+        for item in items:
+            pending = item.pending
+            if isinstance(pending, PendingTransaction):
+                try:
+                    await perform_transfer_checks(
+                        from_account=str(pending.from_account),
+                        to_account=str(pending.to_account),
+                        amount=pending.amount,
+                        nobroadcast=pending.nobroadcast,
+                    )
+                except HiveAccountNameOnExchangesList:
+                    pending.to_account = AccName("v4vapp.sus")
+                except Exception as ex:
+                    logger.warning(
+                        f"{ICON} Transfer checks failed for {pending.from_account} -> "
+                        f"{pending.to_account}: {ex}",
+                        extra={"notification": False},
+                    )
+                    item.fail(ex)
+                    continue
+            checked.append(item)
+        return checked
+
+    async def _send_single(self, item: _QueuedSend) -> None:
+        from v4vapp_backend_v2.hive.hive_extras import send_custom_json, send_pending
+
+        self.stats.single_sends += 1
+        pending = item.pending
+        try:
+            if isinstance(pending, PendingTransaction):
+                trx = await send_pending(pending=pending, hive_client=item.hive_client)
+            else:
+                # A resend_attempt stops send_custom_json saving a second pending record.
+                trx = await send_custom_json(
+                    json_data=pending.json_data or {},
+                    send_account=str(pending.send_account),
+                    hive_client=item.hive_client,
+                    id=pending.cj_id,
+                    nobroadcast=pending.nobroadcast,
+                    active=pending.active,
+                    resend_attempt=max(pending.resend_attempt, 1),
+                )
+                await pending.delete()
+        except Exception as ex:
+            item.fail(ex)
+            return
+        item.resolve(trx)
+
+
+HIVE_SEND_QUEUE = HiveSendQueue()
@@ -0,0 +1,276 @@
+"""
+Cached, pooled decryption of encrypted (``#``) Hive memos.
+
+``decode_memo`` used to build a nectar ``Memo`` for every encrypted memo and run the whole
+decryption inline, from ``TransferBase.post_process`` on the streaming path.  Each call
+does an ECDH multiplication between one of our memo keys and the counterparty's public
+key, so catching up through blocks full of encrypted memos serialised on elliptic-curve
+work, and a memo seen twice (catch-up overlap, reprocessing, the same op rebuilt from
+the database) was decrypted twice.
+
+``MemoDecoder`` keeps three bounded caches:
+
+- the private key for each of our memo public keys, looked up from the wallet once;
+- the ECDH shared secret per (our public key, counterparty public key), which is the
+  expensive part and the same for every memo between the two;
+- the decrypted text per memo, also reachable by ``(trx_id, op_in_trx)``.
+
+``prefetch`` decrypts the encrypted memos of a batch of raw stream events in a worker
+thread pool (coincurve and the AES/hash code release the GIL), so by the time the ops
+are built ``decode_memo`` is a cache hit.  ``decrypt`` raises what ``Memo.decrypt``
+raises, so ``decode_memo`` keeps its error handling.
+"""
+
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Iterable, Tuple
+
+import nectarbase.memo as BtsMemo
+from nectar.exceptions import MissingKeyError
+from nectar.hive import Hive
+from nectargraphenebase.account import PrivateKey, PublicKey
+
+from v4vapp_backend_v2.config.setup import logger
+
+ICON = "🔐"
+
+MAX_CACHED_MEMOS = 20_000
+MAX_CACHED_SECRETS = 5_000
+MEMO_WORKERS = 4
+
+
+@dataclass
+class MemoDecoderStats:
+    decrypted: int = 0
+    memo_hits: int = 0
+    secret_hits: int = 0
+    secret_misses: int = 0
+    prefetched: int = 0
+    failures: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(self.__dict__)
+
+
+class _LRU:
+    """A small thread-safe LRU map; the decoder's caches are filled from pool threads."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def _decrypt_with_secret(shared_secret: str, nonce: int, check: int, cipher: bytes) -> str:
+    """The part of ``nectarbase.memo.decode_memo`` that follows the ECDH step."""
+    aes, checksum = BtsMemo.init_aes2(shared_secret, int(nonce))
+    if not check == checksum:
+        raise AssertionError("Checksum failure")
+    # remove the varint prefix, as nectarbase does
+    n = len(cipher) % 16
+    message_bytes = BtsMemo._unpad(aes.decrypt(cipher[n:]), 16)
+    n = BtsMemo.varintdecode(message_bytes)
+    if (len(message_bytes) - n) > 0 and (len(message_bytes) - n) < 8:
+        message_bytes = message_bytes[len(message_bytes) - n :]
+    return "#" + message_bytes.decode("utf8")
+
+
+def _is_encrypted(memo: Any) -> bool:
+    return isinstance(memo, str) and len(memo) > 1 and memo[0] == "#"
+
+
+class MemoDecoder:
+    """
+    Decrypt encrypted Hive memos, caching keys, shared secrets and results.
+
+    Args:
+        max_memos (int): Decrypted memos kept in memory.
+        max_secrets (int): Shared secrets (one per counterparty key) kept in memory.
+        max_workers (int): Threads used by ``prefetch``.
+    """
+
+    def __init__(
+        self,
+        max_memos: int = MAX_CACHED_MEMOS,
+        max_secrets: int = MAX_CACHED_SECRETS,
+        max_workers: int = MEMO_WORKERS,
+    ) -> None:
+        self.max_workers = max_workers
+        self.stats = MemoDecoderStats()
+        self._memos = _LRU(max_memos)
+        self._secrets = _LRU(max_secrets)
+        self._private_keys: Dict[str, PrivateKey] = {}
+        self._executor: ThreadPoolExecutor | None = None
+
+    def cached(self, memo: str = "", trx_id: str = "", op_in_trx: int = 0) -> str | None:
+        """
+        The decrypted memo if it has been seen before.
+
+        The memo text is the key when given; ``(trx_id, op_in_trx)`` is only used to
+        answer ``decode_memo`` calls that would otherwise refetch the transaction.
+        """
+        if memo:
+            d_memo = self._memos.get(memo)
+        else:
+            d_memo = self._memos.get((trx_id, op_in_trx)) if trx_id else None
+        if d_memo is not None:
+            self.stats.memo_hits += 1
+        return d_memo
+
+    def decrypt(self, memo: str, hive_inst: Hive, trx_id: str = "", op_in_trx: int = 0) -> str:
+        """
+        Decrypt an encrypted memo with the memo keys in ``hive_inst``'s wallet.
+
+        Args:
+            memo (str): The memo, starting with ``#``.
+            hive_inst (Hive): A Hive instance whose wallet holds our memo keys.
+            trx_id (str): Transaction id of the op carrying the memo, for the cache.
+            op_in_trx (int): Position of that op in its transaction.
+
+        Returns:
+            str: The decrypted memo, still starting with ``#`` as ``Memo.decrypt`` returns it.
+
+        Raises:
+            MissingKeyError: If neither memo key is in the wallet.
+            ValueError, struct.error, AssertionError: If the memo is not a valid encrypted memo.
+        """
+        d_memo = self.cached(memo)
+        if d_memo is None:
+            d_memo = self._decrypt(memo, hive_inst)
+        if trx_id:
+            self._memos.set((trx_id, op_in_trx), d_memo)
+        return d_memo
+
+    def _decrypt(self, memo: str, hive_inst: Hive) -> str:
+        from_key, to_key, nonce, check, cipher = BtsMemo.extract_memo_data(memo)
+        private_key = self._private_key(hive_inst, to_key)
+        other_key = from_key
+        if private_key is None:
+            # if that failed, we assume that we have sent the memo
+            private_key = self._private_key(hive_inst, from_key)
+            other_key = to_key
+        if private_key is None:
+            raise MissingKeyError("Non of the required memo keys are installed!")
+        shared_secret = self._shared_secret(private_key, other_key)
+        d_memo = _decrypt_with_secret(shared_secret, nonce, check, cipher)
+        self.stats.decrypted += 1
+        self._memos.set(memo, d_memo)
+        return d_memo
+
+    async def prefetch(self, events: Iterable[Dict[str, Any]], hive_inst: Hive | None) -> int:
+        """
+        Decrypt the encrypted memos in a batch of raw stream events ahead of time.
+
+        Failures are left for ``decode_memo`` to handle when the op is built; most are
+        memos between other accounts, which we hold no key for.
+
+        Args:
+            events (Iterable[Dict[str, Any]]): Raw events from ``Blockchain.stream``.
+            hive_inst (Hive | None): A Hive instance with our memo keys; nothing is done
+                without one.
+
+        Returns:
+            int: How many memos were decrypted.
+        """
+        if hive_inst is None:
+            return 0
+        memos = list(
+            {
+                event["memo"]
+                for event in events
+                if _is_encrypted(event.get("memo")) and self._memos.get(event["memo"]) is None
+            }
+        )
+        if not memos:
+            return 0
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        results = await asyncio.gather(
+            *(loop.run_in_executor(executor, self.decrypt, memo, hive_inst) for memo in memos),
+            return_exceptions=True,
+        )
+        decrypted = sum(1 for result in results if not isinstance(result, BaseException))
+        self.stats.prefetched += decrypted
+        self.stats.failures += len(results) - decrypted
+        logger.debug(
+            f"{ICON} Prefetched {decrypted} of {len(memos)} encrypted memos",
+            extra={"notification": False},
+        )
+        return decrypted
+
+    def clear(self) -> None:
+        self._memos.clear()
+        self._secrets.clear()
+        self._private_keys.clear()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "cached_memos": len(self._memos),
+            "cached_secrets": len(self._secrets),
+            **self.stats.as_dict(),
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="memo_decoder"
+            )
+        return self._executor
+
+    def _private_key(self, hive_inst: Hive, public_key: PublicKey) -> PrivateKey | None:
+        # Only found keys are cached: Hive clients are short-lived and their wallets
+        # can differ, but a public key always belongs to the same private key.
+        key = str(public_key)
+        private_key = self._private_keys.get(key)
+        if private_key is not None:
+            return private_key
+        try:
+            wif = hive_inst.wallet.getPrivateKeyForPublicKey(key)
+        except MissingKeyError:
+            return None
+        private_key = PrivateKey(wif)
+        self._private_keys[key] = private_key
+        return private_key
+
+    def _shared_secret(self, private_key: PrivateKey, public_key: PublicKey) -> str:
+        key: Tuple[str, str] = (str(private_key.pubkey), str(public_key))
+        shared_secret = self._secrets.get(key)
+        if shared_secret is not None:
+            self.stats.secret_hits += 1
+            return shared_secret
+        self.stats.secret_misses += 1
+        shared_secret = BtsMemo.get_shared_secret(private_key, public_key)
+        self._secrets.set(key, shared_secret)
+        return shared_secret
+
+
+MEMO_DECODER = MemoDecoder()
@@ -0,0 +1,389 @@
+"""
+Health-scored pool of Hive API nodes.
+
+``get_hive_client`` used to shuffle the beacon's good nodes and the streams only left a
+node after an error or a ``STREAM_TIMEOUT``, via ``hive.rpc.next()``, which just takes
+the next node in the shuffled list.  A node that answers slowly, or answers promptly
+but is several blocks behind, could hold the stream back for minutes.
+
+``HiveNodePool`` probes every node every ``PROBE_INTERVAL`` seconds with
+``condenser_api.get_dynamic_global_properties`` and keeps, per node:
+
+- an exponentially weighted latency and error rate (probes and reported failures)
+- the head block and how many blocks it is behind the best node
+
+``ranked_nodes`` orders nodes best first (healthy ones ahead of the rest) and is what
+``get_hive_client`` connects to, so ``rpc.next()`` also moves to the next best node.
+``switch`` reconnects a client to the best node other than one that just failed, and
+``call`` makes a JSON-RPC read that is hedged to a second node if the first is slow.
+``status`` exposes the scores for the status API.
+"""
+
+import asyncio
+import math
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from timeit import default_timer as timer
+from typing import Any, Dict, List
+
+import httpx
+from nectar.hive import Hive
+
+from v4vapp_backend_v2.config.setup import logger
+
+ICON = "🛰️"
+
+PROBE_INTERVAL = 30  # seconds
+PROBE_TIMEOUT = 5.0  # seconds
+REFRESH_NODES_EVERY = 20  # probe rounds between beacon refreshes (~10 minutes)
+EWMA_ALPHA = 0.3
+MAX_ERROR_RATE = 0.5
+MAX_LAG_BLOCKS = 3  # ~9 s behind the best node
+LAG_PENALTY = 3.0  # seconds of score per block behind (one Hive block)
+HEDGE_AFTER = 1.0  # seconds; upper bound before a read is also sent to the next node
+HEDGE_MIN = 0.25  # seconds; lower bound, whatever the node's latency
+MAX_ATTEMPTS = 3  # nodes tried by one ``call``
+
+
+class HiveNodeRPCError(Exception):
+    """A node answered a JSON-RPC request with an error."""
+
+    def __init__(self, message: str, extra: dict | None = None):
+        super().__init__(message)
+        self.extra = extra if extra else {}
+
+
+@dataclass
+class NodeScore:
+    url: str
+    latency: float | None = None  # EWMA seconds, None until the first success
+    error_rate: float = 0.0  # EWMA of failures, 0..1
+    head_block: int = 0
+    lag_blocks: int = 0
+    requests: int = 0
+    errors: int = 0
+    last_error: str = ""
+    last_probe: datetime | None = None
+
+    def record_success(self, latency: float) -> None:
+        self.requests += 1
+        self.error_rate *= 1 - EWMA_ALPHA
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency = (1 - EWMA_ALPHA) * self.latency + EWMA_ALPHA * latency
+
+    def record_failure(self, error: str) -> None:
+        self.requests += 1
+        self.errors += 1
+        self.error_rate = (1 - EWMA_ALPHA) * self.error_rate + EWMA_ALPHA
+        self.last_error = error
+
+    @property
+    def healthy(self) -> bool:
+        return (
+            self.latency is not None
+            and self.error_rate < MAX_ERROR_RATE
+            and self.lag_blocks <= MAX_LAG_BLOCKS
+        )
+
+    @property
+    def score(self) -> float:
+        """Expected cost in seconds of using this node; lower is better."""
+        if self.latency is None:
+            return math.inf
+        return self.latency * (1 + 4 * self.error_rate) + self.lag_blocks * LAG_PENALTY
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "latency_ms": round(self.latency * 1000) if self.latency is not None else None,
+            "error_rate": round(self.error_rate, 3),
+            "head_block": self.head_block,
+            "lag_blocks": self.lag_blocks,
+            "requests": self.requests,
+            "errors": self.errors,
+            "healthy": self.healthy,
+            "score": round(self.score, 3) if self.latency is not None else None,
+            "last_error": self.last_error,
+            "last_probe": self.last_probe.isoformat() if self.last_probe else None,
+        }
+
+
+@dataclass
+class NodePoolStats:
+    probes: int = 0
+    calls: int = 0
+    hedged: int = 0
+    hedge_wins: int = 0
+    switches: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(self.__dict__)
+
+
+class HiveNodePool:
+    """
+    Score Hive API nodes by latency, error rate and head-block lag.
+
+    Args:
+        nodes (List[str] | None): Initial node URLs; ``run`` fills them from
+            ``get_good_nodes`` when empty and refreshes them periodically.
+        probe_interval (float): Seconds between probe rounds in ``run``.
+        hedge_after (float): Longest wait before ``call`` also asks the next node.
+    """
+
+    def __init__(
+        self,
+        nodes: List[str] | None = None,
+        probe_interval: float = PROBE_INTERVAL,
+        hedge_after: float = HEDGE_AFTER,
+    ) -> None:
+        self.probe_interval = probe_interval
+        self.hedge_after = hedge_after
+        self.scores: Dict[str, NodeScore] = {}
+        self.stats = NodePoolStats()
+        self._http: httpx.AsyncClient | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        if nodes:
+            self.set_nodes(nodes)
+
+    def set_nodes(self, nodes: List[str]) -> None:
+        """Track exactly ``nodes``, keeping the scores of those already known."""
+        self.scores = {url: self.scores.get(url) or NodeScore(url=url) for url in nodes}
+
+    @property
+    def probed(self) -> bool:
+        return any(score.latency is not None for score in self.scores.values())
+
+    def ranked_nodes(self) -> List[str]:
+        """
+        Node URLs best first: healthy nodes by score, then the rest by score.
+
+        Empty until at least one probe has succeeded, so callers keep their own
+        node selection while the pool warms up.
+        """
+        if not self.probed:
+            return []
+        ranked = sorted(self.scores.values(), key=lambda score: (not score.healthy, score.score))
+        return [score.url for score in ranked]
+
+    def best_node(self) -> str | None:
+        ranked = self.ranked_nodes()
+        return ranked[0] if ranked else None
+
+    def record_success(self, url: str, latency: float) -> None:
+        if url in self.scores:
+            self.scores[url].record_success(latency)
+
+    def record_failure(self, url: str, error: str = "") -> None:
+        if url in self.scores:
+            self.scores[url].record_failure(error)
+
+    def is_lagging(self, url: str) -> bool:
+        """True if ``url`` is known to be more than ``MAX_LAG_BLOCKS`` behind the best node."""
+        score = self.scores.get(url)
+        return score is not None and score.lag_blocks > MAX_LAG_BLOCKS
+
+    def switch(self, hive: Hive, failed: str = "") -> str:
+        """
+        Move ``hive`` off ``failed`` to the best other node in the pool.
+
+        Falls back to ``hive.rpc.next()`` while the pool has no scores or if
+        reconnecting fails.
+
+        Returns:
+            str: The URL ``hive`` is now connected to.
+        """
+        if failed:
+            self.record_failure(failed, "switched away")
+        ranked = [url for url in self.ranked_nodes() if url != failed]
+        try:
+            if ranked:
+                # The failed node goes last rather than away, so rpc.next() can still reach it.
+                hive.connect(node=ranked + ([failed] if failed in self.scores else []))
+                self.stats.switches += 1
+            elif getattr(hive, "rpc", None):
+                hive.rpc.next()
+        except Exception as e:
+            logger.warning(
+                f"{ICON} Could not switch Hive node away from {failed}: {e}",
+                extra={"notification": False},
+            )
+            if getattr(hive, "rpc", None):
+                hive.rpc.next()
+        return str(hive.rpc.url) if getattr(hive, "rpc", None) else ""
+
+    # MARK: Probing
+
+    async def probe(self, url: str) -> None:
+        """Measure one node: latency and head block from ``get_dynamic_global_properties``."""
+        self.stats.probes += 1
+        score = self.scores.setdefault(url, NodeScore(url=url))
+        score.last_probe = datetime.now(tz=timezone.utc)
+        try:
+            properties, _ = await self._timed_rpc(
+                url, "condenser_api.get_dynamic_global_properties", []
+            )
+        except Exception:
+            return
+        score.head_block = int((properties or {}).get("head_block_number", 0))
+
+    async def probe_all(self) -> None:
+        """Probe every node concurrently and recompute how far each is behind."""
+        await asyncio.gather(*(self.probe(url) for url in list(self.scores)))
+        best_head = max((score.head_block for score in self.scores.values()), default=0)
+        for score in self.scores.values():
+            score.lag_blocks = best_head - score.head_block if score.head_block else 0
+            if not score.head_block and score.latency is not None:
+                # Never answered a probe with a head block: treat as far behind.
+                score.lag_blocks = MAX_LAG_BLOCKS + 1
+
+    async def run(self, shutdown_event: asyncio.Event | None = None) -> None:
+        """
+        Probe the pool every ``probe_interval`` seconds until ``shutdown_event`` is set,
+        refreshing the node list from the beacon every ``REFRESH_NODES_EVERY`` rounds.
+        """
+        from v4vapp_backend_v2.hive.hive_extras import get_good_nodes
+
+        rounds = 0
+        while not (shutdown_event and shutdown_event.is_set()):
+            try:
+                if not self.scores or rounds % REFRESH_NODES_EVERY == 0:
+                    self.set_nodes(await asyncio.to_thread(get_good_nodes))
+                await self.probe_all()
+                best = self.best_node()
+                logger.debug(
+                    f"{ICON} Node pool probed {len(self.scores)} nodes, best {best}",
+                    extra={"notification": False, "node_pool": self.status()},
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(
+                    f"{ICON} Node pool probe failed: {e}", extra={"notification": False}
+                )
+            rounds += 1
+            if shutdown_event is None:
+                await asyncio.sleep(self.probe_interval)
+                continue
+            try:
+                await asyncio.wait_for(shutdown_event.wait(), timeout=self.probe_interval)
+            except asyncio.TimeoutError:
+                pass
+        await self.close()
+
+    # MARK: Hedged reads
+
+    async def call(self, method: str, params: Any = None) -> Any:
+        """
+        JSON-RPC read from the best node, hedged to the next one if it is slow.
+
+        If the first node has not answered within ``hedge_delay`` the request is also
+        sent to the next ranked node and the first successful answer wins.  A failure
+        moves straight on to the next node.  At most ``MAX_ATTEMPTS`` nodes are asked.
+
+        Args:
+            method (str): The JSON-RPC method, e.g. ``condenser_api.get_block``.
+            params (Any): Its parameters. Defaults to ``[]``.
+
+        Returns:
+            Any: The ``result`` of the JSON-RPC reply.
+
+        Raises:
+            ValueError: If the pool has no nodes.
+            The last error if every attempted node failed.
+        """
+        nodes = (self.ranked_nodes() or list(self.scores))[:MAX_ATTEMPTS]
+        if not nodes:
+            raise ValueError("No Hive nodes in the pool")
+        self.stats.calls += 1
+        params = [] if params is None else params
+        tasks: Dict[asyncio.Task, str] = {}
+        errors: List[BaseException] = []
+        next_index = 0
+
+        def start_next() -> None:
+            nonlocal next_index
+            url = nodes[next_index]
+            next_index += 1
+            tasks[asyncio.create_task(self._timed_rpc(url, method, params))] = url
+
+        start_next()
+        try:
+            while tasks:
+                timeout = (
+                    self.hedge_delay(nodes[next_index - 1]) if next_index < len(nodes) else None
+                )
+                done, _ = await asyncio.wait(
+                    tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    self.stats.hedged += 1
+                    start_next()
+                    continue
+                for task in done:
+                    url = tasks.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        if url != nodes[0]:
+                            self.stats.hedge_wins += 1
+                        return task.result()[0]
+                    errors.append(error)
+                if not tasks and next_index < len(nodes):
+                    start_next()
+        finally:
+            for task in tasks:
+                task.cancel()
+        raise errors[-1]
+
+    def hedge_delay(self, url: str) -> float:
+        """Three times the node's usual latency, between ``HEDGE_MIN`` and ``hedge_after``."""
+        score = self.scores.get(url)
+        if score is None or score.latency is None:
+            return self.hedge_after
+        return min(self.hedge_after, max(HEDGE_MIN, 3 * score.latency))
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "best_node": self.best_node(),
+            "nodes": {url: score.as_dict() for url, score in self.scores.items()},
+            **self.stats.as_dict(),
+        }
+
+    async def close(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def _timed_rpc(self, url: str, method: str, params: Any) -> tuple[Any, float]:
+        started = timer()
+        try:
+            result = await self._rpc(url, method, params)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.record_failure(url, f"{e.__class__.__name__}: {e}")
+            raise
+        latency = timer() - started
+        self.record_success(url, latency)
+        return result, latency
+
+    async def _rpc(self, url: str, method: str, params: Any) -> Any:
+        response = await self._client().post(
+            url, json={"jsonrpc": "2.0", "method": method, "params": params, "id": 1}
+        )
+        response.raise_for_status()
+        reply = response.json()
+        if "error" in reply:
+            raise HiveNodeRPCError(f"{url} {method}: {reply['error']}", extra={"url": url})
+        return reply.get("result")
+
+    def _client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._http is None or loop is not self._loop:
+            self._http = httpx.AsyncClient(timeout=PROBE_TIMEOUT)
+            self._loop = loop
+        return self._http
+
+
+NODE_POOL = HiveNodePool()
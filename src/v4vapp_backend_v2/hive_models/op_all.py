@@ -1,10 +1,12 @@
-from typing import Annotated, Any
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Annotated, Any, Callable, Dict, Iterable, Set, Tuple
 
 from pydantic import BaseModel, Discriminator, Tag, ValidationError
 
 from v4vapp_backend_v2.hive_models.op_account_update2 import AccountUpdate2
 from v4vapp_backend_v2.hive_models.op_account_witness_vote import AccountWitnessVote
-from v4vapp_backend_v2.hive_models.op_base import OP_TRACKED, OpBase
+from v4vapp_backend_v2.hive_models.op_base import OP_TRACKED, OpBase, OpRealm, op_realm
 from v4vapp_backend_v2.hive_models.op_custom_json import CustomJson
 from v4vapp_backend_v2.hive_models.op_fill_order import FillOrder
 from v4vapp_backend_v2.hive_models.op_fill_recurrent_transfer import FillRecurrentTransfer
@@ -33,6 +35,12 @@ OP_MAP: dict[str, Any] = {
 }
 
 
+# Validator of each mapped model, looked up by op type instead of through the union
+OP_VALIDATORS: dict[str, Callable[[Any], Any]] = {
+    op_type: model.model_validate for op_type, model in OP_MAP.items()
+}
+
+
 # Define the discriminator function
 def get_op_type(value: Any) -> str:
     """
@@ -149,7 +157,11 @@ def op_any(hive_event: dict[str, Any]) -> OpAny:
 def op_any_or_base(hive_event: dict[str, Any]) -> OpAny:
     """
     Factory function to create the appropriate OpBase subclass instance based on the
-    provided Hive event data using discriminated union.
+    provided Hive event data.
+
+    Dispatches straight to the model's validator on the ``type`` field, which gives the
+    same result as validating ``DiscriminatedOp`` without wrapping the event in a
+    ``{"value": ...}`` dict and running the union's discriminator for every op.
 
     Args:
         hive_event: A dictionary containing Hive event data
@@ -162,14 +174,149 @@ def op_any_or_base(hive_event: dict[str, Any]) -> OpAny:
     """
     if "_id" in hive_event:
         del hive_event["_id"]  # Remove _id field if present
+    validate = OP_VALIDATORS.get(hive_event.get("type"), OpBase.model_validate)  # type: ignore[arg-type]
     try:
-        value = {"value": hive_event}
-        answer = DiscriminatedOp.model_validate(value)
-        return answer.value
+        return validate(hive_event)
     except ValidationError as e:
         raise ValueError(f"Failed to validate operation: {e}") from e
 
 
+# MARK: Raw op classification
+
+# Op fields naming the accounts an op affects, as in hived's impacted-accounts rules
+# for the tracked op types.
+IMPACTED_ACCOUNT_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "transfer": ("from", "to"),
+    "recurrent_transfer": ("from", "to"),
+    "fill_recurrent_transfer": ("from", "to"),
+    "account_witness_vote": ("account", "witness"),
+    "producer_reward": ("producer",),
+    "producer_missed": ("producer",),
+    "fill_order": ("current_owner", "open_owner"),
+    "limit_order_create": ("owner",),
+    "limit_order_cancelled": ("seller",),
+    "account_update2": ("account",),
+    "update_proposal_votes": ("voter",),
+    "custom_json": (),
+}
+
+ALL_TRANSFER_TYPES = ("transfer", "recurrent_transfer", "fill_recurrent_transfer")
+
+
+def impacted_accounts(hive_event: dict) -> Set[str]:
+    """Accounts affected by a raw op (``custom_json`` adds its signing accounts)."""
+    op_type = hive_event.get("type", "")
+    accounts = {
+        hive_event[name]
+        for name in IMPACTED_ACCOUNT_FIELDS.get(op_type, ())
+        if isinstance(hive_event.get(name), str)
+    }
+    if op_type == "custom_json":
+        accounts.update(hive_event.get("required_auths", []))
+        accounts.update(hive_event.get("required_posting_auths", []))
+    return accounts
+
+
+@dataclass(slots=True)
+class RawOp:
+    """
+    A raw Hive event that has been classified but not validated into a model.
+
+    Carries what the streamers and ``BlockCounter`` need to keep their place (type,
+    realm, block, transaction, ``op_in_trx``) so ops nobody acts on never pay for
+    ``op_any_or_base``.  ``materialize`` builds the full model when it is needed.
+    """
+
+    hive_event: Dict[str, Any]
+    op_type: str
+    realm: OpRealm
+    block_num: int
+    trx_id: str
+    op_in_trx: int = 1
+
+    @classmethod
+    def from_event(cls, hive_event: Dict[str, Any]) -> "RawOp":
+        """
+        Raises:
+            ValueError: If the event lacks the fields every op has.
+        """
+        try:
+            op_type = hive_event["type"]
+            return cls(
+                hive_event=hive_event,
+                op_type=op_type,
+                realm=op_realm(op_type),
+                block_num=int(hive_event["block_num"]),
+                trx_id=str(hive_event["trx_id"]),
+            )
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Not a Hive op event: {e}") from e
+
+    @property
+    def raw_op(self) -> Dict[str, Any]:
+        return self.hive_event
+
+    @property
+    def accounts(self) -> Set[str]:
+        return impacted_accounts(self.hive_event)
+
+    @property
+    def timestamp(self) -> datetime:
+        timestamp = self.hive_event.get("timestamp")
+        if isinstance(timestamp, str):
+            timestamp = datetime.fromisoformat(timestamp)
+        if not isinstance(timestamp, datetime):
+            return datetime.now(tz=timezone.utc)
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        return timestamp
+
+    def materialize(self) -> OpAny:
+        """The validated model for this op, with the ``op_in_trx`` counted so far."""
+        op = op_any_or_base(self.hive_event)
+        op.op_in_trx = self.op_in_trx
+        return op
+
+
+def op_or_raw(
+    hive_event: Dict[str, Any], keep: Callable[[RawOp], bool] | None = None
+) -> OpAny | RawOp:
+    """
+    Classify a raw event and validate it only if ``keep`` wants it (or there is no ``keep``).
+
+    Raises:
+        ValueError: If the event cannot be classified, or a kept op fails validation.
+    """
+    raw = RawOp.from_event(hive_event)
+    if keep is None or keep(raw):
+        return op_any_or_base(hive_event)
+    return raw
+
+
+def tracked_op_filter(
+    watch_users: Iterable[str], custom_json_ids: Iterable[str]
+) -> Callable[[RawOp], bool]:
+    """
+    A ``keep`` for ``op_or_raw`` that drops the bulk of the chain before validation.
+
+    Only ``custom_json`` ops with an untracked id and transfers not touching a watched
+    user are dropped; they are most of the tracked ops in any block and the monitor
+    never acts on them (``known_custom_json`` and ``is_watched`` are False).  Every other
+    op type is kept so anything that logs or inspects them sees the same ops as before.
+    """
+    watched = set(watch_users)
+    cj_ids = set(custom_json_ids)
+
+    def keep(raw: RawOp) -> bool:
+        if raw.op_type == "custom_json":
+            return raw.hive_event.get("id") in cj_ids
+        if raw.op_type in ALL_TRANSFER_TYPES:
+            return not watched.isdisjoint(raw.accounts)
+        return True
+
+    return keep
+
+
 def op_query(types: list[str]) -> dict[str, Any]:
     if not types:
         raise ValueError("types list cannot be empty")
@@ -187,4 +334,4 @@ def is_op_all_transfer(op: OpAny) -> bool:
     Returns:
         bool: True if the operation type is a transfer operation, False otherwise.
     """
-    return op.op_type in ["transfer", "recurrent_transfer", "fill_recurrent_transfer"]
+    return op.op_type in ALL_TRANSFER_TYPES
@@ -1,7 +1,10 @@
 import asyncio
 import re
+from collections import deque
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
-from typing import AsyncGenerator
+from timeit import default_timer as timer
+from typing import AsyncGenerator, Callable, Deque, Dict, List, Tuple
 
 from nectar.blockchain import Blockchain
 from nectar.exceptions import NectarException
@@ -12,14 +15,17 @@ from v4vapp_backend_v2.actions.tracked_models import TrackedBaseModel
 from v4vapp_backend_v2.config.setup import logger
 from v4vapp_backend_v2.helpers.async_wrapper import sync_to_async_iterable
 from v4vapp_backend_v2.hive.hive_extras import (
+    HIVE_BLOCK_TIME,
     get_blockchain_instance,
     get_good_nodes,
     get_hive_client,
 )
+from v4vapp_backend_v2.hive.memo_decoder import MEMO_DECODER
+from v4vapp_backend_v2.hive.node_pool import NODE_POOL
 from v4vapp_backend_v2.hive_models.custom_json_data import custom_json_test_data
-from v4vapp_backend_v2.hive_models.op_all import OpAny, op_any_or_base
+from v4vapp_backend_v2.hive_models.op_all import OpAny, RawOp, op_or_raw
 from v4vapp_backend_v2.hive_models.op_base import OP_TRACKED, OpBase, op_realm
-from v4vapp_backend_v2.hive_models.op_base_counters import OpInTrxCounter
+from v4vapp_backend_v2.hive_models.op_base_counters import TIME_DIFFERENCE_CHECK, OpInTrxCounter
 
 ICON = "🔗"
 
@@ -31,6 +37,27 @@ ICON = "🔗"
 STREAM_TIMEOUT = 15
 
 
+# Parallel catch-up: only used when the stream starts further behind the head
+# than BlockCounter.is_catching_up tolerates, and stops once it is back within it.
+CATCH_UP_MIN_BLOCKS = int(TIME_DIFFERENCE_CHECK.total_seconds() / HIVE_BLOCK_TIME)
+CATCH_UP_CHUNK_BLOCKS = 200  # ~10 minutes of blocks per request
+CATCH_UP_MAX_NODES = 4
+CATCH_UP_CHUNKS_AHEAD = 2  # chunks in flight per node
+CATCH_UP_RETRIES = 3
+
+# How often the live stream asks NODE_POOL whether its node has fallen behind the others.
+LAG_CHECK_SECONDS = 30
+
+
+class NodeLagging(Exception):
+    """
+    Raised inside the stream when ``NODE_POOL`` reports that the node being streamed
+    from is behind the other nodes, so the restart logic moves to a better node.
+    """
+
+    pass
+
+
 class SwitchToLiveStream(Exception):
     """
     Exception to indicate that the stream should switch to live mode.
@@ -41,6 +68,221 @@ class SwitchToLiveStream(Exception):
     pass
 
 
+@dataclass
+class BlockRange:
+    """Prefetched operations for the blocks ``start``..``stop`` (inclusive)."""
+
+    start: int
+    stop: int
+    events: List[dict] = field(default_factory=list)
+    virtual_ops: Dict[int, List[dict]] = field(default_factory=dict)
+
+
+@dataclass
+class CatchUpState:
+    """Position shared between the parallel catch-up and the live stream.
+
+    ``next_block`` is the first block not yet processed; ``last_block`` is the block
+    of the last real op, which drives when the virtual ops of a block are emitted.
+    """
+
+    next_block: int
+    last_block: int
+    op_in_trx_counter: OpInTrxCounter = field(default_factory=OpInTrxCounter)
+
+
+def _virtual_ops_by_block(
+    blockchain: Blockchain, start: int, stop: int, max_batch_size: int | None
+) -> Dict[int, List[dict]]:
+    """Virtual ops for blocks ``start``..``stop`` keyed by block (empty list if none)."""
+    virtual_ops: Dict[int, List[dict]] = {block: [] for block in range(start, stop + 1)}
+    for virtual_event in blockchain.stream(
+        start=start,
+        stop=stop,
+        raw_ops=False,
+        only_virtual_ops=True,
+        max_batch_size=max_batch_size,
+        threading=False,
+    ):
+        virtual_ops.setdefault(virtual_event["block_num"], []).append(virtual_event)
+    return virtual_ops
+
+
+def virtual_keep(
+    opNames: list[str], keep: Callable[[RawOp], bool] | None
+) -> Callable[[RawOp], bool]:
+    """
+    Which virtual ops to validate: every virtual op of a block is needed to number
+    ``op_in_trx``, but only the ones in ``opNames`` (and wanted by ``keep``) are yielded.
+    """
+    return lambda raw: raw.op_type in opNames and (keep is None or keep(raw))
+
+
+def fetch_block_range(
+    node: str, start: int, stop: int, opNames: list[str], max_batch_size: int | None = 180
+) -> BlockRange:
+    """
+    Fetch the ops for one block range from a single node (blocking; run in a thread).
+
+    Real ops are streamed with the same ``opNames`` filter as ``stream_ops_async``; the
+    virtual ops of every block from ``start - 1`` to ``stop`` are grouped by block number
+    so the reassembly can emit them exactly where the sequential stream would.
+    """
+    hive = get_hive_client(node=[node])
+    blockchain = get_blockchain_instance(hive_instance=hive)
+    events = list(
+        blockchain.stream(
+            start=start,
+            stop=stop,
+            only_virtual_ops=False,
+            opNames=opNames,
+            max_batch_size=max_batch_size,
+            threading=False,
+        )
+    )
+    virtual_ops = _virtual_ops_by_block(blockchain, max(start - 1, 1), stop, max_batch_size)
+    return BlockRange(start=start, stop=stop, events=events, virtual_ops=virtual_ops)
+
+
+def fetch_virtual_ops(node: str, block_num: int) -> List[dict]:
+    """Virtual ops of a single block from ``node`` (blocking; run in a thread)."""
+    hive = get_hive_client(node=[node])
+    blockchain = get_blockchain_instance(hive_instance=hive)
+    return _virtual_ops_by_block(blockchain, block_num, block_num, None)[block_num]
+
+
+async def _fetch_block_range_with_retries(
+    nodes: List[str], node_index: int, start: int, stop: int, opNames: list[str]
+) -> BlockRange:
+    """
+    Fetch a range in a worker thread, moving to the next node on each failure.
+
+    The range's encrypted memos are decrypted in the memo decoder's pool before it is
+    returned, so building its ops does not stall on memo crypto.
+    """
+    error: Exception | None = None
+    for attempt in range(CATCH_UP_RETRIES):
+        node = nodes[(node_index + attempt) % len(nodes)]
+        try:
+            block_range = await asyncio.to_thread(fetch_block_range, node, start, stop, opNames)
+        except Exception as e:
+            error = e
+            logger.warning(
+                f"{ICON} Catch-up fetch {start:,}-{stop:,} failed on {node}: {e}",
+                extra={"notification": False},
+            )
+            continue
+        await MEMO_DECODER.prefetch(block_range.events, OpBase.hive_inst)
+        return block_range
+    raise error or RuntimeError(f"Catch-up fetch {start:,}-{stop:,} failed")
+
+
+async def parallel_catch_up(
+    state: CatchUpState,
+    stop_block: int,
+    nodes: List[str],
+    opNames: list[str],
+    filter_custom_json: bool = True,
+    keep: Callable[[RawOp], bool] | None = None,
+) -> AsyncGenerator[OpAny | RawOp, None]:
+    """
+    Stream blocks ``state.next_block``..``stop_block`` by fetching block ranges
+    concurrently from several nodes and yielding their ops in strict block order.
+
+    Ranges are requested round-robin across ``nodes`` with a bounded number in flight;
+    each finished range is processed only once every earlier range has been yielded.
+    The per-event handling (virtual op placement, op_in_trx numbering, custom_json
+    filtering) mirrors the sequential loop in ``stream_ops_async`` so the two produce
+    identical ops and ``state`` can be handed straight to the live stream.
+
+    Raises whatever the last retry raised if a range cannot be fetched; ``state`` then
+    points at the first block of that range so the caller can resume sequentially.
+    ``keep`` is passed to ``op_or_raw`` as in ``stream_ops_async``.
+    """
+    ranges: Deque[Tuple[int, int]] = deque(
+        (block, min(block + CATCH_UP_CHUNK_BLOCKS - 1, stop_block))
+        for block in range(state.next_block, stop_block + 1, CATCH_UP_CHUNK_BLOCKS)
+    )
+    max_in_flight = max(1, len(nodes) * CATCH_UP_CHUNKS_AHEAD)
+    in_flight: Deque[asyncio.Task] = deque()
+    virtual_cache: Dict[int, List[dict]] = {}
+    keep_virtual = virtual_keep(opNames, keep)
+    node_index = 0
+    total_blocks = stop_block - state.next_block + 1
+    started = timer()
+
+    def _schedule() -> None:
+        nonlocal node_index
+        while ranges and len(in_flight) < max_in_flight:
+            start, stop = ranges.popleft()
+            in_flight.append(
+                asyncio.create_task(
+                    _fetch_block_range_with_retries(nodes, node_index, start, stop, opNames),
+                    name=f"catch_up_{start}",
+                )
+            )
+            node_index = (node_index + 1) % len(nodes)
+
+    logger.info(
+        f"{ICON} Parallel catch-up of {total_blocks:,} blocks {state.next_block:,}-{stop_block:,} "
+        f"from {len(nodes)} nodes",
+        extra={"notification": False},
+    )
+    try:
+        _schedule()
+        while in_flight:
+            block_range = await in_flight.popleft()
+            _schedule()
+            virtual_cache.update(block_range.virtual_ops)
+            for hive_event in block_range.events:
+                if hive_event["block_num"] > state.last_block and hive_event["block_num"] <= stop_block:
+                    virtual_block = state.last_block - 1
+                    virtual_events = virtual_cache.get(virtual_block)
+                    if virtual_events is None:
+                        # Outside the prefetched ranges (no real ops for a long stretch).
+                        virtual_events = await asyncio.to_thread(
+                            fetch_virtual_ops, nodes[0], virtual_block
+                        )
+                    for virtual_event in virtual_events:
+                        state.last_block = hive_event.get("block_num", state.last_block)
+                        try:
+                            op_virtual_base = op_or_raw(virtual_event, keep_virtual)
+                        except ValueError as e:
+                            logger.warning(
+                                f"{ICON} ValidationError in block_stream:{virtual_event.get('block_num')} {virtual_event.get('trx_id')}: {e}",
+                                extra={"notification": True, "virtual_event": virtual_event},
+                            )
+                            continue
+                        state.op_in_trx_counter.op_in_trx_inc(op_virtual_base)
+                        if op_virtual_base.op_type in opNames:
+                            yield op_virtual_base
+                    for block_num in [b for b in virtual_cache if b < state.last_block - 1]:
+                        del virtual_cache[block_num]
+                if not filter_custom_json and not custom_json_test_data(hive_event):
+                    continue
+                try:
+                    op_base = op_or_raw(hive_event, keep)
+                except ValueError as e:
+                    logger.warning(
+                        f"{ICON} ValidationError in block_stream:{hive_event.get('block_num')} {hive_event.get('trx_id')}: {e}",
+                        extra={"notification": False, "hive_event": hive_event},
+                    )
+                    continue
+                state.op_in_trx_counter.op_in_trx_inc(op_base)
+                state.last_block = op_base.block_num
+                yield op_base
+            state.next_block = block_range.stop + 1
+        elapsed = timer() - started
+        logger.info(
+            f"{ICON} Parallel catch-up reached {state.next_block - 1:,}: {total_blocks:,} blocks "
+            f"in {elapsed:.1f}s ({total_blocks / max(elapsed, 1e-6):,.0f} blocks/s)",
+            extra={"notification": False},
+        )
+    finally:
+        for task in in_flight:
+            task.cancel()
+
+
 async def stream_ops_async(
     start: int = 0,
     stop: int | None = None,
@@ -49,7 +291,9 @@ async def stream_ops_async(
     hive: Hive | None = None,
     opNames: list[str] = OP_TRACKED,
     filter_custom_json: bool = True,
-) -> AsyncGenerator[OpAny, None]:
+    parallel_catch_up_enabled: bool = False,
+    keep: Callable[[RawOp], bool] | None = None,
+) -> AsyncGenerator[OpAny | RawOp, None]:
     """
     An asynchronous generator function for streaming blockchain operations.
 
@@ -68,8 +312,17 @@ async def stream_ops_async(
         opNames (list[str], optional): A list of operation names to track. Defaults to OP_TRACKED.
         filter_custom_json (bool, optional): If True, filters out operations with custom JSON data
             that do not pass a specific test. Defaults to True.
-
-        OpAny: The next operation in the stream, either a base operation or a virtual operation.
+        parallel_catch_up_enabled (bool, optional): If True and the start block is more than
+            ``CATCH_UP_MIN_BLOCKS`` behind the head, fetch the backlog concurrently from several
+            good nodes (``parallel_catch_up``) and switch to the normal stream once within that
+            distance of the head. Defaults to False.
+        keep (Callable[[RawOp], bool], optional): Decides from the raw event which ops are
+            validated into models (see ``tracked_op_filter``). Ops it rejects are yielded as
+            ``RawOp`` so the caller can still follow the block position. By default every
+            op is validated.
+
+        OpAny | RawOp: The next operation in the stream, either a base operation or a virtual
+            operation, or a ``RawOp`` for an op ``keep`` rejected.
 
     Raises:
         asyncio.CancelledError: If the streaming is cancelled.
@@ -120,6 +373,38 @@ async def stream_ops_async(
         stop_block = stop or (2**31) - 1  # Maximum value for a 32-bit signed integer
 
     last_block = start_block or 1
+    keep_virtual = virtual_keep(opNames, keep)
+
+    if parallel_catch_up_enabled and not only_virtual_ops and start_block:
+        state = CatchUpState(next_block=start_block, last_block=last_block)
+        head_block = current_block
+        catch_up_nodes = (NODE_POOL.ranked_nodes() or good_nodes)[:CATCH_UP_MAX_NODES]
+        try:
+            await TrackedBaseModel.update_quote()
+            while catch_up_nodes and head_block - state.next_block > CATCH_UP_MIN_BLOCKS:
+                async for op in parallel_catch_up(
+                    state=state,
+                    stop_block=min(head_block, stop_block),
+                    nodes=catch_up_nodes,
+                    opNames=opNames,
+                    filter_custom_json=filter_custom_json,
+                    keep=keep,
+                ):
+                    yield op
+                if state.next_block > stop_block:
+                    return
+                head_block = blockchain.get_current_block_num()
+        except (asyncio.CancelledError, KeyboardInterrupt) as e:
+            logger.info(f"{ICON} Async streamer received signal to stop. Exiting... {e}")
+            return
+        except Exception as e:
+            logger.warning(
+                f"{ICON} Parallel catch-up stopped at {state.next_block:,}: {e}, continuing sequentially",
+                extra={"notification": False},
+            )
+        start_block = state.next_block
+        last_block = state.last_block
+
     while last_block is not None and stop_block is not None and last_block < stop_block:
         await TrackedBaseModel.update_quote()
         rpc_url = str(hive.rpc.url) if hive and hive.rpc else "No RPC"
@@ -148,6 +433,7 @@ async def stream_ops_async(
             # RPC node triggers a node switch instead of blocking forever.
             async_iter = async_stream_real.__aiter__()
             current_timeout = STREAM_TIMEOUT
+            lag_checked = timer()
             while True:
                 try:
                     hive_event = await asyncio.wait_for(
@@ -163,6 +449,13 @@ async def stream_ops_async(
                     )
                     raise  # caught by the TimeoutError handler below
 
+                if timer() - lag_checked > LAG_CHECK_SECONDS:
+                    lag_checked = timer()
+                    if NODE_POOL.is_lagging(rpc_url):
+                        raise NodeLagging(
+                            f"{rpc_url} is {NODE_POOL.scores[rpc_url].lag_blocks} blocks behind"
+                        )
+
                 if (
                     not only_virtual_ops
                     and hive_event["block_num"] > last_block
@@ -185,7 +478,7 @@ async def stream_ops_async(
                     ):
                         last_block = hive_event.get("block_num", start_block)
                         try:
-                            op_virtual_base = op_any_or_base(virtual_event)
+                            op_virtual_base = op_or_raw(virtual_event, keep_virtual)
                         except ValueError as e:
                             logger.warning(
                                 f"{ICON} ValidationError in block_stream:{virtual_event.get('block_num')} {virtual_event.get('trx_id')}: {e}",
@@ -199,7 +492,7 @@ async def stream_ops_async(
                 if not filter_custom_json and not custom_json_test_data(hive_event):
                     continue
                 try:
-                    op_base = op_any_or_base(hive_event)
+                    op_base = op_or_raw(hive_event, keep)
                 except ValueError as e:
                     logger.warning(hive_event)
                     logger.warning(
@@ -223,6 +516,11 @@ async def stream_ops_async(
         except (asyncio.CancelledError, KeyboardInterrupt) as e:
             logger.info(f"{ICON} Async streamer received signal to stop. Exiting... {e}")
             return
+        except NodeLagging as e:
+            logger.warning(
+                f"{ICON} {start_block:,} {e}, switching node",
+                extra={"notification": False, "error_code": "stream_restart"},
+            )
         except asyncio.TimeoutError:
             # Stream timed out waiting for the next event — the warning
             # was already logged above.  Sleep briefly then let the
@@ -267,7 +565,7 @@ async def stream_ops_async(
                 )
             current_node = rpc_url
             if hive and hive.rpc:
-                hive.rpc.next()
+                NODE_POOL.switch(hive, failed=current_node)
                 if current_node == hive.rpc.url:
                     good_nodes = get_good_nodes()
                     hive.set_default_nodes(good_nodes)
@@ -0,0 +1,333 @@
+"""
+Watched-account ingestion for the Hive monitor.
+
+``stream_ops_async`` validates every tracked op of every block into an ``OpAny`` and
+fetches the virtual ops of every block, after which ``all_ops_loop`` throws nearly all
+of them away.  ``stream_watched_ops_async`` yields the subset ``all_ops_loop`` can act
+on and validates only that:
+
+* Virtual ops come from the account history of the watched accounts.  Only the blocks
+  holding a tracked virtual op for one of them have their virtual ops fetched, instead
+  of one ``get_ops_in_block`` call per block.
+* Real ops still come from the block stream, because tracked ``custom_json`` ids and
+  proposal votes are not tied to a watched account.  Each raw event is checked against
+  the watched accounts, custom_json ids and proposals before ``op_any_or_base`` is
+  called.
+
+``op_in_trx`` is counted on the raw events exactly as ``OpInTrxCounter`` counts them in
+``stream_ops_async``, so the ops (and their ``group_id``) are identical; only their
+order differs in that each block's virtual ops follow its real ops instead of lagging
+behind.
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import AsyncGenerator, Dict, Iterable, List, Sequence, Set, Tuple
+
+from nectar.account import Account
+from nectar.hive import Hive
+
+from v4vapp_backend_v2.actions.tracked_models import TrackedBaseModel
+from v4vapp_backend_v2.config.setup import InternalConfig, logger
+from v4vapp_backend_v2.hive.hive_extras import (
+    HIVE_BLOCK_TIME,
+    get_blockchain_instance,
+    get_hive_client,
+)
+from v4vapp_backend_v2.hive.node_pool import NODE_POOL
+from v4vapp_backend_v2.hive_models.op_all import (
+    OpAny,
+    RawOp,
+    impacted_accounts,
+    op_any_or_base,
+    op_or_raw,
+)
+from v4vapp_backend_v2.hive_models.op_base import OP_TRACKED, OpBase, OpRealm, op_realm
+
+ICON = "🎯"
+
+# Blocks requested per window while catching up.
+WATCHED_WINDOW_BLOCKS = 100
+
+
+@dataclass
+class WatchedFilter:
+    """
+    Cheap relevance test on raw events, a superset of what ``all_ops_loop`` stores.
+
+    Attributes:
+        accounts (Set[str]): Watched users, server accounts and watched witnesses.
+        custom_json_ids (Set[str]): ``custom_json`` ids tracked regardless of account.
+        proposals (Set[int]): Proposal ids whose votes are tracked regardless of account.
+    """
+
+    accounts: Set[str] = field(default_factory=set)
+    custom_json_ids: Set[str] = field(default_factory=set)
+    proposals: Set[int] = field(default_factory=set)
+
+    def relevant(self, hive_event: dict) -> bool:
+        op_type = hive_event.get("type")
+        if op_type == "custom_json":
+            return hive_event.get("id") in self.custom_json_ids
+        if op_type == "update_proposal_votes" and self.proposals.intersection(
+            hive_event.get("proposal_ids", [])
+        ):
+            return True
+        return not self.accounts.isdisjoint(impacted_accounts(hive_event))
+
+
+class HiveOpSource:
+    """
+    Block stream and account-history access for ``stream_watched_ops_async``.
+
+    Keeps the last account-history index seen per account so that, once an account has
+    had an op, later windows continue from that index instead of re-estimating it from
+    the block number.  Indexes read during a window only take effect on
+    ``commit_history`` so a failed window is re-read in full.
+    """
+
+    def __init__(self, hive: Hive):
+        self.hive = hive
+        self.blockchain = get_blockchain_instance(hive_instance=hive)
+        self._history_index: Dict[str, int] = {}
+        self._pending_index: Dict[str, int] = {}
+
+    def head_block(self) -> int:
+        return self.blockchain.get_current_block_num()
+
+    def real_ops(self, start: int, stop: int, opNames: List[str]) -> Iterable[dict]:
+        return self.blockchain.stream(
+            start=start,
+            stop=stop,
+            only_virtual_ops=False,
+            opNames=opNames,
+            max_batch_size=180,
+            threading=False,
+        )
+
+    def virtual_ops(self, block_num: int) -> List[dict]:
+        return list(
+            self.blockchain.stream(
+                start=block_num,
+                stop=block_num,
+                raw_ops=False,
+                only_virtual_ops=True,
+                threading=False,
+            )
+        )
+
+    def history_blocks(self, account: str, start: int, stop: int, op_types: List[str]) -> Set[int]:
+        """Blocks in ``start``..``stop`` holding an op of ``op_types`` in ``account``'s history."""
+        acc = Account(account, blockchain_instance=self.hive)
+        last_index = self._history_index.get(account)
+        if last_index is None:
+            history = acc.history(
+                start=start, stop=stop, use_block_num=True, only_ops=op_types, raw_output=True
+            )
+        else:
+            history = acc.history(
+                start=last_index + 1, use_block_num=False, only_ops=op_types, raw_output=True
+            )
+        blocks: Set[int] = set()
+        for index, event in history:
+            block_num = event["block"]
+            if block_num > stop:
+                break
+            if block_num >= start:
+                blocks.add(block_num)
+            self._pending_index[account] = index
+        return blocks
+
+    def commit_history(self) -> None:
+        self._history_index.update(self._pending_index)
+        self._pending_index.clear()
+
+
+@dataclass
+class _RawWindow:
+    real: List[Tuple[dict, int]] = field(default_factory=list)
+    virtual: Dict[int, List[dict]] = field(default_factory=dict)
+
+
+class _RawOpInTrx:
+    """``OpInTrxCounter`` for real ops, applied to raw events before validation."""
+
+    def __init__(self) -> None:
+        self.last_trx_id = ""
+        self.op_in_trx = 0
+
+    def inc(self, hive_event: dict) -> int:
+        trx_id = hive_event.get("trx_id", "")
+        self.op_in_trx = self.op_in_trx + 1 if trx_id == self.last_trx_id else 1
+        self.last_trx_id = trx_id
+        return self.op_in_trx
+
+
+def _fetch_window(
+    source: HiveOpSource,
+    start: int,
+    stop: int,
+    real_names: List[str],
+    virtual_names: List[str],
+    watched: WatchedFilter,
+    virtual_start: int,
+) -> _RawWindow:
+    """Blocking fetch of one window; runs in a worker thread.
+
+    Windows start on a block boundary, which no transaction spans, so each gets a fresh
+    ``op_in_trx`` counter.  Virtual ops are read from ``virtual_start`` (``start - 1``
+    for the first window, as ``stream_ops_async`` does).
+    """
+    window = _RawWindow()
+    counter = _RawOpInTrx()
+    if real_names:
+        for hive_event in source.real_ops(start, stop, real_names):
+            op_in_trx = counter.inc(hive_event)
+            if watched.relevant(hive_event):
+                window.real.append((hive_event, op_in_trx))
+    if virtual_names:
+        blocks: Set[int] = set()
+        for account in sorted(watched.accounts):
+            blocks |= source.history_blocks(account, virtual_start, stop, virtual_names)
+        for block_num in sorted(blocks):
+            window.virtual[block_num] = source.virtual_ops(block_num)
+    source.commit_history()
+    return window
+
+
+def _virtual_ops_for_block(
+    virtual_events: List[dict], opNames: List[str], watched: WatchedFilter
+) -> List[OpAny]:
+    """
+    Number a block's virtual ops like ``stream_ops_async`` and keep the watched ones.
+
+    Every virtual op of the block is counted, but only the watched ones are validated.
+    """
+    ops: List[OpAny] = []
+    last_trx_id = ""
+    op_in_trx = 0
+    for virtual_event in virtual_events:
+        try:
+            op = op_or_raw(
+                virtual_event,
+                keep=lambda raw: raw.op_type in opNames and watched.relevant(raw.hive_event),
+            )
+        except ValueError as e:
+            logger.warning(
+                f"{ICON} ValidationError in watched stream:{virtual_event.get('block_num')} {virtual_event.get('trx_id')}: {e}",
+                extra={"notification": False, "virtual_event": virtual_event},
+            )
+            continue
+        op_in_trx = op_in_trx + 1 if op.trx_id == last_trx_id else 1
+        last_trx_id = op.trx_id
+        op.op_in_trx = op_in_trx
+        if not isinstance(op, RawOp):
+            ops.append(op)
+    return ops
+
+
+async def stream_watched_ops_async(
+    watched: WatchedFilter,
+    start: int,
+    stop: int | None = None,
+    opNames: List[str] = OP_TRACKED,
+    hive: Hive | None = None,
+    source: HiveOpSource | None = None,
+    window_blocks: int = WATCHED_WINDOW_BLOCKS,
+) -> AsyncGenerator[OpAny, None]:
+    """
+    Stream the tracked ops relevant to ``watched`` from ``start`` to ``stop``.
+
+    Works through the chain in windows of up to ``window_blocks`` blocks, then follows
+    the head.  Within a window ops are yielded in block order, real ops before virtual
+    ops.  Errors retry the same window on the next node.
+
+    Args:
+        watched (WatchedFilter): Accounts, custom_json ids and proposals to keep.
+        start (int): First block to stream.
+        stop (int | None): Last block to stream; follows the head forever if None.
+        opNames (List[str]): Op types to yield. Defaults to OP_TRACKED.
+        hive (Hive | None): Client used to build the default ``HiveOpSource``.
+        source (HiveOpSource | None): Block/history access; replays pass a recorded source.
+        window_blocks (int): Blocks requested per window.
+
+    Yields:
+        OpAny: Validated ops with ``op_in_trx`` numbered as in ``stream_ops_async``.
+    """
+    if source is None:
+        hive = hive or get_hive_client()
+        source = HiveOpSource(hive)
+    if source.hive is not None:
+        # This ensures the Transaction class has a hive instance with memo keys
+        OpBase.hive_inst = source.hive
+    real_names = [name for name in opNames if op_realm(name) == OpRealm.REAL]
+    virtual_names = [name for name in opNames if op_realm(name) == OpRealm.VIRTUAL]
+    stop_block = stop if stop is not None else (2**31) - 1
+    next_block = start
+    await TrackedBaseModel.update_quote()
+    logger.info(
+        f"{ICON} Watched stream from {start:,} for {len(watched.accounts)} accounts",
+        extra={"notification": False, "accounts": sorted(watched.accounts)},
+    )
+    while next_block <= stop_block:
+        try:
+            head_block = await asyncio.to_thread(source.head_block)
+            if head_block < next_block:
+                await asyncio.sleep(HIVE_BLOCK_TIME)
+                continue
+            window_stop = min(head_block, stop_block, next_block + window_blocks - 1)
+            window = await asyncio.to_thread(
+                _fetch_window,
+                source,
+                next_block,
+                window_stop,
+                real_names,
+                virtual_names,
+                watched,
+                next_block - 1 if next_block == start else next_block,
+            )
+        except (asyncio.CancelledError, KeyboardInterrupt) as e:
+            logger.info(f"{ICON} Watched streamer received signal to stop. Exiting... {e}")
+            return
+        except Exception as e:
+            logger.warning(
+                f"{ICON} {next_block:,} Error in watched stream: {e}, retrying",
+                extra={"notification": False, "error": e},
+            )
+            if getattr(source.hive, "rpc", None):
+                NODE_POOL.switch(source.hive, failed=str(source.hive.rpc.url))
+            await asyncio.sleep(2)
+            continue
+
+        by_block: Dict[int, List[OpAny]] = {}
+        for hive_event, op_in_trx in window.real:
+            try:
+                op = op_any_or_base(hive_event)
+            except ValueError as e:
+                logger.warning(
+                    f"{ICON} ValidationError in watched stream:{hive_event.get('block_num')} {hive_event.get('trx_id')}: {e}",
+                    extra={"notification": False, "hive_event": hive_event},
+                )
+                continue
+            op.op_in_trx = op_in_trx
+            by_block.setdefault(op.block_num, []).append(op)
+        for block_num, virtual_events in window.virtual.items():
+            by_block.setdefault(block_num, []).extend(
+                _virtual_ops_for_block(virtual_events, opNames, watched)
+            )
+        for block_num in sorted(by_block):
+            for op in by_block[block_num]:
+                yield op
+        next_block = window_stop + 1
+
+
+def watched_filter_from_config(
+    watch_users: Sequence[str], watch_witnesses: Sequence[str]
+) -> WatchedFilter:
+    """Build the filter ``all_ops_loop`` needs from its arguments and the Hive config."""
+    hive_config = InternalConfig().config.hive_config
+    return WatchedFilter(
+        accounts={*watch_users, *watch_witnesses, *hive_config.server_account_names},
+        custom_json_ids=set(hive_config.custom_json_ids_tracked),
+        proposals=set(hive_config.proposals_tracked),
+    )
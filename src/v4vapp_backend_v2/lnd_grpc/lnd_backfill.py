@@ -0,0 +1,429 @@
+"""
+Concurrent, resumable backfill of LND invoices and payments into MongoDB.
+
+``read_all_invoices`` and ``read_all_payments`` used to walk the node's history one page
+at a time, newest first, with a ``find_one`` per invoice or payment to skip what was
+already stored.  On a node with hundreds of thousands of invoices ``synchronize_db`` took
+a long time and held ``pause_for_database_sync`` for all of it, and an interrupted sync
+started again from the top.
+
+``LndBackfill`` splits the history into index-offset pages and, for each page:
+
+- fetches it from LND, with ``BACKFILL_CONCURRENCY`` pages in flight;
+- converts the protobuf response to models in a worker pool (the converters are
+  top-level functions over the serialized page, so a ``ProcessPoolExecutor`` can be
+  passed in instead of the default threads);
+- looks up which records are already stored with one ``$in`` query on ``r_hash`` /
+  ``payment_hash``;
+- bulk-upserts the rest on ``group_id_query``, unordered, so a record the live
+  subscriptions already wrote is updated rather than duplicated.
+
+Progress is checkpointed in the ``lnd_backfill`` collection as the highest index below
+which every page has been stored, per node and kind.  A sync that is interrupted resumes
+from the checkpoint, and once a sync completes the next one only covers new indexes.
+
+Payments stored without a ``route_str`` (the alias lookup failed, or the live writer
+stored them before the route was known) are re-read on every sync, as before: the pages
+holding them are fetched again alongside the new ones and enriched before writing.
+
+Collection: ``lnd_backfill``
+
+    {
+        "_id": "voltage_invoices",
+        "node": "voltage",
+        "kind": "invoices",
+        "index": 250000,        # every index <= this is stored
+        "head": 251234,         # the node's last index when the sync started
+        "timestamp": ISODate("..."),
+    }
+"""
+
+import asyncio
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from timeit import default_timer as timer
+from typing import Any, ClassVar, Dict, List, Set
+
+from google.protobuf.message import Message
+from pydantic import BaseModel
+from pymongo import ASCENDING, IndexModel, UpdateOne
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.errors import BulkWriteError
+
+import v4vapp_backend_v2.lnd_grpc.lightning_pb2 as lnrpc
+from v4vapp_backend_v2.config.setup import InternalConfig, logger
+from v4vapp_backend_v2.database.db_pymongo import DATABASE_ICON
+from v4vapp_backend_v2.helpers.pub_key_alias import (
+    decode_payment_request_and_attach,
+    update_payment_route_with_alias,
+)
+from v4vapp_backend_v2.lnd_grpc.lnd_client import LNDClient
+from v4vapp_backend_v2.models.invoice_models import Invoice, ListInvoiceResponse
+from v4vapp_backend_v2.models.payment_models import ListPaymentsResponse, Payment
+
+ICON = "📥"
+
+BACKFILL_PAGE_SIZE = 1000
+BACKFILL_CONCURRENCY = 4
+BACKFILL_WORKERS = 4
+CHECKPOINT_COLLECTION = "lnd_backfill"
+
+_executor: ThreadPoolExecutor | None = None
+
+
+def _default_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=BACKFILL_WORKERS, thread_name_prefix="lnd_backfill"
+        )
+    return _executor
+
+
+def invoices_from_page(page: bytes) -> List[Invoice]:
+    """Parse a serialized ``lnrpc.ListInvoiceResponse`` into ``Invoice`` models."""
+    return ListInvoiceResponse(lnrpc.ListInvoiceResponse.FromString(page)).invoices
+
+
+def payments_from_page(page: bytes) -> List[Payment]:
+    """Parse a serialized ``lnrpc.ListPaymentsResponse`` into ``Payment`` models."""
+    return ListPaymentsResponse(lnrpc.ListPaymentsResponse.FromString(page)).payments
+
+
+@dataclass
+class BackfillStats:
+    pages: int = 0
+    fetched: int = 0
+    skipped: int = 0
+    inserted: int = 0
+    modified: int = 0
+    errors: int = 0
+    start_index: int = 0
+    checkpoint: int = 0
+    head: int = 0
+    elapsed: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+class LndBackfill(ABC):
+    """
+    Backfill one kind of LND record (see ``InvoiceBackfill`` and ``PaymentBackfill``).
+
+    Args:
+        lnd_client (LNDClient): The node to read from.
+        page_size (int): Records requested per page.
+        concurrency (int): Pages fetched and stored at the same time.
+        executor (Executor | None): Pool for the protobuf conversion; a shared thread
+            pool when not given.
+        shutdown_event (asyncio.Event | None): Stop taking new pages once set; the
+            checkpoint keeps what was finished.
+    """
+
+    kind: ClassVar[str] = ""
+    index_field: ClassVar[str] = ""
+    key_field: ClassVar[str] = ""
+    exclude: ClassVar[Set[str]] = set()
+
+    def __init__(
+        self,
+        lnd_client: LNDClient,
+        page_size: int = BACKFILL_PAGE_SIZE,
+        concurrency: int = BACKFILL_CONCURRENCY,
+        executor: Executor | None = None,
+        shutdown_event: asyncio.Event | None = None,
+    ) -> None:
+        self.lnd_client = lnd_client
+        self.page_size = page_size
+        self.concurrency = concurrency
+        self.executor = executor
+        self.shutdown_event = shutdown_event
+        self.stats = BackfillStats()
+        self._done: Set[int] = set()
+        self._next_offset = 0
+
+    # MARK: Per kind
+
+    @classmethod
+    @abstractmethod
+    def collection(cls) -> AsyncCollection:
+        pass
+
+    @abstractmethod
+    def list_request(self, index_offset: int, count: int, reversed: bool = False) -> Message:
+        pass
+
+    @abstractmethod
+    async def list_call(self, request: Message) -> Any:
+        pass
+
+    @staticmethod
+    @abstractmethod
+    def convert(page: bytes) -> List[Any]:
+        pass
+
+    async def prepare(self, records: List[Any], stored: Dict[str, Dict[str, Any]]) -> List[Any]:
+        """The records of a page that need writing; by default those not stored yet."""
+        return [record for record in records if self.key_of(record) not in stored]
+
+    async def revisit_offsets(self, start: int) -> List[int]:
+        """Offsets of pages below *start* to read again; none by default."""
+        return []
+
+    def index_of(self, record: Any) -> int:
+        return int(getattr(record, self.index_field))
+
+    def key_of(self, record: Any) -> str:
+        return getattr(record, self.key_field)
+
+    def document(self, record: BaseModel) -> Dict[str, Any]:
+        return record.model_dump(exclude_none=True, exclude_unset=True, exclude=self.exclude)
+
+    # MARK: Checkpoint
+
+    @property
+    def checkpoint_id(self) -> str:
+        return f"{self.lnd_client.connection.name}_{self.kind}"
+
+    @staticmethod
+    def checkpoint_collection() -> AsyncCollection:
+        return InternalConfig.db[CHECKPOINT_COLLECTION]
+
+    async def load_checkpoint(self) -> int:
+        doc = await self.checkpoint_collection().find_one({"_id": self.checkpoint_id})
+        return int(doc.get("index", 0)) if doc else 0
+
+    async def save_checkpoint(self, index: int) -> None:
+        await self.checkpoint_collection().update_one(
+            {"_id": self.checkpoint_id},
+            {
+                # Pages finish out of order and saves can overtake each other.
+                "$max": {"index": index},
+                "$set": {
+                    "node": self.lnd_client.connection.name,
+                    "kind": self.kind,
+                    "head": self.stats.head,
+                    "timestamp": datetime.now(tz=timezone.utc),
+                },
+            },
+            upsert=True,
+        )
+
+    async def ensure_indexes(self) -> None:
+        indexes = [
+            IndexModel([(field, ASCENDING)], name=f"{field}_1")
+            for field in (self.index_field, self.key_field)
+        ]
+        await self.collection().create_indexes(indexes)
+
+    # MARK: Run
+
+    async def head_index(self) -> int:
+        """The node's most recent index, from a one record, newest first request."""
+        response = await self.list_call(self.list_request(0, 1, reversed=True))
+        return int(response.last_index_offset)
+
+    async def run(self, restart: bool = False) -> BackfillStats:
+        """
+        Store every record between the checkpoint and the node's current head.
+
+        Args:
+            restart (bool): Ignore the checkpoint and go through the whole history,
+                still skipping records that are stored.
+
+        Returns:
+            BackfillStats: Counts for this run; ``checkpoint`` is where the next starts.
+        """
+        t0 = timer()
+        icon = f"{self.lnd_client.icon} {DATABASE_ICON} {ICON}"
+        await self.ensure_indexes()
+        start = 0 if restart else await self.load_checkpoint()
+        self.stats = BackfillStats(start_index=start, checkpoint=start)
+        self.stats.head = await self.head_index()
+        revisit = await self.revisit_offsets(start) if start else []
+        if self.stats.head <= start and not revisit:
+            logger.info(f"{icon} No new {self.kind} since index {start}")
+            return self.stats
+        logger.info(
+            f"{icon} Backfilling {self.kind} {start}..{self.stats.head}"
+            + (f", revisiting {len(revisit)} pages" if revisit else "")
+        )
+
+        offsets: asyncio.Queue[int] = asyncio.Queue()
+        for offset in [*revisit, *range(start, self.stats.head, self.page_size)]:
+            offsets.put_nowait(offset)
+        self._done = set()
+        self._next_offset = start
+        workers = [
+            asyncio.create_task(self._worker(offsets), name=f"backfill_{self.kind}_{n}")
+            for n in range(min(self.concurrency, offsets.qsize()))
+        ]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await self._advance_checkpoint()
+            self.stats.elapsed = timer() - t0
+            logger.info(
+                f"{icon} Backfilled {self.kind}: {self.stats.fetched:,} read, "
+                f"{self.stats.inserted:,} inserted, {self.stats.modified:,} modified, "
+                f"{self.stats.skipped:,} already stored, checkpoint {self.stats.checkpoint} "
+                f"in {self.stats.elapsed:.1f}s",
+                extra={"notification": False, "backfill": self.stats.as_dict()},
+            )
+        return self.stats
+
+    async def _worker(self, offsets: "asyncio.Queue[int]") -> None:
+        while not offsets.empty():
+            if self.shutdown_event is not None and self.shutdown_event.is_set():
+                return
+            offset = offsets.get_nowait()
+            await self._page(offset)
+            if offset >= self.stats.start_index:
+                self._done.add(offset)
+                await self._advance_checkpoint()
+
+    async def _page(self, offset: int) -> None:
+        response = await self.list_call(self.list_request(offset, self.page_size))
+        loop = asyncio.get_running_loop()
+        records = await loop.run_in_executor(
+            self.executor or _default_executor(), self.convert, response.SerializeToString()
+        )
+        # LND returns records after ``offset``; keep the page to its own slot so pages
+        # never overlap even if the node skips indexes.
+        upper = offset + self.page_size
+        records = [r for r in records if offset < self.index_of(r) <= upper]
+        self.stats.pages += 1
+        self.stats.fetched += len(records)
+        if not records:
+            return
+
+        collection = self.collection()
+        stored: Dict[str, Dict[str, Any]] = {}
+        keys = [self.key_of(r) for r in records]
+        async for doc in collection.find({self.key_field: {"$in": keys}}):
+            stored[doc[self.key_field]] = doc
+        to_write = await self.prepare(records, stored)
+        self.stats.skipped += len(records) - len(to_write)
+        if not to_write:
+            return
+
+        requests = [
+            UpdateOne(
+                record.group_id_query,
+                {"$set": self.document(record)},
+                upsert=True,
+            )
+            for record in to_write
+        ]
+        try:
+            result = await collection.bulk_write(requests, ordered=False)
+            self.stats.inserted += result.upserted_count
+            self.stats.modified += result.modified_count
+        except BulkWriteError as e:
+            # Unordered: everything but the failed writes went through.
+            self.stats.errors += len(e.details.get("writeErrors", []))
+            self.stats.inserted += e.details.get("nUpserted", 0)
+            self.stats.modified += e.details.get("nModified", 0)
+            logger.warning(
+                f"{ICON} {self.kind} page {offset}: {len(e.details.get('writeErrors', []))} "
+                "write errors",
+                extra={"notification": False, "details": e.details},
+            )
+
+    async def _advance_checkpoint(self) -> None:
+        """Move the checkpoint over the pages finished contiguously from it."""
+        while self._next_offset in self._done:
+            self._done.discard(self._next_offset)
+            self._next_offset += self.page_size
+        checkpoint = min(self._next_offset, self.stats.head)
+        if checkpoint > self.stats.checkpoint:
+            self.stats.checkpoint = checkpoint
+            await self.save_checkpoint(checkpoint)
+
+
+class InvoiceBackfill(LndBackfill):
+    kind = "invoices"
+    index_field = "add_index"
+    key_field = "r_hash"
+    exclude = {"conv"}
+
+    @classmethod
+    def collection(cls) -> AsyncCollection:
+        return Invoice.collection()
+
+    def list_request(self, index_offset: int, count: int, reversed: bool = False) -> Message:
+        return lnrpc.ListInvoiceRequest(
+            pending_only=False,
+            index_offset=index_offset,
+            num_max_invoices=count,
+            reversed=reversed,
+        )
+
+    async def list_call(self, request: Message) -> lnrpc.ListInvoiceResponse:
+        return await self.lnd_client.call(self.lnd_client.lightning_stub.ListInvoices, request)
+
+    convert = staticmethod(invoices_from_page)
+
+
+class PaymentBackfill(LndBackfill):
+    kind = "payments"
+    index_field = "payment_index"
+    key_field = "payment_hash"
+    exclude = {"conv", "conv_fee"}
+
+    @classmethod
+    def collection(cls) -> AsyncCollection:
+        return Payment.collection()
+
+    def list_request(self, index_offset: int, count: int, reversed: bool = False) -> Message:
+        return lnrpc.ListPaymentsRequest(
+            include_incomplete=True,
+            index_offset=index_offset,
+            max_payments=count,
+            reversed=reversed,
+        )
+
+    async def list_call(self, request: Message) -> lnrpc.ListPaymentsResponse:
+        return await self.lnd_client.call(self.lnd_client.lightning_stub.ListPayments, request)
+
+    convert = staticmethod(payments_from_page)
+
+    async def prepare(
+        self, records: List[Payment], stored: Dict[str, Dict[str, Any]]
+    ) -> List[Payment]:
+        """
+        Payments that are new, or stored without a route, get the route aliases and the
+        decoded pay request attached before they are written.
+        """
+        to_write = [
+            payment
+            for payment in records
+            if not stored.get(self.key_of(payment), {}).get("route_str")
+        ]
+        for payment in to_write:
+            await update_payment_route_with_alias(
+                lnd_client=self.lnd_client,
+                payment=payment,
+                fill_cache=True,
+                col_pub_keys="pub_keys",
+            )
+            await decode_payment_request_and_attach(lnd_client=self.lnd_client, payment=payment)
+        return to_write
+
+    async def revisit_offsets(self, start: int) -> List[int]:
+        """The pages below the checkpoint that hold payments stored without a route."""
+        offsets: Set[int] = set()
+        cursor = self.collection().find(
+            {self.index_field: {"$lte": start}, "route_str": {"$in": [None, ""]}},
+            projection={self.index_field: 1},
+        )
+        async for doc in cursor:
+            index = int(doc.get(self.index_field) or 0)
+            if index > 0:
+                offsets.add((index - 1) // self.page_size * self.page_size)
+        return sorted(offsets)
@@ -33,7 +33,7 @@ async def reply_with_balance_request(transfer: TrackedTransfer, nobroadcast: boo
 
     amount = Amount(str(transfer.amount))
     net_msats, _ = await keepsats_balance(
-        cust_id=transfer.cust_id, line_items=False, notifications=False
+        cust_id=transfer.cust_id, line_items=False, notifications=False, use_running_balance=True
     )
 
     net_sats = net_msats / Decimal(1000)
@@ -184,6 +184,7 @@ async def reply_with_hive(details: HiveReturnDetails, nobroadcast: bool = False)
                 to_account=details.pay_to_cust_id,  # Repay to the original sender
                 amount=adjusted_amount,
                 memo=memo,
+                batched=True,
             )
         except HiveTransferError as e:
             error_message = f"Failed to send Hive transfer: {e}"
@@ -232,6 +233,7 @@ async def reply_with_hive(details: HiveReturnDetails, nobroadcast: bool = False)
                 active=True,
                 id=custom_json_id,
                 hive_client=hive_client,
+                batched=True,
             )
             return_amount_msat = 0  # Custom JSON does not have a return amount in msats
             logger.info(
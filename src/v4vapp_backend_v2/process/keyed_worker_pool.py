@@ -0,0 +1,246 @@
+"""
+Bounded asyncio worker pool with per-key FIFO ordering.
+
+Jobs are sharded by a key (for the DB monitor this is the customer id).  Jobs that
+share a key run strictly one after another in submission order; jobs with
+different keys run in parallel on up to ``workers`` worker tasks.  A key is only
+ever held by one worker at a time, so a busy customer cannot starve the others:
+after each job the key goes to the back of the ready queue.
+
+``CompletionWatermark`` tracks which submitted events have finished so a resume
+token is only advanced past a contiguous prefix of completed events.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable
+
+from v4vapp_backend_v2.config.setup import logger
+
+ICON = "🧵"
+
+DEFAULT_WORKERS = 8
+DEFAULT_MAX_PENDING = 1_000
+
+Job = Callable[[], Awaitable[Any]]
+DoneCallback = Callable[[], None]
+
+
+@dataclass
+class WorkerStats:
+    """Latency and throughput for one worker task."""
+
+    processed: int = 0
+    errors: int = 0
+    busy_key: str = ""
+    last_latency: float = 0.0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+
+    @property
+    def avg_latency(self) -> float:
+        return self.total_latency / self.processed if self.processed else 0.0
+
+    def record(self, latency: float, error: bool) -> None:
+        self.processed += 1
+        self.errors += int(error)
+        self.last_latency = latency
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "processed": self.processed,
+            "errors": self.errors,
+            "busy_key": self.busy_key,
+            "last_latency": round(self.last_latency, 4),
+            "avg_latency": round(self.avg_latency, 4),
+            "max_latency": round(self.max_latency, 4),
+        }
+
+
+@dataclass
+class _Entry:
+    job: Job
+    on_done: DoneCallback | None
+    submitted: float = field(default_factory=time.monotonic)
+
+
+class KeyedWorkerPool:
+    """
+    Run async jobs on a bounded set of workers, preserving order per key.
+
+    Args:
+        name (str): Used in log lines and worker task names.
+        workers (int): Maximum number of jobs running at once.
+        max_pending (int): ``submit`` waits while this many jobs are queued or running.
+    """
+
+    def __init__(
+        self,
+        name: str = "pool",
+        workers: int = DEFAULT_WORKERS,
+        max_pending: int = DEFAULT_MAX_PENDING,
+    ) -> None:
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.name = name
+        self.workers = workers
+        self.max_pending = max(max_pending, 1)
+        self._queues: Dict[Hashable, Deque[_Entry]] = {}
+        self._ready: asyncio.Queue[Hashable] = asyncio.Queue()
+        self._pending = 0
+        self._slots = asyncio.Semaphore(self.max_pending)
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._tasks: list[asyncio.Task] = []
+        self.worker_stats: list[WorkerStats] = [WorkerStats() for _ in range(workers)]
+        self.max_queue_wait = 0.0
+
+    @property
+    def running(self) -> bool:
+        return any(not t.done() for t in self._tasks)
+
+    @property
+    def pending(self) -> int:
+        """Jobs submitted and not yet finished (queued or running)."""
+        return self._pending
+
+    def start(self) -> None:
+        """Start the worker tasks; safe to call more than once."""
+        if self.running:
+            return
+        self._tasks = [
+            asyncio.create_task(self._worker(i), name=f"{self.name}_worker_{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Cancel the workers.  Queued jobs are dropped and their ``on_done`` never runs."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, key: Hashable, job: Job, on_done: DoneCallback | None = None) -> None:
+        """
+        Queue ``job`` behind any earlier jobs for ``key``.
+
+        Waits while the pool already holds ``max_pending`` jobs.  ``on_done`` is called
+        once the job has finished, whether or not it raised, but not if the worker is
+        cancelled mid-job.
+        """
+        self.start()
+        await self._slots.acquire()
+        self._pending += 1
+        self._idle.clear()
+        queue = self._queues.get(key)
+        if queue is None:
+            # Key is not queued or held by a worker: make it ready.
+            self._queues[key] = deque([_Entry(job, on_done)])
+            self._ready.put_nowait(key)
+        else:
+            queue.append(_Entry(job, on_done))
+
+    async def join(self) -> None:
+        """Wait until every submitted job has finished."""
+        await self._idle.wait()
+
+    async def _worker(self, index: int) -> None:
+        stats = self.worker_stats[index]
+        while True:
+            key = await self._ready.get()
+            queue = self._queues[key]
+            entry = queue.popleft()
+            self.max_queue_wait = max(self.max_queue_wait, time.monotonic() - entry.submitted)
+            stats.busy_key = str(key)
+            started = time.monotonic()
+            error = False
+            try:
+                await entry.job()
+            except Exception as e:
+                error = True
+                logger.error(
+                    f"{ICON} {self.name} job for {key} failed: {e}",
+                    extra={"notification": False, "error": e},
+                )
+            finally:
+                stats.busy_key = ""
+                if queue:
+                    self._ready.put_nowait(key)
+                else:
+                    del self._queues[key]
+                self._release()
+            stats.record(time.monotonic() - started, error)
+            if entry.on_done is not None:
+                try:
+                    entry.on_done()
+                except Exception as e:
+                    logger.warning(
+                        f"{ICON} {self.name} completion callback for {key} failed: {e}",
+                        extra={"notification": False, "error": e},
+                    )
+
+    def _release(self) -> None:
+        self._pending -= 1
+        if self._pending == 0:
+            self._idle.set()
+        self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and per-worker latency, for health checks."""
+        return {
+            "workers": self.workers,
+            "pending": self._pending,
+            "queued_keys": len(self._queues),
+            "ready_keys": self._ready.qsize(),
+            "max_queue_wait": round(self.max_queue_wait, 4),
+            "worker_stats": [s.as_dict() for s in self.worker_stats],
+        }
+
+
+class CompletionWatermark:
+    """
+    Advance a resume token only past events whose processing has completed.
+
+    Events are registered in stream order with ``add`` and finished in any order with
+    ``done``.  ``on_advance`` is called with the token of the newest event for which it
+    and every earlier event are done.
+    """
+
+    def __init__(self, on_advance: Callable[[Any], None]) -> None:
+        self.on_advance = on_advance
+        self._next_seq = 0
+        self._outstanding: OrderedDict[int, list] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._outstanding)
+
+    def add(self, token: Any) -> int:
+        seq = self._next_seq
+        self._next_seq += 1
+        self._outstanding[seq] = [token, False]
+        return seq
+
+    def done(self, seq: int) -> None:
+        item = self._outstanding.get(seq)
+        if item is None:
+            return
+        item[1] = True
+        advanced_to = None
+        while self._outstanding:
+            token, finished = next(iter(self._outstanding.values()))
+            if not finished:
+                break
+            self._outstanding.popitem(last=False)
+            advanced_to = token
+        if advanced_to is not None:
+            try:
+                self.on_advance(advanced_to)
+            except Exception as e:
+                logger.warning(
+                    f"{ICON} Failed to advance resume token: {e}",
+                    extra={"notification": False, "error": e},
+                )
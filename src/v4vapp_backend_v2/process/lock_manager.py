@@ -0,0 +1,410 @@
+"""
+Local-first lock manager behind ``LockStr``.
+
+``LockStr`` locks used to be plain Redis locks: every acquisition was a Redis round
+trip, and a waiter polled Redis every half second until the key went away,
+even when the holder was another task in the same process.
+
+Here each lock name has an in-process FIFO queue.  Only the task at the head of the
+queue talks to Redis:
+
+- ``SET lock_str:<name> <owner> NX [PX]`` takes the cross-process lease, pipelined
+  with ``INCR lock_str_fence`` for a fencing token.  Tokens only ever increase, so
+  anything that records the token can reject a write from a holder whose lease
+  expired and was taken by another process.
+- When the key is held by another process the waiter sleeps until a release is
+  published on ``RELEASE_CHANNEL``.  It also wakes at the key's expiry, and at least
+  every ``REDIS_RECHECK_SEC`` in case a message was missed.
+- On release with local waiters queued, the lease is handed to the next waiter
+  without touching Redis.  After ``MAX_LOCAL_HANDOFFS`` consecutive handoffs it is
+  released to Redis instead, so other processes get a turn.  A waiter that asks for
+  a ``timeout`` renews the handed-off lease only while the key still holds its owner
+  value; if the lease was lost it takes a new one from Redis.
+- Otherwise the key is deleted only while it still holds this lease's owner value
+  (WATCH/MULTI), and the release is published.
+
+Locks are not re-entrant, as before.  Every waiter's details are kept in memory for
+the outstanding-lock reports.
+"""
+
+import asyncio
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List
+
+from redis.exceptions import WatchError
+
+from v4vapp_backend_v2.config.setup import InternalConfig, logger
+
+ICON = "🔒"
+
+LOCK_PREFIX = "lock_str:"
+FENCE_KEY = "lock_str_fence"
+RELEASE_CHANNEL = "lock_str_released"
+
+MAX_LOCAL_HANDOFFS = 32
+REDIS_RECHECK_SEC = 5.0
+
+
+class LockTimeout(Exception):
+    """Raised when a lock could not be acquired within ``blocking_timeout``."""
+
+
+@dataclass
+class LockLease:
+    """The cross-process Redis lease this process holds for one lock name."""
+
+    name: str
+    owner: str
+    fence: int
+    details: str = ""
+    acquired: float = field(default_factory=time.time)
+    handoffs: int = 0
+
+    @property
+    def key(self) -> str:
+        return f"{LOCK_PREFIX}{self.name}"
+
+
+@dataclass
+class _LockState:
+    held: bool = False
+    lease: LockLease | None = None
+    queue: Deque[asyncio.Future] = field(default_factory=deque)
+    # request_id -> {"details": str, "started": float}
+    waiters: Dict[str, Dict[str, float | str]] = field(default_factory=dict)
+
+    @property
+    def idle(self) -> bool:
+        return not self.held and not self.queue and not self.waiters
+
+
+class LockManager:
+    """
+    Grant ``LockStr`` locks in memory within a process and through Redis across processes.
+
+    Args:
+        max_local_handoffs (int): Consecutive in-process handoffs before the Redis
+            lease is released so other processes can take it.
+        recheck (float): Longest wait between Redis attempts without a release message.
+    """
+
+    def __init__(
+        self, max_local_handoffs: int = MAX_LOCAL_HANDOFFS, recheck: float = REDIS_RECHECK_SEC
+    ) -> None:
+        self.max_local_handoffs = max_local_handoffs
+        self.recheck = recheck
+        self.process_id = uuid.uuid4().hex[:12]
+        self._states: Dict[str, _LockState] = {}
+        self._released: Dict[str, asyncio.Event] = {}
+        self._listener: asyncio.Task | None = None
+        self._client: Any = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self.stats = {"local_handoffs": 0, "redis_acquires": 0, "redis_waits": 0}
+
+    @property
+    def redis(self):
+        return InternalConfig.redis_async
+
+    # MARK: Acquire
+
+    async def acquire(
+        self,
+        name: str,
+        timeout: float | None = None,
+        blocking_timeout: float | None = None,
+        details: str = "",
+        on_wait: Any = None,
+    ) -> LockLease:
+        """
+        Acquire ``name``, waiting behind local holders first and then for Redis.
+
+        Args:
+            name: Lock name (the ``LockStr`` value).
+            timeout: Lease lifetime in seconds; None never expires.
+            blocking_timeout: Give up after this many seconds; None waits indefinitely.
+            details: Shown in outstanding-lock reports while waiting.
+            on_wait: Optional ``callable(name)`` run every time a wait step times out,
+                used by ``LockStr`` for its throttled "still waiting" warnings.
+
+        Raises:
+            LockTimeout: ``blocking_timeout`` passed before the lock was granted.
+        """
+        self._check_loop()
+        loop = asyncio.get_running_loop()
+        deadline = None if blocking_timeout is None else loop.time() + blocking_timeout
+        state = self._states.setdefault(name, _LockState())
+        request_id = uuid.uuid4().hex
+        state.waiters[request_id] = {"details": details, "started": time.time()}
+        try:
+            if state.held or state.queue:
+                await self._wait_turn(name, state, deadline, on_wait)
+            else:
+                state.held = True
+            # The turn is ours: reuse a handed-off lease or take one from Redis.
+            try:
+                lease = state.lease
+                if lease is not None and timeout is not None:
+                    if not await self._renew_redis(lease, timeout):
+                        lease = state.lease = None
+                if lease is None:
+                    lease = await self._acquire_redis(name, timeout, deadline, on_wait)
+                    state.lease = lease
+            except BaseException:
+                self._give_up_turn(name, state)
+                raise
+            lease.details = details
+            lease.acquired = time.time()
+            return lease
+        finally:
+            state.waiters.pop(request_id, None)
+            self._forget_if_idle(name, state)
+
+    async def _wait_turn(
+        self, name: str, state: _LockState, deadline: float | None, on_wait: Any
+    ) -> None:
+        future = asyncio.get_running_loop().create_future()
+        state.queue.append(future)
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(asyncio.shield(future), self._step(deadline))
+                    return
+                except asyncio.TimeoutError:
+                    if deadline is not None and asyncio.get_running_loop().time() >= deadline:
+                        raise LockTimeout(name)
+                    if on_wait is not None:
+                        await on_wait(name)
+        except BaseException:
+            if future.done() and not future.cancelled():
+                # Handed the turn just as we gave up: pass it on.
+                self._give_up_turn(name, state)
+            else:
+                future.cancel()
+                try:
+                    state.queue.remove(future)
+                except ValueError:
+                    pass
+            raise
+
+    async def _acquire_redis(
+        self, name: str, timeout: float | None, deadline: float | None, on_wait: Any
+    ) -> LockLease:
+        key = f"{LOCK_PREFIX}{name}"
+        owner = f"{self.process_id}:{uuid.uuid4().hex[:8]}"
+        px = int(timeout * 1000) if timeout is not None else None
+        loop = asyncio.get_running_loop()
+        while True:
+            # Armed before trying so a release between the attempt and the wait is seen.
+            released = self._release_event(name)
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.incr(FENCE_KEY)
+                pipe.set(key, owner, nx=True, px=px)
+                fence, acquired = await pipe.execute()
+            if acquired:
+                self.stats["redis_acquires"] += 1
+                return LockLease(name=name, owner=owner, fence=int(fence))
+            self.stats["redis_waits"] += 1
+            self._ensure_listener()
+            wait = self.recheck
+            pttl = await self.redis.pttl(key)
+            if pttl is not None and pttl > 0:
+                wait = min(wait, pttl / 1000)
+            if deadline is not None:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise LockTimeout(name)
+                wait = min(wait, remaining)
+            try:
+                await asyncio.wait_for(released.wait(), wait)
+            except asyncio.TimeoutError:
+                if on_wait is not None:
+                    await on_wait(name)
+
+    async def _renew_redis(self, lease: LockLease, timeout: float) -> bool:
+        """Reset a handed-off lease's expiry; False if the key no longer holds its owner."""
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                await pipe.watch(lease.key)
+                if await pipe.get(lease.key) == lease.owner:
+                    pipe.multi()
+                    pipe.pexpire(lease.key, int(timeout * 1000))
+                    await pipe.execute()
+                    return True
+                await pipe.unwatch()
+        except WatchError:
+            pass
+        logger.warning(
+            f"{ICON} Lock {lease.name} expired or was taken over before handoff "
+            f"(fence {lease.fence})",
+            extra={"notification": False},
+        )
+        return False
+
+    # MARK: Release
+
+    async def release(self, name: str) -> bool:
+        """Release ``name`` if this process holds it; False if it does not."""
+        state = self._states.get(name)
+        if state is None or not state.held:
+            return False
+        lease = state.lease
+        if state.queue and lease is not None and lease.handoffs < self.max_local_handoffs:
+            lease.handoffs += 1
+            self.stats["local_handoffs"] += 1
+            self._pass_turn(state)
+            return True
+        state.lease = None
+        try:
+            if lease is not None:
+                await self._release_redis(lease)
+        finally:
+            if state.queue:
+                self._pass_turn(state)
+            else:
+                state.held = False
+                self._forget_if_idle(name, state)
+        return True
+
+    async def _release_redis(self, lease: LockLease) -> None:
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                await pipe.watch(lease.key)
+                if await pipe.get(lease.key) != lease.owner:
+                    await pipe.unwatch()
+                    logger.warning(
+                        f"{ICON} Lock {lease.name} expired or was taken over before release "
+                        f"(fence {lease.fence})",
+                        extra={"notification": False},
+                    )
+                    return
+                pipe.multi()
+                pipe.delete(lease.key)
+                pipe.publish(RELEASE_CHANNEL, lease.name)
+                await pipe.execute()
+        except WatchError:
+            logger.warning(
+                f"{ICON} Lock {lease.name} changed during release (fence {lease.fence})",
+                extra={"notification": False},
+            )
+
+    def _pass_turn(self, state: _LockState) -> None:
+        """Hand the lock (and any lease) to the next live local waiter."""
+        while state.queue:
+            future = state.queue.popleft()
+            if not future.done():
+                state.held = True
+                future.set_result(None)
+                return
+        state.held = False
+
+    def _give_up_turn(self, name: str, state: _LockState) -> None:
+        """Release a turn that was granted but never used (cancelled or failed)."""
+        if state.queue:
+            self._pass_turn(state)
+            return
+        state.held = False
+        lease, state.lease = state.lease, None
+        if lease is not None:
+            asyncio.ensure_future(self._release_redis(lease))
+        self._forget_if_idle(name, state)
+
+    def _forget_if_idle(self, name: str, state: _LockState) -> None:
+        if state.idle and state.lease is None and self._states.get(name) is state:
+            del self._states[name]
+            self._released.pop(name, None)
+
+    # MARK: Release notifications
+
+    def _release_event(self, name: str) -> asyncio.Event:
+        event = self._released.get(name)
+        if event is None:
+            event = self._released[name] = asyncio.Event()
+        event.clear()
+        return event
+
+    def _ensure_listener(self) -> None:
+        if (
+            self._listener is not None
+            and not self._listener.done()
+            and self._client is self.redis
+        ):
+            return
+        if self._listener is not None:
+            self._listener.cancel()
+        self._client = self.redis
+        self._listener = asyncio.create_task(self._listen(self._client), name="lock_listener")
+
+    async def _listen(self, client: Any) -> None:
+        pubsub = client.pubsub()
+        try:
+            await pubsub.subscribe(RELEASE_CHANNEL)
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                name = message.get("data")
+                if isinstance(name, bytes):
+                    name = name.decode()
+                event = self._released.get(name)
+                if event is not None:
+                    event.set()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Waiters fall back to rechecking every ``recheck`` seconds.
+            logger.info(
+                f"{ICON} Lock release listener stopped: {e}", extra={"notification": False}
+            )
+        finally:
+            try:
+                await pubsub.aclose()
+            except Exception:
+                pass
+
+    async def publish_release(self, *names: str) -> None:
+        """Wake waiters everywhere for keys removed outside ``release`` (clears, expiries)."""
+        if not names:
+            return
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for name in names:
+                pipe.publish(RELEASE_CHANNEL, name)
+            await pipe.execute()
+
+    # MARK: State
+
+    def _check_loop(self) -> None:
+        """Futures and the listener belong to one event loop; start over if it changed."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._states = {}
+            self._released = {}
+            self._listener = None
+            self._client = None
+            self._loop = loop
+
+    @staticmethod
+    def _step(deadline: float | None, report_every: float = 10.0) -> float:
+        if deadline is None:
+            return report_every
+        return max(min(report_every, deadline - asyncio.get_running_loop().time()), 0)
+
+    def held(self, name: str) -> bool:
+        state = self._states.get(name)
+        return state is not None and state.held
+
+    def lease(self, name: str) -> LockLease | None:
+        state = self._states.get(name)
+        return state.lease if state is not None and state.held else None
+
+    def waiters(self) -> Dict[str, List[Dict[str, float | str]]]:
+        """In-process waiters per lock name, for the outstanding-lock reports."""
+        return {
+            name: [dict(info) for info in state.waiters.values()]
+            for name, state in self._states.items()
+            if state.waiters
+        }
+
+
+LOCK_MANAGER = LockManager()
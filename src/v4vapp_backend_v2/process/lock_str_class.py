@@ -1,6 +1,5 @@
 import asyncio
 import time
-import uuid
 from contextlib import asynccontextmanager
 from typing import Annotated
 
@@ -11,16 +10,11 @@ from redis.exceptions import LockError, LockNotOwnedError
 
 from v4vapp_backend_v2.config.setup import InternalConfig, logger
 from v4vapp_backend_v2.hive_models.account_name_type import AccName
+from v4vapp_backend_v2.process.lock_manager import LOCK_MANAGER, LockLease, LockTimeout
 
 LOCK_REPORTING_TIME = 10
-LOOK_POLLING_SLEEP_TIME = 0.5
 ICON = "🔒"
 
-# In-process tracking of outstanding lock waiters.
-# cust_id -> request_id -> {"details": str, "started": float}
-_OUTSTANDING_WAITERS: dict[str, dict[str, dict[str, float | str]]] = {}
-_OUTSTANDING_LOCK = asyncio.Lock()
-
 # Per-object rate-limit for wait warnings: cust_id -> next_allowed_epoch
 _NEXT_ALLOWED_WARN: dict[str, float] = {}
 
@@ -34,32 +28,8 @@ class CustIDLockException(Exception):
     pass
 
 
-async def _register_waiter(cust_id: str, request_id: str, details: str) -> None:
-    async with _OUTSTANDING_LOCK:
-        bucket = _OUTSTANDING_WAITERS.setdefault(str(cust_id), {})
-        bucket[request_id] = {"details": details, "started": time.time()}
-        # Initialize throttle window if not present
-        _NEXT_ALLOWED_WARN.setdefault(str(cust_id), 0.0)
-
-
-async def _unregister_waiter(cust_id: str, request_id: str) -> None:
-    async with _OUTSTANDING_LOCK:
-        bucket = _OUTSTANDING_WAITERS.get(str(cust_id))
-        if bucket and request_id in bucket:
-            bucket.pop(request_id, None)
-            if not bucket:
-                _OUTSTANDING_WAITERS.pop(str(cust_id), None)
-                _NEXT_ALLOWED_WARN.pop(str(cust_id), None)
-
-
 async def _snapshot_waiters() -> dict[str, list[dict[str, float | str]]]:
-    async with _OUTSTANDING_LOCK:
-        return {
-            cid: [
-                {"details": info["details"], "started": info["started"]} for info in reqs.values()
-            ]
-            for cid, reqs in _OUTSTANDING_WAITERS.items()
-        }
+    return LOCK_MANAGER.waiters()
 
 
 async def _log_outstanding_locks() -> None:
@@ -170,6 +140,9 @@ class LockStr(AccName):
         """
         Acquire a lock for this object ID.
 
+        Waiters in this process queue in memory (FIFO) and only the head of the queue
+        goes to Redis; see ``lock_manager`` for the handoff and fencing rules.
+
         Args:
             timeout: Maximum life for the lock in seconds (None for no expiry)
             blocking_timeout: How long to wait before giving up (None waits indefinitely)
@@ -178,79 +151,67 @@ class LockStr(AccName):
         Returns:
             bool: True if lock was acquired successfully
         """
-        # Ensure periodic reporter is running
-        start_lock_reporter()
-
-        redis_instance = InternalConfig.redis_async
+        await self.acquire_lease(
+            timeout=timeout, blocking_timeout=blocking_timeout, request_details=request_details
+        )
+        return True
 
-        # Track this waiter (multiple per cust_id supported)
-        request_id = f"{uuid.uuid4()}"
-        await _register_waiter(str(self), request_id, request_details or "")
+    async def acquire_lease(
+        self,
+        timeout: int | None = None,
+        blocking_timeout: int | None = 60,
+        request_details: str = "",
+    ) -> LockLease:
+        """
+        Acquire a lock for this object ID and return its lease.
 
+        ``lease.fence`` is a fencing token: it increases with every Redis acquisition,
+        so a store that records it can reject writes from a holder whose lease expired.
+        Local handoffs within this process share the lease and its token.
+        """
+        # Ensure periodic reporter is running
+        start_lock_reporter()
+        _NEXT_ALLOWED_WARN.setdefault(str(self), 0.0)
         try:
-            lock = RedisLock(
-                redis_instance,
-                name=self.lock_key,
+            lease = await LOCK_MANAGER.acquire(
+                str(self),
                 timeout=timeout,
-                sleep=LOOK_POLLING_SLEEP_TIME,
-                blocking=True,
                 blocking_timeout=blocking_timeout,
+                details=request_details or "",
+                on_wait=self._log_wait,
+            )
+        except LockTimeout:
+            raise CustIDLockException(
+                f"Failed to acquire lock for {self} after {blocking_timeout} seconds"
             )
-
-            start_time = time.time()
-
-            while True:
-                try:
-                    acquired = await asyncio.wait_for(
-                        lock.acquire(),
-                        timeout=LOCK_REPORTING_TIME
-                        if blocking_timeout is None
-                        else min(LOCK_REPORTING_TIME, blocking_timeout),
-                    )
-                    if acquired:
-                        await _unregister_waiter(str(self), request_id)
-                        logger.debug(f"{ICON} Lock acquired for object {self}")
-                        logger.debug(f"{ICON} {request_details if request_details else ''}")
-                        return True
-                except asyncio.TimeoutError:
-                    # Per-object deduped wait warning
-                    should_log, preview, oldest = await LockStr._should_log_wait(str(self))
-                    if should_log:
-                        # Header line once
-                        logger.warning(
-                            f"{ICON} Still waiting for lock on object {self} after {oldest}s...",
-                            extra={"notification": False},
-                        )
-                        # Then one line per outstanding request
-                        snap = await _snapshot_waiters()
-                        waiters = snap.get(str(self), [])
-                        for w in waiters:
-                            details = str(w.get("details") or "").strip()
-                            if details:
-                                logger.warning(
-                                    f"request: {details}",
-                                    extra={"notification": False},
-                                )
-
-                    # Check blocking timeout
-                    current_time = time.time()
-                    if (
-                        blocking_timeout is not None
-                        and (current_time - start_time) >= blocking_timeout
-                    ):
-                        await _unregister_waiter(str(self), request_id)
-                        raise CustIDLockException(
-                            f"Failed to acquire lock for {self} after {blocking_timeout} seconds"
-                        )
-                    continue
-                except Exception as e:
-                    await _unregister_waiter(str(self), request_id)
-                    raise CustIDLockException(f"{ICON} Error acquiring lock for {self}: {e}")
-
         except Exception as e:
-            logger.error(f"{ICON} Error setting up lock for {self}: {e}")
-            await _unregister_waiter(str(self), request_id)
-            raise CustIDLockException(f"{ICON} Error setting up lock: {e}")
+            logger.error(f"{ICON} Error acquiring lock for {self}: {e}")
+            raise CustIDLockException(f"{ICON} Error acquiring lock for {self}: {e}")
+        finally:
+            if not LOCK_MANAGER.waiters().get(str(self)):
+                _NEXT_ALLOWED_WARN.pop(str(self), None)
+        logger.debug(f"{ICON} Lock acquired for object {self} (fence {lease.fence})")
+        logger.debug(f"{ICON} {request_details if request_details else ''}")
+        return lease
+
+    async def _log_wait(self, cust_id: str) -> None:
+        # Per-object deduped wait warning
+        should_log, preview, oldest = await self._should_log_wait(cust_id)
+        if should_log:
+            # Header line once
+            logger.warning(
+                f"{ICON} Still waiting for lock on object {cust_id} after {oldest}s...",
+                extra={"notification": False},
+            )
+            # Then one line per outstanding request
+            snap = await _snapshot_waiters()
+            for w in snap.get(cust_id, []):
+                details = str(w.get("details") or "").strip()
+                if details:
+                    logger.warning(
+                        f"request: {details}",
+                        extra={"notification": False},
+                    )
 
     @staticmethod
     async def release_lock(cust_id: str) -> bool:
@@ -263,6 +224,16 @@ class LockStr(AccName):
         Returns:
             bool: True if lock was released successfully
         """
+        # Held by this process: hand over locally or release the lease in Redis.
+        try:
+            if await LOCK_MANAGER.release(str(cust_id)):
+                logger.debug(f"{ICON} Lock released for {cust_id}")
+                return True
+        except Exception as e:
+            logger.error(f"{ICON} Error releasing lock for {cust_id}: {e}")
+            return False
+
+        # Not held here: a lock taken some other way, or an expired one to clean up.
         redis_instance = InternalConfig.redis_async
         try:
             lock = RedisLock(redis_instance, name=f"lock_str:{cust_id}", timeout=None)
@@ -328,6 +299,7 @@ class LockStr(AccName):
             keys = await redis_instance.keys("lock_str:*")
             if keys:
                 await redis_instance.delete(*keys)
+                await LOCK_MANAGER.publish_release(*(key[len("lock_str:") :] for key in keys))
                 logger.info(f"{ICON} All object ID locks cleared.")
             else:
                 logger.info(f"{ICON} No object ID locks found to clear.")
@@ -352,18 +324,18 @@ class LockStr(AccName):
         request_details: str = "",
     ):
         """
-        Async context manager for acquiring and releasing a lock.
+        Async context manager for acquiring and releasing a lock; yields the lease.
         """
-        acquired = False
+        lease = None
         try:
-            acquired = await self.acquire_lock(
+            lease = await self.acquire_lease(
                 timeout=timeout,
                 blocking_timeout=blocking_timeout,
                 request_details=request_details,
             )
-            yield
+            yield lease
         finally:
-            if acquired:
+            if lease is not None:
                 await LockStr.release_lock(self)
 
     @staticmethod
@@ -373,20 +345,19 @@ class LockStr(AccName):
         enforcing a single log per LOCK_REPORTING_TIME across all waiters.
         """
         now = time.time()
-        async with _OUTSTANDING_LOCK:
-            next_allowed = _NEXT_ALLOWED_WARN.get(cust_id, 0.0)
-            if now < next_allowed:
-                return False, "", 0
-            _NEXT_ALLOWED_WARN[cust_id] = now + LOCK_REPORTING_TIME
-
-            reqs = list(_OUTSTANDING_WAITERS.get(cust_id, {}).values())
-            ages = [int(now - float(it["started"])) for it in reqs]
-            oldest = max(ages) if ages else 0
-            details = [str(it.get("details") or "") for it in reqs if it.get("details")]
-            preview = ", ".join(details[:3]) if details else ""
-            if len(details) > 3:
-                preview += f" (+{len(details) - 3} more)"
-            return True, preview, oldest
+        next_allowed = _NEXT_ALLOWED_WARN.get(cust_id, 0.0)
+        if now < next_allowed:
+            return False, "", 0
+        _NEXT_ALLOWED_WARN[cust_id] = now + LOCK_REPORTING_TIME
+
+        reqs = LOCK_MANAGER.waiters().get(cust_id, [])
+        ages = [int(now - float(it["started"])) for it in reqs]
+        oldest = max(ages) if ages else 0
+        details = [str(it.get("details") or "") for it in reqs if it.get("details")]
+        preview = ", ".join(details[:3]) if details else ""
+        if len(details) > 3:
+            preview += f" (+{len(details) - 3} more)"
+        return True, preview, oldest
 
 
 # Annotated type with validator to cast to CustID
@@ -255,7 +255,9 @@ async def custom_json_internal_transfer(
     if fee_sats > 0 and keepsats_transfer.sats <= fee_sats and custom_json.to_account == server_id:
         fee_transfer = True
 
-    net_msats, account_balance = await keepsats_balance(cust_id=keepsats_transfer.from_account)
+    net_msats, account_balance = await keepsats_balance(
+        cust_id=keepsats_transfer.from_account, use_running_balance=True
+    )
     # Add a buffer of 1 sat 1_000 msats to avoid rounding issues
     if (
         keepsats_transfer.from_account != server_id
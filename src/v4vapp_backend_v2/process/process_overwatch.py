@@ -13,6 +13,13 @@ Core models:
 - Overwatch: Singleton that ingests events, manages active flows, and runs a
   periodic reporting loop.  State is persisted in Redis so it survives restarts.
 
+Persistence is incremental: an active flow is a snapshot in the
+``overwatch:flows:active`` hash plus an append-only list of change records
+(new events, changed fields) that is folded back into the snapshot every
+``_COMPACT_AFTER`` records.  Writes are queued and flushed in one pipeline per
+event-loop tick, and completed flows too old to absorb late events are only
+read back from Redis on demand.
+
 Usage from db_monitor::
 
     from v4vapp_backend_v2.process.process_overwatch import Overwatch
@@ -28,13 +35,17 @@ Usage from db_monitor::
 from __future__ import annotations
 
 import asyncio
-from collections.abc import Callable
+import heapq
+import itertools
+import json
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from enum import StrEnum
-from typing import Any, ClassVar, Dict, List, Literal
+from typing import Any, ClassVar, Dict, List, Literal, Tuple
 
 from colorama import Fore
-from pydantic import BaseModel, ConfigDict, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, TypeAdapter, field_validator
 
 from v4vapp_backend_v2.accounting.ledger_entry_class import LedgerEntry
 from v4vapp_backend_v2.accounting.ledger_type_class import LedgerType
@@ -48,8 +59,12 @@ ICON = "🌟"
 # Redis key prefixes / TTLs
 _REDIS_ACTIVE_KEY = "overwatch:flows:active"
 _REDIS_COMPLETED_PREFIX = "overwatch:flows:completed:"
+_REDIS_LOG_PREFIX = "overwatch:flows:log:"
+_REDIS_COMPLETED_INDEX = "overwatch:flows:completed_at"  # zset: flow key -> completed_at
 _COMPLETED_TTL_SECONDS = 24 * 60 * 60  # 24 hours
+_COMPACT_AFTER = 20  # change records per flow before they are folded into a new snapshot
 _LATE_EVENT_WINDOW = timedelta(seconds=300)  # only absorb late events into recent completions
+_FLUSH_RETRY_SECONDS = 5.0  # wait before rewriting a batch Redis rejected
 
 
 def _swallow_task_exception(task: asyncio.Task) -> None:  # type: ignore[type-arg]
@@ -88,6 +103,9 @@ class FlowStatus(StrEnum):
 # ---------------------------------------------------------------------------
 
 
+StageSignature = Tuple[str, str]
+
+
 class FlowStage(BaseModel):
     """An expected event within a flow definition.
 
@@ -159,6 +177,13 @@ class FlowStage(BaseModel):
             **data,
         )
 
+    @property
+    def signature(self) -> StageSignature | None:
+        """The ``(event_type, ledger_type | op_type)`` an event needs to match this stage."""
+        if self.event_type == "ledger":
+            return ("ledger", str(self.ledger_type)) if self.ledger_type is not None else None
+        return ("op", self.op_type) if self.op_type is not None else None
+
     def matches(self, event: FlowEvent) -> bool:
         """Check if an event fulfils this stage.
 
@@ -285,6 +310,13 @@ class FlowEvent(BaseModel):
             event_value=event_value,
         )
 
+    @property
+    def signature(self) -> StageSignature:
+        """The stage signature this event can match (see :pyattr:`FlowStage.signature`)."""
+        if self.event_type == "ledger":
+            return ("ledger", str(self.ledger_type))
+        return ("op", self.op_type or "")
+
     @property
     def log_str(self) -> str:
         """Return a human-readable string summarizing this event for logging."""
@@ -354,6 +386,8 @@ class FlowInstance(BaseModel):
     last_stall_reported_at: datetime | None = Field(
         None, description="When the stall was last logged in the report loop"
     )
+    # The stall timers this flow is armed in; told when a deadline input changes.
+    _timers: FlowTimers | None = PrivateAttr(None)
 
     def __init__(
         self,
@@ -395,6 +429,11 @@ class FlowInstance(BaseModel):
             **data,
         )
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name in _DEADLINE_FIELDS and self._timers is not None:
+            self._timers.touch(self)
+
     def add_event(self, event: FlowEvent) -> str | None:
         """Add an event and return the matched stage name, or None if unmatched.
 
@@ -516,6 +555,363 @@ class FlowInstance(BaseModel):
         }
 
 
+# ---------------------------------------------------------------------------
+# Flow registry: indexed store of flow instances
+# ---------------------------------------------------------------------------
+
+
+def _is_open(flow: FlowInstance) -> bool:
+    return flow.status not in (FlowStatus.COMPLETED, FlowStatus.FAILED)
+
+
+class FlowRegistry:
+    """Insertion-ordered store of flow instances with lookup indexes.
+
+    Stands in for the plain list ``Overwatch.flow_instances`` used to be:
+    it iterates, counts, appends, extends and removes like one, but removal is
+    O(1) and flows can be found without a scan by
+
+    - stage signature: the flows whose definition has a stage an event of that
+      ``(event_type, ledger_type | op_type)`` could match, split into open and
+      completed flows;
+    - ``trigger_group_id`` and ``trigger_short_id``.
+
+    Statuses are changed in place all over the code (and in tests), so the
+    indexes never trust them: lookups re-check the status, and a flow found
+    terminal in the open half of a signature bucket is moved to the completed
+    half then.  Completed flows leave the signature index once they are too old
+    to absorb late events.
+    """
+
+    def __init__(self, flows: Iterable[FlowInstance] = ()) -> None:
+        self._flows: Dict[int, FlowInstance] = {}
+        self._open_by_sig: Dict[StageSignature, Dict[int, FlowInstance]] = {}
+        self._done_by_sig: Dict[StageSignature, Dict[int, FlowInstance]] = {}
+        self._by_trigger: Dict[str, Dict[int, FlowInstance]] = {}
+        self._by_short_id: Dict[str, Dict[int, FlowInstance]] = {}
+        self._added: Dict[int, FlowInstance] = {}
+        self.extend(flows)
+
+    # ---- list-like interface ----
+
+    def __iter__(self) -> Iterator[FlowInstance]:
+        return iter(list(self._flows.values()))
+
+    def __len__(self) -> int:
+        return len(self._flows)
+
+    def __bool__(self) -> bool:
+        return bool(self._flows)
+
+    def __contains__(self, flow: object) -> bool:
+        return id(flow) in self._flows
+
+    def __getitem__(self, index: int) -> FlowInstance:
+        return list(self._flows.values())[index]
+
+    def append(self, flow: FlowInstance) -> None:
+        key = id(flow)
+        if key in self._flows:
+            return
+        self._flows[key] = flow
+        sigs = {stage.signature for stage in flow.flow_definition.stages} - {None}
+        by_sig = self._open_by_sig if _is_open(flow) else self._done_by_sig
+        for sig in sigs:
+            by_sig.setdefault(sig, {})[key] = flow
+        self._by_trigger.setdefault(flow.trigger_group_id, {})[key] = flow
+        self._by_short_id.setdefault(flow.trigger_short_id, {})[key] = flow
+        self._added[key] = flow
+
+    def extend(self, flows: Iterable[FlowInstance]) -> None:
+        for flow in flows:
+            self.append(flow)
+
+    def remove(self, flow: FlowInstance) -> None:
+        """Remove *flow*; raises ``ValueError`` if it is not held, as ``list.remove`` does."""
+        key = id(flow)
+        if self._flows.pop(key, None) is None:
+            raise ValueError("flow not in registry")
+        for index in (self._open_by_sig, self._done_by_sig):
+            for stage in flow.flow_definition.stages:
+                self._discard(index, stage.signature, key)
+        self._discard(self._by_trigger, flow.trigger_group_id, key)
+        self._discard(self._by_short_id, flow.trigger_short_id, key)
+        self._added.pop(key, None)
+
+    def clear(self) -> None:
+        for index in (
+            self._flows,
+            self._open_by_sig,
+            self._done_by_sig,
+            self._by_trigger,
+            self._by_short_id,
+            self._added,
+        ):
+            index.clear()
+
+    # ---- indexed lookups ----
+
+    def open_candidates(self, event: FlowEvent) -> List[FlowInstance]:
+        """Open flows with a stage *event* could match, in registration order."""
+        sig = event.signature
+        bucket = self._open_by_sig.get(sig)
+        if not bucket:
+            return []
+        candidates = []
+        for key, flow in list(bucket.items()):
+            if _is_open(flow):
+                candidates.append(flow)
+            else:
+                del bucket[key]
+                self._done_by_sig.setdefault(sig, {})[key] = flow
+        return candidates
+
+    def completed_candidates(
+        self, event: FlowEvent, now: datetime, window: timedelta
+    ) -> List[FlowInstance]:
+        """Completed flows with a stage *event* could match, completed within *window*."""
+        sig = event.signature
+        bucket = self._done_by_sig.get(sig)
+        if not bucket:
+            return []
+        candidates = []
+        for key, flow in list(bucket.items()):
+            if flow.status != FlowStatus.COMPLETED:
+                continue
+            if flow.completed_at is not None and now - flow.completed_at > window:
+                # completed_at only moves forward from here: never a candidate again
+                del bucket[key]
+                continue
+            candidates.append(flow)
+        return candidates
+
+    def by_trigger_group_id(self, trigger_group_id: str) -> List[FlowInstance]:
+        return list(self._by_trigger.get(trigger_group_id, {}).values())
+
+    def by_trigger_short_id(self, trigger_short_id: str) -> List[FlowInstance]:
+        return list(self._by_short_id.get(trigger_short_id, {}).values())
+
+    def drain_added(self) -> List[FlowInstance]:
+        """Return the flows added since the last call."""
+        added = list(self._added.values())
+        self._added.clear()
+        return added
+
+    @staticmethod
+    def _discard(index: Dict[Any, Dict[int, FlowInstance]], value: Any, key: int) -> None:
+        bucket = index.get(value)
+        if bucket is not None:
+            bucket.pop(key, None)
+            if not bucket:
+                del index[value]
+
+
+# ---------------------------------------------------------------------------
+# Stall timers: per-flow deadlines for check_stalls
+# ---------------------------------------------------------------------------
+
+# FlowInstance fields a flow's next stall deadline depends on (besides its events).
+_DEADLINE_FIELDS = frozenset({"status", "started_at", "superset_grace_expires"})
+
+
+@dataclass
+class StallTimerStats:
+    armed: int = 0
+    fired: int = 0
+    acted: int = 0
+    last_lag: float = 0.0
+    max_lag: float = 0.0
+    next_deadline: datetime | None = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+class FlowTimers:
+    """Min-heap of per-flow deadlines, so stall checks cost O(due) rather than O(active).
+
+    Each flow has at most one live timer; arming it again just pushes a new heap
+    entry, and entries that no longer match the live one are skipped when
+    popped.  A flow is *touched* when something its deadline depends on
+    changes; touched flows are re-armed (the deadline recomputed) by the owner
+    before the next :pymeth:`pop_due`.  A deadline that only moves later needs
+    no touch: the owner re-checks the flow when its timer fires.
+    """
+
+    def __init__(self) -> None:
+        self._heap: List[Tuple[datetime, int, FlowInstance]] = []
+        self._armed: Dict[int, int] = {}  # id(flow) -> live entry's sequence number
+        self._touched: Dict[int, FlowInstance] = {}
+        self._seq = itertools.count()
+        self.fired = 0
+        self.acted = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+
+    def __len__(self) -> int:
+        return len(self._armed)
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> FlowTimers:
+        return self  # shared by the flows pointing at it, not owned
+
+    def arm(self, flow: FlowInstance, deadline: datetime | None) -> None:
+        """Set *flow*'s timer to *deadline*, or disarm it if None."""
+        flow._timers = self
+        if deadline is None:
+            self._armed.pop(id(flow), None)
+            return
+        seq = next(self._seq)
+        self._armed[id(flow)] = seq
+        heapq.heappush(self._heap, (deadline, seq, flow))
+
+    def disarm(self, flow: FlowInstance) -> None:
+        self._armed.pop(id(flow), None)
+        self._touched.pop(id(flow), None)
+        flow._timers = None
+
+    def touch(self, flow: FlowInstance) -> None:
+        self._touched[id(flow)] = flow
+
+    def drain_touched(self) -> List[FlowInstance]:
+        touched = list(self._touched.values())
+        self._touched.clear()
+        return touched
+
+    def pop_due(self, now: datetime) -> List[Tuple[FlowInstance, datetime]]:
+        """Disarm and return the flows whose deadline is at or before *now*, earliest first."""
+        due = []
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            deadline, seq, flow = heapq.heappop(heap)
+            if self._armed.get(id(flow)) != seq:
+                continue  # re-armed or disarmed since
+            del self._armed[id(flow)]
+            due.append((flow, deadline))
+        self.fired += len(due)
+        return due
+
+    @property
+    def next_deadline(self) -> datetime | None:
+        heap = self._heap
+        while heap and self._armed.get(id(heap[0][2])) != heap[0][1]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def record_lag(self, lag: timedelta) -> None:
+        """Record how late a fired deadline was acted on."""
+        seconds = max(lag.total_seconds(), 0.0)
+        self.acted += 1
+        self.last_lag = seconds
+        self.max_lag = max(self.max_lag, seconds)
+
+    def stats(self) -> StallTimerStats:
+        return StallTimerStats(
+            armed=len(self),
+            fired=self.fired,
+            acted=self.acted,
+            last_lag=self.last_lag,
+            max_lag=self.max_lag,
+            next_deadline=self.next_deadline,
+        )
+
+    def clear(self) -> None:
+        for _, _, flow in self._heap:
+            flow._timers = None
+        for flow in self._touched.values():
+            flow._timers = None
+        self._heap.clear()
+        self._armed.clear()
+        self._touched.clear()
+        self.fired = self.acted = 0
+        self.last_lag = self.max_lag = 0.0
+
+
+# ---------------------------------------------------------------------------
+# Flow persistence: snapshot plus append-only change log
+# ---------------------------------------------------------------------------
+
+# FlowInstance fields that can change after the flow is created.
+_LOGGED_FIELDS = (
+    "status",
+    "cust_id",
+    "flow_value",
+    "completed_at",
+    "superset_grace_expires",
+    "superset_winner_name",
+    "last_stall_reported_at",
+)
+_field_adapters: Dict[str, TypeAdapter] = {}
+
+
+def _logged_fields(flow: FlowInstance) -> Dict[str, Any]:
+    return {name: getattr(flow, name) for name in _LOGGED_FIELDS}
+
+
+def _stage_log_strs(flow: FlowInstance) -> Dict[str, str]:
+    return {stage.name: stage.event_log_str for stage in flow.flow_definition.stages}
+
+
+@dataclass(slots=True)
+class _PersistedFlow:
+    """What Redis holds for an active flow: its key and the state its snapshot + log add up to."""
+
+    flow: FlowInstance
+    rkey: str
+    events: int
+    fields: Dict[str, Any]
+    stages: Dict[str, str]
+    log_len: int = 0
+
+    @classmethod
+    def of(cls, flow: FlowInstance, rkey: str) -> _PersistedFlow:
+        return cls(flow, rkey, len(flow.events), _logged_fields(flow), _stage_log_strs(flow))
+
+    def change_record(self) -> str | None:
+        """Return the JSON record taking the persisted state to the flow's, or None if equal.
+
+        Only new events and changed values are serialised, so the cost follows
+        the size of the change, not of the flow.
+        """
+        flow = self.flow
+        fields = _logged_fields(flow)
+        stages = _stage_log_strs(flow)
+        changed = {name for name, value in fields.items() if self.fields.get(name) != value}
+        changed_stages = {name: s for name, s in stages.items() if self.stages.get(name) != s}
+        new_events = flow.events[self.events :]
+        if not (new_events or changed or changed_stages):
+            return None
+        record: Dict[str, Any] = {"at": self.events}
+        if new_events:
+            record["events"] = [event.model_dump(mode="json") for event in new_events]
+        if changed:
+            record["fields"] = flow.model_dump(mode="json", include=changed)
+        if changed_stages:
+            record["stages"] = changed_stages
+        self.events, self.fields, self.stages = len(flow.events), fields, stages
+        self.log_len += 1
+        return json.dumps(record)
+
+
+def _apply_change_record(flow: FlowInstance, raw: str | bytes) -> None:
+    """Replay one change-log record (see :pymeth:`_PersistedFlow.change_record`) onto *flow*."""
+    record = json.loads(raw)
+    at = record.get("at", len(flow.events))
+    if at > len(flow.events):
+        raise ValueError(f"change record starts at event {at}, flow has {len(flow.events)}")
+    if "events" in record:
+        flow.events[at:] = [FlowEvent.model_validate(event) for event in record["events"]]
+    for name, value in record.get("fields", {}).items():
+        adapter = _field_adapters.get(name)
+        if adapter is None:
+            annotation = FlowInstance.model_fields[name].annotation
+            adapter = _field_adapters[name] = TypeAdapter(annotation)
+        setattr(flow, name, adapter.validate_python(value))
+    stages = record.get("stages", {})
+    for stage in flow.flow_definition.stages:
+        if stage.name in stages:
+            stage.event_log_str = stages[stage.name]
+
+
 # ---------------------------------------------------------------------------
 # Overwatch singleton: clean entry point for db_monitor integration
 # ---------------------------------------------------------------------------
@@ -559,7 +955,7 @@ class Overwatch:
     _instance: ClassVar[Overwatch | None] = None
 
     # ---- state (in-memory cache, synced to Redis) ----
-    flow_instances: ClassVar[List[FlowInstance]] = []
+    flow_instances: ClassVar[FlowRegistry] = FlowRegistry()
     _flow_definitions: ClassVar[dict[str, FlowDefinition]] = {}
     stall_timeout: ClassVar[timedelta] = DEFAULT_STALL_TIMEOUT
     superset_grace_period: ClassVar[timedelta] = DEFAULT_SUPERSET_GRACE_PERIOD
@@ -574,6 +970,24 @@ class Overwatch:
     _completion_report_tasks: ClassVar[dict[str, asyncio.Task]] = {}
     COMPLETION_REPORT_DELAY: ClassVar[float] = 5.0  # seconds
 
+    # ---- Redis write queue ----
+    # Flows changed since the last flush (by id) and active-flow keys to delete;
+    # one task drains both into a pipeline.  _persisted tracks what Redis holds
+    # for each active flow so only the difference is written.
+    _persisted: ClassVar[dict[int, _PersistedFlow]] = {}
+    _dirty: ClassVar[dict[int, FlowInstance]] = {}
+    _stale_keys: ClassVar[set[str]] = set()
+    _flush_task: ClassVar[asyncio.Task | None] = None
+    _flush_retry: ClassVar[asyncio.TimerHandle | None] = None
+    # Completed flows left in Redis by load_from_redis: flow key -> completed_at (epoch)
+    _dormant_completed: ClassVar[dict[str, float]] = {}
+
+    # ---- stall timers ----
+    # Next deadline of every open flow; _timer_settings are the timeouts they
+    # were computed with (a change re-arms them all).
+    _timers: ClassVar[FlowTimers] = FlowTimers()
+    _timer_settings: ClassVar[tuple[timedelta, timedelta] | None] = None
+
     def __new__(cls) -> Overwatch:
         if cls._instance is None:
             cls._instance = super().__new__(cls)
@@ -608,36 +1022,131 @@ class Overwatch:
         """Composite Redis key allowing multiple candidates per trigger."""
         return f"{flow.cust_id}:{flow.trigger_group_id}:{flow.flow_definition.name}"
 
-    async def _persist_flow(self, flow: FlowInstance) -> None:
-        """Write a single flow to Redis (active hash or completed key)."""
-        r = self._redis()
-        if r is None:
+    @staticmethod
+    def _redis_log_key(rkey: str) -> str:
+        return f"{_REDIS_LOG_PREFIX}{rkey}"
+
+    def _mark_dirty(self, flow: FlowInstance) -> None:
+        """Queue *flow* for the next flush without waiting for it.
+
+        Everything queued before the running coroutine yields goes out in one
+        pipeline, so a dispatch touching several flows costs one round trip.
+        """
+        if self._redis() is None:
             return
+        self._dirty[id(flow)] = flow
+        self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        task = self._flush_task
+        loop = asyncio.get_running_loop()
+        if task is None or task.done() or task.get_loop() is not loop:
+            Overwatch._flush_task = loop.create_task(self._flush())
+
+    async def _flush_pending(self) -> None:
+        """Wait until everything queued so far has been written."""
+        task = self._flush_task
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            await asyncio.shield(task)
+
+    async def _persist_flow(self, flow: FlowInstance) -> None:
+        """Write a single flow to Redis (active snapshot + change log, or completed key)."""
+        self._mark_dirty(flow)
+        await self._flush_pending()
+
+    async def _flush(self) -> None:
+        """Drain the write queue, one MULTI pipeline per batch."""
         try:
-            data = flow.model_dump_json()
-            rkey = self._redis_flow_key(flow)
-            if flow.status == FlowStatus.COMPLETED:
-                key = f"{_REDIS_COMPLETED_PREFIX}{rkey}"
-                await r.setex(key, _COMPLETED_TTL_SECONDS, data)
-                # Remove from the active hash
-                await r.hdel(_REDIS_ACTIVE_KEY, rkey)
-            else:
-                await r.hset(_REDIS_ACTIVE_KEY, rkey, data)
-        except Exception as e:
-            logger.warning(
-                f"{ICON} Redis persist failed: {e}",
-                extra={"notification": False},
+            while self._dirty or self._stale_keys:
+                dirty = list(self._dirty.values())
+                stale = list(self._stale_keys)
+                self._dirty.clear()
+                self._stale_keys.clear()
+                r = self._redis()
+                if r is None:
+                    continue
+                try:
+                    async with r.pipeline(transaction=True) as pipe:
+                        # Deletions first: a new flow may reuse a removed flow's key.
+                        for rkey in stale:
+                            pipe.hdel(_REDIS_ACTIVE_KEY, rkey)
+                            pipe.delete(self._redis_log_key(rkey))
+                        for flow in dirty:
+                            self._queue_flow_write(pipe, flow)
+                        if len(pipe):
+                            await pipe.execute()
+                except Exception as e:
+                    # Redis may be behind what _persisted says: rewrite in full
+                    # next time.  Requeue the batch and retry later rather than
+                    # spinning while Redis is down.
+                    for flow in dirty:
+                        self._persisted.pop(id(flow), None)
+                        self._dirty.setdefault(id(flow), flow)
+                    self._stale_keys.update(stale)
+                    logger.warning(
+                        f"{ICON} Redis persist failed, retrying in "
+                        f"{_FLUSH_RETRY_SECONDS:.0f}s: {e}",
+                        extra={"notification": False},
+                    )
+                    if Overwatch._flush_retry is None:
+                        Overwatch._flush_retry = asyncio.get_running_loop().call_later(
+                            _FLUSH_RETRY_SECONDS, self._retry_flush
+                        )
+                    break
+        finally:
+            if Overwatch._flush_task is asyncio.current_task():
+                Overwatch._flush_task = None
+
+    def _retry_flush(self) -> None:
+        Overwatch._flush_retry = None
+        if self._dirty or self._stale_keys:
+            self._schedule_flush()
+
+    def _queue_flow_write(self, pipe: Any, flow: FlowInstance) -> None:
+        """Add the commands bringing Redis up to date with *flow* to *pipe*."""
+        rkey = self._redis_flow_key(flow)
+        state = self._persisted.get(id(flow))
+        if state is not None and (state.flow is not flow or state.rkey != rkey):
+            if state.flow is flow:
+                # cust_id filled in after the first write: the flow moves key
+                pipe.hdel(_REDIS_ACTIVE_KEY, state.rkey)
+                pipe.delete(self._redis_log_key(state.rkey))
+            state = None
+        if flow.status == FlowStatus.COMPLETED:
+            completed_at = flow.completed_at or datetime.now(tz=timezone.utc)
+            pipe.setex(
+                f"{_REDIS_COMPLETED_PREFIX}{rkey}", _COMPLETED_TTL_SECONDS, flow.model_dump_json()
             )
+            pipe.zadd(_REDIS_COMPLETED_INDEX, {rkey: completed_at.timestamp()})
+            # Remove from the active hash
+            pipe.hdel(_REDIS_ACTIVE_KEY, rkey)
+            pipe.delete(self._redis_log_key(rkey))
+            self._persisted.pop(id(flow), None)
+            return
+        if state is not None and len(flow.events) >= state.events:
+            if state.log_len < _COMPACT_AFTER:
+                record = state.change_record()
+                if record is not None:
+                    pipe.rpush(self._redis_log_key(rkey), record)
+                return
+        # New flow, a full log, or events rewritten in place: a fresh snapshot
+        # replaces the log.
+        pipe.hset(_REDIS_ACTIVE_KEY, rkey, flow.model_dump_json())
+        pipe.delete(self._redis_log_key(rkey))
+        self._persisted[id(flow)] = _PersistedFlow.of(flow, rkey)
 
     async def _remove_active_flow(self, flow: FlowInstance) -> None:
         """Remove a flow from the active Redis hash."""
-        r = self._redis()
-        if r is None:
+        self._timers.disarm(flow)
+        if self._redis() is None:
             return
-        try:
-            await r.hdel(_REDIS_ACTIVE_KEY, self._redis_flow_key(flow))
-        except Exception:
-            pass
+        self._dirty.pop(id(flow), None)
+        state = self._persisted.pop(id(flow), None)
+        if state is not None and state.flow is flow:
+            self._stale_keys.add(state.rkey)
+        self._stale_keys.add(self._redis_flow_key(flow))
+        self._schedule_flush()
+        await self._flush_pending()
 
     async def load_from_redis(self) -> int:
         """Hydrate in-memory state from Redis.
@@ -645,6 +1154,11 @@ class Overwatch:
         Called once on startup (or manually).  Returns the number of flows
         loaded.  Already-loaded flows whose ``trigger_group_id`` is present in
         memory are skipped so hot-reloading is safe.
+
+        Active flows are rebuilt from their snapshot and change log, and any
+        log is compacted.  Completed flows older than ``_LATE_EVENT_WINDOW``
+        can no longer absorb events, so they are not read here; they stay in
+        Redis until their TTL expires and are only counted in the report.
         """
         r = self._redis()
         if r is None:
@@ -654,11 +1168,18 @@ class Overwatch:
         try:
             # Active flows
             active_data: dict[str, str] = await r.hgetall(_REDIS_ACTIVE_KEY)
-            for rkey, raw in active_data.items():
-                if rkey in existing_ids:
-                    continue
+            rkeys = [rkey for rkey in active_data if rkey not in existing_ids]
+            logs: list[list[str]] = []
+            if rkeys:
+                async with r.pipeline(transaction=False) as pipe:
+                    for rkey in rkeys:
+                        pipe.lrange(self._redis_log_key(rkey), 0, -1)
+                    logs = await pipe.execute()
+            for rkey, log in zip(rkeys, logs):
                 try:
-                    flow = FlowInstance.model_validate_json(raw)
+                    flow = FlowInstance.model_validate_json(active_data[rkey])
+                    for record in log:
+                        _apply_change_record(flow, record)
                     normalized_rkey = self._redis_flow_key(flow)
                     # Rebuild the flow definition from the current registered
                     # version (deep copy) so stage additions/reordering are
@@ -679,31 +1200,29 @@ class Overwatch:
                         flow.completed_at = (
                             flow.events[-1].timestamp if flow.events else flow.started_at
                         )
-                        # also persist updated status immediately
-                        await self._persist_flow(flow)
                     self.flow_instances.append(flow)
                     existing_ids.add(normalized_rkey)
                     loaded += 1
-                    if normalized_rkey != rkey:
-                        await r.hdel(_REDIS_ACTIVE_KEY, rkey)
-                        if flow.status == FlowStatus.COMPLETED:
-                            await r.setex(
-                                f"{_REDIS_COMPLETED_PREFIX}{normalized_rkey}",
-                                _COMPLETED_TTL_SECONDS,
-                                flow.model_dump_json(),
-                            )
-                        else:
-                            await r.hset(
-                                _REDIS_ACTIVE_KEY,
-                                normalized_rkey,
-                                flow.model_dump_json(),
-                            )
+                    if log or normalized_rkey != rkey or flow.status == FlowStatus.COMPLETED:
+                        # Write a compacted snapshot under the right key (or
+                        # the completed key) in place of the stored one.
+                        if normalized_rkey != rkey:
+                            self._stale_keys.add(rkey)
+                        self._mark_dirty(flow)
+                    else:
+                        self._persisted[id(flow)] = _PersistedFlow.of(flow, rkey)
                 except Exception as e:
                     logger.warning(
                         f"{ICON} Skipping corrupt active flow {rkey}: {e}",
                         extra={"notification": False},
                     )
+            await self._flush_pending()
+
             # Completed flows (scan for keys)
+            now = datetime.now(tz=timezone.utc).timestamp()
+            await r.zremrangebyscore(_REDIS_COMPLETED_INDEX, "-inf", now - _COMPLETED_TTL_SECONDS)
+            completed_index = dict(await r.zrange(_REDIS_COMPLETED_INDEX, 0, -1, withscores=True))
+            late_cutoff = now - _LATE_EVENT_WINDOW.total_seconds()
             cursor: int = 0
             while True:
                 cursor, keys = await r.scan(
@@ -711,6 +1230,7 @@ class Overwatch:
                     match=f"{_REDIS_COMPLETED_PREFIX}*",
                     count=100,
                 )
+                wanted: list[tuple[str, str]] = []
                 for key in keys:
                     rkey = (
                         key.removeprefix(_REDIS_COMPLETED_PREFIX)
@@ -719,7 +1239,13 @@ class Overwatch:
                     )
                     if rkey in existing_ids:
                         continue
-                    raw_val: str | None = await r.get(key)
+                    completed_at = completed_index.get(rkey)
+                    if completed_at is not None and completed_at < late_cutoff:
+                        self._dormant_completed[rkey] = completed_at
+                        continue
+                    wanted.append((key, rkey))
+                raw_vals = await r.mget([key for key, _ in wanted]) if wanted else []
+                for (key, rkey), raw_val in zip(wanted, raw_vals):
                     if raw_val is None:
                         continue
                     try:
@@ -730,11 +1256,8 @@ class Overwatch:
                         loaded += 1
                         if normalized_rkey != rkey:
                             await r.delete(key)
-                            await r.setex(
-                                f"{_REDIS_COMPLETED_PREFIX}{normalized_rkey}",
-                                _COMPLETED_TTL_SECONDS,
-                                flow.model_dump_json(),
-                            )
+                            await r.zrem(_REDIS_COMPLETED_INDEX, rkey)
+                            self._mark_dirty(flow)
                     except Exception as e:
                         logger.warning(
                             f"{ICON} Skipping corrupt completed flow {rkey}: {e}",
@@ -742,6 +1265,7 @@ class Overwatch:
                         )
                 if cursor == 0:
                     break
+            await self._flush_pending()
         except Exception as e:
             logger.warning(
                 f"{ICON} Failed to load flows from Redis: {e}",
@@ -756,8 +1280,10 @@ class Overwatch:
             ])
             stl = len([f for f in self.flow_instances if f.status == FlowStatus.STALLED])
             comp = len([f for f in self.flow_instances if f.status == FlowStatus.COMPLETED])
+            dormant = len(self._dormant_completed)
             logger.info(
-                f"{ICON} Loaded {loaded} flow(s) from Redis ({act} active, {stl} stalled, {comp} completed)",
+                f"{ICON} Loaded {loaded} flow(s) from Redis ({act} active, {stl} stalled, {comp} completed)"
+                + (f", {dormant} older completed flow(s) left in Redis" if dormant else ""),
                 extra={"notification": False},
             )
         Overwatch._loaded_from_redis = True
@@ -870,6 +1396,8 @@ class Overwatch:
         match) so that multiple candidate flows for the same trigger can
         accumulate stages in parallel.  When a candidate completes,
         :pymethod:`_resolve_candidates` removes the remaining candidates.
+        Only flows with a stage of the event's signature are looked at; the
+        others could not match it (see :pyclass:`FlowRegistry`).
 
         If no active flow matches, recently completed flows are also
         checked so that late-arriving optional events (e.g. notifications)
@@ -881,11 +1409,12 @@ class Overwatch:
         """
         first_result: str | None = None
         newly_completed: list[FlowInstance] = []
-        for flow in self.active_flows:
+        for flow in self.flow_instances.open_candidates(event):
             if self._is_duplicate(flow, event):
                 continue
             result = flow.add_event(event)
             if result is not None:
+                self._timers.touch(flow)
                 if first_result is None:
                     first_result = result
                 # Clear superset grace only when the event is a
@@ -907,7 +1436,8 @@ class Overwatch:
                 if flow.is_complete:
                     newly_completed.append(flow)
                     self._enqueue_completion_report(flow)
-                await self._persist_flow(flow)
+                self._mark_dirty(flow)
+        await self._flush_pending()
         for completed in newly_completed:
             await self._resolve_candidates(completed)
 
@@ -917,12 +1447,7 @@ class Overwatch:
         # avoid greedily absorbing unrelated events from new transactions.
         if first_result is None:
             now = datetime.now(tz=timezone.utc)
-            for flow in self.completed_flows:
-                if (
-                    flow.completed_at is not None
-                    and (now - flow.completed_at) > _LATE_EVENT_WINDOW
-                ):
-                    continue
+            for flow in self.flow_instances.completed_candidates(event, now, _LATE_EVENT_WINDOW):
                 if self._is_duplicate(flow, event):
                     continue
                 result = flow.add_event(event)
@@ -1074,7 +1599,8 @@ class Overwatch:
                 if first_result is None and result is not None:
                     first_result = result
                 candidates.append(defn.name)
-                await self._persist_flow(instance)
+                self._mark_dirty(instance)
+        await self._flush_pending()
         if candidates:
             if len(candidates) == 1:
                 logger.info(
@@ -1107,12 +1633,10 @@ class Overwatch:
         The most-progressed candidate is marked COMPLETED; the rest are
         cancelled as losing candidates.
         """
-        matching = [
-            f
-            for f in self.active_flows
-            if (parent_id and f.trigger_group_id == parent_id)
-            or (trigger_short_id and f.trigger_short_id == trigger_short_id)
-        ]
+        found = self.flow_instances.by_trigger_group_id(parent_id) if parent_id else []
+        if trigger_short_id:
+            found += self.flow_instances.by_trigger_short_id(trigger_short_id)
+        matching = [f for f in {id(f): f for f in found}.values() if _is_open(f)]
         if not matching:
             return
 
@@ -1168,10 +1692,8 @@ class Overwatch:
         """
         candidates = [
             f
-            for f in self.flow_instances
-            if f is not winner
-            and f.trigger_group_id == winner.trigger_group_id
-            and f.status not in (FlowStatus.COMPLETED, FlowStatus.FAILED)
+            for f in self.flow_instances.by_trigger_group_id(winner.trigger_group_id)
+            if f is not winner and _is_open(f)
         ]
         winner_stages = winner.flow_definition.stages
 
@@ -1239,8 +1761,8 @@ class Overwatch:
         accounts.  Returns the number of flows cancelled.
         """
         cancelled = 0
-        for flow in list(self.active_flows):
-            if flow.trigger_group_id != trigger_group_id:
+        for flow in self.flow_instances.by_trigger_group_id(trigger_group_id):
+            if not _is_open(flow):
                 continue
             flow.status = FlowStatus.FAILED
             self.flow_instances.remove(flow)
@@ -1258,11 +1780,7 @@ class Overwatch:
     @property
     def active_flows(self) -> List[FlowInstance]:
         """Return flow instances that are not yet completed or failed."""
-        return [
-            f
-            for f in self.flow_instances
-            if f.status not in (FlowStatus.COMPLETED, FlowStatus.FAILED)
-        ]
+        return [f for f in self.flow_instances if _is_open(f)]
 
     @property
     def completed_flows(self) -> List[FlowInstance]:
@@ -1274,8 +1792,43 @@ class Overwatch:
         """Return stalled flow instances."""
         return [f for f in self.flow_instances if f.status == FlowStatus.STALLED]
 
+    @property
+    def stall_timer_stats(self) -> StallTimerStats:
+        """Armed stall timers and how late fired deadlines were acted on (seconds)."""
+        return self._timers.stats()
+
     # ---- stall detection ----
 
+    def _next_deadline(self, flow: FlowInstance) -> datetime | None:
+        """When :pymeth:`check_stalls` next has to look at *flow*, or None if never."""
+        if not _is_open(flow):
+            return None
+        deadlines: List[datetime] = []
+        if flow.superset_grace_expires is not None:
+            deadlines.append(flow.superset_grace_expires)
+        elif len(flow.events) == 1 and flow.events[0].event_type == "op":
+            deadlines.append(flow.started_at + self.trigger_only_timeout)
+        if flow.status != FlowStatus.STALLED:
+            last_event_time = flow.events[-1].timestamp if flow.events else flow.started_at
+            deadlines.append(last_event_time + self.stall_timeout)
+        return min(deadlines, default=None)
+
+    def _sync_timers(self) -> None:
+        """Arm timers for flows added or changed since the last check."""
+        settings = (self.stall_timeout, self.trigger_only_timeout)
+        if settings != Overwatch._timer_settings:
+            Overwatch._timer_settings = settings
+            self.flow_instances.drain_added()
+            self._timers.drain_touched()
+            flows = self.active_flows
+        else:
+            flows = self.flow_instances.drain_added() + self._timers.drain_touched()
+        for flow in flows:
+            if flow in self.flow_instances:
+                self._timers.arm(flow, self._next_deadline(flow))
+            else:
+                self._timers.disarm(flow)
+
     async def check_stalls(self, now: datetime | None = None) -> List[FlowInstance]:
         """Mark active flows that haven't received events recently as STALLED.
 
@@ -1283,13 +1836,20 @@ class Overwatch:
         i.e. a simpler sibling flow already completed and this candidate
         hasn't accumulated any distinguishing events in time.
 
+        Only flows whose next deadline (see :pymeth:`_next_deadline`) has
+        passed are looked at, so this is cheap enough to run every second.
+
         Returns the list of flows whose status was changed.
         """
         now = now or datetime.now(tz=timezone.utc)
         newly_stalled: List[FlowInstance] = []
+        self._sync_timers()
 
-        # Rule 1: cancel superset candidates past their grace period
-        for flow in list(self.active_flows):
+        for flow, deadline in self._timers.pop_due(now):
+            if flow not in self.flow_instances or not _is_open(flow):
+                continue
+            acted = True
+            # Rule 1: cancel superset candidates past their grace period
             if flow.superset_grace_expires is not None and now >= flow.superset_grace_expires:
                 flow.status = FlowStatus.FAILED
                 self.flow_instances.remove(flow)
@@ -1301,16 +1861,14 @@ class Overwatch:
                     extra={"notification": False, **flow.log_extra},
                 )
 
-        # Rule 2: cancel flows that haven't progressed past trigger-only.
-        # A flow created by _try_create_flow receives exactly one "op" event
-        # (the trigger).  If no subsequent stage-matched events arrive within
-        # trigger_only_timeout, the trigger was likely for an irrelevant op
-        # (e.g. a server-to-exchange transfer) and the flow should be cleaned up.
-        for flow in list(self.active_flows):
-            if flow.superset_grace_expires is not None:
-                continue  # handled by Rule 1
-            if (
-                len(flow.events) == 1
+            # Rule 2: cancel flows that haven't progressed past trigger-only.
+            # A flow created by _try_create_flow receives exactly one "op" event
+            # (the trigger).  If no subsequent stage-matched events arrive within
+            # trigger_only_timeout, the trigger was likely for an irrelevant op
+            # (e.g. a server-to-exchange transfer) and the flow should be cleaned up.
+            elif (
+                flow.superset_grace_expires is None
+                and len(flow.events) == 1
                 and flow.events[0].event_type == "op"
                 and now - flow.started_at > self.trigger_only_timeout
             ):
@@ -1325,20 +1883,17 @@ class Overwatch:
                     extra={"notification": False, **flow.log_extra},
                 )
 
-        for flow in list(self.active_flows):
             # Already stalled — nothing new to report.
-            if flow.status == FlowStatus.STALLED:
-                continue
+            elif flow.status == FlowStatus.STALLED:
+                acted = False
 
             # a definition change may have made the flow complete
-            if flow.is_complete and flow.status != FlowStatus.COMPLETED:
+            elif flow.is_complete:
                 flow.status = FlowStatus.COMPLETED
                 flow.completed_at = flow.events[-1].timestamp if flow.events else flow.started_at
-                await self._persist_flow(flow)
-                continue
+                self._mark_dirty(flow)
 
-            last_event_time = flow.events[-1].timestamp if flow.events else flow.started_at
-            if now - last_event_time > self.stall_timeout:
+            elif now - (last_event_time := self._last_event_time(flow)) > self.stall_timeout:
                 flow.status = FlowStatus.STALLED
                 newly_stalled.append(flow)
                 logger.warning(
@@ -1352,9 +1907,23 @@ class Overwatch:
                         **flow.log_extra,
                     },
                 )
-                await self._persist_flow(flow)
+                self._mark_dirty(flow)
+            else:
+                acted = False
+
+            if acted:
+                self._timers.record_lag(now - deadline)
+            if flow in self.flow_instances:
+                # Events that arrived meanwhile moved the deadline on, or a
+                # stalled superset candidate still has its grace period to run.
+                self._timers.arm(flow, self._next_deadline(flow))
+        await self._flush_pending()
         return newly_stalled
 
+    @staticmethod
+    def _last_event_time(flow: FlowInstance) -> datetime:
+        return flow.events[-1].timestamp if flow.events else flow.started_at
+
     # ---- periodic reporter ----
 
     async def report_loop(
@@ -1387,11 +1956,19 @@ class Overwatch:
                     f"{ICON} Error in overwatch report loop: {e}",
                     extra={"error_code": "overwatch_report_error"},
                 )
-            # Sleep in small increments so we can break promptly on shutdown
+            # Sleep in small increments so we can break promptly on shutdown;
+            # check_stalls only looks at due timers, so run it on each one.
             for _ in range(int(interval)):
                 if shutdown_event and shutdown_event.is_set():
                     break
                 await asyncio.sleep(1)
+                try:
+                    await self.check_stalls()
+                except Exception as e:
+                    logger.error(
+                        f"{ICON} Error in overwatch stall check: {e}",
+                        extra={"error_code": "overwatch_report_error"},
+                    )
 
         logger.info(
             f"{ICON} Overwatch report loop stopped",
@@ -1412,7 +1989,9 @@ class Overwatch:
             parts.append(f"{len(active)} active")
         if stalled:
             parts.append(f"{len(stalled)} stalled")
-        parts.append(f"{len(completed)} completed")
+        parts.append(f"{len(completed) + len(self._dormant_completed)} completed")
+        timers = self.stall_timer_stats
+        parts.append(f"{timers.armed} timers armed (max lag {timers.max_lag:.1f}s)")
         logger.info(" | ".join(parts), extra={"notification": False})
 
         for flow in active:
@@ -1457,25 +2036,43 @@ class Overwatch:
             task.cancel()
         cls._pending_completion_reports.clear()
         cls._completion_report_tasks.clear()
+        # Drop queued Redis writes along with the flows they belong to
+        task = cls._flush_task
+        if task is not None and not task.done() and not task.get_loop().is_closed():
+            task.cancel()
+        cls._flush_task = None
+        if cls._flush_retry is not None:
+            cls._flush_retry.cancel()
+            cls._flush_retry = None
+        cls._dirty.clear()
+        cls._stale_keys.clear()
+        cls._persisted.clear()
+        cls._dormant_completed.clear()
+        cls._timers.clear()
+        cls._timer_settings = None
 
     async def reset_redis(self) -> None:
         """Clear all overwatch data from Redis."""
         r = self._redis()
         if r is None:
             return
+        # Nothing is left for change records to apply to
+        self._persisted.clear()
+        self._dormant_completed.clear()
         try:
-            await r.delete(_REDIS_ACTIVE_KEY)
-            cursor: int = 0
-            while True:
-                cursor, keys = await r.scan(
-                    cursor,
-                    match=f"{_REDIS_COMPLETED_PREFIX}*",
-                    count=100,
-                )
-                if keys:
-                    await r.delete(*keys)
-                if cursor == 0:
-                    break
+            await r.delete(_REDIS_ACTIVE_KEY, _REDIS_COMPLETED_INDEX)
+            for prefix in (_REDIS_COMPLETED_PREFIX, _REDIS_LOG_PREFIX):
+                cursor: int = 0
+                while True:
+                    cursor, keys = await r.scan(
+                        cursor,
+                        match=f"{prefix}*",
+                        count=100,
+                    )
+                    if keys:
+                        await r.delete(*keys)
+                    if cursor == 0:
+                        break
         except Exception as e:
             logger.warning(
                 f"{ICON} Failed to clear Redis overwatch data: {e}",
@@ -9,9 +9,8 @@ from v4vapp_backend_v2.hive.hive_extras import (  # Assuming this function exist
     HiveMissingKeyError,
     account_hive_balances,
     get_verified_hive_client,
-    send_custom_json,
-    send_pending,
 )
+from v4vapp_backend_v2.hive.hive_send_queue import HIVE_SEND_QUEUE
 from v4vapp_backend_v2.hive_models.pending_transaction_class import (
     PendingCustomJson,
     PendingTransaction,
@@ -33,8 +32,9 @@ async def resend_pending_transactions() -> None:
     """
     Re-sends all pending Hive transactions if the server has sufficient balance for each transaction.
 
-    This function retrieves all pending transactions and attempts to resend them one by one.
-    For each transaction, it checks if the server's Hive or HBD balance is sufficient before resending.
+    This function retrieves all pending transactions and resends them through the Hive send
+    queue, which packs them into multi-op transactions. For each transaction, it checks if
+    the server's Hive or HBD balance is sufficient before resending.
     If the balance is insufficient, the transaction is skipped and a warning is logged.
     Successfully resent transactions are deleted from the pending list.
     All actions and errors are logged.
@@ -83,19 +83,23 @@ async def resend_pending_transactions() -> None:
     nobroadcast = any(pending.nobroadcast for pending in sending)
     hive_client, _ = await get_verified_hive_client(nobroadcast=nobroadcast)
     for pending in sending:
-        try:
-            pending.resend_attempt += 1
-            trx = await send_pending(pending=pending, hive_client=hive_client)
-            logger.debug(
-                f"{Fore.GREEN}Resent pending transaction {pending}, trx: {trx.get('trx_id')}{Style.RESET_ALL}"
+        pending.resend_attempt += 1
+    # All pending transfers leave from the server account, so they go out as a few
+    # multi-op transactions; a failed batch falls back to one send per transfer.
+    results = await HIVE_SEND_QUEUE.send_many(sending, hive_client)
+    for pending, result in zip(sending, results):
+        if isinstance(result, HiveMissingKeyError):
+            logger.warning(
+                f"MissingKeyError when resending pending transaction {pending}: {result}"
             )
-            await pending.delete()
-        except HiveMissingKeyError as e:
-            logger.warning(f"MissingKeyError when resending pending transaction {pending}: {e}")
             await pending.delete()  # Consider whether to delete or keep for future attempts
-        except Exception as e:
+        elif isinstance(result, BaseException):
             await pending.save()
-            logger.warning(f"Failed to resend pending transaction {pending}: {e}")
+            logger.warning(f"Failed to resend pending transaction {pending}: {result}")
+        else:
+            logger.debug(
+                f"{Fore.GREEN}Resent pending transaction {pending}, trx: {result.get('trx_id')}{Style.RESET_ALL}"
+            )
 
 
 async def resend_pending_custom_jsons():
@@ -105,9 +109,8 @@ async def resend_pending_custom_jsons():
     - Retrieves all pending custom JSON objects.
     - Filters for active custom JSONs.
     - Initializes a Hive client, determining the 'nobroadcast' flag based on pending items.
-    - Iterates through each active pending custom JSON:
-        - Skips if 'json_data' is None.
-        - Attempts to send the custom JSON using the Hive client.
+    - Skips any active pending custom JSON whose 'json_data' is None.
+    - Sends the rest through the Hive send queue (multi-op transactions), then for each:
         - Logs the transaction ID on success and deletes the pending item.
         - Logs a warning if sending fails.
 
@@ -134,28 +137,20 @@ async def resend_pending_custom_jsons():
     for pending in sending_cj:
         if pending.json_data is None:
             logger.warning(f"Skipping custom JSON {pending} as json_data is None.")
-            continue
-        try:
-            # Note: Adjust parameters based on actual send_custom_json signature
-            pending.resend_attempt += 1
-            trx = await send_custom_json(
-                json_data=pending.json_data,
-                send_account=pending.send_account,
-                id=pending.cj_id,
-                hive_client=hive_client,
-                nobroadcast=pending.nobroadcast,
-                resend_attempt=pending.resend_attempt,
-            )
-            logger.debug(f"Resent pending custom JSON {pending}, trx: {trx.get('trx_id')}")
-            await pending.delete()
-        except CustomJsonSendError as e:
-            logger.error(f"CustomJsonSendError when resending custom JSON {pending}: {e}")
+    sending_cj = [pending for pending in sending_cj if pending.json_data is not None]
+    for pending in sending_cj:
+        pending.resend_attempt += 1
+    results = await HIVE_SEND_QUEUE.send_many(sending_cj, hive_client)
+    for pending, result in zip(sending_cj, results):
+        if isinstance(result, CustomJsonSendError):
+            logger.error(f"CustomJsonSendError when resending custom JSON {pending}: {result}")
             await pending.delete()  # Consider whether to delete or keep for future attempts
-
-        except Exception as e:
+        elif isinstance(result, BaseException):
             if pending.resend_attempt >= 3:
                 logger.error(
-                    f"Failed to resend pending custom JSON {pending} after {pending.resend_attempt} attempts: {e}"
+                    f"Failed to resend pending custom JSON {pending} after {pending.resend_attempt} attempts: {result}"
                 )
                 await pending.delete()  # Consider whether to delete or keep for future attempts
-            logger.warning(f"Failed to resend pending custom JSON {pending}: {e}")
+            logger.warning(f"Failed to resend pending custom JSON {pending}: {result}")
+        else:
+            logger.debug(f"Resent pending custom JSON {pending}, trx: {result.get('trx_id')}")
@@ -607,7 +607,7 @@ async def check_keepsats_balance(extra_spend_msats: Decimal, cust_id: str) -> st
     """
     Asynchronously checks whether the user has sufficient Keepsats balance for a payment request.
     """
-    net_msats, balance = await keepsats_balance(cust_id=cust_id)
+    net_msats, balance = await keepsats_balance(cust_id=cust_id, use_running_balance=True)
     if not balance.balances.get(Currency.MSATS):
         raise HiveTransferError(
             f"Insufficient Keepsats balance ({int(net_msats / Decimal(1000)):,.0f} sats) to cover payment request: {int(extra_spend_msats / Decimal(1000)):,.0f} sats"
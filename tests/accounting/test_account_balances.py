@@ -20,6 +20,7 @@ from v4vapp_backend_v2.accounting.account_balances import (
     keepsats_balance,
     list_all_accounts,
     list_all_active_accounts,
+    many_account_balances,
     one_account_balance,
 )
 from v4vapp_backend_v2.accounting.accounting_classes import AccountBalances, LedgerAccountDetails
@@ -362,6 +363,26 @@ async def test_one_account_balances():
     pprint(balance)
 
 
+async def test_many_account_balances_matches_one_account_balance():
+    """Batched balances are returned in input order and match the single-account path."""
+    accounts = await list_all_active_accounts()
+    accounts = accounts[:6] + [LiabilityAccount(name="VSC Liability", sub="no-such-customer")]
+    as_of_date = datetime.now(tz=timezone.utc)
+
+    batched = await many_account_balances(accounts, as_of_date=as_of_date, use_cache=False)
+    assert len(batched) == len(accounts)
+
+    for account, details in zip(accounts, batched):
+        single = await one_account_balance(
+            account=account, as_of_date=as_of_date, use_cache=False, use_checkpoints=False
+        )
+        assert (details.name, details.sub) == (account.name, account.sub)
+        assert details.balances_net == single.balances_net
+        assert details.last_transaction_date == single.last_transaction_date
+
+    assert batched[-1].balances == {}
+
+
 async def test_get_account_balance_printout():
     account = LiabilityAccount(name="VSC Liability", sub="v4vapp-test")
     result, details = await account_balance_printout(account, line_items=True)
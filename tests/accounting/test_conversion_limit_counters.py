@@ -0,0 +1,286 @@
+"""
+Tests for the hourly conversion limit counters.
+
+Covers:
+- window sums take whole buckets and only the in-window entries of the boundary bucket
+- the next expiry is the oldest conversion in the shortest window
+- save() only produces counter updates for conversions, and a reversal backs out
+  the stored version before adding the new one
+- reconciliation leaves buckets written during its scan alone and only overwrites
+  buckets still as they were read
+- with a database: counters match limit_check_pipeline, reconciliation repairs a
+  damaged bucket, and readers fall back to the pipeline until the counters are built
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from bson import json_util
+
+from v4vapp_backend_v2.accounting.account_balances import (
+    check_hive_conversion_limits,
+    check_hive_conversion_limits_many,
+    get_next_limit_expiry,
+)
+from v4vapp_backend_v2.accounting.conversion_limit_counters import (
+    META_ID,
+    CounterEntry,
+    ReconcileResult,
+    _build_updates,
+    _reconcile_operations,
+    bucket_hour,
+    build_buckets,
+    collection,
+    collection_name,
+    counter_limit_checks,
+    ensure_indexes,
+    next_expiry,
+    period_results,
+    rebuild_conversion_limit_counters,
+    reconcile_conversion_limit_counters,
+)
+from v4vapp_backend_v2.accounting.ledger_entry_class import LedgerEntry
+from v4vapp_backend_v2.accounting.ledger_type_class import LedgerType
+from v4vapp_backend_v2.config.setup import InternalConfig
+from v4vapp_backend_v2.database.db_pymongo import DBConn
+from v4vapp_backend_v2.helpers.crypto_conversion import CryptoConv
+from v4vapp_backend_v2.hive.v4v_config import V4VConfigRateLimits
+
+NOW = datetime(2026, 10, 16, 12, 30, tzinfo=timezone.utc)
+LIMITS = [
+    V4VConfigRateLimits(hours=4, sats=400_000),
+    V4VConfigRateLimits(hours=72, sats=800_000),
+]
+
+
+def _entry(group_id: str, age: timedelta, sats: int, cust_id: str = "alice") -> CounterEntry:
+    return CounterEntry(
+        cust_id=cust_id,
+        group_id=group_id,
+        timestamp=NOW - age,
+        conv={
+            "hive": Decimal(sats) / 1000,
+            "hbd": Decimal(sats) / 4000,
+            "usd": Decimal(sats) / 4000,
+            "sats": Decimal(sats),
+            "msats": Decimal(sats * 1000),
+        },
+    )
+
+
+def _buckets(*entries: CounterEntry):
+    return list(build_buckets(entries, 72).values())
+
+
+def test_period_results_split_boundary_bucket():
+    # 4h window starts at 08:30: the 08:00 bucket is split, 09:00+ buckets count whole.
+    buckets = _buckets(
+        _entry("inside-boundary", timedelta(hours=3, minutes=50), 1_000),  # 08:40
+        _entry("outside-boundary", timedelta(hours=4, minutes=10), 20_000),  # 08:20
+        _entry("recent", timedelta(minutes=10), 300),  # 12:20
+        _entry("old", timedelta(hours=50), 50_000),
+        _entry("expired", timedelta(hours=80), 900_000),
+    )
+    results = period_results(buckets, LIMITS, NOW)
+
+    assert list(results) == ["4", "72"]
+    assert results["4"].sats == Decimal(1_300)
+    assert results["4"].msats == Decimal(1_300_000)
+    assert results["72"].sats == Decimal(71_300)
+    assert results["72"].limit_sats == 800_000
+    assert results["4"].limit_ok
+
+
+def test_next_expiry_is_oldest_in_shortest_window():
+    buckets = _buckets(
+        _entry("older", timedelta(hours=5), 9_999),
+        _entry("oldest-in-window", timedelta(hours=3, minutes=45), 2_500),
+        _entry("newer", timedelta(hours=1), 7_000),
+    )
+    expiry, sats_freed = next_expiry(buckets, LIMITS, NOW)
+    assert expiry == NOW - timedelta(hours=3, minutes=45) + timedelta(hours=4)
+    assert sats_freed == Decimal(2_500)
+    assert next_expiry(_buckets(_entry("old", timedelta(hours=5), 1)), LIMITS, NOW) is None
+
+
+def _ledger_entry(ledger_type: LedgerType, reversed: datetime | None = None) -> LedgerEntry:
+    return LedgerEntry(
+        group_id="group-1",
+        ledger_type=ledger_type,
+        cust_id="alice",
+        timestamp=NOW,
+        credit_conv=CryptoConv(sats=Decimal(1_000), msats=Decimal(1_000_000)),
+        reversed=reversed,
+    )
+
+
+def test_build_updates_only_for_conversions():
+    assert _build_updates(None, _ledger_entry(LedgerType.FUNDING)) == []
+
+    (add,) = _build_updates(None, _ledger_entry(LedgerType.CONV_HIVE_TO_KEEPSATS))
+    assert add._filter["hour"] == bucket_hour(NOW)
+    assert add._filter["entries.group_id"] == {"$ne": "group-1"}
+    assert add._upsert
+    assert str(add._doc["$inc"]["totals.sats"]) == "1000"
+
+    remove, add = _build_updates(
+        _ledger_entry(LedgerType.CONV_KEEPSATS_TO_HIVE),
+        _ledger_entry(LedgerType.CONV_KEEPSATS_TO_HIVE, reversed=NOW),
+    )
+    assert remove._filter["entries.group_id"] == "group-1"
+    assert remove._doc["$pull"] == {"entries": {"group_id": "group-1"}}
+    assert str(remove._doc["$inc"]["totals.sats"]) == "-1000"
+    assert remove._doc["$inc"]["count"] == -1
+    assert add._doc["$inc"]["count"] == 1
+
+
+def test_reconcile_skips_buckets_written_during_scan():
+    scan_start = NOW
+    expected = build_buckets([_entry("in-ledger", timedelta(hours=2), 1_000)], 72)
+    (key,) = expected
+    # A conversion saved after the ledger was read: in the bucket, not in the snapshot.
+    racing = {
+        **_buckets(
+            _entry("in-ledger", timedelta(hours=2), 1_000),
+            _entry("racing", timedelta(hours=2), 2_000),
+        )[0],
+        "_id": "racing-bucket",
+        "updated_at": scan_start + timedelta(milliseconds=5),
+    }
+    result = ReconcileResult()
+    assert _reconcile_operations(expected, {key: racing}, scan_start, NOW, result) == []
+    assert (result.repaired, result.skipped) == (0, 1)
+
+    # An older damaged bucket is replaced, but only if still unchanged.
+    damaged = {**racing, "updated_at": scan_start - timedelta(hours=1)}
+    result = ReconcileResult()
+    (replace,) = _reconcile_operations(expected, {key: damaged}, scan_start, NOW, result)
+    assert replace._filter["updated_at"] == damaged["updated_at"]
+    assert not replace._upsert
+    assert result.repaired == 1
+
+    # A stale bucket with no ledger conversions left is deleted conditionally too.
+    result = ReconcileResult()
+    (delete,) = _reconcile_operations({}, {key: damaged}, scan_start, NOW, result)
+    assert delete._filter == {"_id": "racing-bucket", "updated_at": damaged["updated_at"]}
+    assert result.removed == 1
+
+
+# ---------------------------------------------------------------------------
+# Database-backed
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture(scope="module")
+def module_monkeypatch():
+    from _pytest.monkeypatch import MonkeyPatch
+
+    mp = MonkeyPatch()
+    yield mp
+    mp.undo()
+
+
+@pytest.fixture(scope="module")
+async def conversion_db(module_monkeypatch):
+    test_config_path = Path("tests/data/config")
+    module_monkeypatch.setattr("v4vapp_backend_v2.config.setup.BASE_CONFIG_PATH", test_config_path)
+    test_config_logging_path = Path(test_config_path, "logging/")
+    module_monkeypatch.setattr(
+        "v4vapp_backend_v2.config.setup.BASE_LOGGING_CONFIG_PATH",
+        test_config_logging_path,
+    )
+    module_monkeypatch.setattr("v4vapp_backend_v2.config.setup.InternalConfig._instance", None)
+    InternalConfig()
+    db_conn = DBConn()
+    await db_conn.setup_database()
+
+    await InternalConfig.db["ledger"].drop()
+    await InternalConfig.db[collection_name()].drop()
+    await ensure_indexes()
+    with open("tests/accounting/test_data/v4vapp-dev.ledger.json") as f:
+        json_data = json.loads(f.read(), object_hook=json_util.object_hook)
+    # Move the conversions into the limit windows, a few hours apart.
+    now = datetime.now(tz=timezone.utc)
+    conversions = 0
+    for entry_raw in json_data:
+        if entry_raw.get("ledger_type") in ("h_conv_k", "k_conv_h"):
+            entry_raw["timestamp"] = now - timedelta(hours=3 * conversions, minutes=7)
+            conversions += 1
+        await LedgerEntry.model_validate(entry_raw).save()
+    assert conversions > 0
+    cust_ids = await LedgerEntry.collection().distinct(
+        "cust_id", {"ledger_type": {"$in": ["h_conv_k", "k_conv_h"]}}
+    )
+    await rebuild_conversion_limit_counters()
+
+    yield cust_ids
+
+    await InternalConfig.db["ledger"].drop()
+    await InternalConfig.db[collection_name()].drop()
+    module_monkeypatch.setattr("v4vapp_backend_v2.config.setup.InternalConfig._instance", None)
+
+
+async def test_counters_match_pipeline(conversion_db):
+    for cust_id in conversion_db:
+        counters = await check_hive_conversion_limits(cust_id)
+        pipeline = await check_hive_conversion_limits(cust_id, use_counters=False)
+        assert counters.periods.keys() == pipeline.periods.keys()
+        for key, period in pipeline.periods.items():
+            assert counters.periods[key].sats == period.sats
+            assert counters.periods[key].msats == period.msats
+        assert await get_next_limit_expiry(cust_id) == await get_next_limit_expiry(
+            cust_id, use_counters=False
+        )
+
+    many = await check_hive_conversion_limits_many(conversion_db)
+    assert set(many) == set(conversion_db)
+
+
+async def test_save_and_reversal_update_counters(conversion_db):
+    cust_id = conversion_db[0]
+    doc = await LedgerEntry.collection().find_one(
+        {"cust_id": cust_id, "ledger_type": {"$in": ["h_conv_k", "k_conv_h"]}}
+    )
+    entry = LedgerEntry.model_validate(doc)
+    before = (await counter_limit_checks([cust_id]))[cust_id][0]
+
+    # Replaying the same entry does not count it twice.
+    await entry.save(upsert=True)
+    await entry.save(upsert=True, reverse=True)
+    after = (await counter_limit_checks([cust_id]))[cust_id][0]
+    assert after.sats == before.sats
+
+    result = await reconcile_conversion_limit_counters()
+    assert (result.repaired, result.removed, result.rebuilt) == (0, 0, False)
+
+
+async def test_reconcile_repairs_damaged_bucket(conversion_db):
+    bucket = await collection().find_one({"cust_id": {"$exists": True}})
+    await collection().update_one({"_id": bucket["_id"]}, {"$set": {"entries": [], "count": 0}})
+    await collection().insert_one(
+        {
+            "cust_id": "nobody",
+            "hour": bucket_hour(datetime.now(tz=timezone.utc)),
+            "count": 1,
+            "entries": [{"group_id": "ghost"}],
+        }
+    )
+
+    result = await reconcile_conversion_limit_counters()
+    assert (result.repaired, result.removed) == (1, 1)
+    again = await reconcile_conversion_limit_counters()
+    assert (again.repaired, again.removed) == (0, 0)
+
+
+async def test_pipeline_fallback_until_built(conversion_db):
+    await collection().delete_one({"_id": META_ID})
+    assert await counter_limit_checks(conversion_db) is None
+    cust_id = conversion_db[0]
+    assert (await check_hive_conversion_limits(cust_id)).periods
+
+    result = await reconcile_conversion_limit_counters()
+    assert result.rebuilt
+    assert await counter_limit_checks(conversion_db) is not None
@@ -17,11 +17,14 @@ from v4vapp_backend_v2.accounting.accounting_classes import LedgerAccountDetails
 from v4vapp_backend_v2.accounting.ledger_account_classes import LiabilityAccount
 from v4vapp_backend_v2.accounting.ledger_cache import (
     GENERATION_KEY,
+    _make_index_key,
     get_cache_generation,
     get_cached_balance,
+    get_cached_balances,
     invalidate_all_ledger_cache,
     invalidate_ledger_cache,
     set_cached_balance,
+    set_cached_balances,
 )
 from v4vapp_backend_v2.accounting.ledger_entry_class import LedgerEntry
 from v4vapp_backend_v2.config.setup import InternalConfig
@@ -153,6 +156,22 @@ async def test_set_and_get_cached_balance():
     assert live_cached2.sub == balance.sub
 
 
+async def test_batched_set_and_get_cached_balances():
+    """set_cached_balances / get_cached_balances round-trip in input order with misses as None."""
+    account = LiabilityAccount(name="VSC Liability", sub="v4vapp-test")
+    missing = LiabilityAccount(name="VSC Liability", sub="not-cached")
+    balance = await one_account_balance(account=account, use_cache=False)
+
+    await set_cached_balances([(account, balance)], None, None, ttl=30)
+    cached = await get_cached_balances([missing, account, missing], None, None)
+
+    assert cached[0] is None
+    assert cached[2] is None
+    assert cached[1] is not None
+    assert cached[1].sub == balance.sub
+    assert cached[1].msats == balance.msats
+
+
 async def test_invalidation_orphans_cached_entries():
     """After full invalidation, previously cached entries should not be found."""
     account = LiabilityAccount(name="VSC Liability", sub="v4vapp-test")
@@ -241,10 +260,29 @@ async def test_selective_invalidation_respects_account_filters():
     assert await get_cached_balance(acc2, as_of, None) is not None
 
 
-async def test_selective_invalidation_falls_back_to_full_on_error(
-    module_monkeypatch,
-):
-    """If the Redis scan/delete loop raises an exception, revert to full invalidation."""
+async def test_index_set_tracks_and_clears_cached_keys():
+    """Every cached key is listed in its account's index set, which invalidation drops."""
+    from datetime import datetime, timezone
+
+    account = LiabilityAccount(name="VSC Liability", sub="index-test")
+    as_of = datetime.now(tz=timezone.utc)
+    balance = await one_account_balance(account=account, use_cache=False)
+    await set_cached_balance(account, as_of, None, balance, ttl=30)
+    await set_cached_balances([(account, balance)], None, None, ttl=60)
+
+    index_key = _make_index_key(account.name, account.sub)
+    members = await InternalConfig.redis_async.smembers(index_key)
+    assert len(members) == 2
+    assert 30 < await InternalConfig.redis_async.ttl(index_key) <= 60
+
+    await invalidate_ledger_cache(debit_name=account.name, debit_sub=account.sub)
+
+    assert not await InternalConfig.redis_async.exists(index_key, *members)
+    assert await get_cached_balance(account, as_of, None) is None
+
+
+async def test_selective_invalidation_falls_back_to_full_on_error(monkeypatch):
+    """If the Redis index pipeline raises an exception, revert to full invalidation."""
     from datetime import datetime, timezone
 
     acc = LiabilityAccount(name="VSC Liability", sub="v4vapp-test")
@@ -258,11 +296,11 @@ async def test_selective_invalidation_falls_back_to_full_on_error(
     await InternalConfig.redis_async.delete(GENERATION_KEY)
     gen_before = await get_cache_generation()
 
-    # make scan fail
-    async def boom(*args, **kwargs):
-        raise RuntimeError("scan failed")
+    # make the index pipeline fail
+    def boom(*args, **kwargs):
+        raise RuntimeError("pipeline failed")
 
-    module_monkeypatch.setattr(InternalConfig.redis_async, "scan", boom)
+    monkeypatch.setattr(InternalConfig.redis_async, "pipeline", boom)
     gen_after = await invalidate_ledger_cache(
         debit_name=acc.name,
         debit_sub=acc.sub,
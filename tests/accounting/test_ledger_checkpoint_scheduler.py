@@ -0,0 +1,214 @@
+"""
+Tests for the ledger checkpoint scheduler.
+
+Covers:
+- retention windows for expected period ends and the next-run calculation
+- a cycle backfills every gap, and a second cycle finds none
+- deleted checkpoints are detected as gaps and rebuilt
+- pruning removes daily checkpoints older than the retention window
+- live one_account_balance queries start from the latest checkpoint only when asked
+  (live_checkpoints) and agree with the full-history path; by default existing live
+  callers get exactly the full-history result
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from bson import json_util
+
+from v4vapp_backend_v2.accounting import ledger_checkpoint_scheduler
+from v4vapp_backend_v2.accounting.account_balances import _use_checkpoints, one_account_balance
+from v4vapp_backend_v2.accounting.ledger_account_classes import LiabilityAccount
+from v4vapp_backend_v2.accounting.ledger_checkpoint_scheduler import (
+    DAILY_RETENTION,
+    LOCK_KEY,
+    active_accounts_with_first_timestamp,
+    expected_period_ends,
+    find_checkpoint_gaps,
+    prune_checkpoints,
+    run_checkpoint_cycle,
+    run_checkpoint_cycle_locked,
+    seconds_until_next_run,
+)
+from v4vapp_backend_v2.accounting.ledger_checkpoints import LedgerCheckpoint
+from v4vapp_backend_v2.accounting.ledger_entry_class import LedgerEntry
+from v4vapp_backend_v2.config.setup import InternalConfig
+from v4vapp_backend_v2.database.db_pymongo import DBConn
+from v4vapp_backend_v2.helpers.period_end_type import PeriodType
+
+
+@pytest.fixture(scope="module")
+def module_monkeypatch():
+    from _pytest.monkeypatch import MonkeyPatch
+
+    mp = MonkeyPatch()
+    yield mp
+    mp.undo()
+
+
+@pytest.fixture(autouse=True, scope="module")
+async def setup_test_db(module_monkeypatch):
+    test_config_path = Path("tests/data/config")
+    module_monkeypatch.setattr("v4vapp_backend_v2.config.setup.BASE_CONFIG_PATH", test_config_path)
+    test_config_logging_path = Path(test_config_path, "logging/")
+    module_monkeypatch.setattr(
+        "v4vapp_backend_v2.config.setup.BASE_LOGGING_CONFIG_PATH",
+        test_config_logging_path,
+    )
+    module_monkeypatch.setattr("v4vapp_backend_v2.config.setup.InternalConfig._instance", None)
+    InternalConfig()
+    db_conn = DBConn()
+    await db_conn.setup_database()
+
+    await InternalConfig.db["ledger"].drop()
+    await InternalConfig.db["ledger_checkpoints"].drop()
+    with open("tests/accounting/test_data/v4vapp-dev.ledger.json") as f:
+        json_data = json.loads(f.read(), object_hook=json_util.object_hook)
+    for entry_raw in json_data:
+        entry = LedgerEntry.model_validate(entry_raw)
+        await entry.save()
+    await LedgerCheckpoint.ensure_indexes()
+
+    yield
+
+    await InternalConfig.db["ledger"].drop()
+    await InternalConfig.db["ledger_checkpoints"].drop()
+    module_monkeypatch.setattr("v4vapp_backend_v2.config.setup.InternalConfig._instance", None)
+
+
+async def _cycle_now() -> datetime:
+    """A 'now' a few days after the last test entry so the cycle has a bounded amount of work."""
+    last_doc = await LedgerEntry.collection().find_one(filter={}, sort=[("timestamp", -1)])
+    assert last_doc is not None
+    last_ts = last_doc["timestamp"]
+    if last_ts.tzinfo is None:
+        last_ts = last_ts.replace(tzinfo=timezone.utc)
+    return last_ts + timedelta(days=3)
+
+
+# ---------------------------------------------------------------------------
+# Pure unit tests
+# ---------------------------------------------------------------------------
+
+
+def test_expected_period_ends_respects_retention():
+    now = datetime(2026, 3, 10, 12, tzinfo=timezone.utc)
+    first = datetime(2024, 1, 15, tzinfo=timezone.utc)
+
+    daily = expected_period_ends(PeriodType.DAILY, first, now)
+    assert daily[0] >= now - DAILY_RETENTION
+    assert daily[-1] == datetime(2026, 3, 9, 23, 59, 59, 999999, tzinfo=timezone.utc)
+
+    monthly = expected_period_ends(PeriodType.MONTHLY, first, now)
+    assert monthly[0] == datetime(2024, 1, 31, 23, 59, 59, 999999, tzinfo=timezone.utc)
+    assert monthly[-1] == datetime(2026, 2, 28, 23, 59, 59, 999999, tzinfo=timezone.utc)
+
+
+def test_seconds_until_next_run():
+    before = datetime(2026, 3, 10, 0, 1, tzinfo=timezone.utc)
+    assert seconds_until_next_run(before) == 4 * 60
+    after = datetime(2026, 3, 10, 12, 0, tzinfo=timezone.utc)
+    assert seconds_until_next_run(after) == 12 * 3600 + 5 * 60
+
+
+# ---------------------------------------------------------------------------
+# DB tests
+# ---------------------------------------------------------------------------
+
+
+def test_live_queries_only_checkpointed_when_asked():
+    now = datetime.now(tz=timezone.utc)
+    assert _use_checkpoints(True, False, now, None)
+    assert not _use_checkpoints(True, False, None, None)
+    assert _use_checkpoints(True, True, None, None)
+    assert not _use_checkpoints(False, True, None, None)
+    assert not _use_checkpoints(True, True, None, timedelta(days=1))
+
+
+async def test_lock_released_only_by_its_holder(monkeypatch):
+    redis = InternalConfig.redis_async
+    takeover: list[str] = []
+
+    async def cycle():
+        # Simulates our lock expiring mid-cycle and another scheduler taking it
+        for owner in takeover:
+            await redis.set(LOCK_KEY, owner, ex=60)
+
+    monkeypatch.setattr(ledger_checkpoint_scheduler, "run_checkpoint_cycle", cycle)
+    await redis.delete(LOCK_KEY)
+    await run_checkpoint_cycle_locked()
+    assert not await redis.exists(LOCK_KEY)
+
+    takeover.append("other-host:token")
+    await run_checkpoint_cycle_locked()
+    assert await redis.get(LOCK_KEY) == "other-host:token"
+    await redis.delete(LOCK_KEY)
+
+
+async def test_cycle_backfills_all_gaps():
+    now = await _cycle_now()
+    result = await run_checkpoint_cycle(now=now)
+    assert result.accounts > 0
+    assert sum(result.created.values()) > 0
+    assert result.failed == 0
+
+    for account, first in await active_accounts_with_first_timestamp():
+        for period_type in PeriodType:
+            assert await find_checkpoint_gaps(account, period_type, first, now) == []
+
+    second = await run_checkpoint_cycle(now=now)
+    assert sum(second.created.values()) == 0
+
+
+async def test_deleted_checkpoints_are_rebuilt():
+    now = await _cycle_now()
+    account, first = (await active_accounts_with_first_timestamp())[0]
+    await LedgerCheckpoint.collection().delete_many(
+        {
+            "account_name": account.name,
+            "account_sub": account.sub,
+            "period_type": str(PeriodType.DAILY),
+        }
+    )
+    gaps = await find_checkpoint_gaps(account, PeriodType.DAILY, first, now)
+    assert gaps
+
+    result = await run_checkpoint_cycle(now=now)
+    assert result.created.get(str(PeriodType.DAILY), 0) >= len(gaps)
+    assert await find_checkpoint_gaps(account, PeriodType.DAILY, first, now) == []
+
+
+async def test_prune_removes_old_daily_checkpoints():
+    now = await _cycle_now()
+    await run_checkpoint_cycle(now=now)
+    # Pretend a year has passed: every daily checkpoint is now out of the window.
+    pruned = await prune_checkpoints(now + timedelta(days=365))
+    assert pruned.get(str(PeriodType.DAILY), 0) > 0
+    remaining = await LedgerCheckpoint.collection().count_documents(
+        {"period_type": str(PeriodType.DAILY)}
+    )
+    assert remaining == 0
+    assert await LedgerCheckpoint.collection().count_documents(
+        {"period_type": str(PeriodType.MONTHLY)}
+    )
+
+
+async def test_live_balance_starts_from_checkpoint():
+    now = await _cycle_now()
+    await run_checkpoint_cycle(now=now)
+    subs = await LedgerEntry.collection().distinct("credit.sub", {"credit.name": "VSC Liability"})
+    assert subs
+    account = LiabilityAccount(name="VSC Liability", sub=subs[0])
+
+    with_cp = await one_account_balance(account, use_cache=False, live_checkpoints=True)
+    full = await one_account_balance(account, use_cache=False, use_checkpoints=False)
+    default = await one_account_balance(account, use_cache=False)
+
+    assert default.model_dump() == full.model_dump()
+
+    assert abs(with_cp.msats - full.msats) <= Decimal("10")
+    assert abs(with_cp.hive - full.hive) <= Decimal("0.001")
+    assert abs(with_cp.hbd - full.hbd) <= Decimal("0.001")
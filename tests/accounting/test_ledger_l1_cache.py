@@ -0,0 +1,203 @@
+"""
+Tests for the in-process ledger L1 cache and its pub/sub invalidation.
+
+The unit tests exercise ``LedgerL1Cache`` directly; the integration tests run
+the listener against the test Redis and check that ``invalidate_ledger_cache``
+and ``invalidate_all_ledger_cache`` reach it.
+"""
+
+import asyncio
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from v4vapp_backend_v2.accounting.accounting_classes import LedgerAccountDetails
+from v4vapp_backend_v2.accounting.ledger_account_classes import LiabilityAccount
+from v4vapp_backend_v2.accounting.ledger_cache import (
+    get_cached_balance,
+    invalidate_all_ledger_cache,
+    invalidate_ledger_cache,
+    set_cached_balance,
+)
+from v4vapp_backend_v2.accounting.ledger_l1_cache import LedgerL1Cache, ledger_l1_cache
+from v4vapp_backend_v2.config.setup import InternalConfig
+
+
+@pytest.fixture(scope="module")
+def module_monkeypatch():
+    from _pytest.monkeypatch import MonkeyPatch
+
+    mp = MonkeyPatch()
+    yield mp
+    mp.undo()
+
+
+@pytest.fixture(autouse=True, scope="module")
+def setup_config(module_monkeypatch):
+    test_config_path = Path("tests/data/config")
+    module_monkeypatch.setattr("v4vapp_backend_v2.config.setup.BASE_CONFIG_PATH", test_config_path)
+    test_config_logging_path = Path(test_config_path, "logging/")
+    module_monkeypatch.setattr(
+        "v4vapp_backend_v2.config.setup.BASE_LOGGING_CONFIG_PATH",
+        test_config_logging_path,
+    )
+    module_monkeypatch.setattr("v4vapp_backend_v2.config.setup.InternalConfig._instance", None)
+    InternalConfig()
+    yield
+    module_monkeypatch.setattr("v4vapp_backend_v2.config.setup.InternalConfig._instance", None)
+
+
+def _details(sub: str) -> LedgerAccountDetails:
+    return LedgerAccountDetails(name="VSC Liability", account_type="Liability", sub=sub)
+
+
+async def _wait_active(timeout: float = 2.0) -> None:
+    ledger_l1_cache.ensure_listener()
+    for _ in range(int(timeout / 0.01)):
+        if ledger_l1_cache.active:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("L1 listener did not subscribe")
+
+
+async def _wait_for(predicate, timeout: float = 2.0) -> None:
+    for _ in range(int(timeout / 0.01)):
+        if predicate():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not met")
+
+
+# ---- LedgerL1Cache unit tests ----
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LedgerL1Cache(max_entries=2)
+    cache.put("a", ("VSC Liability", "a"), _details("a"))
+    cache.put("b", ("VSC Liability", "b"), _details("b"))
+    assert cache.get("a") is not None  # "a" is now most recently used
+    cache.put("c", ("VSC Liability", "c"), _details("c"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+    assert stats["entries"] == 2
+
+
+def test_get_returns_copy():
+    cache = LedgerL1Cache()
+    cache.put("a", ("VSC Liability", "a"), _details("a"))
+    first = cache.get("a")
+    assert first is not None
+    first.in_progress_msats = 123
+    second = cache.get("a")
+    assert second is not None
+    assert second.in_progress_msats != 123
+
+
+async def test_notification_lines_do_not_grow_cached_entry(monkeypatch):
+    from v4vapp_backend_v2.accounting import account_balances
+
+    cache = LedgerL1Cache()
+    cache.put("k", ("VSC Liability", "alice"), _details("alice"))
+    notification = {
+        "parent_id": "p1",
+        "short_id": "s1",
+        "trx_id": "t1",
+        "memo": "hello",
+        "timestamp": datetime(2026, 10, 17, tzinfo=timezone.utc),
+    }
+
+    class _Cursor:
+        async def to_list(self, length=None):
+            return [dict(notification)]
+
+    class _HiveOps:
+        async def aggregate(self, pipeline):
+            return _Cursor()
+
+    async def one_account_balance(**kwargs):
+        return cache.get("k")
+
+    monkeypatch.setattr(InternalConfig, "db", {"hive_ops": _HiveOps()})
+    monkeypatch.setattr(account_balances, "one_account_balance", one_account_balance)
+    for _ in range(2):
+        _, details = await account_balances.keepsats_balance(cust_id="alice", notifications=True)
+        assert len(details.combined_balance) == 1
+    cached = cache.get("k")
+    assert cached is not None and cached.combined_balance == []
+
+
+def test_invalidate_accounts_drops_only_matching_entries():
+    cache = LedgerL1Cache()
+    cache.put("a1", ("VSC Liability", "a"), _details("a"))
+    cache.put("a2", ("VSC Liability", "a"), _details("a"))
+    cache.put("b1", ("VSC Liability", "b"), _details("b"))
+    cache.put_held([{"cust_id": "a"}], cache.epoch)
+
+    cache.apply_message(cache.accounts_message([("VSC Liability", "a")]))
+
+    assert cache.get("a1") is None
+    assert cache.get("a2") is None
+    assert cache.get("b1") is not None
+    assert cache.get_held() is None
+
+
+def test_generation_message_clears_everything():
+    cache = LedgerL1Cache()
+    cache.put("a1", ("VSC Liability", "a"), _details("a"))
+    cache.apply_message(cache.generation_message(7))
+    assert cache.generation == 7
+    assert cache.get("a1") is None
+
+
+def test_put_skipped_after_concurrent_invalidation():
+    cache = LedgerL1Cache()
+    epoch = cache.epoch
+    cache.invalidate_accounts([("VSC Liability", "a")])
+    cache.put("a1", ("VSC Liability", "a"), _details("a"), epoch)
+    cache.put_held([], epoch)
+    assert cache.get("a1") is None
+    assert cache.get_held() is None
+
+
+def test_expired_entry_is_a_miss():
+    cache = LedgerL1Cache(max_age=0)
+    cache.put("a1", ("VSC Liability", "a"), _details("a"))
+    assert cache.get("a1") is None
+    assert cache.stats()["entries"] == 0
+
+
+# ---- Listener integration ----
+
+
+async def test_l1_serves_hits_and_is_invalidated_by_publish():
+    account = LiabilityAccount(name="VSC Liability", sub="l1-test")
+    await _wait_active()
+
+    await set_cached_balance(account, None, None, _details("l1-test"), ttl=30)
+    hits_before = ledger_l1_cache.hits
+    assert await get_cached_balance(account, None, None) is not None
+    assert ledger_l1_cache.hits == hits_before + 1
+
+    # Simulate another process invalidating: publish directly, the listener must react.
+    key_count = ledger_l1_cache.stats()["entries"]
+    await InternalConfig.redis_async.publish(
+        "ledger:cache:invalidate", ledger_l1_cache.accounts_message([(account.name, account.sub)])
+    )
+    await _wait_for(lambda: ledger_l1_cache.stats()["entries"] < key_count)
+
+    await invalidate_ledger_cache(debit_name=account.name, debit_sub=account.sub)
+    assert await get_cached_balance(account, None, None) is None
+
+
+async def test_invalidate_all_updates_l1_generation():
+    await _wait_active()
+    new_gen = await invalidate_all_ledger_cache()
+    assert ledger_l1_cache.generation == new_gen
+    assert ledger_l1_cache.stats()["entries"] == 0
@@ -0,0 +1,186 @@
+"""
+Tests for the incrementally maintained ledger running balances.
+
+Covers:
+- LedgerEntry.save() keeps ledger_running_balances in step with the pipeline
+- rebuild_running_balances() recreates the same totals from scratch
+- reversals (save(upsert=True, reverse=True)) drop out of the running balance
+- ledger-editor style edits move an entry between accounts, once each when concurrent
+- one_account_balance(use_running_balance=True) returns the same totals
+- reads fall back to the pipeline while the running balances are not ready
+"""
+
+import asyncio
+import json
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from bson import json_util
+
+from v4vapp_backend_v2.accounting.account_balances import one_account_balance
+from v4vapp_backend_v2.accounting.ledger_account_classes import LiabilityAccount
+from v4vapp_backend_v2.accounting.ledger_entry_class import LedgerEntry
+from v4vapp_backend_v2.accounting.ledger_running_balances import (
+    LedgerRunningBalance,
+    get_running_balance,
+    rebuild_running_balances,
+    running_account_balance,
+    running_balances_ready,
+    set_running_balances_ready,
+    verify_running_balances,
+)
+from v4vapp_backend_v2.config.setup import InternalConfig
+from v4vapp_backend_v2.database.db_pymongo import DBConn
+
+
+@pytest.fixture(scope="module")
+def module_monkeypatch():
+    from _pytest.monkeypatch import MonkeyPatch
+
+    mp = MonkeyPatch()
+    yield mp
+    mp.undo()
+
+
+@pytest.fixture(autouse=True, scope="module")
+async def setup_test_db(module_monkeypatch):
+    test_config_path = Path("tests/data/config")
+    module_monkeypatch.setattr("v4vapp_backend_v2.config.setup.BASE_CONFIG_PATH", test_config_path)
+    test_config_logging_path = Path(test_config_path, "logging/")
+    module_monkeypatch.setattr(
+        "v4vapp_backend_v2.config.setup.BASE_LOGGING_CONFIG_PATH",
+        test_config_logging_path,
+    )
+    module_monkeypatch.setattr("v4vapp_backend_v2.config.setup.InternalConfig._instance", None)
+    InternalConfig()
+    db_conn = DBConn()
+    await db_conn.setup_database()
+
+    await InternalConfig.db["ledger"].drop()
+    await InternalConfig.db[LedgerRunningBalance.collection_name()].drop()
+    await LedgerRunningBalance.ensure_indexes()
+    # Empty ledger and empty collection: incremental updates start consistent.
+    await set_running_balances_ready(True)
+    with open("tests/accounting/test_data/v4vapp-dev.ledger.json") as f:
+        json_data = json.loads(f.read(), object_hook=json_util.object_hook)
+    for entry_raw in json_data:
+        entry = LedgerEntry.model_validate(entry_raw)
+        await entry.save()
+
+    yield
+
+    await InternalConfig.db["ledger"].drop()
+    await InternalConfig.db[LedgerRunningBalance.collection_name()].drop()
+    module_monkeypatch.setattr("v4vapp_backend_v2.config.setup.InternalConfig._instance", None)
+
+
+async def _first_customer_account() -> LiabilityAccount:
+    subs = await LedgerEntry.collection().distinct("credit.sub", {"credit.name": "VSC Liability"})
+    assert subs, "Test data should contain VSC Liability entries"
+    return LiabilityAccount(name="VSC Liability", sub=subs[0])
+
+
+async def test_save_maintains_running_balances():
+    mismatches = await verify_running_balances()
+    assert mismatches == {}
+
+
+async def test_rebuild_matches_incremental():
+    account = await _first_customer_account()
+    before = await get_running_balance(account)
+    assert before is not None
+
+    written = await rebuild_running_balances()
+    assert written > 0
+
+    after = await get_running_balance(account)
+    assert after is not None
+    for unit, unit_balance in before.balances.items():
+        assert after.balances[unit].amount == unit_balance.amount
+    assert await verify_running_balances() == {}
+
+
+async def test_one_account_balance_use_running_balance():
+    account = await _first_customer_account()
+    running = await one_account_balance(account, use_running_balance=True)
+    full = await one_account_balance(account, use_cache=False, use_checkpoints=False)
+    assert abs(running.msats - full.msats) <= Decimal("10")
+    assert running.hive == full.hive
+    assert running.hbd == full.hbd
+
+
+async def test_reversal_removes_entry_from_running_balance():
+    account = await _first_customer_account()
+    doc = await LedgerEntry.collection().find_one(
+        {"credit.name": account.name, "credit.sub": account.sub, "reversed": {"$exists": False}}
+    )
+    entry = LedgerEntry.model_validate(doc)
+
+    before = await get_running_balance(account)
+    assert before is not None
+    unit = entry.credit_unit.value
+    before_amount = before.balances[unit].amount
+
+    await entry.save(upsert=True, reverse=True)
+
+    after = await get_running_balance(account)
+    assert after is not None
+    assert after.balances[unit].amount == before_amount - entry.credit_amount_signed
+    assert await verify_running_balances([account]) == {}
+
+
+async def test_edit_moves_entry_between_accounts():
+    account = await _first_customer_account()
+    doc = await LedgerEntry.collection().find_one(
+        {"credit.name": account.name, "credit.sub": account.sub, "reversed": {"$exists": False}}
+    )
+    entry = LedgerEntry.model_validate(doc)
+    new_account = LiabilityAccount(name="VSC Liability", sub="running-balance-test")
+
+    entry_data = entry.model_dump()
+    entry_data["credit"] = new_account.model_dump()
+    updated_entry = LedgerEntry.model_validate(entry_data)
+    await updated_entry.save(upsert=True)
+
+    assert await verify_running_balances([account, new_account]) == {}
+    moved = await get_running_balance(new_account)
+    assert moved is not None
+    assert moved.balances[entry.credit_unit.value].amount == entry.credit_amount_signed
+
+
+async def test_concurrent_edits_each_applied_once():
+    account = await _first_customer_account()
+    doc = await LedgerEntry.collection().find_one(
+        {"credit.name": account.name, "credit.sub": account.sub, "reversed": {"$exists": False}}
+    )
+    entry = LedgerEntry.model_validate(doc)
+    new_accounts = [
+        LiabilityAccount(name="VSC Liability", sub=f"running-balance-race-{n}") for n in range(2)
+    ]
+    edits = []
+    for new_account in new_accounts:
+        entry_data = entry.model_dump()
+        entry_data["credit"] = new_account.model_dump()
+        edits.append(LedgerEntry.model_validate(entry_data))
+
+    await asyncio.gather(*(edit.save(upsert=True) for edit in edits))
+
+    assert await verify_running_balances([account, *new_accounts]) == {}
+
+
+async def test_not_ready_falls_back_to_pipeline():
+    account = await _first_customer_account()
+    assert await running_balances_ready()
+    assert await running_account_balance(account) is not None
+
+    await set_running_balances_ready(False, reason="test")
+    assert await running_account_balance(account) is None
+    fallback = await one_account_balance(account, use_running_balance=True, use_cache=False)
+    assert fallback.balances and any(
+        line.ledger_type != "summary" for lines in fallback.balances.values() for line in lines
+    )
+
+    await rebuild_running_balances()
+    assert await running_balances_ready()
+    assert await running_account_balance(account) is not None
@@ -82,8 +82,8 @@ async def test_sample_trading_pnl_matches_expected(monkeypatch):
     # we expect in production)
     expected = _compute_from_sample_balance(data)
 
-    # fake one_account_balance to return the sample data structure
-    async def fake_one_account_balance(account, as_of_date=None, age=None):
+    # fake many_account_balances to return the sample data structure
+    async def fake_many_account_balances(accounts, as_of_date=None, age=None):
         # convert the raw dict entries into objects with attribute access to mimic
         # AccountBalanceLine.  make nested dicts AttrDict too so conv_signed.hive
         # works.
@@ -97,11 +97,11 @@ async def test_sample_trading_pnl_matches_expected(monkeypatch):
         class Dummy:
             balances = {"hive": [AttrDict(t) for t in data["balances"]["hive"]]}
 
-        return Dummy()
+        return [Dummy() for _ in accounts]
 
     monkeypatch.setattr(
-        "v4vapp_backend_v2.accounting.trading_pnl.one_account_balance",
-        fake_one_account_balance,
+        "v4vapp_backend_v2.accounting.trading_pnl.many_account_balances",
+        fake_many_account_balances,
     )
 
     report = await generate_trading_pnl_report(subs=["binance_convert"])
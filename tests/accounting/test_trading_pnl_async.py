@@ -6,16 +6,16 @@ from v4vapp_backend_v2.accounting.trading_pnl import generate_trading_pnl_report
 
 @pytest.mark.asyncio
 async def test_generate_trading_pnl_accepts_sub(monkeypatch):
-    # Fake one_account_balance to avoid DB calls; return object with minimal shape
-    async def fake_one_account_balance(account, as_of_date=None, age=None):
+    # Fake many_account_balances to avoid DB calls; return object with minimal shape
+    async def fake_many_account_balances(accounts, as_of_date=None, age=None):
         class Dummy:
             balances = {"hive": []}
 
-        return Dummy()
+        return [Dummy() for _ in accounts]
 
     monkeypatch.setattr(
-        "v4vapp_backend_v2.accounting.trading_pnl.one_account_balance",
-        fake_one_account_balance,
+        "v4vapp_backend_v2.accounting.trading_pnl.many_account_balances",
+        fake_many_account_balances,
     )
 
     res = await generate_trading_pnl_report(subs=["binance_convert"])
@@ -33,15 +33,15 @@ async def test_negative_signed_entries_are_normalized(monkeypatch):
         # conv_signed with negative hive indicates a sell in production data
         conv_signed = type("c", (), {"hive": -100.0, "sats": 5000.0, "sats_hive": 50.0})
 
-    async def fake_one_account_balance(account, as_of_date=None, age=None):
+    async def fake_many_account_balances(accounts, as_of_date=None, age=None):
         class Dummy:
             balances = {"hive": [FakeLine()]}
 
-        return Dummy()
+        return [Dummy() for _ in accounts]
 
     monkeypatch.setattr(
-        "v4vapp_backend_v2.accounting.trading_pnl.one_account_balance",
-        fake_one_account_balance,
+        "v4vapp_backend_v2.accounting.trading_pnl.many_account_balances",
+        fake_many_account_balances,
     )
 
     report = await generate_trading_pnl_report(subs=["binance_convert"])
@@ -30,7 +30,7 @@ class FakeCollection:
         self.docs = docs
         self.ts_field = ts_field
 
-    def find(self, flt):
+    def find(self, flt, projection=None):
         key = self.ts_field
         matched = []
         cond_ts = flt.get(key, {})
@@ -41,6 +41,10 @@ class FakeCollection:
                 ok = False
             if "$gte" in cond_ts and not (ts >= cond_ts["$gte"]):
                 ok = False
+            if "$lt" in cond_ts and not (ts < cond_ts["$lt"]):
+                ok = False
+            if "$gt" in cond_ts and not (ts > cond_ts["$gt"]):
+                ok = False
 
             # support simple equality checks for extra filters
             for k, v in flt.items():
@@ -263,8 +263,8 @@ class TestAdminTemplates:
         #     ],
         # )
         mocker.patch(
-            "v4vapp_backend_v2.admin.routers.users.check_hive_conversion_limits",
-            return_value=None,  # Mock as needed
+            "v4vapp_backend_v2.admin.routers.users.check_hive_conversion_limits_many",
+            return_value={},  # Mock as needed
         )
         response = admin_client.get("/admin/users")
         assert response.status_code == 200
@@ -337,8 +337,8 @@ class TestAdminTemplates:
         )
         # simple empty limit result
         mocker.patch(
-            "v4vapp_backend_v2.admin.routers.users.check_hive_conversion_limits",
-            return_value=LimitCheckResult(cust_id="duplicate_user"),
+            "v4vapp_backend_v2.admin.routers.users.check_hive_conversion_limits_many",
+            return_value={"duplicate_user": LimitCheckResult(cust_id="duplicate_user")},
         )
 
         response = admin_client.get("/admin/users/data")
@@ -3,11 +3,13 @@ import os
 import re
 import select
 import subprocess
+import sys
 import threading
 import time  # Optional, for adding a startup delay if needed
 from datetime import datetime, timedelta
 from pathlib import Path
 from queue import Queue
+from types import ModuleType
 from typing import Generator
 
 import pytest
@@ -31,6 +33,44 @@ def ensure_event_loop() -> Generator:
     yield
 
 
+def _loaded(module_name: str) -> ModuleType | None:
+    """
+    The module if something has already imported it.
+
+    The cache-reset fixtures below only clear caches that exist.  Importing these
+    modules here would pull in hive_extras, which needs a Hive node at import time,
+    so the suite could no longer be collected offline.
+    """
+    return sys.modules.get(module_name)
+
+
+@pytest.fixture(autouse=True)
+def reset_quote_service() -> Generator:
+    """Start every test without a quote held over from an earlier test's mocked fetch."""
+    quote_service = _loaded("v4vapp_backend_v2.helpers.quote_service")
+    if quote_service:
+        quote_service.QUOTE_SERVICE.clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def reset_binance_cache() -> Generator:
+    """Don't let a cached Binance client, symbol or balance outlive the test that mocked it."""
+    binance_extras = _loaded("v4vapp_backend_v2.helpers.binance_extras")
+    if binance_extras:
+        binance_extras.clear_binance_cache()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def reset_memo_decoder() -> Generator:
+    """Decrypted memos are cached process-wide; start each test with an empty cache."""
+    memo_decoder = _loaded("v4vapp_backend_v2.hive.memo_decoder")
+    if memo_decoder:
+        memo_decoder.MEMO_DECODER.clear()
+    yield
+
+
 @pytest.fixture(scope="session", autouse=True)
 def close_async_db_client() -> Generator:
     """Close the AsyncMongoClient at the end of the test session to avoid background tasks
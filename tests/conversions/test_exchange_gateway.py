@@ -0,0 +1,153 @@
+"""
+Tests for the async exchange gateway and the Binance helper caches behind it.
+
+Covers:
+- concurrent identical reads share one blocking call; trades are never shared
+- blocking calls never exceed the gateway's thread pool size
+- symbol info and balances are cached, and an order invalidates balances
+- get_client reuses one client per set of credentials
+- the adapters' ``*_async`` methods read through the gateway and its caches
+"""
+
+import asyncio
+import threading
+import time
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+from v4vapp_backend_v2.conversion.binance_adapter import BinanceAdapter
+from v4vapp_backend_v2.conversion.exchange_gateway import EXCHANGE_GATEWAY, ExchangeGateway
+from v4vapp_backend_v2.helpers import binance_extras
+from v4vapp_backend_v2.helpers.binance_extras import BINANCE_CACHE, TTLCache
+
+SYMBOL_INFO = {
+    "symbols": [
+        {
+            "symbol": "HIVEBTC",
+            "filters": [
+                {"filterType": "LOT_SIZE", "minQty": "1.0", "stepSize": "1.0"},
+                {"filterType": "NOTIONAL", "minNotional": "0.0001"},
+            ],
+        }
+    ]
+}
+
+
+def mock_client(mocker) -> MagicMock:
+    client = MagicMock()
+    client.account.return_value = {
+        "balances": [{"asset": "BTC", "free": "0.5"}, {"asset": "HIVE", "free": "100"}]
+    }
+    client.exchange_info.return_value = SYMBOL_INFO
+    client.new_order.return_value = {"symbol": "HIVEBTC", "executedQty": "10"}
+    client.book_ticker.return_value = {"askPrice": "0.0000021", "bidPrice": "0.0000019"}
+    client.ticker_price.return_value = {"price": "0.000002"}
+    mocker.patch("v4vapp_backend_v2.helpers.binance_extras.get_client", return_value=client)
+    return client
+
+
+async def test_identical_reads_are_coalesced():
+    gateway = ExchangeGateway()
+    calls = []
+
+    def slow_price(symbol: str) -> Decimal:
+        calls.append(symbol)
+        time.sleep(0.05)
+        return Decimal("0.000002")
+
+    results = await asyncio.gather(
+        *(gateway.read(slow_price, "HIVEBTC") for _ in range(10)),
+        gateway.read(slow_price, "HBDBTC"),
+    )
+    assert results[0] == Decimal("0.000002")
+    assert sorted(calls) == ["HBDBTC", "HIVEBTC"]
+    assert gateway.stats.coalesced == 9
+
+    # Trades always run.
+    await asyncio.gather(*(gateway.run(slow_price, "HIVEBTC") for _ in range(3)))
+    assert len(calls) == 5
+
+
+async def test_thread_pool_is_bounded():
+    gateway = ExchangeGateway(max_workers=2)
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def blocking(i: int) -> int:
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+        return i
+
+    assert await asyncio.gather(*(gateway.run(blocking, i) for i in range(8))) == list(range(8))
+    assert peak == 2
+    gateway.shutdown()
+
+
+async def test_balances_and_symbol_info_are_cached(mocker):
+    client = mock_client(mocker)
+    gateway = ExchangeGateway()
+
+    balances = await gateway.get_balances(["BTC", "HIVE", "ETH"])
+    assert balances == {
+        "BTC": Decimal("0.5"),
+        "HIVE": Decimal("100"),
+        "ETH": Decimal("0"),
+        "SATS": Decimal("50000000"),
+    }
+    assert (await gateway.get_balances(["HIVE"]))["HIVE"] == Decimal("100")
+    assert client.account.call_count == 1
+    assert gateway.stats.cache_hits == 1
+
+    for _ in range(3):
+        min_qty, min_notional = await gateway.get_min_order_quantity("HIVEBTC")
+    assert (min_qty, min_notional) == (Decimal("1.0"), Decimal("0.0001"))
+    assert client.exchange_info.call_count == 1
+
+    binance_extras.market_buy("HIVEBTC", Decimal("100"))
+    assert ("balances", False) not in BINANCE_CACHE
+    await gateway.get_balances(["HIVE"])
+    assert client.account.call_count == 2
+
+
+def test_ttl_cache_expiry_and_invalidate():
+    cache = TTLCache()
+    cache.set(("balances", False), 1, ttl=0)
+    cache.set(("symbol_info", "HIVEBTC", False), 2, ttl=60)
+    assert ("balances", False) not in cache
+    assert cache.get_or_set(("symbol_info", "HIVEBTC", False), 60, lambda: 3) == 2
+    cache.invalidate("symbol_info")
+    assert cache.get(("symbol_info", "HIVEBTC", False)) is None
+
+
+def test_get_client_is_reused(mocker):
+    spot = mocker.patch(
+        "v4vapp_backend_v2.helpers.binance_extras.Client", side_effect=lambda **kw: MagicMock()
+    )
+    first = binance_extras.get_client(testnet=True)
+    assert binance_extras.get_client(testnet=True) is first
+    assert spot.call_count == 1
+
+
+async def test_adapter_async_reads_use_gateway_caches(mocker):
+    client = mock_client(mocker)
+    adapter = BinanceAdapter(testnet=False)
+    hits = EXCHANGE_GATEWAY.stats.cache_hits
+
+    balances = await adapter.get_balances_async(["BTC", "HIVE"])
+    assert balances["SATS"] == Decimal("50000000")
+    assert await adapter.get_balance_async("HIVE") == Decimal("100")
+    assert client.account.call_count == 1
+
+    minimums = await adapter.get_min_order_requirements_async("HIVE", "BTC")
+    assert (minimums.min_qty, minimums.step_size) == (Decimal("1.0"), Decimal("1.0"))
+    assert await adapter.can_execute_order_async("HIVE", "BTC", Decimal("100")) == (True, "OK")
+    ok, reason = await adapter.can_execute_order_async("HIVE", "BTC", Decimal("0.5"))
+    assert not ok and "below minimum" in reason
+    assert client.exchange_info.call_count == 1
+    assert EXCHANGE_GATEWAY.stats.cache_hits > hits
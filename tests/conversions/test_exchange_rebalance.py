@@ -894,6 +894,10 @@ class TestGetNetPosition:
             step_size=Decimal("1"),
         )
         mock.get_current_price.return_value = Decimal("0.00001")
+        mock.get_min_order_requirements_async.return_value = (
+            mock.get_min_order_requirements.return_value
+        )
+        mock.get_current_price_async.return_value = Decimal("0.00001")
         return mock
 
     @pytest.mark.asyncio
@@ -1164,6 +1168,10 @@ class TestExecuteNetRebalance:
             step_size=Decimal("1"),
         )
         mock.get_current_price.return_value = Decimal("0.00001")
+        mock.get_min_order_requirements_async.return_value = (
+            mock.get_min_order_requirements.return_value
+        )
+        mock.get_current_price_async.return_value = Decimal("0.00001")
         return mock
 
     @pytest.mark.asyncio
@@ -1219,7 +1227,7 @@ class TestExecuteNetRebalance:
         )
 
         # Mock the market_sell to return success for net amount (70)
-        mock_exchange.market_sell.return_value = ExchangeOrderResult(
+        mock_exchange.market_sell_async.return_value = ExchangeOrderResult(
             exchange="mock_exchange",
             symbol="HIVEBTC",
             order_id="net-order-1",
@@ -1245,7 +1253,7 @@ class TestExecuteNetRebalance:
         assert result.order_result is not None
         assert result.order_result.executed_qty == Decimal("70")
         # Verify market_sell was called with net amount
-        mock_exchange.market_sell.assert_called_once_with(
+        mock_exchange.market_sell_async.assert_called_once_with(
             base_asset="HIVE",
             quote_asset="BTC",
             quantity=Decimal("70"),
@@ -1304,7 +1312,7 @@ class TestExecuteNetRebalance:
         )
 
         # Mock the market_buy to return success for net amount (80)
-        mock_exchange.market_buy.return_value = ExchangeOrderResult(
+        mock_exchange.market_buy_async.return_value = ExchangeOrderResult(
             exchange="mock_exchange",
             symbol="HIVEBTC",
             order_id="net-order-2",
@@ -1330,7 +1338,7 @@ class TestExecuteNetRebalance:
         assert result.order_result is not None
         assert result.order_result.executed_qty == Decimal("80")
         # Verify market_buy was called with net amount
-        mock_exchange.market_buy.assert_called_once_with(
+        mock_exchange.market_buy_async.assert_called_once_with(
             base_asset="HIVE",
             quote_asset="BTC",
             quantity=Decimal("80"),
@@ -1397,5 +1405,5 @@ class TestExecuteNetRebalance:
         assert result.executed is False
         assert "Balanced" in result.reason
         # No trade should be attempted
-        mock_exchange.market_sell.assert_not_called()
-        mock_exchange.market_buy.assert_not_called()
+        mock_exchange.market_sell_async.assert_not_called()
+        mock_exchange.market_buy_async.assert_not_called()
@@ -0,0 +1,103 @@
+import asyncio
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+from pymongo import UpdateOne
+
+from v4vapp_backend_v2.config.setup import InternalConfig
+from v4vapp_backend_v2.database.bulk_op_writer import BulkOpWriter
+from v4vapp_backend_v2.hive_models.block_marker import BlockMarker
+
+
+@pytest.fixture(autouse=True)
+def set_base_config_path_combined(monkeypatch: pytest.MonkeyPatch):
+    test_config_path = Path("tests/data/config")
+    monkeypatch.setattr("v4vapp_backend_v2.config.setup.BASE_CONFIG_PATH", test_config_path)
+    test_config_logging_path = Path(test_config_path, "logging/")
+    monkeypatch.setattr(
+        "v4vapp_backend_v2.config.setup.BASE_LOGGING_CONFIG_PATH",
+        test_config_logging_path,
+    )
+    monkeypatch.setattr("v4vapp_backend_v2.config.setup.InternalConfig._instance", None)
+    yield
+    monkeypatch.setattr("v4vapp_backend_v2.config.setup.InternalConfig._instance", None)
+
+
+class RecordingCollection:
+    def __init__(self, delay: float = 0.0):
+        self.batches: List[List[UpdateOne]] = []
+        self.delay = delay
+
+    async def bulk_write(self, requests, ordered=True):
+        assert ordered is False
+        await asyncio.sleep(self.delay)
+        self.batches.append(list(requests))
+
+
+class RecordingDB:
+    def __init__(self, delay: float = 0.0):
+        self.collections: Dict[str, RecordingCollection] = {}
+        self.delay = delay
+
+    def __getitem__(self, name: str) -> RecordingCollection:
+        return self.collections.setdefault(name, RecordingCollection(self.delay))
+
+
+class NumberedMarker(BlockMarker):
+    """A block marker keyed by block number, so every block is a separate upsert."""
+
+    @property
+    def group_id_query(self) -> Dict[str, Any]:
+        return {"trx_id": self.trx_id, "block_num": self.block_num, "realm": self.realm}
+
+
+def _docs(db: RecordingDB) -> List[Dict[str, Any]]:
+    return [
+        request._doc["$set"] for col in db.collections.values() for b in col.batches for request in b
+    ]
+
+
+@pytest.mark.asyncio
+async def test_writer_batches_by_size_and_flushes_on_shutdown(monkeypatch):
+    db = RecordingDB()
+    monkeypatch.setattr(InternalConfig, "db", db)
+    shutdown = asyncio.Event()
+    writer = BulkOpWriter(max_batch=10, flush_interval=60)
+    task = asyncio.create_task(writer.run(shutdown))
+    await asyncio.sleep(0)
+
+    for block_num in range(25):
+        await writer.add(NumberedMarker(block_num))
+        await asyncio.sleep(0)
+    await asyncio.sleep(0.01)
+    col = db[BlockMarker(1).collection_name]
+    # size-triggered flushes; the remainder waits for the timer or shutdown
+    assert len(col.batches) == 2 and all(len(b) >= 10 for b in col.batches)
+    assert all(isinstance(r, UpdateOne) for b in col.batches for r in b)
+
+    shutdown.set()
+    await asyncio.wait_for(task, timeout=5)
+    assert writer.buffered == 0
+    assert [d["block_num"] for d in _docs(db)] == list(range(25))
+    assert writer.stats.written == 25
+
+
+@pytest.mark.asyncio
+async def test_writer_merges_duplicates_and_applies_backpressure(monkeypatch):
+    db = RecordingDB(delay=0.05)
+    monkeypatch.setattr(InternalConfig, "db", db)
+    writer = BulkOpWriter(max_batch=1_000, flush_interval=60, max_buffered=1)
+
+    first = BlockMarker(1)
+    await writer.add(first)
+    await writer.add(BlockMarker(2))  # same group_id_query: merged, buffer stays at one
+    assert writer.buffered == 1 and writer.stats.merged == 1
+
+    blocked = asyncio.create_task(writer.add(NumberedMarker(3)))
+    await asyncio.sleep(0.01)
+    assert not blocked.done(), "add must wait while the buffer is full"
+    await writer.flush()
+    await asyncio.wait_for(blocked, timeout=1)
+    await writer.flush()
+    assert [d["block_num"] for d in _docs(db)] == [2, 3]
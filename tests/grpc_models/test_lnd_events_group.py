@@ -181,3 +181,99 @@ def test_message_forward_events():
                     assert False
             all_messages.append(message_str)
             print(message_str)
+
+
+def htlc(incoming_id: int, outgoing_id: int = 0, channel_in: int = 0, channel_out: int = 0):
+    return routerrpc.HtlcEvent(
+        incoming_htlc_id=incoming_id,
+        outgoing_htlc_id=outgoing_id,
+        incoming_channel_id=channel_in,
+        outgoing_channel_id=channel_out,
+        event_type=routerrpc.HtlcEvent.EventType.FORWARD,
+    )
+
+
+def test_indexed_lookups_match_scans():
+    lnd_events_group = LndEventsGroup()
+    events = list(read_log_file("tests/data/lnd_events/v4vapp-backend-v2.safe_log.jsonl"))
+    for event in events:
+        lnd_events_group.append(event)
+
+    for event in lnd_events_group.htlc_events:
+        for htlc_id in (event.incoming_htlc_id, event.outgoing_htlc_id):
+            scanned = [
+                e
+                for e in lnd_events_group.htlc_events
+                if e.incoming_htlc_id == htlc_id or e.outgoing_htlc_id == htlc_id
+            ]
+            assert lnd_events_group.by_htlc_id(htlc_id) == scanned
+            scanned_invoice = next(
+                (
+                    i
+                    for i in lnd_events_group.lnrpc_invoices
+                    if any(h.htlc_index == htlc_id for h in i.htlcs)
+                ),
+                None,
+            )
+            assert lnd_events_group.lookup_invoice_by_htlc_id(htlc_id) is scanned_invoice
+
+    for payment in lnd_events_group.lnrpc_payments:
+        for h in payment.htlcs:
+            if h.preimage.strip(b"\0"):
+                found = lnd_events_group.search_payment_preimage(h.preimage)
+                assert found.payment_hash == payment.payment_hash
+                assert lnd_events_group.get_payment_by_pre_image(h.preimage.hex()) is found
+
+    for invoice in lnd_events_group.lnrpc_invoices:
+        group = lnd_events_group.get_invoice_list_by_pre_image(invoice.r_preimage)
+        assert invoice in group
+        assert all(i.r_hash == invoice.r_hash for i in group)
+
+
+def test_remove_group_keeps_indexes_consistent():
+    lnd_events_group = LndEventsGroup()
+    forward = [htlc(5, 7, 100, 200), htlc(5, 0, 100), htlc(5, 0, 100)]
+    send = htlc(0, 7, 0, 300)
+    for event in forward + [send]:
+        lnd_events_group.append(event)
+
+    assert len(lnd_events_group.by_htlc_id(5)) == 3
+    assert lnd_events_group.by_htlc_id(7) == [forward[0], send]
+    assert lnd_events_group.by_channel_id(100) == forward
+    assert lnd_events_group.by_channel_id(200) == [forward[0]]
+
+    lnd_events_group.remove_group(forward[0])
+    assert lnd_events_group.by_htlc_id(5) == []
+    assert lnd_events_group.by_htlc_id(7) == [send]
+    assert lnd_events_group.by_channel_id(100) == []
+    assert lnd_events_group.htlc_events == [send]
+    assert lnd_events_group.report_event_counts()["htlc_events"] == 1
+
+
+def test_groups_evicted_by_ttl_and_ceiling(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(
+        "v4vapp_backend_v2.grpc_models.lnd_events_group.time.monotonic", lambda: clock[0]
+    )
+    lnd_events_group = LndEventsGroup(ttl=60, completed_ttl=5, max_events=4)
+
+    lnd_events_group.append(htlc(1))
+    payment = lnrpc.Payment(payment_hash="aa", payment_index=1)
+    lnd_events_group.append(payment)
+    assert lnd_events_group.complete_group(payment)
+
+    clock[0] += 10  # the completed payment goes, the htlc is still young
+    assert lnd_events_group.evict() == 1
+    assert payment not in lnd_events_group
+    assert lnd_events_group.by_htlc_id(1)
+
+    for htlc_id in (2, 3, 4, 5):
+        lnd_events_group.append(htlc(htlc_id))
+    # Five events held, ceiling of four: the least recently touched group goes.
+    assert lnd_events_group.by_htlc_id(1) == []
+    assert lnd_events_group.list_htlc_ids() == [2, 3, 4, 5]
+
+    clock[0] += 61
+    lnd_events_group.append(htlc(6))
+    assert lnd_events_group.list_htlc_ids() == [6]
+    assert lnd_events_group.evicted == 6
@@ -2,7 +2,7 @@ import asyncio
 import json
 from datetime import datetime, timezone
 from pathlib import Path
-from unittest.mock import AsyncMock, MagicMock, Mock
+from unittest.mock import AsyncMock
 
 import pytest
 from httpx import Request, Response
@@ -57,10 +57,12 @@ async def test_coin_gecko_quote_service(mocker):
     assert quote is not None
     assert quote.fetch_date is not None
     assert quote.raw_response == coingecko_resp
-    quote = await service.get_quote(use_cache=True)
-    assert quote is not None
-    assert quote.fetch_date is not None
-    assert quote.raw_response == coingecko_resp
+    cached = await service.get_quote(use_cache=True)
+    assert cached is not None
+    assert cached.fetch_date == quote.fetch_date
+    assert cached.hive_usd == quote.hive_usd
+    # The cache holds the rates only; raw responses are cached separately, if at all.
+    assert cached.raw_response == {}
 
 
 @pytest.mark.asyncio
@@ -109,9 +111,10 @@ async def test_binance_quote_service(mocker):
     quote = await service.get_quote(use_cache=False)
     assert quote is not None
     assert quote.raw_response == binance_resp
-    quote = await service.get_quote(use_cache=True)
-    assert quote is not None
-    assert quote.raw_response == binance_resp
+    cached = await service.get_quote(use_cache=True)
+    assert cached is not None
+    assert cached.btc_usd == quote.btc_usd
+    assert cached.raw_response == {}
 
 
 def mock_binance_error(mocker):
@@ -155,9 +158,10 @@ async def test_coin_market_cap_quote_service(mocker):
     quote = await service.get_quote(use_cache=False)
     assert quote is not None
     assert quote.raw_response == coinmarketcap_resp
-    quote = await service.get_quote(use_cache=True)
-    assert quote is not None
-    assert quote.raw_response == coinmarketcap_resp
+    cached = await service.get_quote(use_cache=True)
+    assert cached is not None
+    assert cached.btc_usd == quote.btc_usd
+    assert cached.raw_response == {}
 
 
 @pytest.mark.asyncio
@@ -257,11 +261,11 @@ async def test_get_all_quotes(mocker, set_base_config_path):
         return_value=None,
     )
     # Do not use the redis cache at the object level.
-    mock_redis_instance = mocker.patch("v4vapp_backend_v2.config.setup.InternalConfig.redis")
-    mock_redis_instance.__aenter__.return_value = mock_redis_instance
-    mock_redis_instance.__aexit__.return_value = None
-    mock_redis_instance.setex = MagicMock(return_value=None)
-    mock_redis_instance.get = MagicMock(return_value=None)
+    mock_redis_instance = mocker.patch(
+        "v4vapp_backend_v2.config.setup.InternalConfig.redis_async_raw"
+    )
+    mock_redis_instance.setex = AsyncMock(return_value=None)
+    mock_redis_instance.get = AsyncMock(return_value=None)
 
     # Apply the patch
     mocker.patch("httpx.AsyncClient.get", new=AsyncMock(side_effect=mock_get))
@@ -350,9 +354,11 @@ async def test_get_all_quotes_with_single_failure(mocker, failing_service):
     Parametrized to test each service failing independently.
     """
     # Do not use the redis cache at the object level.
-    mock_redis_instance = mocker.patch("v4vapp_backend_v2.config.setup.InternalConfig.redis")
-    mock_redis_instance.setex = Mock(return_value=None)
-    mock_redis_instance.get = Mock(return_value=None)
+    mock_redis_instance = mocker.patch(
+        "v4vapp_backend_v2.config.setup.InternalConfig.redis_async_raw"
+    )
+    mock_redis_instance.setex = AsyncMock(return_value=None)
+    mock_redis_instance.get = AsyncMock(return_value=None)
 
     # Extracted the setup into this function to avoid code duplication
     coingecko_resp, coinmarketcap_resp, binance_resp, hive_resp = load_and_mock_responses(
@@ -440,16 +446,24 @@ async def test_get_all_quotes_global_timeout(mocker):
     mocker.patch.object(Binance, "get_quote", new=slow_quote)
     mocker.patch.object(CoinMarketCap, "get_quote", new=slow_quote)
     mocker.patch.object(HiveInternalMarket, "get_quote", new=slow_quote)
+    # Do not use the redis cache at the object level.
+    mock_redis_instance = mocker.patch(
+        "v4vapp_backend_v2.config.setup.InternalConfig.redis_async_raw"
+    )
+    mock_redis_instance.setex = AsyncMock(return_value=None)
+    mock_redis_instance.get = AsyncMock(return_value=None)
 
     all_quotes = AllQuotes()
     # use a very small timeout so we hit the boundary quickly
-    await all_quotes.get_all_quotes(timeout=0.01, store_db=False)
+    await all_quotes.get_all_quotes(use_cache=False, timeout=0.01, store_db=False)
 
     # we expect every service to have a timeout-style error rather than an
     # empty string (previous bug produced empty messages)
     for svc, quote in all_quotes.quotes.items():
         assert quote.error, f"{svc} did not have an error"
         assert "timeout" in quote.error.lower()
+    # An all-error result is not cached for the next caller.
+    mock_redis_instance.setex.assert_not_awaited()
 
 
 @pytest.mark.asyncio
@@ -467,6 +481,12 @@ async def test_per_service_timeout(mocker, monkeypatch: pytest.MonkeyPatch):
     mocker.patch.object(Binance, "get_quote", new=fast_quote)
     mocker.patch.object(CoinMarketCap, "get_quote", new=fast_quote)
     mocker.patch.object(HiveInternalMarket, "get_quote", new=fast_quote)
+    # Do not use the redis cache at the object level.
+    mock_redis_instance = mocker.patch(
+        "v4vapp_backend_v2.config.setup.InternalConfig.redis_async_raw"
+    )
+    mock_redis_instance.setex = AsyncMock(return_value=None)
+    mock_redis_instance.get = AsyncMock(return_value=None)
 
     real_wait_for = asyncio.wait_for
     wait_for_calls = {"count": 0}
@@ -486,7 +506,7 @@ async def test_per_service_timeout(mocker, monkeypatch: pytest.MonkeyPatch):
     )
 
     all_quotes = AllQuotes()
-    await all_quotes.get_all_quotes(timeout=20, store_db=False)
+    await all_quotes.get_all_quotes(use_cache=False, timeout=20, store_db=False)
 
     assert "service timeout" in all_quotes.quotes["CoinGecko"].error.lower()
     # the other providers should have succeeded
@@ -69,7 +69,9 @@ def _make_mock_adapter(
     """Create a mock exchange adapter with the given balances and name."""
     adapter = MagicMock()
     type(adapter).exchange_name = PropertyMock(return_value=name)
-    adapter.get_balance = lambda asset: {"BTC": btc, "HIVE": hive}.get(asset, Decimal(0))
+    adapter.get_balances_async = AsyncMock(
+        side_effect=lambda assets: {"BTC": btc, "HIVE": hive, "SATS": btc * Decimal(1e8)}
+    )
     return adapter
 
 
@@ -0,0 +1,130 @@
+"""
+Tests for the versioned quote cache codec.
+
+Covers:
+- a quote round-trips its rates, fetch date, source and error exactly, without raw_response
+- the global pack keeps only good quotes
+- pickles, other versions and garbage decode as a cache miss
+- QuoteService caches through the codec, with the raw response only when enabled
+"""
+
+import json
+import pickle
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+from v4vapp_backend_v2.config.setup import InternalConfig
+from v4vapp_backend_v2.helpers import crypto_prices
+from v4vapp_backend_v2.helpers.crypto_prices import CoinGecko, QuoteResponse
+from v4vapp_backend_v2.helpers.quote_codec import (
+    QUOTE_CODEC_VERSION,
+    decode_quote,
+    decode_quote_pack,
+    encode_quote,
+    encode_quote_pack,
+)
+
+
+def load_quote(name: str) -> QuoteResponse:
+    with open(f"tests/data/crypto_prices/{name}.json") as f:
+        return QuoteResponse.model_validate(json.load(f))
+
+
+def test_quote_round_trip():
+    quote = load_quote("CoinMarketCap")
+    quote.fetch_date = datetime(2025, 3, 22, 12, 11, 51, 123456, tzinfo=timezone.utc)
+    quote.hive_hbd = Decimal("0.2345678901234567890123456789")
+    data = encode_quote(quote)
+    assert len(data) < len(pickle.dumps(quote)) / 10
+
+    decoded = decode_quote(data)
+    assert decoded is not None
+    for field in ("hive_usd", "hbd_usd", "btc_usd", "hive_hbd", "source", "error"):
+        assert getattr(decoded, field) == getattr(quote, field)
+    assert decoded.fetch_date == quote.fetch_date
+    assert decoded.sats_hive_p == quote.sats_hive_p
+    assert decoded.raw_response == {}
+
+    error = QuoteResponse(source="Binance", error="timeout", error_details={"code": 1})
+    decoded = decode_quote(encode_quote(error))
+    assert decoded.error == "timeout"
+    assert decoded.error_details == {"code": 1}
+
+
+def test_quote_pack_round_trip():
+    quotes = {name: load_quote(name) for name in ("CoinGecko", "Binance", "CoinMarketCap")}
+    quotes["HiveInternalMarket"] = QuoteResponse(source="HiveInternalMarket", error="down")
+    fetch_date = datetime.now(tz=timezone.utc)
+    unpacked = decode_quote_pack(encode_quote_pack(quotes, fetch_date, "CoinGecko, Binance"))
+    assert unpacked is not None
+    decoded, decoded_date, source = unpacked
+    assert set(decoded) == {"CoinGecko", "Binance", "CoinMarketCap"}
+    assert decoded["Binance"].btc_usd == quotes["Binance"].btc_usd
+    assert decoded_date == fetch_date
+    assert source == "CoinGecko, Binance"
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        None,
+        b"",
+        pickle.dumps(QuoteResponse(hive_usd=Decimal("0.2"))),
+        json.dumps([QUOTE_CODEC_VERSION + 1, "0.2"]).encode(),
+        b"[1, 2",
+        json.dumps([QUOTE_CODEC_VERSION, "x", "1", "1", "1", 0, "", ""]).encode(),
+    ],
+)
+def test_unknown_data_is_a_miss(data):
+    assert decode_quote(data) is None
+    assert decode_quote_pack(data) is None
+
+
+async def test_service_cache_uses_codec(monkeypatch):
+    store = {}
+
+    class FakeRedis:
+        async def get(self, key):
+            return store.get(key)
+
+        async def mget(self, *keys):
+            return [store.get(k) for k in keys]
+
+        async def setex(self, key, time, value):
+            store[key] = value
+
+        def pipeline(self, transaction=True):
+            return FakePipeline()
+
+    class FakePipeline:
+        async def __aenter__(self):
+            self.calls = []
+            return self
+
+        async def __aexit__(self, *args):
+            return None
+
+        def setex(self, key, time, value):
+            self.calls.append((key, value))
+
+        async def execute(self):
+            store.update(self.calls)
+
+    InternalConfig()  # initialise first: it replaces the Redis clients
+    monkeypatch.setattr(InternalConfig, "redis_async_raw", FakeRedis())
+    quote = load_quote("CoinGecko")
+    service = CoinGecko()
+
+    await service.set_cache(quote)
+    assert set(store) == {"CoinGecko:get_quote"}
+    cached = await service.check_cache()
+    assert cached.hive_usd == quote.hive_usd
+    assert cached.raw_response == {}
+
+    monkeypatch.setattr(crypto_prices, "CACHE_RAW_RESPONSES", True)
+    await service.set_cache(quote)
+    assert "CoinGecko:get_quote:raw" in store
+    cached = await service.check_cache(with_raw=True)
+    assert cached.raw_response == quote.raw_response
@@ -0,0 +1,112 @@
+"""
+Tests for the single-flight quote refresh behind ``TrackedBaseModel.update_quote``.
+
+Covers:
+- concurrent callers share one ``get_all_quotes``
+- a stale quote is served immediately while one background refresh runs
+- an error quote does not replace a good one
+- the background refresher runs until shutdown
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+from v4vapp_backend_v2.helpers.crypto_prices import AllQuotes, QuoteResponse
+from v4vapp_backend_v2.helpers.quote_service import QuoteRefreshService
+
+
+def make_quote(age: timedelta = timedelta(0), error: str = "") -> QuoteResponse:
+    return QuoteResponse(
+        hive_usd=Decimal("0.25"),
+        hbd_usd=Decimal("1.0"),
+        btc_usd=Decimal("60000"),
+        hive_hbd=Decimal("0.25"),
+        raw_response={},
+        source="test",
+        fetch_date=datetime.now(tz=timezone.utc) - age,
+        error=error,
+    )
+
+
+@pytest.fixture
+def fetcher(monkeypatch):
+    """Replace ``get_all_quotes`` with a slow fake that counts calls."""
+    state = {"calls": 0, "error": "", "delay": 0.05}
+
+    async def fake_get_all_quotes(self, use_cache=True, timeout=60.0, store_db=True):
+        state["calls"] += 1
+        await asyncio.sleep(state["delay"])
+        self.quote = make_quote(error=state["error"])
+
+    monkeypatch.setattr(AllQuotes, "get_all_quotes", fake_get_all_quotes)
+    return state
+
+
+async def test_concurrent_callers_share_one_fetch(fetcher):
+    service = QuoteRefreshService()
+    quotes = await asyncio.gather(*(service.get() for _ in range(20)))
+    assert fetcher["calls"] == 1
+    assert all(q is quotes[0] for q in quotes)
+    assert service.stats.coalesced == 19
+
+    # Fresh now: no further fetches
+    await service.get()
+    assert fetcher["calls"] == 1
+    assert service.stats.fresh_hits == 1
+
+    # use_cache=False always waits for a provider fetch
+    await service.get(use_cache=False)
+    assert fetcher["calls"] == 2
+
+
+async def test_stale_quote_served_while_refreshing(fetcher):
+    service = QuoteRefreshService(fresh_for=timedelta(seconds=60))
+    stale = make_quote(age=timedelta(seconds=120))
+    service.quote = stale
+
+    results = await asyncio.gather(*(service.get() for _ in range(5)))
+    assert all(q is stale for q in results)
+    assert service.stats.stale_hits == 5
+
+    # One background refresh replaces the stale quote
+    await asyncio.sleep(fetcher["delay"] * 3)
+    assert fetcher["calls"] == 1
+    assert service.quote is not stale
+    assert service.age() < timedelta(seconds=5)
+
+    # Too old to serve: the caller waits for the refresh
+    service.quote = make_quote(age=service.stale_for + timedelta(seconds=1))
+    quote = await service.get()
+    assert fetcher["calls"] == 2
+    assert service.age(quote) < timedelta(seconds=5)
+
+
+async def test_error_quote_keeps_last_good_quote(fetcher):
+    service = QuoteRefreshService()
+    good = await service.refresh()
+    assert not good.error
+
+    fetcher["error"] = "all providers failed"
+    kept = await service.refresh()
+    assert kept is good
+    assert service.quote is good
+    assert service.stats.errors == 1
+
+    # With nothing better to offer the error quote is still returned
+    service.clear()
+    quote = await service.refresh()
+    assert quote.error == "all providers failed"
+
+
+async def test_background_refresher_stops_on_shutdown(fetcher):
+    service = QuoteRefreshService(refresh_every=timedelta(seconds=0.1))
+    shutdown = asyncio.Event()
+    task = asyncio.create_task(service.run(shutdown))
+    await asyncio.sleep(0.35)
+    shutdown.set()
+    await asyncio.wait_for(task, timeout=1)
+    assert fetcher["calls"] >= 2
+    assert service.quote is not None
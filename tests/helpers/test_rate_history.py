@@ -0,0 +1,164 @@
+"""
+Tests for the in-memory rate history behind ``TrackedBaseModel.nearest_quote``.
+
+Covers:
+- lookups agree with a brute-force nearest search (earlier record wins a tie)
+- older history is paged in lazily and repeated lookups do not reload
+- rates added by this process are visible without a reload
+- sparse history falls back to a direct database query
+"""
+
+import random
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from bson import Decimal128
+
+from v4vapp_backend_v2.config.setup import InternalConfig
+from v4vapp_backend_v2.helpers.crypto_prices import HiveRatesDB
+from v4vapp_backend_v2.helpers.rate_history import RateHistory
+
+OPS = {
+    "$lte": lambda a, b: a <= b,
+    "$gte": lambda a, b: a >= b,
+    "$lt": lambda a, b: a < b,
+    "$gt": lambda a, b: a > b,
+}
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = list(docs)
+
+    def sort(self, field, direction):
+        self.docs.sort(key=lambda d: d[field], reverse=direction < 0)
+        return self
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    async def to_list(self, length=None):
+        return self.docs
+
+
+class FakeRates:
+    """Just enough of a rates collection for range finds (no aggregate)."""
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.finds = 0
+
+    def find(self, flt, projection=None):
+        self.finds += 1
+        cond = flt.get("timestamp", {})
+        return FakeCursor(
+            d for d in self.docs if all(OPS[op](d["timestamp"], v) for op, v in cond.items())
+        )
+
+
+class FakeDB:
+    def __init__(self, collection):
+        self.collection = collection
+
+    def __getitem__(self, name):
+        return self.collection
+
+
+def _doc(ts: datetime, hive_usd: str) -> dict:
+    return {
+        "timestamp": ts,
+        "hive_usd": Decimal128(hive_usd),
+        "hbd_usd": Decimal128("1.001"),
+        "btc_usd": Decimal128("65000.5"),
+        "hive_hbd": Decimal128(hive_usd),
+    }
+
+
+def _brute_force(docs, target):
+    return min(docs, key=lambda d: (abs(d["timestamp"] - target), d["timestamp"]))
+
+
+@pytest.fixture
+def rates(monkeypatch):
+    random.seed(7)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    docs = []
+    ts = start
+    for i in range(4_000):
+        ts += timedelta(seconds=random.randint(60, 600))
+        docs.append(_doc(ts, f"0.{2000 + i}"))
+    collection = FakeRates(docs)
+    monkeypatch.setattr(InternalConfig, "db", FakeDB(collection))
+    return collection
+
+
+@pytest.mark.asyncio
+async def test_nearest_matches_brute_force(rates):
+    history = RateHistory(page=timedelta(days=2))
+    first, last = rates.docs[0]["timestamp"], rates.docs[-1]["timestamp"]
+    for _ in range(200):
+        target = first + (last - first) * random.random()
+        quote = await history.nearest(target)
+        expected = _brute_force(rates.docs, target)
+        assert quote.fetch_date == expected["timestamp"]
+        assert quote.hive_usd == Decimal(str(expected["hive_usd"]))
+        assert quote.btc_usd == Decimal("65000.5")
+
+    # exact tie between two records: the earlier one wins
+    a, b = rates.docs[100]["timestamp"], rates.docs[101]["timestamp"]
+    quote = await history.nearest(a + (b - a) / 2)
+    assert quote.fetch_date == a
+
+
+@pytest.mark.asyncio
+async def test_history_pages_in_lazily(rates):
+    history = RateHistory(page=timedelta(days=1))
+    late = rates.docs[-10]["timestamp"]
+    await history.nearest(late)
+    loaded = len(history)
+    assert 0 < loaded < len(rates.docs)
+    finds = rates.finds
+
+    await history.nearest(late - timedelta(hours=3))
+    assert rates.finds == finds, "lookup inside the loaded span must not query"
+
+    await history.nearest(late - timedelta(days=3))
+    assert rates.finds > finds and len(history) > loaded
+
+
+@pytest.mark.asyncio
+async def test_added_rates_are_used(rates):
+    history = RateHistory(page=timedelta(days=1))
+    target = rates.docs[2000]["timestamp"] + timedelta(seconds=20)
+    await history.nearest(target)
+    history.add(
+        HiveRatesDB(
+            timestamp=target,
+            hive_usd=Decimal("9.99"),
+            hbd_usd=Decimal("1"),
+            btc_usd=Decimal("1"),
+            hive_hbd=Decimal("9.99"),
+            sats_hive=Decimal("1"),
+            sats_usd=Decimal("1"),
+            sats_hbd=Decimal("1"),
+        )
+    )
+    quote = await history.nearest(target)
+    assert quote.hive_usd == Decimal("9.99")
+
+
+@pytest.mark.asyncio
+async def test_sparse_history_falls_back_to_db(monkeypatch):
+    old = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    collection = FakeRates([_doc(old, "0.3")])
+    monkeypatch.setattr(InternalConfig, "db", FakeDB(collection))
+    history = RateHistory(page=timedelta(days=1))
+
+    quote = await history.nearest(old + timedelta(days=30))
+    assert quote.fetch_date == old
+    assert history.fallbacks == 1
+
+    monkeypatch.setattr(InternalConfig, "db", FakeDB(FakeRates([])))
+    assert await history.nearest(old) is None
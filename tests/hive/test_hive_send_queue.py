@@ -0,0 +1,204 @@
+"""
+Tests for the Hive send queue that packs pending transfers and custom_jsons into
+multi-op transactions.
+
+Covers:
+- items submitted within the window share one broadcast, each getting its own op back
+- groups are split by signing account and by MAX_OPS_PER_TRX
+- a failed batch is retried one by one so each caller sees its own error
+- lone items and posting-authority custom_jsons use the single-op senders
+- transfers get send_transfer's checks before batching, and private memos are encrypted
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from v4vapp_backend_v2.hive.hive_extras import (
+    HiveAccountNameOnExchangesList,
+    HiveDevelopmentAccountError,
+    HiveNotEnoughHiveInAccount,
+    HiveSomeOtherRPCException,
+    send_transfer_bulk,
+)
+from v4vapp_backend_v2.hive.hive_send_queue import HiveSendQueue, item_reply
+from v4vapp_backend_v2.hive_models.pending_transaction_class import (
+    PendingCustomJson,
+    PendingTransaction,
+)
+
+
+def pending_transfer(from_account: str, to_account: str, amount: str) -> MagicMock:
+    pending = MagicMock(spec=PendingTransaction)
+    pending.from_account = from_account
+    pending.to_account = to_account
+    pending.amount = amount
+    pending.memo = f"pay {to_account}"
+    pending.nobroadcast = False
+    pending.delete = AsyncMock()
+    return pending
+
+
+def pending_custom_json(send_account: str, active: bool = True) -> PendingCustomJson:
+    return PendingCustomJson(
+        unique_key=f"{send_account}_{active}",
+        send_account=send_account,
+        json_data={"memo": "hello"},
+        active=active,
+    )
+
+
+def bulk_reply(transfer_list=[], custom_json_list=[], **kwargs) -> dict:
+    operations = [["transfer", {"to": t.to_account, "amount": t.amount}] for t in transfer_list]
+    operations += [["custom_json", {"id": c.cj_id}] for c in custom_json_list]
+    return {"trx_id": f"trx{len(operations)}", "operations": operations}
+
+
+@pytest.fixture
+def senders(mocker):
+    mocker.patch.object(PendingCustomJson, "delete", AsyncMock())
+    return {
+        "checks": mocker.patch(
+            "v4vapp_backend_v2.hive.hive_extras.perform_transfer_checks",
+            AsyncMock(return_value=True),
+        ),
+        "bulk": mocker.patch(
+            "v4vapp_backend_v2.hive.hive_extras.send_transfer_bulk",
+            AsyncMock(side_effect=bulk_reply),
+        ),
+        "pending": mocker.patch(
+            "v4vapp_backend_v2.hive.hive_extras.send_pending",
+            AsyncMock(return_value={"trx_id": "single"}),
+        ),
+        "custom_json": mocker.patch(
+            "v4vapp_backend_v2.hive.hive_extras.send_custom_json",
+            AsyncMock(return_value={"trx_id": "single_cj"}),
+        ),
+    }
+
+
+async def test_items_in_window_share_one_transaction(senders):
+    queue = HiveSendQueue(window=0.01)
+    hive_client = MagicMock()
+    transfers = [pending_transfer("server", f"cust{i}", f"{i}.000 HIVE") for i in range(3)]
+    custom_json = pending_custom_json("server")
+
+    results = await asyncio.gather(
+        queue.submit(custom_json, hive_client),
+        *(queue.submit(t, hive_client) for t in transfers),
+    )
+
+    assert senders["bulk"].await_count == 1
+    assert senders["pending"].await_count == 0
+    # Transfers come first in the transaction, whatever the submit order.
+    assert results[0]["op_in_trx"] == 3
+    assert results[0]["operations"] == [["custom_json", {"id": "v4vapp_transfer"}]]
+    for i, result in enumerate(results[1:]):
+        assert result["trx_id"] == "trx4"
+        assert result["operations"] == [
+            ["transfer", {"to": f"cust{i}", "amount": f"{i}.000 HIVE"}]
+        ]
+        transfers[i].delete.assert_awaited_once()
+    assert queue.stats.transactions == 1
+    assert queue.stats.batched_ops == 4
+
+
+async def test_groups_split_by_signer_and_size(senders):
+    queue = HiveSendQueue(window=0.01, max_ops=2)
+    hive_client = MagicMock()
+    server = [pending_transfer("server", f"cust{i}", "1.000 HIVE") for i in range(3)]
+    other = [pending_transfer("treasury", f"cust{i}", "1.000 HIVE") for i in range(2)]
+
+    results = await queue.send_many(server + other, hive_client)
+
+    assert not any(isinstance(result, BaseException) for result in results)
+    batches = [call.kwargs["transfer_list"] for call in senders["bulk"].await_args_list]
+    assert sorted(len(batch) for batch in batches) == [2, 2]
+    for batch in batches:
+        assert len({t.from_account for t in batch}) == 1
+    # The third server transfer was alone in its chunk.
+    senders["pending"].assert_awaited_once()
+
+
+async def test_failed_batch_falls_back_to_single_sends(senders):
+    queue = HiveSendQueue(window=0.01)
+    hive_client = MagicMock()
+    good = pending_transfer("server", "alice", "1.000 HIVE")
+    bad = pending_transfer("server", "bob", "999999.000 HIVE")
+    senders["bulk"].side_effect = HiveSomeOtherRPCException("does not have sufficient funds")
+
+    async def send_pending(pending, hive_client):
+        if pending is bad:
+            raise HiveNotEnoughHiveInAccount("too much", sending_amount=pending.amount)
+        return {"trx_id": "single"}
+
+    senders["pending"].side_effect = send_pending
+
+    results = await queue.send_many([good, bad], hive_client)
+
+    assert results[0] == {"trx_id": "single"}
+    assert isinstance(results[1], HiveNotEnoughHiveInAccount)
+    assert queue.stats.batch_failures == 1
+    assert queue.stats.single_sends == 2
+
+
+async def test_posting_custom_json_is_never_batched(senders):
+    queue = HiveSendQueue(window=0.01)
+    hive_client = MagicMock()
+    posting = [pending_custom_json("server", active=False) for _ in range(2)]
+
+    results = await queue.send_many(posting, hive_client)
+
+    assert results == [{"trx_id": "single_cj"}] * 2
+    senders["bulk"].assert_not_awaited()
+    assert senders["custom_json"].await_args.kwargs["resend_attempt"] == 1
+    assert senders["custom_json"].await_args.kwargs["active"] is False
+
+
+async def test_transfer_checks_run_before_batching(senders):
+    queue = HiveSendQueue(window=0.01)
+    hive_client = MagicMock()
+    good = pending_transfer("server", "alice", "1.000 HIVE")
+    exchange = pending_transfer("server", "binance-hot", "1.000 HIVE")
+    dev = pending_transfer("server", "stranger", "1.000 HIVE")
+
+    async def checks(from_account, to_account, amount, nobroadcast):
+        if to_account == "binance-hot":
+            raise HiveAccountNameOnExchangesList("binance-hot is on the bad accounts list")
+        if to_account == "stranger":
+            raise HiveDevelopmentAccountError("stranger is not allowed")
+        return True
+
+    senders["checks"].side_effect = checks
+
+    results = await queue.send_many([good, exchange, dev], hive_client)
+
+    assert isinstance(results[2], HiveDevelopmentAccountError)
+    (batch,) = [call.kwargs["transfer_list"] for call in senders["bulk"].await_args_list]
+    assert batch == [good, exchange]
+    assert exchange.to_account == "v4vapp.sus"
+    dev.delete.assert_not_awaited()
+
+
+async def test_bulk_encrypts_private_memo(mocker):
+    builder = mocker.patch("v4vapp_backend_v2.hive.hive_extras.TransactionBuilder")
+    builder.return_value.broadcast.return_value = {"trx_id": "trx"}
+    transfer_op = mocker.patch("v4vapp_backend_v2.hive.hive_extras.NectarTransfer")
+    mocker.patch("v4vapp_backend_v2.hive.hive_extras.Account")
+    memo = mocker.patch("v4vapp_backend_v2.hive.hive_extras.Memo")
+    memo.return_value.encrypt.return_value = {"message": "#encrypted"}
+    private = pending_transfer("server", "alice", "1.000 HIVE")
+    private.memo = "#secret"
+    public = pending_transfer("server", "bob", "1.000 HIVE")
+
+    await send_transfer_bulk(transfer_list=[private, public], hive_client=MagicMock())
+
+    memo.return_value.encrypt.assert_called_once_with("secret")
+    assert memo.call_args.kwargs["to_account"] == "alice"
+    built = [call.args[0]["memo"] for call in transfer_op.call_args_list]
+    assert built == ["#encrypted", "pay bob"]
+
+
+def test_item_reply_without_operations():
+    assert item_reply({"trx_id": "abc"}, 2) == {"trx_id": "abc", "op_in_trx": 2}
@@ -0,0 +1,111 @@
+"""
+Tests for the caching memo decoder behind ``decode_memo``.
+
+Covers:
+- decrypted memos match nectar's own decoding, in both directions of a transfer
+- the shared secret is derived once per counterparty and memos are decrypted once
+- ``prefetch`` decrypts a batch of stream events and skips memos it cannot read
+- ``decode_memo`` answers from the cache without touching the wallet
+"""
+
+from unittest.mock import MagicMock
+
+import nectarbase.memo as BtsMemo
+import pytest
+from nectar.exceptions import MissingKeyError
+from nectargraphenebase.account import PrivateKey
+
+from v4vapp_backend_v2.hive.hive_extras import decode_memo
+from v4vapp_backend_v2.hive.memo_decoder import MemoDecoder
+
+OUR_KEY = PrivateKey()
+CUSTOMER_KEY = PrivateKey()
+STRANGER_KEY = PrivateKey()
+
+
+def encrypt(sender: PrivateKey, receiver: PrivateKey, message: str, nonce: int = 1) -> str:
+    return BtsMemo.encode_memo(sender, receiver.pubkey, nonce, message)
+
+
+def hive_with_keys(*keys: PrivateKey) -> MagicMock:
+    wifs = {str(key.pubkey): str(key) for key in keys}
+
+    def get_private_key(public_key: str) -> str:
+        if public_key not in wifs:
+            raise MissingKeyError("not installed")
+        return wifs[public_key]
+
+    hive_inst = MagicMock()
+    hive_inst.wallet.getPrivateKeyForPublicKey.side_effect = get_private_key
+    return hive_inst
+
+
+@pytest.fixture
+def hive_inst() -> MagicMock:
+    return hive_with_keys(OUR_KEY)
+
+
+def test_decrypt_matches_nectar_both_ways(hive_inst):
+    decoder = MemoDecoder()
+    received = encrypt(CUSTOMER_KEY, OUR_KEY, "pay me | lnbc1")
+    sent = encrypt(OUR_KEY, CUSTOMER_KEY, "refund #1234")
+
+    assert decoder.decrypt(received, hive_inst) == BtsMemo.decode_memo(OUR_KEY, received)
+    assert decoder.decrypt(sent, hive_inst) == BtsMemo.decode_memo(OUR_KEY, sent)
+    # Both directions share the same counterparty and so the same secret.
+    assert decoder.stats.secret_misses == 1
+    assert decoder.stats.secret_hits == 1
+
+
+def test_memos_and_secrets_are_cached(hive_inst):
+    decoder = MemoDecoder()
+    memos = [encrypt(CUSTOMER_KEY, OUR_KEY, f"memo {i}", nonce=i) for i in range(5)]
+
+    decoded = [decoder.decrypt(memo, hive_inst) for memo in memos]
+    assert decoded == [f"#memo {i}" for i in range(5)]
+    assert decoder.stats.secret_misses == 1
+    assert decoder.stats.decrypted == 5
+
+    hive_inst.wallet.getPrivateKeyForPublicKey.reset_mock()
+    assert decoder.decrypt(memos[0], hive_inst, trx_id="abc", op_in_trx=0) == decoded[0]
+    hive_inst.wallet.getPrivateKeyForPublicKey.assert_not_called()
+    assert decoder.stats.decrypted == 5
+    assert decoder.cached(trx_id="abc", op_in_trx=0) == decoded[0]
+    assert decoder.cached(trx_id="abc", op_in_trx=1) is None
+
+
+def test_decrypt_raises_without_our_key(hive_inst):
+    decoder = MemoDecoder()
+    with pytest.raises(MissingKeyError):
+        decoder.decrypt(encrypt(CUSTOMER_KEY, STRANGER_KEY, "not ours"), hive_inst)
+
+
+async def test_prefetch_decrypts_stream_events(hive_inst):
+    decoder = MemoDecoder(max_workers=2)
+    ours = [encrypt(CUSTOMER_KEY, OUR_KEY, f"deposit {i}", nonce=i) for i in range(4)]
+    events = [{"type": "transfer", "memo": memo} for memo in ours]
+    events += [
+        {"type": "transfer", "memo": encrypt(CUSTOMER_KEY, STRANGER_KEY, "other people")},
+        {"type": "transfer", "memo": "plain memo"},
+        {"type": "producer_reward"},
+    ]
+
+    assert await decoder.prefetch(events, hive_inst) == 4
+    assert decoder.stats.failures == 1
+    assert decoder.cached(ours[2]) == "#deposit 2"
+    # Already decrypted memos are not sent to the pool again.
+    assert await decoder.prefetch(events[:4], hive_inst) == 0
+    assert await decoder.prefetch(events, None) == 0
+    decoder.shutdown()
+
+
+def test_decode_memo_uses_cache(hive_inst):
+    memo = encrypt(CUSTOMER_KEY, OUR_KEY, "cached deposit", nonce=99)
+    assert decode_memo(memo=memo, hive_inst=hive_inst) == "cached deposit"
+
+    other_hive = hive_with_keys()  # no keys at all: only the cache can answer
+    assert decode_memo(memo=memo, hive_inst=other_hive) == "cached deposit"
+    assert decode_memo(memo="plain", hive_inst=other_hive) == "plain"
+    assert decode_memo(
+        memo=encrypt(CUSTOMER_KEY, STRANGER_KEY, "not ours"), hive_inst=hive_inst
+    ).startswith("#")
@@ -0,0 +1,99 @@
+"""
+Tests for the health-scored Hive node pool.
+
+Covers:
+- probes rank nodes by latency and push lagging or failing nodes to the back
+- ``call`` hedges a slow node to the next one and moves on after failures
+- ``switch`` reconnects a client to the best other node, or falls back to rpc.next()
+"""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from v4vapp_backend_v2.hive.node_pool import MAX_LAG_BLOCKS, HiveNodePool, HiveNodeRPCError
+
+FAST = "https://fast.node"
+SLOW = "https://slow.node"
+BEHIND = "https://behind.node"
+BROKEN = "https://broken.node"
+
+
+def fake_rpc(delays: dict, heads: dict, broken: set = set()):
+    async def _rpc(url, method, params):
+        await asyncio.sleep(delays.get(url, 0))
+        if url in broken:
+            raise HiveNodeRPCError(f"{url} failed")
+        if method == "condenser_api.get_dynamic_global_properties":
+            return {"head_block_number": heads.get(url, 100)}
+        return {"url": url}
+
+    return _rpc
+
+
+@pytest.fixture
+def pool() -> HiveNodePool:
+    pool = HiveNodePool(nodes=[SLOW, BEHIND, BROKEN, FAST], hedge_after=0.05)
+    pool._rpc = fake_rpc(  # type: ignore[method-assign]
+        delays={FAST: 0.001, SLOW: 0.03, BEHIND: 0.001},
+        heads={BEHIND: 100 - MAX_LAG_BLOCKS - 5},
+        broken={BROKEN},
+    )
+    return pool
+
+
+async def test_probe_ranks_fast_healthy_nodes_first(pool):
+    assert pool.ranked_nodes() == []  # nothing probed yet
+
+    await pool.probe_all()
+
+    assert pool.ranked_nodes()[:2] == [FAST, SLOW]
+    assert pool.is_lagging(BEHIND)
+    assert not pool.scores[BEHIND].healthy
+    assert pool.scores[BROKEN].errors == 1
+    status = pool.status()
+    assert status["best_node"] == FAST
+    assert status["nodes"][BEHIND]["lag_blocks"] == MAX_LAG_BLOCKS + 5
+
+
+async def test_call_hedges_slow_node(pool):
+    await pool.probe_all()
+    # FAST turns slow after being ranked first; the hedge to SLOW answers sooner.
+    pool._rpc = fake_rpc(delays={FAST: 0.5, SLOW: 0.01}, heads={})  # type: ignore[method-assign]
+
+    result = await pool.call("condenser_api.get_block", [1])
+
+    assert result == {"url": SLOW}
+    assert pool.stats.hedged == 1
+    assert pool.stats.hedge_wins == 1
+
+
+async def test_call_moves_on_after_failure(pool):
+    pool.set_nodes([BROKEN, FAST])
+    pool.scores[BROKEN].record_success(0.001)  # ranked first until it fails
+
+    assert await pool.call("condenser_api.get_block", [1]) == {"url": FAST}
+    assert pool.scores[BROKEN].errors == 1
+
+
+async def test_call_raises_when_every_node_fails(pool):
+    pool.set_nodes([BROKEN])
+    with pytest.raises(HiveNodeRPCError):
+        await pool.call("condenser_api.get_block", [1])
+
+
+async def test_switch_reconnects_to_best_other_node(pool):
+    hive = MagicMock()
+    hive.rpc.url = SLOW
+
+    pool.switch(hive, failed=FAST)  # not probed: plain rotation
+    hive.rpc.next.assert_called_once()
+    hive.connect.assert_not_called()
+
+    await pool.probe_all()
+    pool.switch(hive, failed=FAST)
+    nodes = hive.connect.call_args.kwargs["node"]
+    assert nodes[0] == SLOW
+    assert nodes[-1] == FAST
+    assert pool.scores[FAST].last_error == "switched away"
@@ -1,16 +1,25 @@
+import copy
 import os
 from pathlib import Path
 
 import httpx
 import pytest
+from pydantic import ValidationError
 
 from tests.get_last_quote import last_quote
 from tests.helpers.test_crypto_prices import mock_binance
 from tests.load_data import load_hive_events
 from v4vapp_backend_v2.actions.tracked_models import TrackedBaseModel
 from v4vapp_backend_v2.helpers.general_purpose_funcs import find_short_id
-from v4vapp_backend_v2.hive_models.op_all import op_any, op_any_or_base
-from v4vapp_backend_v2.hive_models.op_base import HiveExp, OpBase
+from v4vapp_backend_v2.hive_models.op_all import (
+    DiscriminatedOp,
+    RawOp,
+    op_any,
+    op_any_or_base,
+    op_or_raw,
+    tracked_op_filter,
+)
+from v4vapp_backend_v2.hive_models.op_base import HiveExp, OpBase, OpRealm
 from v4vapp_backend_v2.hive_models.op_producer_reward import ProducerReward
 from v4vapp_backend_v2.hive_models.op_transfer import Transfer
 
@@ -140,3 +149,67 @@ def test_hive_account_name_links(mocker):
             except Exception as e:
                 print(e)
                 assert False
+
+
+def test_op_any_or_base_matches_discriminated_union():
+    TrackedBaseModel.last_quote = last_quote()
+    for hive_event in load_hive_events():
+        try:
+            union_op = DiscriminatedOp.model_validate({"value": copy.deepcopy(hive_event)}).value
+        except ValidationError:
+            with pytest.raises(ValueError):
+                op_any_or_base(copy.deepcopy(hive_event))
+            continue
+        op = op_any_or_base(copy.deepcopy(hive_event))
+        assert type(op) is type(union_op)
+        assert op.model_dump() == union_op.model_dump()
+
+
+def test_raw_op_classification():
+    hive_event = {
+        "type": "transfer",
+        "from": "alice",
+        "to": "bob",
+        "amount": {"amount": "1000", "precision": 3, "nai": "@@000000021"},
+        "memo": "hi",
+        "block_num": 96000000,
+        "trx_id": "abc",
+        "timestamp": "2025-05-01T10:00:00",
+    }
+    raw = RawOp.from_event(hive_event)
+    assert (raw.op_type, raw.realm, raw.block_num, raw.trx_id) == (
+        "transfer",
+        OpRealm.REAL,
+        96000000,
+        "abc",
+    )
+    assert raw.accounts == {"alice", "bob"}
+    assert raw.raw_op is hive_event
+    assert raw.timestamp.tzinfo is not None
+    with pytest.raises(ValueError):
+        RawOp.from_event({"type": "transfer"})
+
+
+def test_tracked_op_filter_skips_unwatched_ops():
+    TrackedBaseModel.last_quote = last_quote()
+    keep = tracked_op_filter(watch_users=["v4vapp"], custom_json_ids=["v4vapp_transfer"])
+    kept = skipped = 0
+    for hive_event in load_hive_events():
+        try:
+            op = op_or_raw(copy.deepcopy(hive_event), keep)
+        except ValueError:
+            continue
+        if isinstance(op, RawOp):
+            skipped += 1
+            assert op.op_type in (
+                "custom_json",
+                "transfer",
+                "recurrent_transfer",
+                "fill_recurrent_transfer",
+            )
+            # Whatever was skipped is something all_ops_loop would not act on.
+            full = op.materialize()
+            assert not full.is_watched and not full.known_custom_json
+        else:
+            kept += 1
+    assert kept and skipped
@@ -1,4 +1,5 @@
 import os
+import time
 from datetime import timedelta
 from pathlib import Path
 
@@ -6,7 +7,7 @@ import pytest
 
 from tests.load_data import load_hive_events
 from v4vapp_backend_v2.hive_models.op_types_enums import OpTypes
-from v4vapp_backend_v2.hive_models.stream_ops import stream_ops_async
+from v4vapp_backend_v2.hive_models.stream_ops import CATCH_UP_CHUNK_BLOCKS, stream_ops_async
 
 
 @pytest.fixture(autouse=True)
@@ -114,3 +115,70 @@ async def test_stream_ops_block_range(mocker):
 
     # Check that the results are as expected
     assert len(results) > 0
+
+
+@pytest.mark.asyncio
+async def test_stream_ops_parallel_catch_up_order(mocker):
+    """
+    Catch-up ranges fetched concurrently (finishing out of order) must be yielded in
+    strict block order and hand over to the sequential stream without gaps or repeats.
+    """
+    opNames = ["update_proposal_votes"]
+    start_block = 95_000_000
+    head_block = start_block + 1_000
+    stop_block = head_block + 10
+
+    template = next(load_hive_events(OpTypes.UPDATE_PROPOSAL_VOTES)).copy()
+
+    fake_rpc = mocker.Mock(url="https://mock.hive.node")
+    fake_rpc.next.return_value = None
+    fake_hive = mocker.Mock(rpc=fake_rpc)
+    fake_hive.set_default_nodes.return_value = None
+
+    fake_blockchain = mocker.Mock()
+    fake_blockchain.get_current_block_num.return_value = head_block
+    stream_starts = []
+
+    def fake_stream(*args, **kwargs):
+        if kwargs.get("only_virtual_ops"):
+            return iter([])
+        stream_starts.append(kwargs["start"])
+        # Later ranges return first so reassembly order is actually exercised.
+        time.sleep(0.002 * (stop_block - kwargs["start"]) / CATCH_UP_CHUNK_BLOCKS)
+        events = []
+        for block_num in range(kwargs["start"], kwargs["stop"] + 1):
+            event = template.copy()
+            event["block_num"] = block_num
+            event["trx_id"] = f"{block_num:040x}"
+            events.append(event)
+        return iter(events)
+
+    fake_blockchain.stream.side_effect = fake_stream
+
+    mocker.patch(
+        "v4vapp_backend_v2.hive_models.stream_ops.TrackedBaseModel.update_quote",
+        return_value=None,
+    )
+    mocker.patch(
+        "v4vapp_backend_v2.hive_models.stream_ops.get_good_nodes",
+        return_value=["https://mock1.hive.node", "https://mock2.hive.node"],
+    )
+    mocker.patch(
+        "v4vapp_backend_v2.hive_models.stream_ops.get_hive_client",
+        return_value=fake_hive,
+    )
+    mocker.patch(
+        "v4vapp_backend_v2.hive_models.stream_ops.get_blockchain_instance",
+        return_value=fake_blockchain,
+    )
+
+    blocks = []
+    async for op in stream_ops_async(
+        start=start_block, stop=stop_block, opNames=opNames, parallel_catch_up_enabled=True
+    ):
+        blocks.append(op.block_num)
+
+    assert blocks == list(range(start_block, stop_block + 1))
+    # Catch-up ranges, then one sequential stream starting right after the head.
+    assert len(stream_starts) == -(-(head_block - start_block + 1) // CATCH_UP_CHUNK_BLOCKS) + 1
+    assert stream_starts[-1] == head_block + 1
@@ -0,0 +1,311 @@
+"""
+Replay harness: the watched-account stream against the full-block stream.
+
+Recorded hive events are served through a fake blockchain to ``stream_ops_async``
+(the current full-block path) and through a recorded ``HiveOpSource`` to
+``stream_watched_ops_async``.  The ops that ``all_ops_loop`` would store must be
+identical (same ``group_id`` and raw op), and the watched path must validate fewer ops.
+
+``stream_ops_async`` only fetches virtual ops for the block before each block with a
+tracked real op.  On mainnet that is every block; on the sparse recordings the
+comparison is limited to the virtual ops of the blocks it actually fetched.
+"""
+
+import copy
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Set
+
+import pytest
+
+from v4vapp_backend_v2.hive_models.op_account_update2 import AccountUpdate2
+from v4vapp_backend_v2.hive_models.op_account_witness_vote import AccountWitnessVote
+from v4vapp_backend_v2.hive_models.op_all import (
+    OpAny,
+    RawOp,
+    is_op_all_transfer,
+    tracked_op_filter,
+)
+from v4vapp_backend_v2.hive_models.op_base import OP_TRACKED, OpBase, OpRealm, op_realm
+from v4vapp_backend_v2.hive_models.op_fill_order import FillOrder
+from v4vapp_backend_v2.hive_models.op_limit_order_cancelled import LimitOrderCancelled
+from v4vapp_backend_v2.hive_models.op_limit_order_create import LimitOrderCreate
+from v4vapp_backend_v2.hive_models.op_producer_missed import ProducerMissed
+from v4vapp_backend_v2.hive_models.op_producer_reward import ProducerReward
+from v4vapp_backend_v2.hive_models.op_update_proposal_votes import UpdateProposalVotes
+from v4vapp_backend_v2.hive_models.stream_ops import stream_ops_async
+from v4vapp_backend_v2.hive_models.stream_watched_ops import (
+    WatchedFilter,
+    impacted_accounts,
+    stream_watched_ops_async,
+)
+
+
+@pytest.fixture(autouse=True)
+def set_base_config_path_combined(monkeypatch: pytest.MonkeyPatch):
+    test_config_path = Path("tests/data/config")
+    monkeypatch.setattr("v4vapp_backend_v2.config.setup.BASE_CONFIG_PATH", test_config_path)
+    test_config_logging_path = Path(test_config_path, "logging/")
+    monkeypatch.setattr(
+        "v4vapp_backend_v2.config.setup.BASE_LOGGING_CONFIG_PATH",
+        test_config_logging_path,
+    )
+    monkeypatch.setattr("v4vapp_backend_v2.config.setup.InternalConfig._instance", None)
+    yield
+    monkeypatch.setattr("v4vapp_backend_v2.config.setup.InternalConfig._instance", None)
+
+
+def load_recorded_events(*file_names: str) -> List[dict]:
+    events = []
+    for file_name in file_names:
+        with open(file_name, "r") as f:
+            for line in f:
+                try:
+                    hive_event = json.loads(line).get("hive_event")
+                except json.JSONDecodeError:
+                    continue
+                if hive_event:
+                    hive_event.pop("op_in_trx", None)
+                    events.append(hive_event)
+    return events
+
+
+class RecordedBlocks:
+    """Recorded events served as a nectar ``Blockchain`` and as a ``HiveOpSource``."""
+
+    hive = None
+
+    def __init__(self, events: List[dict], stop: int):
+        self.real = [e for e in events if _realm(e) == OpRealm.REAL]
+        self.virtual = [e for e in events if _realm(e) == OpRealm.VIRTUAL]
+        self.stop = stop
+        self.virtual_blocks_fetched: Set[int] = set()
+
+    # nectar Blockchain
+    def get_current_block_num(self) -> int:
+        return self.stop
+
+    def stream(self, start: int, stop: int, opNames=None, only_virtual_ops=False, **kwargs):
+        if only_virtual_ops:
+            self.virtual_blocks_fetched.update(range(start, stop + 1))
+            return iter(self._range(self.virtual, start, stop, None))
+        return iter(self._range(self.real, start, stop, opNames))
+
+    # HiveOpSource
+    def head_block(self) -> int:
+        return self.stop
+
+    def real_ops(self, start: int, stop: int, opNames: List[str]) -> Iterable[dict]:
+        return self._range(self.real, start, stop, opNames)
+
+    def virtual_ops(self, block_num: int) -> List[dict]:
+        return self._range(self.virtual, block_num, block_num, None)
+
+    def history_blocks(self, account: str, start: int, stop: int, op_types: List[str]) -> Set[int]:
+        return {
+            e["block_num"]
+            for e in self._range(self.virtual, start, stop, op_types)
+            if account in impacted_accounts(e)
+        }
+
+    def commit_history(self) -> None:
+        pass
+
+    @staticmethod
+    def _range(events: List[dict], start: int, stop: int, opNames) -> List[dict]:
+        return [
+            copy.deepcopy(e)
+            for e in events
+            if start <= e["block_num"] <= stop and (not opNames or e["type"] in opNames)
+        ]
+
+
+def _realm(hive_event: dict) -> OpRealm:
+    return op_realm(hive_event["type"])
+
+
+def stored_by_all_ops_loop(op: OpAny, watch_users: List[str], watch_witnesses: List[str]) -> bool:
+    """The ``db_store`` decision of ``all_ops_loop`` for each op type."""
+    if isinstance(op, AccountWitnessVote):
+        return bool(watch_witnesses) and op.witness in watch_witnesses
+    if is_op_all_transfer(op):
+        return op.is_watched
+    if op.known_custom_json:
+        return True
+    if isinstance(op, (LimitOrderCreate, FillOrder)):
+        return op.is_watched
+    if isinstance(op, LimitOrderCancelled):
+        return op.seller in watch_users
+    if isinstance(op, (ProducerReward, ProducerMissed)):
+        return op.producer in watch_witnesses
+    if isinstance(op, UpdateProposalVotes):
+        return bool(OpBase.proposals_tracked) and op.is_tracked
+    if isinstance(op, AccountUpdate2):
+        return op.is_watched
+    return False
+
+
+def _watch_accounts(events: List[dict]) -> tuple[List[str], List[str]]:
+    """A handful of users and witnesses that actually appear in the recording."""
+    users: List[str] = []
+    witnesses: List[str] = []
+    for field_name in ("owner", "current_owner", "from", "to", "seller"):
+        for e in events:
+            name = e.get(field_name)
+            if isinstance(name, str) and name not in users:
+                users.append(name)
+                break
+    for e in events:
+        if e["type"] == "producer_reward" and e["producer"] not in witnesses:
+            witnesses.append(e["producer"])
+        if len(witnesses) == 2:
+            break
+    return users, witnesses
+
+
+def _key(op: OpAny) -> Dict:
+    raw = {k: v for k, v in op.raw_op.items() if k != "op_in_trx"}
+    return {"group_id": op.group_id, "raw": raw}
+
+
+@pytest.mark.parametrize(
+    "file_names",
+    [
+        (
+            "tests/data/hive_models/real_ops_logs.jsonl",
+            "tests/data/hive_models/virtual_ops_log.jsonl",
+        ),
+        ("tests/data/hive_models/all_ops_log.jsonl",),
+    ],
+)
+@pytest.mark.asyncio
+async def test_watched_stream_matches_full_block_stream(mocker, monkeypatch, file_names):
+    events = load_recorded_events(*file_names)
+    # stream_ops_async only stops once a tracked real op reaches the stop block.
+    real_blocks = sorted(
+        {e["block_num"] for e in events if _realm(e) == OpRealm.REAL and e["type"] in OP_TRACKED}
+    )
+    start, stop = real_blocks[0], real_blocks[-1]
+    watch_users, watch_witnesses = _watch_accounts(events)
+    cj_ids = sorted({e["id"] for e in events if e["type"] == "custom_json"})[:1]
+    monkeypatch.setattr(OpBase, "watch_users", watch_users)
+    # Other tests assign LimitOrderCreate.watch_users directly, shadowing OpBase's list.
+    monkeypatch.setattr(LimitOrderCreate, "watch_users", watch_users)
+    monkeypatch.setattr(OpBase, "custom_json_ids_tracked", cj_ids)
+    monkeypatch.setattr(OpBase, "proposals_tracked", [])
+
+    recorded = RecordedBlocks(events, stop=stop)
+    fake_rpc = mocker.Mock(url="https://mock.hive.node")
+    fake_hive = mocker.Mock(rpc=fake_rpc)
+    mocker.patch(
+        "v4vapp_backend_v2.hive_models.stream_ops.TrackedBaseModel.update_quote",
+        return_value=None,
+    )
+    mocker.patch(
+        "v4vapp_backend_v2.hive_models.stream_watched_ops.TrackedBaseModel.update_quote",
+        return_value=None,
+    )
+    mocker.patch(
+        "v4vapp_backend_v2.hive_models.stream_ops.get_good_nodes",
+        return_value=["https://mock.hive.node"],
+    )
+    mocker.patch(
+        "v4vapp_backend_v2.hive_models.stream_ops.get_hive_client", return_value=fake_hive
+    )
+    mocker.patch(
+        "v4vapp_backend_v2.hive_models.stream_ops.get_blockchain_instance",
+        return_value=recorded,
+    )
+
+    full_ops = [op async for op in stream_ops_async(start=start, stop=stop, opNames=OP_TRACKED)]
+    watched = WatchedFilter(
+        accounts={*watch_users, *watch_witnesses}, custom_json_ids=set(cj_ids), proposals=set()
+    )
+    watched_ops = [
+        op
+        async for op in stream_watched_ops_async(
+            watched=watched, start=start, stop=stop, source=recorded, window_blocks=50
+        )
+    ]
+
+    def stored(ops: List[OpAny]) -> List[Dict]:
+        return [
+            _key(op)
+            for op in ops
+            if stored_by_all_ops_loop(op, watch_users, watch_witnesses)
+            and (op.realm == OpRealm.REAL or op.block_num in recorded.virtual_blocks_fetched)
+        ]
+
+    expected = sorted(stored(full_ops), key=lambda k: k["group_id"])
+    actual = stored(watched_ops)
+    assert actual, "recording has no ops for the chosen accounts"
+    assert sorted(actual, key=lambda k: k["group_id"]) == expected
+    assert [op.block_num for op in watched_ops] == sorted(op.block_num for op in watched_ops)
+    assert len(watched_ops) < len(full_ops)
+
+
+@pytest.mark.asyncio
+async def test_keep_filter_stores_the_same_ops(mocker, monkeypatch):
+    """``stream_ops_async(keep=tracked_op_filter(...))`` only skips ops nobody stores."""
+    events = load_recorded_events("tests/data/hive_models/all_ops_log.jsonl")
+    real_blocks = sorted(
+        {e["block_num"] for e in events if _realm(e) == OpRealm.REAL and e["type"] in OP_TRACKED}
+    )
+    start, stop = real_blocks[0], real_blocks[-1]
+    watch_users, watch_witnesses = _watch_accounts(events)
+    cj_ids = sorted({e["id"] for e in events if e["type"] == "custom_json"})[:1]
+    monkeypatch.setattr(OpBase, "watch_users", watch_users)
+    monkeypatch.setattr(LimitOrderCreate, "watch_users", watch_users)
+    monkeypatch.setattr(OpBase, "custom_json_ids_tracked", cj_ids)
+    monkeypatch.setattr(OpBase, "proposals_tracked", [])
+    fake_hive = mocker.Mock(rpc=mocker.Mock(url="https://mock.hive.node"))
+    mocker.patch(
+        "v4vapp_backend_v2.hive_models.stream_ops.TrackedBaseModel.update_quote",
+        return_value=None,
+    )
+    mocker.patch(
+        "v4vapp_backend_v2.hive_models.stream_ops.get_good_nodes",
+        return_value=["https://mock.hive.node"],
+    )
+    mocker.patch(
+        "v4vapp_backend_v2.hive_models.stream_ops.get_hive_client", return_value=fake_hive
+    )
+
+    async def stream(**kwargs) -> List:
+        mocker.patch(
+            "v4vapp_backend_v2.hive_models.stream_ops.get_blockchain_instance",
+            return_value=RecordedBlocks(events, stop=stop),
+        )
+        return [op async for op in stream_ops_async(start=start, stop=stop, **kwargs)]
+
+    full_ops = await stream()
+    kept_ops = await stream(keep=tracked_op_filter(watch_users, cj_ids))
+
+    skipped = [op for op in kept_ops if isinstance(op, RawOp)]
+    assert skipped
+    assert [(op.block_num, op.op_type, op.op_in_trx) for op in kept_ops] == [
+        (op.block_num, op.op_type, op.op_in_trx) for op in full_ops
+    ]
+
+    def stored(ops: List) -> List[Dict]:
+        return [
+            _key(op)
+            for op in ops
+            if not isinstance(op, RawOp)
+            and stored_by_all_ops_loop(op, watch_users, watch_witnesses)
+        ]
+
+    assert stored(kept_ops) == stored(full_ops)
+
+
+def test_watched_filter_relevance():
+    watched = WatchedFilter(accounts={"alice"}, custom_json_ids={"vsc.transfer"}, proposals={342})
+    assert watched.relevant({"type": "transfer", "from": "bob", "to": "alice"})
+    assert not watched.relevant({"type": "transfer", "from": "bob", "to": "carol"})
+    assert watched.relevant({"type": "custom_json", "id": "vsc.transfer", "required_auths": []})
+    assert not watched.relevant(
+        {"type": "custom_json", "id": "other", "required_auths": ["alice"]}
+    )
+    assert watched.relevant({"type": "update_proposal_votes", "voter": "x", "proposal_ids": [342]})
+    assert watched.relevant({"type": "fill_order", "current_owner": "x", "open_owner": "alice"})
+    assert not watched.relevant({"type": "producer_reward", "producer": "x"})
@@ -0,0 +1,236 @@
+"""
+Tests for the concurrent, checkpointed LND invoice/payment backfill.
+
+Covers:
+- every invoice up to the node's head is upserted on ``r_hash``, pages fetched oldest first
+- invoices already stored are skipped with one lookup per page
+- an interrupted run leaves a checkpoint and the next run resumes from it
+- payments without a stored route are enriched before being written, including ones
+  below the checkpoint on later runs
+"""
+
+import asyncio
+import base64
+from types import SimpleNamespace
+from typing import Any, Dict, List
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+import v4vapp_backend_v2.lnd_grpc.lightning_pb2 as lnrpc
+from v4vapp_backend_v2.lnd_grpc import lnd_backfill
+from v4vapp_backend_v2.lnd_grpc.lnd_backfill import InvoiceBackfill, PaymentBackfill
+
+
+def r_hash(i: int) -> str:
+    return base64.b64encode(i.to_bytes(32, "big")).decode()
+
+
+def payment_hash(i: int) -> str:
+    return f"{i:064x}"
+
+
+class FakeCollection:
+    """Just enough of an ``AsyncCollection`` for the backfill, keyed on one field."""
+
+    def __init__(self, key: str, docs: List[Dict[str, Any]] | None = None) -> None:
+        self.key = key
+        self.docs = {doc[key]: doc for doc in docs or []}
+        self.finds = 0
+
+    async def create_indexes(self, indexes):
+        return []
+
+    @staticmethod
+    def matches(doc: Dict[str, Any], query: Dict[str, Any]) -> bool:
+        for field, condition in query.items():
+            value = doc.get(field)
+            if "$in" in condition and value not in condition["$in"]:
+                return False
+            if "$lte" in condition and (value is None or value > condition["$lte"]):
+                return False
+        return True
+
+    def find(self, query, projection=None):
+        self.finds += 1
+
+        async def cursor():
+            for doc in list(self.docs.values()):
+                if self.matches(doc, query):
+                    yield doc
+
+        return cursor()
+
+    def indexes(self, field: str) -> List[int]:
+        return sorted(doc[field] for doc in self.docs.values())
+
+    async def bulk_write(self, requests, ordered=True):
+        upserted = 0
+        for request in requests:
+            index = request._filter[self.key]
+            upserted += index not in self.docs
+            self.docs.setdefault(index, {}).update(request._doc["$set"])
+        return SimpleNamespace(upserted_count=upserted, modified_count=len(requests) - upserted)
+
+
+class FakeCheckpoints:
+    def __init__(self) -> None:
+        self.docs: Dict[str, Dict[str, Any]] = {}
+
+    async def find_one(self, query):
+        return self.docs.get(query["_id"])
+
+    async def update_one(self, query, update, upsert=False):
+        doc = self.docs.setdefault(query["_id"], {"index": 0})
+        doc.update(update["$set"])
+        doc["index"] = max(doc["index"], update["$max"]["index"])
+
+
+def fake_node(invoices: int = 0, payments: int = 0) -> MagicMock:
+    def list_invoices(request):
+        found = list(range(1, invoices + 1))
+        if request.reversed:
+            found = found[::-1]
+        else:
+            found = [i for i in found if i > request.index_offset]
+        found = found[: request.num_max_invoices]
+        return lnrpc.ListInvoiceResponse(
+            invoices=[
+                lnrpc.Invoice(add_index=i, r_hash=i.to_bytes(32, "big"), value=i, memo=f"#{i}")
+                for i in found
+            ],
+            first_index_offset=min(found, default=0),
+            last_index_offset=max(found, default=0),
+        )
+
+    def list_payments(request):
+        found = list(range(1, payments + 1))
+        if request.reversed:
+            found = found[::-1]
+        else:
+            found = [i for i in found if i > request.index_offset]
+        found = found[: request.max_payments]
+        return lnrpc.ListPaymentsResponse(
+            payments=[
+                lnrpc.Payment(payment_index=i, payment_hash=f"{i:064x}", value_msat=1000 * i)
+                for i in found
+            ],
+            first_index_offset=min(found, default=0),
+            last_index_offset=max(found, default=0),
+        )
+
+    lnd_client = MagicMock()
+    lnd_client.connection.name = "test_node"
+    lnd_client.icon = "⚡"
+    lnd_client.lightning_stub.ListInvoices = list_invoices
+    lnd_client.lightning_stub.ListPayments = list_payments
+    lnd_client.call = AsyncMock(side_effect=lambda method, request: method(request))
+    return lnd_client
+
+
+@pytest.fixture
+def checkpoints(monkeypatch: pytest.MonkeyPatch) -> FakeCheckpoints:
+    checkpoints = FakeCheckpoints()
+    monkeypatch.setattr(
+        lnd_backfill.LndBackfill, "checkpoint_collection", staticmethod(lambda: checkpoints)
+    )
+    return checkpoints
+
+
+def use_collection(monkeypatch, cls, collection: FakeCollection) -> None:
+    monkeypatch.setattr(cls, "collection", classmethod(lambda _cls: collection))
+
+
+async def test_invoices_backfilled_and_checkpointed(monkeypatch, checkpoints):
+    stored = FakeCollection(
+        "r_hash", [{"r_hash": r_hash(i), "add_index": i, "memo": "old"} for i in (3, 4)]
+    )
+    use_collection(monkeypatch, InvoiceBackfill, stored)
+
+    backfill = InvoiceBackfill(fake_node(invoices=25), page_size=10, concurrency=3)
+    stats = await backfill.run()
+
+    assert stored.indexes("add_index") == list(range(1, 26))
+    assert stored.docs[r_hash(3)]["memo"] == "old"  # stored invoices are left alone
+    assert stored.docs[r_hash(7)]["add_index"] == 7
+    assert (stats.pages, stats.fetched, stats.skipped, stats.inserted) == (3, 25, 2, 23)
+    assert stored.finds == 3
+    assert checkpoints.docs["test_node_invoices"]["index"] == 25
+
+    # Nothing new: only the head is asked for.
+    again = await InvoiceBackfill(fake_node(invoices=25), page_size=10).run()
+    assert (again.start_index, again.pages) == (25, 0)
+
+    # New invoices: only the pages after the checkpoint are read.
+    more = await InvoiceBackfill(fake_node(invoices=32), page_size=10).run()
+    assert (more.start_index, more.fetched, more.inserted, more.checkpoint) == (25, 7, 7, 32)
+
+
+async def test_interrupted_backfill_resumes(monkeypatch, checkpoints):
+    stored = FakeCollection("r_hash")
+    use_collection(monkeypatch, InvoiceBackfill, stored)
+    shutdown = asyncio.Event()
+    lnd_client = fake_node(invoices=50)
+    original_page = InvoiceBackfill._page
+
+    async def page_then_stop(self, offset):
+        await original_page(self, offset)
+        if offset == 10:
+            shutdown.set()
+
+    monkeypatch.setattr(InvoiceBackfill, "_page", page_then_stop)
+    stats = await InvoiceBackfill(
+        lnd_client, page_size=10, concurrency=1, shutdown_event=shutdown
+    ).run()
+    assert stats.checkpoint == 20
+    assert checkpoints.docs["test_node_invoices"]["index"] == 20
+
+    monkeypatch.setattr(InvoiceBackfill, "_page", original_page)
+    resumed = await InvoiceBackfill(lnd_client, page_size=10).run()
+    assert (resumed.start_index, resumed.pages, resumed.checkpoint) == (20, 3, 50)
+    assert stored.indexes("add_index") == list(range(1, 51))
+
+
+async def test_payments_enriched_unless_routed(monkeypatch, checkpoints):
+    stored = FakeCollection(
+        "payment_hash",
+        [
+            {"payment_hash": payment_hash(1), "payment_index": 1, "route_str": "a → b"},
+            {"payment_hash": payment_hash(2), "payment_index": 2},
+        ],
+    )
+    use_collection(monkeypatch, PaymentBackfill, stored)
+    route = AsyncMock()
+    decode = AsyncMock()
+    monkeypatch.setattr(lnd_backfill, "update_payment_route_with_alias", route)
+    monkeypatch.setattr(lnd_backfill, "decode_payment_request_and_attach", decode)
+
+    stats = await PaymentBackfill(fake_node(payments=5), page_size=2).run()
+
+    enriched = sorted(call.kwargs["payment"].payment_index for call in route.await_args_list)
+    assert enriched == [2, 3, 4, 5]
+    assert decode.await_count == 4
+    assert (stats.skipped, stats.inserted, stats.modified) == (1, 3, 1)
+    assert stored.docs[payment_hash(1)]["route_str"] == "a → b"
+    assert len(stored.docs) == 5
+    assert checkpoints.docs["test_node_payments"]["index"] == 5
+
+
+async def test_payments_without_route_revisited_below_checkpoint(monkeypatch, checkpoints):
+    stored = FakeCollection("payment_hash")
+    use_collection(monkeypatch, PaymentBackfill, stored)
+    route = AsyncMock()
+    monkeypatch.setattr(lnd_backfill, "update_payment_route_with_alias", route)
+    monkeypatch.setattr(lnd_backfill, "decode_payment_request_and_attach", AsyncMock())
+
+    await PaymentBackfill(fake_node(payments=6), page_size=2).run()
+    assert route.await_count == 6
+    assert checkpoints.docs["test_node_payments"]["index"] == 6
+
+    # No new payments, but payment 4 was stored without a route: its page is read again.
+    del stored.docs[payment_hash(4)]["route_str"]
+    route.reset_mock()
+    stats = await PaymentBackfill(fake_node(payments=6), page_size=2).run()
+    assert [call.kwargs["payment"].payment_index for call in route.await_args_list] == [4]
+    assert (stats.start_index, stats.pages, stats.skipped, stats.checkpoint) == (6, 1, 1, 6)
+    assert stored.docs[payment_hash(4)]["route_str"]
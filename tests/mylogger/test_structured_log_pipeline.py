@@ -0,0 +1,149 @@
+import json
+import logging
+import logging.handlers
+import queue
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from pydantic import BaseModel, Field
+
+from v4vapp_backend_v2.config.mylogger import (
+    LazyExtra,
+    MyJSONFormatter,
+    StructuredQueueHandler,
+    _json_default,
+    lazy_extra,
+    register_log_encoder,
+)
+
+FMT_KEYS = {"level": "levelname", "message": "message", "logger": "name"}
+
+
+class _Model(BaseModel):
+    amount: Decimal = Field(alias="amt")
+
+
+class _Point:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+class _Point3D(_Point):
+    pass
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+        self.setFormatter(MyJSONFormatter(fmt_keys=FMT_KEYS))
+
+    def emit(self, record):
+        self.lines.append(json.loads(self.format(record)))
+
+
+def _logger(name, *handlers):
+    log = logging.getLogger(f"tests.structured.{name}")
+    log.propagate = False
+    log.setLevel(logging.INFO)
+    log.handlers = list(handlers)
+    return log
+
+
+def test_encoders():
+    when = datetime(2026, 10, 17, 8, 30, tzinfo=timezone.utc)
+    assert _json_default(when) == "2026-10-17T08:30:00+00:00"
+    assert _json_default(Decimal("1.25")) == 1.25
+    assert _json_default(_Model(amt=Decimal("2.5"))) == {"amt": Decimal("2.5")}
+    assert sorted(_json_default({3, 1})) == [1, 3]
+    assert _json_default(object.__new__(_Point)).startswith("<")
+
+    register_log_encoder(_Point, lambda p: [p.x, p.y])
+    assert _json_default(_Point3D(1, 2)) == [1, 2]
+
+    line = json.loads(
+        MyJSONFormatter(fmt_keys=FMT_KEYS).format(
+            logging.makeLogRecord({"msg": "m", "model": _Model(amt=Decimal("2.5"))})
+        )
+    )
+    assert line["model"] == {"amt": 2.5}
+
+
+def test_lazy_extra_not_evaluated_when_level_disabled():
+    calls = []
+    handler = _ListHandler()
+    log = _logger("disabled", handler)
+
+    log.debug("skipped", extra={**lazy_extra(lambda: calls.append(1) or {"a": 1})})
+    log.info("written", extra={"b": LazyExtra(lambda: calls.append(2) or 2)})
+
+    assert calls == [2]
+    assert [line["message"] for line in handler.lines] == ["written"]
+    assert handler.lines[0]["b"] == 2
+
+
+def test_lazy_extra_merges_keys_without_overwriting():
+    handler = _ListHandler()
+    log = _logger("merge", handler)
+
+    log.info(
+        "op",
+        extra={
+            "kept": "caller",
+            **lazy_extra(lambda: {"kept": "lazy", "op": {"n": 1}, "msg": "x"}),
+        },
+    )
+
+    (line,) = handler.lines
+    assert line["message"] == "op"
+    assert line["kept"] == "caller"
+    assert line["op"] == {"n": 1}
+    assert "lazy_extra" not in line
+
+
+def test_structured_queue_handler_resolves_deferred_on_writer():
+    q = queue.SimpleQueue()
+    log = _logger("queue", StructuredQueueHandler(q))
+    state = {"n": 1}
+
+    log.info(
+        "queued",
+        extra={
+            "now": LazyExtra(lambda: dict(state)),
+            **lazy_extra(lambda: {"later": dict(state)}, defer=True),
+        },
+    )
+    state["n"] = 2
+    record = q.get_nowait()
+
+    # Non-deferred values are fixed before queueing, deferred ones by the writer.
+    assert record.now == {"n": 1}
+    assert isinstance(record.lazy_extra, LazyExtra)
+    line = json.loads(MyJSONFormatter(fmt_keys=FMT_KEYS).format(record))
+    assert line["now"] == {"n": 1}
+    assert line["later"] == {"n": 2}
+
+
+def test_queue_listener_writes_json(tmp_path):
+    file_handler = logging.FileHandler(tmp_path / "log.jsonl")
+    file_handler.setFormatter(MyJSONFormatter(fmt_keys=FMT_KEYS))
+    front = StructuredQueueHandler(queue.SimpleQueue())
+    listener = logging.handlers.QueueListener(front.queue, file_handler)
+    log = _logger("listener", front)
+
+    listener.start()
+    try:
+        for n in range(20):
+            log.info(
+                "op %s",
+                n,
+                extra={**lazy_extra(lambda n=n: {"op": {"n": n, "d": Decimal(n)}}, defer=True)},
+            )
+    finally:
+        listener.stop()
+        file_handler.close()
+
+    lines = [json.loads(line) for line in (tmp_path / "log.jsonl").read_text().splitlines()]
+    assert [line["message"] for line in lines] == [f"op {n}" for n in range(20)]
+    assert lines[7]["op"] == {"n": 7, "d": 7.0}
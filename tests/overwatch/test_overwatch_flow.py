@@ -5,7 +5,7 @@ Uses real flow data extracted from db_monitor logs for a Hive-to-Keepsats conver
 """
 
 import json
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 import pytest
@@ -14,9 +14,13 @@ from v4vapp_backend_v2.accounting.ledger_entry_class import LedgerEntry
 from v4vapp_backend_v2.accounting.ledger_type_class import LedgerType
 from v4vapp_backend_v2.process.overwatch_flows import HIVE_TO_KEEPSATS_FLOW
 from v4vapp_backend_v2.process.process_overwatch import (
+    _COMPACT_AFTER,
+    _REDIS_ACTIVE_KEY,
+    _REDIS_COMPLETED_PREFIX,
     FlowDefinition,
     FlowEvent,
     FlowInstance,
+    FlowRegistry,
     FlowStage,
     FlowStatus,
     Overwatch,
@@ -1207,3 +1211,269 @@ class TestCompletionReportDeduplication:
         completion_logs = [r for r in caplog.records if "✅" in r.message]
         assert len(completion_logs) == 1
         assert completion_logs[0].__dict__.get("notification") is True
+
+
+# ---------------------------------------------------------------------------
+# Tests: FlowRegistry indexes
+# ---------------------------------------------------------------------------
+
+
+class TestFlowRegistry:
+    def test_open_candidates_by_signature(self):
+        transfers = _make_flow("t", "transfer", 2, trigger_group_id="g1")
+        payments = _make_flow("p", "payment", 2, trigger_group_id="g2")
+        transfers.status = FlowStatus.PENDING
+        payments.status = FlowStatus.PENDING
+        registry = FlowRegistry([transfers, payments])
+
+        event = FlowEvent(event_type="op", op_type="transfer", group_id="x")
+        assert registry.open_candidates(event) == [transfers]
+
+        # A status changed in place is noticed on the next lookup
+        transfers.status = FlowStatus.COMPLETED
+        assert registry.open_candidates(event) == []
+        now = transfers.started_at
+        assert registry.completed_candidates(event, now, timedelta(seconds=30)) == [transfers]
+
+    def test_completed_candidates_pruned_after_window(self):
+        flow = _make_flow("t", "transfer", 1)
+        flow.completed_at = flow.started_at
+        registry = FlowRegistry([flow])
+        event = FlowEvent(event_type="op", op_type="transfer", group_id="x")
+
+        later = flow.started_at + timedelta(minutes=5)
+        assert registry.completed_candidates(event, later, timedelta(seconds=30)) == []
+        # Pruned from the signature index, but still held
+        assert registry.completed_candidates(event, flow.started_at, timedelta(days=1)) == []
+        assert flow in registry
+
+    def test_remove_and_lookups(self):
+        flows = [_make_flow(f"f{n}", "transfer", 1, trigger_group_id=f"g{n}") for n in range(3)]
+        registry = FlowRegistry(flows)
+        assert len(registry) == 3
+        assert registry[1] is flows[1]
+        assert registry.by_trigger_group_id("g2") == [flows[2]]
+
+        registry.remove(flows[0])
+        assert list(registry) == flows[1:]
+        assert registry.by_trigger_group_id("g0") == []
+        with pytest.raises(ValueError):
+            registry.remove(flows[0])
+
+
+# ---------------------------------------------------------------------------
+# Tests: incremental Redis persistence
+# ---------------------------------------------------------------------------
+
+_OPS = ["transfer", "custom_json", "payment", "invoice"]
+
+
+def _persisted_flow(name: str = "persist_flow", gid: str = "pgid") -> FlowInstance:
+    stages = [
+        FlowStage(name=f"stage_{i}_{op}", event_type="op", op_type=op)
+        for i, op in enumerate(_OPS * 10)
+    ]
+    defn = FlowDefinition(name=name, trigger_op_type="transfer", stages=stages)
+    Overwatch.register_flow(defn)
+    return FlowInstance(flow_definition=defn, trigger_group_id=gid, trigger_short_id=gid)
+
+
+def _op(n: int) -> FlowEvent:
+    return FlowEvent(event_type="op", op_type=_OPS[n % len(_OPS)], group_id=f"op_{n}")
+
+
+@pytest.mark.asyncio
+class TestIncrementalPersistence:
+    async def test_changes_logged_then_replayed(self):
+        Overwatch.reset()
+        ow = Overwatch()
+        await ow.reset_redis()
+        r = ow._redis()
+        flow = _persisted_flow()
+        ow.flow_instances.append(flow)
+        flow.add_event(_op(0))
+        await ow._persist_flow(flow)
+        rkey = ow._redis_flow_key(flow)
+        snapshot = await r.hget(_REDIS_ACTIVE_KEY, rkey)
+
+        for n in range(1, 4):
+            flow.add_event(_op(n))
+            await ow._persist_flow(flow)
+        flow.cust_id = ""  # unchanged: nothing to write
+        await ow._persist_flow(flow)
+
+        assert await r.hget(_REDIS_ACTIVE_KEY, rkey) == snapshot
+        log = await r.lrange(ow._redis_log_key(rkey), 0, -1)
+        assert len(log) == 3
+        assert [len(json.loads(record)["events"]) for record in log] == [1, 1, 1]
+
+        Overwatch.reset()
+        ow = Overwatch()
+        _persisted_flow()
+        assert await ow.load_from_redis() >= 1
+        (loaded,) = ow.flow_instances.by_trigger_group_id("pgid")
+        assert len(loaded.events) == 4
+        assert loaded.status == FlowStatus.IN_PROGRESS
+        assert [e.op_type for e in loaded.events] == _OPS
+        # The log was folded into a new snapshot on load
+        assert await r.llen(ow._redis_log_key(rkey)) == 0
+        await ow.reset_redis()
+
+    async def test_log_compacted_into_snapshot(self):
+        Overwatch.reset()
+        ow = Overwatch()
+        await ow.reset_redis()
+        r = ow._redis()
+        flow = _persisted_flow()
+        ow.flow_instances.append(flow)
+        await ow._persist_flow(flow)
+        log_key = ow._redis_log_key(ow._redis_flow_key(flow))
+
+        for n in range(_COMPACT_AFTER):
+            flow.add_event(_op(n))
+            await ow._persist_flow(flow)
+        assert await r.llen(log_key) == _COMPACT_AFTER
+
+        flow.add_event(_op(_COMPACT_AFTER))
+        await ow._persist_flow(flow)
+        assert await r.llen(log_key) == 0
+        stored = FlowInstance.model_validate_json(
+            await r.hget(_REDIS_ACTIVE_KEY, ow._redis_flow_key(flow))
+        )
+        assert len(stored.events) == _COMPACT_AFTER + 1
+        await ow.reset_redis()
+
+    async def test_writes_in_one_tick_share_a_flush(self):
+        Overwatch.reset()
+        ow = Overwatch()
+        await ow.reset_redis()
+        flows = [_persisted_flow(gid=f"tick{n}") for n in range(3)]
+        for flow in flows:
+            ow._mark_dirty(flow)
+        task = Overwatch._flush_task
+        assert task is not None and len(Overwatch._dirty) == 3
+        await ow._flush_pending()
+        assert task.done() and not Overwatch._dirty
+        stored = await ow._redis().hkeys(_REDIS_ACTIVE_KEY)
+        assert {ow._redis_flow_key(flow) for flow in flows} <= set(stored)
+        await ow.reset_redis()
+
+    async def test_failed_flush_requeued(self, monkeypatch):
+        Overwatch.reset()
+        ow = Overwatch()
+        await ow.reset_redis()
+        real = ow._redis()
+
+        class _Down:
+            def pipeline(self, transaction=True):
+                raise ConnectionError("redis down")
+
+        monkeypatch.setattr(Overwatch, "_redis", staticmethod(lambda: _Down()))
+        flow = _persisted_flow(gid="requeue")
+        ow._stale_keys.add("stale:key")
+        await ow._persist_flow(flow)
+        assert Overwatch._dirty == {id(flow): flow}
+        assert Overwatch._stale_keys == {"stale:key"}
+        assert Overwatch._flush_task is None and Overwatch._flush_retry is not None
+
+        monkeypatch.setattr(Overwatch, "_redis", staticmethod(lambda: real))
+        Overwatch._flush_retry.cancel()
+        ow._retry_flush()
+        await ow._flush_pending()
+        assert not Overwatch._dirty and not Overwatch._stale_keys
+        assert await real.hexists(_REDIS_ACTIVE_KEY, ow._redis_flow_key(flow))
+        await ow.reset_redis()
+
+    async def test_old_completed_flows_left_in_redis(self):
+        Overwatch.reset()
+        ow = Overwatch()
+        await ow.reset_redis()
+        now = datetime.now(tz=timezone.utc)
+        recent = _make_flow("recent", "transfer", 1, trigger_group_id="g_recent", cust_id="alice")
+        old = _make_flow("old", "transfer", 1, trigger_group_id="g_old", cust_id="bob")
+        recent.completed_at = now
+        old.completed_at = now - timedelta(hours=1)
+        await ow._persist_flow(recent)
+        await ow._persist_flow(old)
+
+        Overwatch.reset()
+        ow = Overwatch()
+        await ow.load_from_redis()
+        assert [f.trigger_group_id for f in ow.completed_flows] == ["g_recent"]
+        assert list(Overwatch._dormant_completed) == [ow._redis_flow_key(old)]
+        assert await ow._redis().exists(f"{_REDIS_COMPLETED_PREFIX}{ow._redis_flow_key(old)}")
+        await ow.reset_redis()
+
+
+# ---------------------------------------------------------------------------
+# Tests: stall timers
+# ---------------------------------------------------------------------------
+
+
+def _timed_flow(gid: str, last_event: datetime, events: int = 2) -> FlowInstance:
+    stages = [FlowStage(name=f"s{i}", event_type="op", op_type="transfer") for i in range(5)]
+    defn = FlowDefinition(name="timed", trigger_op_type="transfer", stages=stages)
+    flow = FlowInstance(flow_definition=defn, trigger_group_id=gid, started_at=last_event)
+    for n in range(events):
+        flow.add_event(
+            FlowEvent(
+                event_type="op", op_type="transfer", group_id=f"{gid}_{n}", timestamp=last_event
+            )
+        )
+    return flow
+
+
+@pytest.mark.asyncio
+class TestStallTimers:
+    async def test_only_due_flows_are_checked(self):
+        Overwatch.reset()
+        ow = Overwatch()
+        now = datetime.now(tz=timezone.utc)
+        fresh = [_timed_flow(f"fresh{n}", now) for n in range(200)]
+        old = _timed_flow("old", now - Overwatch.stall_timeout - timedelta(seconds=5))
+        ow.flow_instances.extend([*fresh, old])
+
+        assert await ow.check_stalls(now=now) == [old]
+        stats = ow.stall_timer_stats
+        assert (stats.armed, stats.fired, stats.acted) == (200, 1, 1)
+        assert stats.last_lag == pytest.approx(5, abs=0.01)
+        assert stats.next_deadline == now + Overwatch.stall_timeout
+
+        # Nothing else is due: nothing is looked at
+        assert await ow.check_stalls(now=now + timedelta(seconds=1)) == []
+        assert ow.stall_timer_stats.fired == 1
+
+    async def test_event_moves_deadline_on(self):
+        Overwatch.reset()
+        ow = Overwatch()
+        start = datetime.now(tz=timezone.utc)
+        flow = _timed_flow("moving", start)
+        ow.flow_instances.append(flow)
+        await ow.check_stalls(now=start)
+
+        later = start + Overwatch.stall_timeout / 2
+        flow.add_event(
+            FlowEvent(event_type="op", op_type="transfer", group_id="late", timestamp=later)
+        )
+        # The old deadline fires, finds the newer event and re-arms
+        assert (
+            await ow.check_stalls(now=start + Overwatch.stall_timeout + timedelta(seconds=1)) == []
+        )
+        assert ow.stall_timer_stats.acted == 0
+        assert ow.stall_timer_stats.next_deadline == later + Overwatch.stall_timeout
+        assert flow.status == FlowStatus.IN_PROGRESS
+
+    async def test_earlier_deadline_rearms(self):
+        Overwatch.reset()
+        ow = Overwatch()
+        now = datetime.now(tz=timezone.utc)
+        flow = _timed_flow("grace", now)
+        ow.flow_instances.append(flow)
+        await ow.check_stalls(now=now)
+
+        flow.superset_grace_expires = now + timedelta(seconds=10)
+        assert ow.stall_timer_stats.next_deadline == now + Overwatch.stall_timeout
+        await ow.check_stalls(now=now + timedelta(seconds=10))
+        assert flow.status == FlowStatus.FAILED
+        assert flow not in ow.flow_instances
+        assert ow.stall_timer_stats.armed == 0
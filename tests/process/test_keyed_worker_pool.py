@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+from v4vapp_backend_v2.process.keyed_worker_pool import CompletionWatermark, KeyedWorkerPool
+
+
+@pytest.mark.asyncio
+async def test_pool_orders_per_key_and_runs_keys_in_parallel():
+    pool = KeyedWorkerPool(name="test", workers=4)
+    order: dict[str, list[int]] = {}
+    running = 0
+    max_running = 0
+
+    def make_job(key: str, n: int, delay: float):
+        async def job():
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(delay)
+            order.setdefault(key, []).append(n)
+            running -= 1
+
+        return job
+
+    for n in range(5):
+        for i, key in enumerate(("alice", "bob", "carol")):
+            # later jobs finish faster, so any reordering within a key would show up
+            await pool.submit(key, make_job(key, n, delay=0.01 * (5 - n) + 0.001 * i))
+    await pool.join()
+    await pool.stop()
+
+    assert order == {key: list(range(5)) for key in ("alice", "bob", "carol")}
+    assert max_running == 3, "one job per key at a time, all keys in parallel"
+    stats = pool.stats()
+    assert stats["pending"] == 0
+    assert sum(w["processed"] for w in stats["worker_stats"]) == 15
+
+
+@pytest.mark.asyncio
+async def test_pool_failed_job_does_not_block_key():
+    pool = KeyedWorkerPool(name="test", workers=2, max_pending=2)
+    done: list[int] = []
+
+    async def boom():
+        raise ValueError("boom")
+
+    async def ok():
+        done.append(1)
+
+    await pool.submit("alice", boom, on_done=lambda: done.append(0))
+    await pool.submit("alice", ok)
+    await pool.submit("alice", ok)  # waits for capacity
+    await pool.join()
+    await pool.stop()
+    assert done == [0, 1, 1]
+    assert sum(w["errors"] for w in pool.stats()["worker_stats"]) == 1
+
+
+def test_completion_watermark_only_advances_over_completed_prefix():
+    stored = []
+    watermark = CompletionWatermark(on_advance=stored.append)
+    seqs = [watermark.add(f"t{i}") for i in range(4)]
+    watermark.done(seqs[2])
+    assert stored == []
+    watermark.done(seqs[0])
+    assert stored == ["t0"]
+    watermark.done(seqs[1])
+    assert stored == ["t0", "t2"]
+    assert len(watermark) == 1
+    watermark.done(seqs[3])
+    assert stored[-1] == "t3" and len(watermark) == 0
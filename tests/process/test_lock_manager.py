@@ -0,0 +1,141 @@
+"""
+Tests for the local-first LockStr lock manager.
+
+Covers:
+- tasks in one process get the lock in FIFO order, one at a time
+- queued local waiters are handed the lease without another Redis round trip
+- a second "process" (manager) is excluded and woken by the release message
+- fencing tokens increase across Redis leases
+- a handed-off lease that was lost is not renewed; the waiter takes a new one
+- blocking_timeout surfaces as CustIDLockException through LockStr
+"""
+
+import asyncio
+from uuid import uuid4
+
+import pytest
+
+from v4vapp_backend_v2.config.setup import InternalConfig
+from v4vapp_backend_v2.process import lock_manager as lock_manager_module
+from v4vapp_backend_v2.process.lock_manager import LOCK_PREFIX, LockManager
+from v4vapp_backend_v2.process.lock_str_class import CustIDLockException, LockStr
+
+
+@pytest.fixture
+async def lock_name():
+    InternalConfig()  # fresh Redis clients; other tests replace them
+    name = f"test_lock_manager_{uuid4().hex[:8]}"
+    yield name
+    await InternalConfig.redis_async.delete(f"{LOCK_PREFIX}{name}")
+
+
+async def test_local_waiters_fifo_and_handoff(lock_name):
+    manager = LockManager()
+    order = []
+    inside = 0
+
+    async def worker(i: int):
+        nonlocal inside
+        await manager.acquire(lock_name, timeout=10, details=f"worker {i}")
+        inside += 1
+        assert inside == 1
+        order.append(i)
+        await asyncio.sleep(0)
+        inside -= 1
+        await manager.release(lock_name)
+
+    tasks = []
+    for i in range(10):
+        tasks.append(asyncio.create_task(worker(i)))
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+
+    assert order == list(range(10))
+    assert manager.stats["redis_acquires"] == 1
+    assert manager.stats["local_handoffs"] == 9
+    assert not await InternalConfig.redis_async.exists(f"{LOCK_PREFIX}{lock_name}")
+    assert manager.waiters() == {}
+
+
+async def test_handoff_limit_goes_back_to_redis(lock_name):
+    manager = LockManager(max_local_handoffs=2)
+
+    async def worker():
+        await manager.acquire(lock_name)
+        await asyncio.sleep(0)
+        await manager.release(lock_name)
+
+    await asyncio.gather(*(worker() for _ in range(6)))
+    assert manager.stats["redis_acquires"] == 2
+    assert manager.stats["local_handoffs"] == 4
+
+
+async def test_other_process_woken_by_release(lock_name):
+    first, second = LockManager(recheck=30), LockManager(recheck=30)
+    lease = await first.acquire(lock_name, timeout=30)
+
+    waiter = asyncio.create_task(second.acquire(lock_name, timeout=30))
+    await asyncio.sleep(0.2)
+    assert not waiter.done()
+    assert second.stats["redis_waits"] >= 1
+
+    await first.release(lock_name)
+    # Woken by pub/sub, long before the 30 second recheck.
+    second_lease = await asyncio.wait_for(waiter, 2)
+    assert second_lease.fence > lease.fence
+    await second.release(lock_name)
+
+
+async def test_release_does_not_delete_another_owners_key(lock_name):
+    manager = LockManager()
+    key = f"{LOCK_PREFIX}{lock_name}"
+    await manager.acquire(lock_name, timeout=30)
+    # Lease lost (expired) and the key taken by someone else.
+    await InternalConfig.redis_async.set(key, "someone-else")
+
+    assert await manager.release(lock_name)
+    assert await InternalConfig.redis_async.get(key) == "someone-else"
+    assert not manager.held(lock_name)
+
+
+async def test_lost_lease_not_renewed_on_handoff(lock_name):
+    manager = LockManager(recheck=0.05)
+    key = f"{LOCK_PREFIX}{lock_name}"
+    first = await manager.acquire(lock_name, timeout=30)
+    waiter = asyncio.create_task(manager.acquire(lock_name, timeout=30))
+    await asyncio.sleep(0)
+    # Lease lost (expired) and the key taken by another process for a short while.
+    await InternalConfig.redis_async.set(key, "someone-else", px=300)
+
+    await manager.release(lock_name)
+    second = await asyncio.wait_for(waiter, 2)
+    assert second.fence > first.fence
+    assert await InternalConfig.redis_async.get(key) == second.owner
+    assert manager.stats["redis_acquires"] == 2
+    await manager.release(lock_name)
+
+
+async def test_lock_str_timeout_and_fence(lock_name, monkeypatch):
+    manager = LockManager(recheck=0.1)
+    monkeypatch.setattr("v4vapp_backend_v2.process.lock_str_class.LOCK_MANAGER", manager)
+    # test_lock_str swaps the module's LockStr and exception for fakes at collection time.
+    monkeypatch.setattr("v4vapp_backend_v2.process.lock_str_class.LockStr", LockStr)
+    monkeypatch.setattr(
+        "v4vapp_backend_v2.process.lock_str_class.CustIDLockException", CustIDLockException
+    )
+    assert lock_manager_module.LOCK_MANAGER is not manager
+
+    lock = LockStr(lock_name)
+    async with lock.locked(timeout=30, request_details="holder") as lease:
+        assert lease.fence > 0
+        assert await LockStr.check_lock_exists(lock_name)
+        other = LockManager(recheck=0.1)
+        with pytest.raises(lock_manager_module.LockTimeout):
+            await other.acquire(lock_name, blocking_timeout=0.3)
+
+        # Same process: queued locally behind the holder, then gives up.
+        with pytest.raises(CustIDLockException):
+            await lock.acquire_lock(blocking_timeout=0.3)
+        assert manager.waiters() == {}
+    assert not await LockStr.check_lock_exists(lock_name)
+    assert not manager.held(lock_name)
@@ -373,3 +373,57 @@ def test_pipeline_filters_ignored_updates():
         filtered.append(e)
 
     assert filtered == [evt_allowed]
+
+
+@pytest.mark.asyncio
+async def test_subscribe_stream_orders_per_customer_and_gates_resume(monkeypatch):
+    """Changes for one customer are processed in order, and the resume token only
+    moves past an event once it and every earlier event have been processed."""
+    changes = [
+        {"_id": {"n": 0}, "fullDocument": {"_id": 0, "cust_id": "alice"}},
+        {"_id": {"n": 1}, "fullDocument": {"_id": 1, "cust_id": "bob"}},
+        {"_id": {"n": 2}, "fullDocument": {"_id": 2, "cust_id": "alice"}},
+        {"_id": {"n": 3}, "updateDescription": {"updatedFields": {"locked": True}}},
+    ]
+    dummy_col = DummyCollection()
+    monkeypatch.setattr(db_monitor.InternalConfig, "db", DummyDB(dummy_col))
+
+    async def watch(**kwargs):
+        class Ctx:
+            async def __aenter__(inner):
+                return inner
+
+            async def __aexit__(inner, exc_type, exc_val, exc_tb):
+                return False
+
+            async def __aiter__(inner):
+                for change in changes:
+                    yield change
+
+        return Ctx()
+
+    monkeypatch.setattr(dummy_col, "watch", watch)
+    # earlier tests may have set the module-level shutdown event
+    monkeypatch.setattr(db_monitor, "shutdown_event", asyncio.Event())
+
+    processed: list = []
+    tokens: list = []
+
+    async def slow_process_op(change, collection):
+        # the first alice event is the slowest; bob must not wait for it
+        await asyncio.sleep(0.05 if change["fullDocument"]["_id"] == 0 else 0.001)
+        processed.append(change["fullDocument"]["_id"])
+
+    monkeypatch.setattr(db_monitor, "process_op", slow_process_op)
+    monkeypatch.setattr(ResumeToken, "set_token", lambda self, token: tokens.append(token))
+    db_monitor.set_process_workers(4)
+
+    await db_monitor.subscribe_stream(collection_name="payments", pipeline=None, use_resume=False)
+    pool = db_monitor.process_pool()
+    await pool.join()
+
+    assert processed == [1, 0, 2]
+    # bob (n=1) finished first, but no token is stored until the slow alice event is done
+    assert tokens == [{"n": 1}, {"n": 3}]
+    assert db_monitor.process_pool_stats()["resume_backlog"]["payments"] == 0
+    await pool.stop()